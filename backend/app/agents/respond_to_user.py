@@ -2,35 +2,28 @@
 # Agent to stream the response to user and potentially the artifact (quiz) to the user
 
 from typing import Dict, Any
-from langchain_core.messages import HumanMessage
 from app.models.pydantic_models import GoalGetterState
 
 import logging
 logger = logging.getLogger(__name__)
 
 async def respond_to_user_node(state: Dict[str, Any]) -> Dict[str, Any]:
-    """Node for handling user communication and updating conversation history."""
+    """Node for handling user communication: sets the response the API sends back."""
     logger.info("===== Entering Respond to User Node ======")
-  
+
     current_state = state if isinstance(state, GoalGetterState) else GoalGetterState(**state)
-    
-    # Process message to user if there is one
-    if current_state.message_to_student:
-        logger.info(f"Processing message to user: {current_state.message_to_student}")
-        # Add assistant's message to conversation history
-        current_state.conversation_history.append({
-            "role": "assistant",
-            "content": current_state.message_to_student
-        })
-    
+
+    # The router's message to the user becomes the response
+    message_to_user = current_state.agent_outputs.router_output.get("message_to_user")
+    if message_to_user:
+        logger.info(f"Processing message to user: {message_to_user}")
+        current_state.response = message_to_user
+
     return_state = {
-        "conversation_history": current_state.conversation_history,
-        "response_to_user_attempts": current_state.response_to_user_attempts + 1,
-        "current_step": "respond_to_user",
-        # Keep the message_to_user in the state so it can be sent in the API response
-        "message_to_user": current_state.message_to_user
+        "response": current_state.response,
+        "interaction_count": current_state.interaction_count + 1,
     }
-    
+
     logger.info("===== Exiting Respond to User Node ======")
-    
-    return return_state
\ No newline at end of file
+
+    return return_state
@@ -59,7 +59,7 @@ async def router_node(state: Dict[str, Any]) -> Dict[str, Any]:
             {"role": "user", "content": user_input if user_input else ""}
         ]
         
-        response = call_llm_api(
+        response = await call_llm_api(
             messages=messages,
             #model="gpt-4o-mini-2024-07-18",
             temperature=0.7,
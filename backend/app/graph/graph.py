@@ -9,6 +9,9 @@ from app.models.pydantic_models import GoalGetterState
 #Nodes
 from app.agents.router_agent import router_node
 
+#Tracing
+from app.shared_services.tracing import traced
+
 
 # """ 
 # Graph will use a routing node to determine the first Node.
@@ -90,7 +93,7 @@ def build_graph(state: Dict[str, Any] = None) -> StateGraph:
     """Build the GoalGetter workflow graph."""
     #--- Start with the welcome node ---
     workflow = StateGraph(GoalGetterState)
-    workflow.add_node("routing_agent", router_node)
+    workflow.add_node("routing_agent", traced("graph.routing_agent")(router_node))
 
     #--- Add edges ---
     workflow.add_edge(START, "routing_agent")
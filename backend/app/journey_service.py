@@ -1,4 +1,4 @@
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Iterator
 from uuid import UUID
 
 from .models.journey_models import (
@@ -13,6 +13,9 @@ from .services.journey.load_service import JourneyLoadService
 from .services.journey.list_service import JourneyListService
 from .services.journey.delete_service import JourneyDeleteService
 from .services.journey.stats_service import JourneyStatsService
+from .services.journey.stream_service import JourneyStreamService
+from .services.journey.analysis_service import JourneyAnalysisService
+from .services.journey.milestone_service import JourneyMilestoneService
 
 class JourneyService:
     """Main facade for journey operations - delegates to specialized services"""
@@ -25,19 +28,27 @@ class JourneyService:
         self.list_service = JourneyListService()
         self.delete_service = JourneyDeleteService()
         self.stats_service = JourneyStatsService()
+        self.stream_service = JourneyStreamService()
+        self.analysis_service = JourneyAnalysisService()
+        self.milestone_service = JourneyMilestoneService()
     
     async def create_journey(self, journey_data: CompleteJourneyState, user_id: Optional[str] = None) -> APIResponse:
         """Create a new journey with all its components"""
         return await self.create_service.create_journey(journey_data, user_id)
     
-    async def save_journey(self, journey_id: str, journey_data: CompleteJourneyState) -> APIResponse:
-        """Save/update an existing journey"""
-        return await self.save_service.save_journey(journey_id, journey_data)
+    async def save_journey(self, journey_id: str, journey_data: CompleteJourneyState,
+                           expected_revision: Optional[int] = None) -> APIResponse:
+        """Save/update an existing journey, if it is still at the expected revision"""
+        return await self.save_service.save_journey(journey_id, journey_data, expected_revision)
     
     async def load_journey(self, journey_id: str) -> APIResponse:
         """Load a complete journey by ID"""
         return await self.load_service.load_journey(journey_id)
     
+    def stream_journey(self, journey_id: str) -> Optional[Iterator[bytes]]:
+        """Stream a complete journey as JSON chunks (None if not found)"""
+        return self.stream_service.stream_journey(journey_id)
+    
     async def list_journeys(self, user_id: Optional[str] = None, limit: int = 50, offset: int = 0) -> APIResponse:
         """List journeys for a user"""
         return await self.list_service.list_journeys(user_id, limit, offset)
@@ -55,22 +66,46 @@ class JourneyService:
         """Get journey canvas data (nodes and edges only)"""
         return await self.load_service.get_journey_canvas(journey_id)
     
-    async def save_journey_canvas(self, journey_id: str, canvas_data: dict) -> APIResponse:
+    def stream_journey_canvas(self, journey_id: str) -> Iterator[bytes]:
+        """Stream journey canvas data (nodes and edges only) as JSON chunks"""
+        return self.stream_service.stream_journey_canvas(journey_id)
+    
+    async def load_compact_canvas(self, journey_id: str) -> APIResponse:
+        """Load journey nodes and edges into a CompactCanvas (server-side processing)"""
+        return await self.load_service.load_compact_canvas(journey_id)
+    
+    async def analyze_journey(self, journey_id: str) -> APIResponse:
+        """Structural analysis of the journey graph (cached per journey revision)"""
+        return await self.analysis_service.analyze_journey(journey_id)
+    
+    async def save_journey_canvas(self, journey_id: str, canvas_data: dict,
+                                  expected_revision: Optional[int] = None) -> APIResponse:
         """Save journey canvas data (nodes and edges only)"""
-        return await self.save_service.save_journey_canvas(journey_id, canvas_data)
+        return await self.save_service.save_journey_canvas(journey_id, canvas_data, expected_revision)
     
     async def get_journey_goals(self, journey_id: str) -> APIResponse:
         """Get journey goals only"""
         return await self.load_service.get_journey_goals(journey_id)
     
-    async def save_journey_goals(self, journey_id: str, goals_data: dict) -> APIResponse:
+    async def save_journey_goals(self, journey_id: str, goals_data: dict,
+                                 expected_revision: Optional[int] = None) -> APIResponse:
         """Save journey goals only"""
-        return await self.save_service.save_journey_goals(journey_id, goals_data)
+        return await self.save_service.save_journey_goals(journey_id, goals_data, expected_revision)
     
     async def get_journey_milestones(self, journey_id: str) -> APIResponse:
         """Get journey milestones only"""
         return await self.load_service.get_journey_milestones(journey_id)
     
-    async def save_journey_milestones(self, journey_id: str, milestones_data: dict) -> APIResponse:
+    async def save_journey_milestones(self, journey_id: str, milestones_data: dict,
+                                      expected_revision: Optional[int] = None) -> APIResponse:
         """Save journey milestones only"""
-        return await self.save_service.save_journey_milestones(journey_id, milestones_data)
+        return await self.save_service.save_journey_milestones(journey_id, milestones_data, expected_revision)
+    
+    async def get_milestone_dependencies(self, journey_id: str) -> APIResponse:
+        """Milestone readiness, completion estimates and critical path"""
+        return await self.milestone_service.get_milestone_dependencies(journey_id)
+    
+    async def update_milestone_status(self, journey_id: str, milestone_id: str, status: str,
+                                      progress: Optional[int] = None) -> APIResponse:
+        """Change one milestone's status and resolve the milestones it unblocks"""
+        return await self.milestone_service.update_milestone_status(journey_id, milestone_id, status, progress)
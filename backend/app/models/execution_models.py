@@ -0,0 +1,15 @@
+from pydantic import BaseModel, Field
+from typing import List, Dict, Any, Optional
+
+# ============================================================================
+# EXECUTION REQUEST MODELS
+# ============================================================================
+
+class ExecutionCustomer(BaseModel):
+    customerId: str
+    attributes: Dict[str, Any] = Field(default_factory=dict)
+
+class EnrollCustomersRequest(BaseModel):
+    """Enroll customers into the latest published version of a journey"""
+    customers: List[ExecutionCustomer]
+    entryNodeId: Optional[str] = None  # defaults to the journey's first entry node
@@ -1,4 +1,4 @@
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, TypeAdapter
 from typing import List, Dict, Any, Optional, Union
 from datetime import datetime, date
 from enum import Enum
@@ -118,6 +118,7 @@ class Journey(BaseModel):
     is_view_only: bool = False
     created_at: datetime = Field(default_factory=datetime.now)
     updated_at: datetime = Field(default_factory=datetime.now)
+    revision: int = 1
     user_id: Optional[str] = None
 
 class JourneyNode(BaseModel):
@@ -198,7 +199,10 @@ class CompleteJourneyState(BaseModel):
     description: str
     createdAt: datetime
     updatedAt: datetime
-    
+    # Revision the state was loaded at; a save carrying it fails with a conflict if the
+    # journey was saved since. None saves unconditionally (last write wins).
+    revision: Optional[int] = None
+
     # Journey state flags
     isPublished: bool = False
     isDeleted: bool = False
@@ -244,6 +248,18 @@ class JourneySaveRequest(BaseModel):
     """Save complete journey state"""
     journey: CompleteJourneyState
 
+class MilestoneStatusRequest(BaseModel):
+    """Change the status of a single milestone"""
+    status: MilestoneStatus
+    progress: Optional[int] = Field(default=None, ge=0, le=100)
+
+class GenerateReportRequest(BaseModel):
+    """Build a server-side report over an optional [windowStart, windowEnd) window"""
+    type: ReportType
+    windowStart: Optional[datetime] = None
+    windowEnd: Optional[datetime] = None
+    name: Optional[str] = None
+
 class JourneyResponse(BaseModel):
     success: bool
     message: str
@@ -281,4 +297,11 @@ class APIResponse(BaseModel):
     data: Optional[Dict[str, Any]] = None
     error: Optional[str] = None
 
+# ============================================================================
+# PREBUILT ADAPTERS
+# ============================================================================
+# Built once at import time so request handlers validate raw JSON and dump models
+# straight to bytes without rebuilding validators/serializers per call.
 
+JourneySaveRequestAdapter = TypeAdapter(JourneySaveRequest)
+JourneyResponseAdapter = TypeAdapter(JourneyResponse)
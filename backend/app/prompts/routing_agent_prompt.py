@@ -1,5 +1,7 @@
 from app.models.pydantic_models import GoalGetterState, RouterOutput
+from app.shared_services.tracing import traced
 
+@traced()
 def get_routing_agent_prompt(current_state: GoalGetterState) -> str:
     
     return f"""
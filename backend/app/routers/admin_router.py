@@ -0,0 +1,168 @@
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Path, Query
+from fastapi.responses import PlainTextResponse
+
+from ..models.journey_models import APIResponse
+from ..shared_services.logger_setup import setup_logger
+from ..shared_services.profiler import admin_authorized, profiler_registry
+from ..shared_services.query_stats import query_stats
+from ..shared_services.serialization import ORJSONResponse
+
+logger = setup_logger()
+
+
+async def require_admin(x_admin_token: Optional[str] = Header(None, description="Value of ADMIN_TOKEN")):
+    """Admin endpoints answer 404 unless ADMIN_TOKEN is configured and sent"""
+    if not admin_authorized(x_admin_token):
+        raise HTTPException(status_code=404, detail="Not Found")
+
+
+router = APIRouter(
+    prefix="/api/admin",
+    tags=["admin"],
+    default_response_class=ORJSONResponse,
+    dependencies=[Depends(require_admin)],
+)
+
+@router.get("/profiler", response_model=APIResponse)
+async def profiler_status():
+    """
+    Get the running profiler, the stored profiles and whether tracemalloc is tracing (this process only)
+    """
+    return ORJSONResponse(APIResponse(success=True, message="Profiler status", data=profiler_registry.status()))
+
+@router.post("/profiler/start", response_model=APIResponse)
+async def start_profiler(
+    interval_ms: float = Query(5, ge=1, le=1000, description="Sampling interval in milliseconds"),
+    max_seconds: float = Query(300, ge=1, le=3600, description="Stop automatically after this many seconds"),
+    include_idle: bool = Query(False, description="Also count threads waiting on I/O or locks")
+):
+    """
+    Start sampling every thread's stack in this process
+    """
+    try:
+        profiler = profiler_registry.start(interval_ms, max_seconds, include_idle)
+        if profiler is None:
+            raise HTTPException(status_code=400, detail="The profiler is already running")
+        return ORJSONResponse(APIResponse(success=True, message="Profiler started", data=profiler.summary()))
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error starting profiler: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.post("/profiler/stop", response_model=APIResponse)
+async def stop_profiler():
+    """
+    Stop the profiler and keep its profile for download
+    """
+    try:
+        profile_id = profiler_registry.stop()
+        if profile_id is None:
+            raise HTTPException(status_code=400, detail="The profiler is not running")
+        return ORJSONResponse(APIResponse(
+            success=True,
+            message="Profiler stopped",
+            data={"id": profile_id, **profiler_registry.get(profile_id).summary()}
+        ))
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error stopping profiler: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/profiler/profiles/{profile_id}", response_class=PlainTextResponse)
+async def download_profile(
+    profile_id: str = Path(..., description="Profile ID (from /profiler/stop or the X-Profile-Id header)")
+):
+    """
+    Download a profile as collapsed stacks (flamegraph.pl, speedscope, inferno)
+    """
+    profiler = profiler_registry.get(profile_id)
+    if profiler is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return PlainTextResponse(
+        profiler.folded(),
+        headers={"Content-Disposition": f'attachment; filename="profile-{profile_id}.folded"'}
+    )
+
+@router.post("/tracemalloc/start", response_model=APIResponse)
+async def start_tracemalloc(
+    frames: int = Query(25, ge=1, le=100, description="Stack frames stored per allocation")
+):
+    """
+    Start tracing memory allocations (slows the process down until stopped)
+    """
+    if not profiler_registry.start_tracemalloc(frames):
+        raise HTTPException(status_code=400, detail="tracemalloc is already tracing")
+    return ORJSONResponse(APIResponse(success=True, message="tracemalloc started", data={"frames": frames}))
+
+@router.post("/tracemalloc/stop", response_model=APIResponse)
+async def stop_tracemalloc():
+    """
+    Stop tracing memory allocations
+    """
+    if not profiler_registry.stop_tracemalloc():
+        raise HTTPException(status_code=400, detail="tracemalloc is not tracing")
+    return ORJSONResponse(APIResponse(success=True, message="tracemalloc stopped"))
+
+@router.get("/tracemalloc/snapshot", response_model=APIResponse)
+async def tracemalloc_snapshot(
+    limit: int = Query(50, ge=1, le=1000, description="Allocation sites returned"),
+    key_type: str = Query("lineno", pattern="^(lineno|filename|traceback)$", description="Group allocations by"),
+    compare: bool = Query(False, description="Show the change since the previous snapshot")
+):
+    """
+    Get the top allocation sites, or the growth since the previous snapshot
+    """
+    try:
+        if not profiler_registry.status()["tracemalloc"]:
+            raise HTTPException(status_code=400, detail="tracemalloc is not tracing")
+        return ORJSONResponse(APIResponse(
+            success=True,
+            message="tracemalloc snapshot",
+            data=profiler_registry.snapshot(limit, key_type, compare)
+        ))
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error taking tracemalloc snapshot: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/queries", response_model=APIResponse)
+async def query_report(
+    limit: int = Query(20, ge=1, le=500, description="Statements returned"),
+    order_by: str = Query("totalMs", pattern="^(totalMs|meanMs|maxMs|calls|slowCalls)$", description="Sort key")
+):
+    """
+    Get the top statement fingerprints by time, with whether a slow-query plan was captured (this process only)
+    """
+    return ORJSONResponse(APIResponse(
+        success=True,
+        message="Query report",
+        data={"since": query_stats.since, "queries": query_stats.report(limit, order_by)}
+    ))
+
+@router.get("/queries/{fingerprint}", response_model=APIResponse)
+async def get_query(
+    fingerprint: str = Path(..., description="Statement fingerprint")
+):
+    """
+    Get one statement fingerprint with its latest EXPLAIN plan
+    """
+    entry = query_stats.get(fingerprint)
+    if entry is None:
+        raise HTTPException(status_code=404, detail="Query not found")
+    return ORJSONResponse(APIResponse(success=True, message="Query retrieved", data=entry))
+
+@router.post("/queries/reset", response_model=APIResponse)
+async def reset_queries():
+    """
+    Forget all statement fingerprints and plans
+    """
+    query_stats.reset()
+    return ORJSONResponse(APIResponse(success=True, message="Query statistics reset"))
@@ -0,0 +1,220 @@
+from typing import Optional
+
+from fastapi import APIRouter, HTTPException, Query, Path, UploadFile, File
+
+from ..models.journey_models import APIResponse
+from ..models.execution_models import EnrollCustomersRequest
+from ..services.execution.execution_service import JourneyExecutionService, EXECUTION_BATCH_SIZE
+from ..services.execution.ingestion_service import EntryIngestionService
+from ..services.execution.progress_service import JourneyProgressService
+from ..shared_services.logger_setup import setup_logger
+from ..shared_services.serialization import ORJSONResponse
+
+logger = setup_logger()
+router = APIRouter(prefix="/api/journeys", tags=["execution"], default_response_class=ORJSONResponse)
+
+# Initialize service
+execution_service = JourneyExecutionService()
+ingestion_service = EntryIngestionService()
+progress_service = JourneyProgressService()
+
+@router.post("/{journey_id}/execution/publish", response_model=APIResponse)
+async def publish_journey(
+    journey_id: str = Path(..., description="Journey ID")
+):
+    """
+    Compile the saved journey into a new immutable execution plan version
+    """
+    try:
+        logger.info(f"Publishing journey for execution: {journey_id}")
+
+        result = await execution_service.publish_journey(journey_id)
+
+        if result.success:
+            return ORJSONResponse(result)
+        else:
+            raise HTTPException(status_code=400, detail=result.error or result.message)
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error publishing journey: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.post("/{journey_id}/execution/enroll", response_model=APIResponse)
+async def enroll_customers(
+    request: EnrollCustomersRequest,
+    journey_id: str = Path(..., description="Journey ID")
+):
+    """
+    Enroll customers into the latest published version of the journey
+    """
+    try:
+        logger.info(f"Enrolling {len(request.customers)} customers into journey: {journey_id}")
+
+        result = await execution_service.enroll_customers(
+            journey_id,
+            [customer.model_dump() for customer in request.customers],
+            request.entryNodeId
+        )
+
+        if result.success:
+            return ORJSONResponse(result)
+        else:
+            raise HTTPException(status_code=400, detail=result.error or result.message)
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error enrolling customers: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.post("/{journey_id}/execution/run", response_model=APIResponse)
+async def run_journey(
+    journey_id: str = Path(..., description="Journey ID"),
+    batch_size: int = Query(EXECUTION_BATCH_SIZE, ge=1, le=50000, description="Customers per batch"),
+    max_batches: int = Query(10, ge=1, le=1000, description="Maximum batches to process")
+):
+    """
+    Advance due customers through the journey
+    """
+    try:
+        logger.info(f"Running journey: {journey_id} (batch_size={batch_size}, max_batches={max_batches})")
+
+        result = await execution_service.run_journey(journey_id, batch_size, max_batches)
+
+        if result.success:
+            return ORJSONResponse(result)
+        else:
+            raise HTTPException(status_code=500, detail=result.error or result.message)
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error running journey: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/{journey_id}/execution", response_model=APIResponse)
+async def get_execution_summary(
+    journey_id: str = Path(..., description="Journey ID")
+):
+    """
+    Get customer counts per node and status
+    """
+    try:
+        logger.info(f"Getting execution summary: {journey_id}")
+
+        result = await execution_service.get_execution_summary(journey_id)
+
+        if result.success:
+            return ORJSONResponse(result)
+        else:
+            raise HTTPException(status_code=404, detail=result.message)
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error getting execution summary: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/{journey_id}/progress", response_model=APIResponse)
+async def get_journey_progress(
+    journey_id: str = Path(..., description="Journey ID"),
+    refresh: bool = Query(False, description="Aggregate new execution events before answering")
+):
+    """
+    Get goal values and milestone completion computed from execution events
+    """
+    try:
+        result = await progress_service.get_progress(journey_id, refresh)
+
+        if result.success:
+            return ORJSONResponse(result)
+        else:
+            raise HTTPException(status_code=404, detail=result.message)
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error getting journey progress: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+# ============================================================================
+# ENTRY SOURCES
+# ============================================================================
+
+@router.post("/{journey_id}/entry-sources/upload", response_model=APIResponse)
+async def upload_entry_source(
+    journey_id: str = Path(..., description="Journey ID"),
+    file: UploadFile = File(..., description="CSV, TSV or JSON/NDJSON audience file (optionally .gz)"),
+    format: Optional[str] = Query(None, description="csv, tsv or json; detected from the file name when omitted"),
+    entry_node_id: Optional[str] = Query(None, description="Entry node to feed; defaults to the first entry node"),
+    enroll: bool = Query(False, description="Enroll the staged customers once the file is loaded")
+):
+    """
+    Stream an audience file into the journey's entry staging table, validating each
+    record against the Entry node's audience key and data definitions
+    """
+    try:
+        logger.info(f"Importing entry source file {file.filename} into journey: {journey_id}")
+
+        result = await ingestion_service.import_file(
+            journey_id, file.file, file.filename, format, entry_node_id, enroll
+        )
+
+        if result.success:
+            return ORJSONResponse(result)
+        else:
+            raise HTTPException(status_code=400, detail=result.error or result.message)
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error importing entry source file: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.post("/{journey_id}/entry-sources/imports/{import_id}/enroll", response_model=APIResponse)
+async def enroll_entry_source_import(
+    journey_id: str = Path(..., description="Journey ID"),
+    import_id: str = Path(..., description="Import ID")
+):
+    """
+    Enroll the customers staged by an import into the journey
+    """
+    try:
+        logger.info(f"Enrolling entry source import {import_id} into journey: {journey_id}")
+
+        result = await ingestion_service.enroll_import(journey_id, import_id)
+
+        if result.success:
+            return ORJSONResponse(result)
+        else:
+            raise HTTPException(status_code=400, detail=result.error or result.message)
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error enrolling entry source import: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/{journey_id}/entry-sources/imports/{import_id}", response_model=APIResponse)
+async def get_entry_source_import(
+    journey_id: str = Path(..., description="Journey ID"),
+    import_id: str = Path(..., description="Import ID")
+):
+    """
+    Get progress, throughput and rejected records of an import
+    """
+    try:
+        result = await ingestion_service.get_import(journey_id, import_id)
+
+        if result.success:
+            return ORJSONResponse(result)
+        else:
+            raise HTTPException(status_code=404, detail=result.message)
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error getting entry source import: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
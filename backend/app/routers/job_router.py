@@ -0,0 +1,85 @@
+from typing import Optional
+
+from fastapi import APIRouter, HTTPException, Query, Path
+
+from ..models.journey_models import APIResponse
+from ..services.jobs.queue import JobQueueService
+from ..shared_services.logger_setup import setup_logger
+from ..shared_services.serialization import ORJSONResponse
+
+logger = setup_logger()
+router = APIRouter(prefix="/api/jobs", tags=["jobs"], default_response_class=ORJSONResponse)
+
+# Initialize service
+job_service = JobQueueService()
+
+@router.get("/", response_model=APIResponse)
+async def list_jobs(
+    type: Optional[str] = Query(None, description="Only jobs of this type"),
+    status: Optional[str] = Query(None, description="Only jobs in this status"),
+    limit: int = Query(50, ge=1, le=500, description="Maximum number of jobs returned")
+):
+    """
+    Get job counts per type and status, and the most recent jobs
+    """
+    try:
+        result = await job_service.list_jobs(type, status, limit)
+
+        if result.success:
+            return ORJSONResponse(result)
+        else:
+            raise HTTPException(status_code=400, detail=result.error or result.message)
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error listing jobs: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/{job_id}", response_model=APIResponse)
+async def get_job(
+    job_id: str = Path(..., description="Job ID")
+):
+    """
+    Get the status, attempts and result of a background job
+    """
+    try:
+        result = await job_service.get_job(job_id)
+
+        if result.success:
+            return ORJSONResponse(result)
+        elif result.message == "Job not found":
+            raise HTTPException(status_code=404, detail=result.message)
+        else:
+            raise HTTPException(status_code=500, detail=result.error or result.message)
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error getting job: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.post("/{job_id}/cancel", response_model=APIResponse)
+async def cancel_job(
+    job_id: str = Path(..., description="Job ID")
+):
+    """
+    Cancel a job that is queued and has not started
+    """
+    try:
+        logger.info(f"Cancelling job: {job_id}")
+
+        result = await job_service.cancel_job(job_id)
+
+        if result.success:
+            return ORJSONResponse(result)
+        elif result.message == "Job not found":
+            raise HTTPException(status_code=404, detail=result.message)
+        else:
+            raise HTTPException(status_code=400, detail=result.error or result.message)
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error cancelling job: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
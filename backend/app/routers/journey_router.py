@@ -1,21 +1,81 @@
-from fastapi import APIRouter, HTTPException, Query, Path
+from fastapi import APIRouter, HTTPException, Query, Path, Request
+from fastapi.exceptions import RequestValidationError
+from fastapi.responses import Response, StreamingResponse
+from pydantic import ValidationError
 from typing import Optional, List
 from uuid import UUID
 import uuid
 
 from ..models.journey_models import (
-    JourneyCreateRequest, JourneyUpdateRequest, JourneySaveRequest,
-    JourneyResponse, JourneyListResponse, APIResponse
+    JourneyCreateRequest, JourneyUpdateRequest,
+    JourneyResponse, JourneyListResponse, APIResponse,
+    JourneySaveRequestAdapter, JourneyResponseAdapter, MilestoneStatusRequest
 )
 from ..journey_service import JourneyService
+from ..services.journey.save_service import REVISION_CONFLICT
 from ..shared_services.logger_setup import setup_logger
+from ..shared_services.serialization import ORJSONResponse
 
 logger = setup_logger()
-router = APIRouter(prefix="/api/journeys", tags=["journeys"])
+router = APIRouter(prefix="/api/journeys", tags=["journeys"], default_response_class=ORJSONResponse)
 
 # Initialize service
 journey_service = JourneyService()
 
+# The save route reads its raw body, so FastAPI cannot document it; publish the request
+# schema by hand. Its models are already components through JourneyResponse.
+SAVE_REQUEST_SCHEMA = JourneySaveRequestAdapter.json_schema(ref_template="#/components/schemas/{model}")
+SAVE_REQUEST_SCHEMA.pop("$defs", None)
+
+def journey_etag(revision: int) -> str:
+    """
+    ETag of a journey at ``revision``; send it back in If-Match to save conditionally.
+    Weak: execution publishes goal/milestone progress without a new revision, so two
+    responses with the same tag can differ in those values.
+    """
+    return f'W/"journey-{revision}"'
+
+def if_match_revision(request: Request) -> Optional[int]:
+    """
+    Revision named by the request's If-Match header, None if there is none (or it is "*").
+    Tags are compared by revision, so weak and strong forms both match.
+    """
+    header = request.headers.get("if-match")
+    if not header or header.strip() == "*":
+        return None
+    tag = header.split(",")[0].strip().removeprefix("W/").strip('"').removeprefix("journey-")
+    try:
+        return int(tag)
+    except ValueError:
+        raise HTTPException(status_code=400, detail=f"If-Match must be a journey ETag, got {header}")
+
+def raise_for_conflict(result: APIResponse) -> None:
+    """Answer 409 with the journey's current revision when a save lost the revision check"""
+    if not result.success and result.message == REVISION_CONFLICT:
+        revision = result.data["revision"]
+        raise HTTPException(
+            status_code=409,
+            detail={"message": result.message, "error": result.error, "revision": revision},
+            headers={"ETag": journey_etag(revision)}
+        )
+
+def journey_response(message: str, journey) -> Response:
+    """Serialize an already-validated journey straight to JSON bytes (no re-validation)"""
+    response = JourneyResponse.model_construct(success=True, message=message, data=None, journey=journey)
+    return Response(
+        content=JourneyResponseAdapter.dump_json(response, by_alias=True),
+        media_type="application/json",
+        headers={"ETag": journey_etag(journey.revision)} if journey.revision is not None else None
+    )
+
+def saved_response(result: APIResponse) -> Response:
+    """Response of a successful partial save, tagged with the journey's new revision"""
+    return ORJSONResponse(APIResponse(
+        success=True,
+        message=result.message,
+        data=result.data
+    ), headers={"ETag": journey_etag(result.data["revision"])})
+
 @router.post("/", response_model=JourneyResponse)
 async def create_journey(request: JourneyCreateRequest):
     """
@@ -41,11 +101,8 @@ async def create_journey(request: JourneyCreateRequest):
         if result.success:
             # Update the journey state with the actual ID from the service
             journey_state.id = result.data["journey_id"]
-            return JourneyResponse(
-                success=True,
-                message=result.message,
-                journey=journey_state
-            )
+            journey_state.revision = result.data["revision"]
+            return journey_response(result.message, journey_state)
         else:
             raise HTTPException(status_code=400, detail=result.message)
             
@@ -68,12 +125,12 @@ async def list_journeys(
         result = await journey_service.list_journeys(user_id, limit, offset)
         
         if result.success:
-            return JourneyListResponse(
+            return ORJSONResponse(JourneyListResponse(
                 success=True,
                 message=result.message,
                 journeys=result.data["journeys"],
                 total=result.data["total"]
-            )
+            ))
         else:
             raise HTTPException(status_code=400, detail=result.message)
             
@@ -83,36 +140,49 @@ async def list_journeys(
 
 @router.get("/{journey_id}", response_model=JourneyResponse)
 async def get_journey(
-    journey_id: str = Path(..., description="Journey ID")
+    journey_id: str = Path(..., description="Journey ID"),
+    stream: bool = Query(False, description="Stream the journey from a server-side cursor")
 ):
     """
     Get a specific journey by ID
     """
     try:
-        logger.info(f"Getting journey: {journey_id}")
+        logger.info(f"Getting journey: {journey_id} (stream={stream})")
+        
+        if stream:
+            try:
+                body = journey_service.stream_journey(journey_id)
+            except ValueError:
+                # Malformed id: not found, as without streaming
+                body = None
+            if body is None:
+                raise HTTPException(status_code=404, detail="Journey not found")
+            return StreamingResponse(body, media_type="application/json")
         
         result = await journey_service.load_journey(journey_id)
         
         if result.success:
-            return JourneyResponse(
-                success=True,
-                message=result.message,
-                journey=result.data["journey"]
-            )
+            return journey_response(result.message, result.data["journey"])
         else:
             raise HTTPException(status_code=404, detail=result.message)
             
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error getting journey: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.put("/{journey_id}", response_model=JourneyResponse)
 async def update_journey(
+    http_request: Request,
     journey_id: str = Path(..., description="Journey ID"),
     request: JourneyUpdateRequest = None
 ):
     """
     Update journey metadata
+
+    Conditional on the If-Match revision when given (409 if the journey was saved since);
+    without it the update applies unconditionally, like a save without a revision.
     """
     try:
         logger.info(f"Updating journey metadata: {journey_id}")
@@ -122,67 +192,67 @@ async def update_journey(
         if not load_result.success:
             raise HTTPException(status_code=404, detail="Journey not found")
         
-        # Update the journey state with new metadata
+        # Apply only the metadata fields that were provided; the loaded state is
+        # already a model, so copying it avoids re-validating nodes/edges/goals.
+        # The revision loaded here is not a precondition the client asked for.
         journey_state = load_result.data["journey"]
+        updated_journey = journey_state.model_copy(update={**request.model_dump(exclude_none=True), "revision": None})
         
-        if request.name is not None:
-            journey_state["name"] = request.name
-        if request.description is not None:
-            journey_state["description"] = request.description
-        if request.isPublished is not None:
-            journey_state["isPublished"] = request.isPublished
-        if request.isArchived is not None:
-            journey_state["isArchived"] = request.isArchived
-        if request.isLocked is not None:
-            journey_state["isLocked"] = request.isLocked
-        if request.isReadOnly is not None:
-            journey_state["isReadOnly"] = request.isReadOnly
-        if request.isEditable is not None:
-            journey_state["isEditable"] = request.isEditable
-        if request.isViewOnly is not None:
-            journey_state["isViewOnly"] = request.isViewOnly
-        
-        # Save the updated journey
-        from ..models.journey_models import CompleteJourneyState
-        updated_journey = CompleteJourneyState(**journey_state)
-        
-        save_result = await journey_service.save_journey(journey_id, updated_journey)
+        save_result = await journey_service.save_journey(journey_id, updated_journey, if_match_revision(http_request))
+        raise_for_conflict(save_result)
         
         if save_result.success:
-            return JourneyResponse(
-                success=True,
-                message="Journey updated successfully",
-                journey=updated_journey
-            )
+            updated_journey.revision = save_result.data["revision"]
+            return journey_response("Journey updated successfully", updated_journey)
         else:
             raise HTTPException(status_code=400, detail=save_result.message)
             
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error updating journey: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
-@router.post("/{journey_id}/save", response_model=JourneyResponse)
+@router.post(
+    "/{journey_id}/save",
+    response_model=JourneyResponse,
+    openapi_extra={"requestBody": {"required": True, "content": {"application/json": {"schema": SAVE_REQUEST_SCHEMA}}}}
+)
 async def save_journey(
+    request: Request,
     journey_id: str = Path(..., description="Journey ID"),
-    request: JourneySaveRequest = None
+    strict: bool = Query(False, description="Validate the payload in Pydantic strict mode (no type coercion)")
 ):
     """
     Save complete journey state (nodes, edges, goals, milestones, reports)
+    
+    Expects a JourneySaveRequest body. The raw body is validated exactly once with the
+    prebuilt TypeAdapter (optionally in strict mode) and the validated state is echoed
+    back without being re-validated.
+    
+    The save only applies while the journey is still at the revision in the If-Match
+    header, or else ``journey.revision``; otherwise it answers 409 with the current
+    revision. Without either it overwrites unconditionally.
     """
+    try:
+        save_request = JourneySaveRequestAdapter.validate_json(await request.body(), strict=strict)
+    except ValidationError as e:
+        raise RequestValidationError(e.errors())
+    
     try:
         logger.info(f"Saving journey: {journey_id}")
         
-        result = await journey_service.save_journey(journey_id, request.journey)
+        result = await journey_service.save_journey(journey_id, save_request.journey, if_match_revision(request))
+        raise_for_conflict(result)
         
         if result.success:
-            return JourneyResponse(
-                success=True,
-                message=result.message,
-                journey=request.journey
-            )
+            save_request.journey.revision = result.data["revision"]
+            return journey_response(result.message, save_request.journey)
         else:
             raise HTTPException(status_code=400, detail=result.message)
             
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error saving journey: {e}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -202,11 +272,11 @@ async def delete_journey(
         result = await journey_service.delete_journey(journey_id, not hard_delete)
         
         if result.success:
-            return APIResponse(
+            return ORJSONResponse(APIResponse(
                 success=True,
                 message=result.message,
                 data=result.data
-            )
+            ))
         else:
             raise HTTPException(status_code=400, detail=result.message)
             
@@ -227,11 +297,11 @@ async def get_journey_stats(
         result = await journey_service.get_journey_stats(journey_id)
         
         if result.success:
-            return APIResponse(
+            return ORJSONResponse(APIResponse(
                 success=True,
                 message=result.message,
                 data=result.data
-            )
+            ))
         else:
             raise HTTPException(status_code=404, detail=result.message)
             
@@ -260,10 +330,10 @@ async def duplicate_journey(
         from datetime import datetime
         
         original_journey = load_result.data["journey"]
-        new_journey = CompleteJourneyState(
+        new_journey = CompleteJourneyState.model_construct(
             id="",  # Will be set by the service after creation
-            name=new_name or f"{original_journey['name']} (Copy)",
-            description=original_journey["description"],
+            name=new_name or f"{original_journey.name} (Copy)",
+            description=original_journey.description,
             createdAt=datetime.now(),
             updatedAt=datetime.now(),
             isPublished=False,  # Duplicated journeys start as unpublished
@@ -273,10 +343,10 @@ async def duplicate_journey(
             isReadOnly=False,
             isEditable=True,
             isViewOnly=False,
-            nodes=original_journey["nodes"],
-            edges=original_journey["edges"],
-            goals=original_journey["goals"],
-            milestones=original_journey["milestones"],
+            nodes=original_journey.nodes,
+            edges=original_journey.edges,
+            goals=original_journey.goals,
+            milestones=original_journey.milestones,
             reports=[]  # Don't duplicate reports
         )
         
@@ -284,11 +354,9 @@ async def duplicate_journey(
         create_result = await journey_service.create_journey(new_journey)
         
         if create_result.success:
-            return JourneyResponse(
-                success=True,
-                message="Journey duplicated successfully",
-                journey=new_journey
-            )
+            new_journey.id = create_result.data["journey_id"]
+            new_journey.revision = create_result.data["revision"]
+            return journey_response("Journey duplicated successfully", new_journey)
         else:
             raise HTTPException(status_code=400, detail=create_result.message)
             
@@ -299,55 +367,101 @@ async def duplicate_journey(
 # Domain-specific endpoints
 @router.get("/{journey_id}/canvas", response_model=APIResponse)
 async def get_journey_canvas(
-    journey_id: str = Path(..., description="Journey ID")
+    journey_id: str = Path(..., description="Journey ID"),
+    stream: bool = Query(False, description="Stream the canvas from a server-side cursor")
 ):
     """
     Get journey canvas data (nodes and edges only)
     """
     try:
-        logger.info(f"Getting journey canvas: {journey_id}")
+        logger.info(f"Getting journey canvas: {journey_id} (stream={stream})")
+        
+        if stream:
+            try:
+                body = journey_service.stream_journey_canvas(journey_id)
+            except ValueError:
+                # Malformed id: not found, as without streaming
+                raise HTTPException(status_code=404, detail="Failed to load journey canvas")
+            return StreamingResponse(body, media_type="application/json")
         
         result = await journey_service.get_journey_canvas(journey_id)
         
         if result.success:
-            return APIResponse(
+            return ORJSONResponse(APIResponse(
                 success=True,
                 message=result.message,
                 data=result.data
-            )
+            ))
         else:
             raise HTTPException(status_code=404, detail=result.message)
             
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error getting journey canvas: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.post("/{journey_id}/canvas", response_model=APIResponse)
 async def save_journey_canvas(
+    request: Request,
     journey_id: str = Path(..., description="Journey ID"),
     canvas_data: dict = None
 ):
     """
     Save journey canvas data (nodes and edges only)
+
+    Conditional on the If-Match (or body "revision") revision, like the full save
     """
     try:
         logger.info(f"Saving journey canvas: {journey_id}")
         
-        result = await journey_service.save_journey_canvas(journey_id, canvas_data)
+        result = await journey_service.save_journey_canvas(journey_id, canvas_data, if_match_revision(request))
+        raise_for_conflict(result)
         
         if result.success:
-            return APIResponse(
-                success=True,
-                message=result.message,
-                data=result.data
-            )
+            return saved_response(result)
         else:
             raise HTTPException(status_code=400, detail=result.message)
             
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error saving journey canvas: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.get("/{journey_id}/analysis", response_model=APIResponse)
+async def get_journey_analysis(
+    request: Request,
+    journey_id: str = Path(..., description="Journey ID")
+):
+    """
+    Analyze the journey graph: unreachable nodes, dangling edges, cycles outside Loop nodes,
+    topological order and longest path. Supports conditional requests via ETag/If-None-Match.
+    """
+    try:
+        logger.info(f"Analyzing journey: {journey_id}")
+
+        result = await journey_service.analyze_journey(journey_id)
+
+        if result.success:
+            etag = f'"analysis-{result.data["revision"]}"'
+            if_none_match = request.headers.get("if-none-match")
+            if if_none_match and etag in [tag.strip() for tag in if_none_match.split(",")]:
+                return Response(status_code=304, headers={"ETag": etag})
+            return ORJSONResponse(APIResponse(
+                success=True,
+                message=result.message,
+                data=result.data
+            ), headers={"ETag": etag})
+        else:
+            raise HTTPException(status_code=404, detail=result.message)
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error analyzing journey: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
 @router.get("/{journey_id}/goals", response_model=APIResponse)
 async def get_journey_goals(
     journey_id: str = Path(..., description="Journey ID")
@@ -361,11 +475,11 @@ async def get_journey_goals(
         result = await journey_service.get_journey_goals(journey_id)
         
         if result.success:
-            return APIResponse(
+            return ORJSONResponse(APIResponse(
                 success=True,
                 message=result.message,
                 data=result.data
-            )
+            ))
         else:
             raise HTTPException(status_code=404, detail=result.message)
             
@@ -375,26 +489,28 @@ async def get_journey_goals(
 
 @router.post("/{journey_id}/goals", response_model=APIResponse)
 async def save_journey_goals(
+    request: Request,
     journey_id: str = Path(..., description="Journey ID"),
     goals_data: dict = None
 ):
     """
     Save journey goals only
+
+    Conditional on the If-Match (or body "revision") revision, like the full save
     """
     try:
         logger.info(f"Saving journey goals: {journey_id}")
         
-        result = await journey_service.save_journey_goals(journey_id, goals_data)
+        result = await journey_service.save_journey_goals(journey_id, goals_data, if_match_revision(request))
+        raise_for_conflict(result)
         
         if result.success:
-            return APIResponse(
-                success=True,
-                message=result.message,
-                data=result.data
-            )
+            return saved_response(result)
         else:
             raise HTTPException(status_code=400, detail=result.message)
             
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error saving journey goals: {e}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -412,11 +528,11 @@ async def get_journey_milestones(
         result = await journey_service.get_journey_milestones(journey_id)
         
         if result.success:
-            return APIResponse(
+            return ORJSONResponse(APIResponse(
                 success=True,
                 message=result.message,
                 data=result.data
-            )
+            ))
         else:
             raise HTTPException(status_code=404, detail=result.message)
             
@@ -426,26 +542,79 @@ async def get_journey_milestones(
 
 @router.post("/{journey_id}/milestones", response_model=APIResponse)
 async def save_journey_milestones(
+    request: Request,
     journey_id: str = Path(..., description="Journey ID"),
     milestones_data: dict = None
 ):
     """
     Save journey milestones only
+
+    Conditional on the If-Match (or body "revision") revision, like the full save
     """
     try:
         logger.info(f"Saving journey milestones: {journey_id}")
         
-        result = await journey_service.save_journey_milestones(journey_id, milestones_data)
+        result = await journey_service.save_journey_milestones(journey_id, milestones_data, if_match_revision(request))
+        raise_for_conflict(result)
         
         if result.success:
-            return APIResponse(
-                success=True,
-                message=result.message,
-                data=result.data
-            )
+            return saved_response(result)
         else:
             raise HTTPException(status_code=400, detail=result.message)
             
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error saving journey milestones: {e}")
         raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/{journey_id}/milestones/dependencies", response_model=APIResponse)
+async def get_milestone_dependencies(
+    journey_id: str = Path(..., description="Journey ID")
+):
+    """
+    Resolve milestone dependencies: ready and blocked milestones, earliest completion
+    estimates from target dates and the critical path
+    """
+    try:
+        result = await journey_service.get_milestone_dependencies(journey_id)
+
+        if result.success:
+            return ORJSONResponse(result)
+        else:
+            raise HTTPException(status_code=404, detail=result.message)
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error resolving milestone dependencies: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.put("/{journey_id}/milestones/{milestone_id}/status", response_model=APIResponse)
+async def update_milestone_status(
+    request: MilestoneStatusRequest,
+    journey_id: str = Path(..., description="Journey ID"),
+    milestone_id: str = Path(..., description="Milestone ID")
+):
+    """
+    Change a milestone's status; returns the milestones it unblocked (or blocked again)
+    """
+    try:
+        logger.info(f"Updating milestone {milestone_id} of journey {journey_id} to {request.status.value}")
+
+        result = await journey_service.update_milestone_status(
+            journey_id, milestone_id, request.status.value, request.progress
+        )
+
+        if result.success:
+            return ORJSONResponse(result, headers={"ETag": journey_etag(result.data["journeyRevision"])})
+        elif result.message == "Milestone not found":
+            raise HTTPException(status_code=404, detail=result.error)
+        else:
+            raise HTTPException(status_code=400, detail=result.error or result.message)
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error updating milestone status: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
@@ -0,0 +1,64 @@
+from fastapi import APIRouter, HTTPException, Path
+
+from ..models.journey_models import APIResponse, GenerateReportRequest
+from ..services.reports.report_service import JourneyReportService
+from ..shared_services.logger_setup import setup_logger
+from ..shared_services.serialization import ORJSONResponse
+
+logger = setup_logger()
+router = APIRouter(prefix="/api/journeys", tags=["reports"], default_response_class=ORJSONResponse)
+
+# Initialize service
+report_service = JourneyReportService()
+
+@router.post("/{journey_id}/reports/generate", response_model=APIResponse)
+async def generate_report(
+    request: GenerateReportRequest,
+    journey_id: str = Path(..., description="Journey ID")
+):
+    """
+    Get a progress, performance or summary report. Returns the stored report (200) when
+    it is current for the journey and window, otherwise queues a build (202) whose
+    status is available under /api/jobs/{job_id}
+    """
+    try:
+        logger.info(f"Requesting {request.type.value} report for journey: {journey_id}")
+
+        result = await report_service.request_report(
+            journey_id, request.type.value, request.windowStart, request.windowEnd, request.name
+        )
+
+        if result.success:
+            return ORJSONResponse(result, status_code=200 if result.data["status"] == "ready" else 202)
+        elif result.message == "Journey not found":
+            raise HTTPException(status_code=404, detail=result.message)
+        else:
+            raise HTTPException(status_code=400, detail=result.error or result.message)
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error requesting report: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/{journey_id}/reports/{report_id}", response_model=APIResponse)
+async def get_report(
+    journey_id: str = Path(..., description="Journey ID"),
+    report_id: str = Path(..., description="Report ID")
+):
+    """
+    Get a stored report; ``stale`` tells whether the journey changed since it was built
+    """
+    try:
+        result = await report_service.get_report(journey_id, report_id)
+
+        if result.success:
+            return ORJSONResponse(result)
+        else:
+            raise HTTPException(status_code=404, detail=result.message)
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error getting report: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
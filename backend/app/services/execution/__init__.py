@@ -0,0 +1 @@
+# Journey execution package
@@ -0,0 +1,250 @@
+"""
+Batch execution of compiled journey plans.
+
+The engine is pure in-memory logic: it takes a batch of customer states claimed from the
+store, moves each customer forward until it has to wait, leaves the journey or reaches a
+step limit, and returns the events produced. Customers arriving at decision nodes are
+grouped per node so a branch selector can evaluate a whole group at once.
+"""
+import os
+import zlib
+from datetime import datetime
+from typing import Any, Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .rules import CompiledRule, attribute_columns, compile_rule
+from .plan import (
+    ExecutionPlan, resume_at, NO_NODE,
+    WAIT, DECISION, LOOP, EXIT, MESSAGE, GOAL, MILESTONE,
+)
+
+# Customer status codes (journey_customer_states.status)
+READY = 0
+WAITING = 1
+COMPLETED = 2
+EXITED = 3
+FAILED = 4
+
+STATUS_NAMES = {READY: "ready", WAITING: "waiting", COMPLETED: "completed", EXITED: "exited", FAILED: "failed"}
+
+# Guard against loops whose exit is never taken: nodes a customer may visit per advance
+MAX_STEPS_PER_ADVANCE = int(os.getenv("EXECUTION_MAX_STEPS", "256"))
+
+# Decision groups at least this large are evaluated column-wise
+VECTOR_THRESHOLD = int(os.getenv("EXECUTION_VECTOR_THRESHOLD", "64"))
+
+EVENT_TYPES = {MESSAGE: "message", GOAL: "goal", MILESTONE: "milestone"}
+
+
+class CustomerState:
+    """Position of one customer in a journey"""
+    __slots__ = ("customer_id", "plan_version", "node_idx", "status", "due_at", "loop_counts", "attributes", "steps")
+
+    def __init__(self, customer_id: str, plan_version: int, node_idx: int, status: int = READY,
+                 due_at: Optional[datetime] = None, loop_counts: Optional[List[int]] = None,
+                 attributes: Optional[Dict[str, Any]] = None):
+        self.customer_id = customer_id
+        self.plan_version = plan_version
+        self.node_idx = node_idx
+        self.status = status
+        self.due_at = due_at
+        self.loop_counts = list(loop_counts or [])
+        self.attributes = attributes or {}
+        self.steps = 0
+
+
+class ExecutionEvent(NamedTuple):
+    customer_id: str
+    plan_version: int
+    node_id: str
+    event_type: str
+    detail: Optional[str]
+    occurred_at: datetime
+
+
+class FallbackBranchSelector:
+    """Routes every customer down the decision's fallback branch"""
+
+    def select(self, plan: ExecutionPlan, node_idx: int, states: Sequence[CustomerState]) -> List[int]:
+        return [plan.fallback_branch[node_idx]] * len(states)
+
+
+class RuleBranchSelector:
+    """
+    Partitions a group of customers across a decision's branches: branches are tried
+    in order, the first whose rule matches wins, and unmatched customers take the
+    fallback branch. Groups of at least ``vector_threshold`` customers are evaluated
+    column-wise with pandas/NumPy; smaller groups use the scalar reference evaluator.
+    """
+
+    def __init__(self, vector_threshold: int = VECTOR_THRESHOLD):
+        self.vector_threshold = vector_threshold
+        self._rules: Dict[Tuple[str, int], List[Optional[CompiledRule]]] = {}
+
+    def rules_for(self, plan: ExecutionPlan, node_idx: int) -> List[Optional[CompiledRule]]:
+        key = (plan.checksum, node_idx)
+        rules = self._rules.get(key)
+        if rules is None:
+            rules = [compile_rule(branch.rule) for branch in plan.branches[node_idx]]
+            self._rules[key] = rules
+        return rules
+
+    def select(self, plan: ExecutionPlan, node_idx: int, states: Sequence[CustomerState]) -> List[int]:
+        rules = self.rules_for(plan, node_idx)
+        fallback = plan.fallback_branch[node_idx]
+        settings = plan.node_data[node_idx]
+
+        if settings.get("randomSample") and all(rule is None for rule in rules):
+            # Deterministic per customer, so a re-run sends everyone down the same branch
+            seed = settings.get("randomSeed", 0)
+            return [zlib.crc32(f"{seed}:{s.customer_id}".encode()) % len(rules) for s in states]
+
+        attributes = [s.attributes for s in states]
+        if len(states) >= self.vector_threshold:
+            return partition(rules, attributes, fallback).tolist()
+        return partition_scalar(rules, attributes, fallback)
+
+
+def partition_scalar(rules: Sequence[Optional[CompiledRule]], attributes: Sequence[Dict[str, Any]],
+                     fallback: int) -> List[int]:
+    """Reference partition: branch position per customer, evaluated one customer at a time"""
+    positions = []
+    for customer in attributes:
+        for pos, rule in enumerate(rules):
+            if rule is not None and rule.evaluate(customer):
+                positions.append(pos)
+                break
+        else:
+            positions.append(fallback)
+    return positions
+
+
+def partition(rules: Sequence[Optional[CompiledRule]], attributes: Sequence[Dict[str, Any]],
+              fallback: int) -> np.ndarray:
+    """Vectorized partition: branch position per customer for a whole batch"""
+    size = len(attributes)
+    positions = np.full(size, fallback, dtype=np.int32)
+    names = sorted({name for rule in rules if rule is not None for name in rule.attribute_names})
+    columns = attribute_columns(attributes, names)
+    unassigned = np.ones(size, dtype=bool)
+    for pos, rule in enumerate(rules):
+        if rule is None:
+            continue
+        matched = rule.evaluate_batch(columns, size) & unassigned
+        positions[matched] = pos
+        unassigned &= ~matched
+        if not unassigned.any():
+            break
+    return positions
+
+
+class ExecutionEngine:
+    """Advances batches of customers through an execution plan"""
+
+    def __init__(self, branch_selector=None, max_steps: int = MAX_STEPS_PER_ADVANCE):
+        self.branch_selector = branch_selector or RuleBranchSelector()
+        self.max_steps = max_steps
+
+    def advance(self, plan: ExecutionPlan, states: Sequence[CustomerState], now: datetime) -> Tuple[List[ExecutionEvent], int]:
+        """
+        Move every claimed customer as far as possible at time ``now``.
+        States are updated in place; returns (events, number of node transitions).
+        """
+        events: List[ExecutionEvent] = []
+        active = []
+        for state in states:
+            state.steps = 0
+            if len(state.loop_counts) < plan.num_loop_slots:
+                state.loop_counts.extend([0] * (plan.num_loop_slots - len(state.loop_counts)))
+            if state.status == WAITING:
+                # The wait this customer sat on is over
+                wait_idx = state.node_idx
+                state.status = READY
+                state.node_idx = plan.next_node[wait_idx]
+                if state.node_idx == NO_NODE:
+                    self._finish(plan, state, COMPLETED, wait_idx, now, events)
+                    continue
+            if state.status == READY:
+                active.append(state)
+
+        while active:
+            at_decision: Dict[int, List[CustomerState]] = {}
+            for state in active:
+                self._run(plan, state, now, events, at_decision)
+
+            active = []
+            for node_idx, group in at_decision.items():
+                branches = plan.branches[node_idx]
+                node_id = plan.node_ids[node_idx]
+                for state, pos in zip(group, self.branch_selector.select(plan, node_idx, group)):
+                    branch = branches[pos]
+                    events.append(ExecutionEvent(state.customer_id, plan.version, node_id, "branch", branch.label, now))
+                    state.node_idx = branch.target
+                    if branch.target == NO_NODE:
+                        self._finish(plan, state, COMPLETED, node_idx, now, events)
+                    else:
+                        active.append(state)
+
+        return events, sum(state.steps for state in states)
+
+    def _finish(self, plan: ExecutionPlan, state: CustomerState, status: int, last_idx: int,
+                now: datetime, events: List[ExecutionEvent], detail: Optional[str] = None) -> None:
+        state.status = status
+        if last_idx != NO_NODE:
+            state.node_idx = last_idx
+        node_id = plan.node_ids[state.node_idx] if state.node_idx != NO_NODE else ""
+        events.append(ExecutionEvent(state.customer_id, plan.version, node_id, STATUS_NAMES[status], detail, now))
+
+    def _run(self, plan: ExecutionPlan, state: CustomerState, now: datetime,
+             events: List[ExecutionEvent], at_decision: Dict[int, List[CustomerState]]) -> None:
+        """Step one customer until it waits, leaves, or reaches a decision"""
+        kinds = plan.kinds
+        next_node = plan.next_node
+        idx = state.node_idx
+        last = idx
+
+        while True:
+            if idx == NO_NODE:
+                self._finish(plan, state, COMPLETED, last, now, events)
+                return
+            if state.steps >= self.max_steps:
+                self._finish(plan, state, FAILED, idx, now, events, "step limit reached")
+                return
+
+            state.steps += 1
+            last = idx
+            kind = kinds[idx]
+
+            if kind == WAIT:
+                due = resume_at(plan.waits[idx], now)
+                if due > now:
+                    state.node_idx = idx
+                    state.status = WAITING
+                    state.due_at = due
+                    return
+                idx = next_node[idx]
+            elif kind == DECISION and idx in plan.branches:
+                state.node_idx = idx
+                at_decision.setdefault(idx, []).append(state)
+                return
+            elif kind == LOOP:
+                loop = plan.loops[idx]
+                if state.loop_counts[loop.slot] < loop.max_loops:
+                    state.loop_counts[loop.slot] += 1
+                    idx = loop.continue_target
+                else:
+                    # Reset so the loop runs again if the customer comes back through an outer path
+                    state.loop_counts[loop.slot] = 0
+                    idx = loop.exit_target
+            elif kind == EXIT:
+                self._finish(plan, state, EXITED, idx, now, events)
+                return
+            else:
+                event_type = EVENT_TYPES.get(kind)
+                if event_type:
+                    events.append(ExecutionEvent(
+                        state.customer_id, plan.version, plan.node_ids[idx], event_type,
+                        plan.node_data[idx].get("title"), now
+                    ))
+                idx = next_node[idx]
@@ -0,0 +1,461 @@
+"""
+Streaming readers and record validation for Entry Source file uploads.
+
+Uploads are read incrementally so memory stays bounded by the read size, not the file
+size: CSV/TSV row by row, newline-delimited JSON line by line, and a top-level JSON array
+one element at a time. Gzip-compressed files (``.gz``) are decompressed on the fly.
+
+Every record is checked against the Entry node it feeds: the audience key (``userField``
+or the column implied by the audience type) must be present and well formed, and fields
+listed in the node's ``dataDefinitions`` are coerced to their declared types.
+"""
+import csv
+import gzip
+import io
+import json
+import os
+import re
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+# Records per COPY into the staging table (and per commit)
+INGEST_CHUNK_ROWS = int(os.getenv("INGEST_CHUNK_ROWS", "5000"))
+# Characters requested from the upload per read
+INGEST_READ_SIZE = 1 << 20
+# Largest single record (JSON element or line) accepted
+INGEST_MAX_RECORD_BYTES = int(os.getenv("INGEST_MAX_RECORD_BYTES", str(1 << 20)))
+# Rejected records kept with their reasons in the import report
+INGEST_MAX_REJECT_SAMPLES = 100
+
+FORMAT_BY_EXTENSION = {".csv": "csv", ".tsv": "tsv", ".tab": "tsv", ".json": "json", ".jsonl": "json", ".ndjson": "json"}
+DELIMITERS = {"csv": ",", "tsv": "\t"}
+
+# Key column implied by the Entry node's audience type when no userField is set
+AUDIENCE_FIELDS = {"phone-number": "phone", "email": "email", "account-no": "account_no"}
+KEY_FALLBACKS = ("customer_id", "customerId")
+
+EMAIL_RE = re.compile(r"^[^@\s]+@[^@\s]+\.[^@\s]+$")
+PHONE_STRIP_RE = re.compile(r"[\s\-().]")
+PHONE_RE = re.compile(r"^\+?\d{7,15}$")
+ACCOUNT_RE = re.compile(r"^[A-Za-z0-9][A-Za-z0-9\-_/]*$")
+DATE_TOKEN_RE = re.compile(r"YYYY|YY|MM|DD|HH|mm|ss")
+DATE_TOKENS = {"YYYY": "%Y", "YY": "%y", "MM": "%m", "DD": "%d", "HH": "%H", "mm": "%M", "ss": "%S"}
+JSON_WHITESPACE_RE = re.compile(r"[ \t\n\r]*")
+
+TRUE_VALUES = {"true", "t", "yes", "y", "1"}
+FALSE_VALUES = {"false", "f", "no", "n", "0"}
+
+
+class IngestionError(ValueError):
+    """The upload cannot be imported at all (unknown format, unreadable file, missing key column)"""
+
+
+class RecordRejected(ValueError):
+    """A single record failed validation"""
+
+
+# ============================================================================
+# FORMAT DETECTION AND STREAMS
+# ============================================================================
+
+def detect_format(filename: Optional[str], requested: Optional[str] = None) -> Tuple[str, bool]:
+    """Return (format, gzipped) from an explicit format or the file extension"""
+    name = (filename or "").lower()
+    gzipped = name.endswith(".gz")
+    if gzipped:
+        name = name[:-3]
+
+    if requested:
+        fmt = requested.lower()
+        if fmt in ("jsonl", "ndjson"):
+            fmt = "json"
+        if fmt not in ("csv", "tsv", "json"):
+            raise IngestionError(f"Unsupported entry source format: {requested}")
+        return fmt, gzipped
+
+    for extension, fmt in FORMAT_BY_EXTENSION.items():
+        if name.endswith(extension):
+            return fmt, gzipped
+    raise IngestionError(f"Cannot tell the format of '{filename}'; pass format=csv, tsv or json")
+
+
+class CountingReader(io.RawIOBase):
+    """Binary stream wrapper that counts bytes consumed from the upload"""
+
+    def __init__(self, raw):
+        self.raw = raw
+        self.bytes_read = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        data = self.raw.read(len(buffer))
+        size = len(data)
+        buffer[:size] = data
+        self.bytes_read += size
+        return size
+
+
+def open_stream(fileobj, gzipped: bool) -> Tuple[io.BufferedIOBase, CountingReader]:
+    """Buffered (and optionally decompressing) binary stream over an upload"""
+    counter = CountingReader(fileobj)
+    stream = io.BufferedReader(counter, buffer_size=INGEST_READ_SIZE)
+    if gzipped:
+        stream = io.BufferedReader(gzip.GzipFile(fileobj=stream, mode="rb"), buffer_size=INGEST_READ_SIZE)
+    return stream, counter
+
+
+# ============================================================================
+# RECORD READERS
+# ============================================================================
+# Each reader yields (record number, record or None, reject reason or None). The record
+# number is the line in the file for CSV/TSV/NDJSON and the element position for arrays.
+
+def read_records(stream: io.BufferedIOBase, fmt: str) -> Tuple[Optional[List[str]], Iterator[Tuple[int, Optional[Dict[str, Any]], Optional[str]]]]:
+    """Return (column names or None for JSON, record iterator)"""
+    if fmt in DELIMITERS:
+        text = io.TextIOWrapper(stream, encoding="utf-8-sig", newline="")
+        reader = csv.reader(text, delimiter=DELIMITERS[fmt])
+        columns = _read_header(reader)
+        return columns, _delimited_records(reader, columns)
+
+    # JSON: a top-level array or one object per line, told apart by the first character
+    head = stream.peek(INGEST_READ_SIZE).lstrip(b"\xef\xbb\xbf \t\r\n")
+    text = io.TextIOWrapper(stream, encoding="utf-8-sig")
+    if head[:1] == b"[":
+        return None, _json_array_records(text)
+    return None, _json_line_records(text)
+
+
+def _read_header(reader) -> List[str]:
+    try:
+        header = next(reader, None)
+    except (csv.Error, UnicodeDecodeError) as e:
+        raise IngestionError(f"Cannot read header: {e}") from e
+    if not header:
+        raise IngestionError("File is empty")
+
+    columns = [name.strip() for name in header]
+    if not all(columns):
+        raise IngestionError("Header contains an empty column name")
+    duplicates = sorted({name for name in columns if columns.count(name) > 1})
+    if duplicates:
+        raise IngestionError(f"Duplicate columns in header: {', '.join(duplicates)}")
+    return columns
+
+
+def _delimited_records(reader, columns: List[str]) -> Iterator[Tuple[int, Optional[Dict[str, Any]], Optional[str]]]:
+    width = len(columns)
+    try:
+        for row in reader:
+            if not row:
+                continue
+            if len(row) != width:
+                yield reader.line_num, None, f"Expected {width} fields, found {len(row)}"
+                continue
+            # Empty cells are missing values, not empty strings
+            yield reader.line_num, {name: value.strip() for name, value in zip(columns, row) if value.strip()}, None
+    except (csv.Error, UnicodeDecodeError) as e:
+        raise IngestionError(f"Malformed file near line {reader.line_num + 1}: {e}") from e
+
+
+def _json_line_records(text: io.TextIOBase) -> Iterator[Tuple[int, Optional[Dict[str, Any]], Optional[str]]]:
+    line_number = 0
+    try:
+        while True:
+            line = text.readline(INGEST_MAX_RECORD_BYTES + 1)
+            if not line:
+                return
+            line_number += 1
+            if len(line) > INGEST_MAX_RECORD_BYTES and not line.endswith("\n"):
+                # Drain the rest of the oversized line without holding it
+                while line and not line.endswith("\n"):
+                    line = text.readline(INGEST_READ_SIZE)
+                yield line_number, None, f"Record exceeds {INGEST_MAX_RECORD_BYTES} bytes"
+                continue
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                value = json.loads(line)
+            except ValueError as e:
+                yield line_number, None, f"Invalid JSON: {e}"
+                continue
+            if isinstance(value, dict):
+                yield line_number, value, None
+            else:
+                yield line_number, None, "Record is not a JSON object"
+    except UnicodeDecodeError as e:
+        raise IngestionError(f"File is not valid UTF-8 near line {line_number + 1}") from e
+
+
+def _json_array_records(text: io.TextIOBase) -> Iterator[Tuple[int, Optional[Dict[str, Any]], Optional[str]]]:
+    """
+    Decode a top-level JSON array one element at a time. The buffer only ever holds the
+    unread tail of the last read plus the element being decoded. A syntax error cannot be
+    skipped reliably inside an array, so it aborts the import (NDJSON rejects per line).
+    """
+    decoder = json.JSONDecoder()
+    buffer, pos, eof = "", 0, False
+    index = 0
+    state = "start"  # start -> first -> (value -> sep)* -> done
+
+    def refill(keep_from: int) -> None:
+        nonlocal buffer, pos, eof
+        try:
+            chunk = text.read(INGEST_READ_SIZE)
+        except UnicodeDecodeError as e:
+            raise IngestionError(f"File is not valid UTF-8 near record {index + 1}") from e
+        buffer, pos, eof = buffer[keep_from:] + chunk, pos - keep_from, not chunk
+
+    while True:
+        pos = JSON_WHITESPACE_RE.match(buffer, pos).end()
+        if pos >= len(buffer):
+            if eof:
+                if state == "start":
+                    raise IngestionError("File is empty")
+                raise IngestionError("Unexpected end of file inside the JSON array")
+            refill(pos)
+            continue
+
+        char = buffer[pos]
+        if state == "start":
+            if char != "[":
+                raise IngestionError("Expected a JSON array")
+            state, pos = "first", pos + 1
+            continue
+        if state == "sep":
+            if char == ",":
+                state, pos = "value", pos + 1
+                continue
+            if char == "]":
+                return
+            raise IngestionError(f"Expected ',' or ']' after record {index}")
+        if char == "]" and state == "first":
+            return
+
+        # Decode one element, reading more until it is complete
+        while True:
+            try:
+                value, end = decoder.raw_decode(buffer, pos)
+                # A number ending exactly at the buffer edge may continue in the next read
+                if end < len(buffer) or eof:
+                    break
+            except json.JSONDecodeError as e:
+                incomplete = e.pos >= len(buffer) - 16 or e.msg.startswith("Unterminated")
+                if eof or not incomplete:
+                    raise IngestionError(f"Invalid JSON in record {index + 1}: {e.msg}") from e
+            if len(buffer) - pos > INGEST_MAX_RECORD_BYTES:
+                raise IngestionError(f"Record {index + 1} exceeds {INGEST_MAX_RECORD_BYTES} bytes")
+            refill(pos)
+
+        index += 1
+        state, pos = "sep", end
+        if isinstance(value, dict):
+            yield index, value, None
+        else:
+            yield index, None, "Record is not a JSON object"
+
+
+# ============================================================================
+# VALIDATION
+# ============================================================================
+
+def _strptime_format(pattern: str) -> str:
+    """Accept both strptime patterns and the YYYY-MM-DD style used in data definitions"""
+    if "%" in pattern:
+        return pattern
+    return DATE_TOKEN_RE.sub(lambda m: DATE_TOKENS[m.group(0)], pattern)
+
+
+def _coerce_string(value: Any) -> str:
+    if isinstance(value, (dict, list)):
+        raise RecordRejected("expected a string")
+    return value if isinstance(value, str) else str(value)
+
+
+def _coerce_number(value: Any) -> float:
+    if isinstance(value, bool):
+        raise RecordRejected("expected a number")
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        raise RecordRejected("expected a number") from None
+    if number != number or number in (float("inf"), float("-inf")):
+        raise RecordRejected("expected a finite number")
+    return number
+
+
+def _coerce_integer(value: Any) -> int:
+    number = _coerce_number(value)
+    if not number.is_integer():
+        raise RecordRejected("expected an integer")
+    return int(number)
+
+
+def _coerce_boolean(value: Any) -> bool:
+    if isinstance(value, bool):
+        return value
+    text = str(value).strip().lower()
+    if text in TRUE_VALUES:
+        return True
+    if text in FALSE_VALUES:
+        return False
+    raise RecordRejected("expected a boolean")
+
+
+class FieldDefinition:
+    """One entry of an Entry node's ``dataDefinitions``"""
+    __slots__ = ("name", "type", "required", "coerce", "pattern", "minimum", "maximum", "allowed")
+
+    TYPES = ("string", "number", "integer", "boolean", "date", "datetime")
+
+    def __init__(self, definition: Dict[str, Any]):
+        self.name = str(definition.get("name") or definition.get("field") or "").strip()
+        if not self.name:
+            raise IngestionError("Data definition without a field name")
+        self.type = str(definition.get("type") or "string").lower()
+        if self.type not in self.TYPES:
+            raise IngestionError(f"Data definition '{self.name}' has unsupported type '{self.type}'")
+        self.required = bool(definition.get("required"))
+        numeric = self.type in ("number", "integer")
+        self.minimum = self._bound(definition, "min") if numeric else None
+        self.maximum = self._bound(definition, "max") if numeric else None
+        allowed = definition.get("values") or definition.get("allowedValues")
+        self.allowed = set(map(str, allowed)) if allowed else None
+        try:
+            self.pattern = re.compile(definition["pattern"]) if definition.get("pattern") else None
+        except re.error as e:
+            raise IngestionError(f"Data definition '{self.name}' has an invalid pattern: {e}") from e
+        self.coerce = self._coercer(definition.get("format"))
+
+    def _bound(self, definition: Dict[str, Any], key: str) -> Optional[float]:
+        """Numeric min/max of the definition; numbers written as strings are accepted"""
+        value = definition.get(key)
+        if value is None or value == "":
+            return None
+        try:
+            if isinstance(value, bool):
+                raise ValueError
+            bound = float(value)
+            if bound != bound:
+                raise ValueError
+        except (TypeError, ValueError):
+            raise IngestionError(f"Data definition '{self.name}' has an invalid {key}: {value!r}") from None
+        return bound
+
+    def _coercer(self, date_format: Optional[str]) -> Callable[[Any], Any]:
+        if self.type == "number":
+            return _coerce_number
+        if self.type == "integer":
+            return _coerce_integer
+        if self.type == "boolean":
+            return _coerce_boolean
+        if self.type in ("date", "datetime"):
+            parse_format = _strptime_format(date_format) if date_format else None
+            as_date = self.type == "date"
+
+            def coerce_date(value: Any) -> str:
+                text = _coerce_string(value).strip()
+                try:
+                    parsed = datetime.strptime(text, parse_format) if parse_format else datetime.fromisoformat(text)
+                except ValueError:
+                    raise RecordRejected(f"expected a {self.type} ({date_format or 'ISO 8601'})") from None
+                return parsed.date().isoformat() if as_date else parsed.isoformat()
+            return coerce_date
+        return _coerce_string
+
+    def validate(self, value: Any) -> Any:
+        try:
+            value = self.coerce(value)
+        except RecordRejected as e:
+            raise RecordRejected(f"{self.name}: {e}") from None
+        if self.allowed is not None and str(value) not in self.allowed:
+            raise RecordRejected(f"{self.name}: {value!r} is not an allowed value")
+        if self.pattern is not None and not self.pattern.fullmatch(str(value)):
+            raise RecordRejected(f"{self.name}: does not match the required pattern")
+        if self.minimum is not None and value < self.minimum:
+            raise RecordRejected(f"{self.name}: below minimum {self.minimum:g}")
+        if self.maximum is not None and value > self.maximum:
+            raise RecordRejected(f"{self.name}: above maximum {self.maximum:g}")
+        return value
+
+
+class EntrySchema:
+    """Audience key and data definitions of the Entry node an upload feeds"""
+
+    def __init__(self, entry_data: Dict[str, Any], rule_attributes: Sequence[str] = ()):
+        self.audience = entry_data.get("audience")
+        self.key_field = (
+            str(entry_data.get("userField") or "").strip()
+            or AUDIENCE_FIELDS.get(self.audience)
+            or KEY_FALLBACKS[0]
+        )
+        try:
+            self.fields = [FieldDefinition(d) for d in entry_data.get("dataDefinitions") or []]
+        except (AttributeError, TypeError) as e:
+            raise IngestionError(f"Invalid data definitions: {e}") from e
+        self.rule_attributes = list(rule_attributes)
+        self._key_candidates = (self.key_field,) + tuple(k for k in KEY_FALLBACKS if k != self.key_field)
+
+    def check_columns(self, columns: Sequence[str]) -> List[str]:
+        """Fail on a missing key or required column; return warnings for other gaps"""
+        present = set(columns)
+        if not any(key in present for key in self._key_candidates):
+            raise IngestionError(f"Key column '{self.key_field}' not found in header")
+        missing = [f.name for f in self.fields if f.required and f.name not in present]
+        if missing:
+            raise IngestionError(f"Required columns missing from header: {', '.join(missing)}")
+        return self.missing_rule_attributes(present)
+
+    def missing_rule_attributes(self, seen: set) -> List[str]:
+        unseen = [
+            name for name in self.rule_attributes
+            if name not in seen and name.split(".", 1)[0] not in seen
+        ]
+        if not unseen:
+            return []
+        return [f"Decision rules reference attributes not present in the file: {', '.join(unseen)}"]
+
+    def _key(self, record: Dict[str, Any]) -> str:
+        for key in self._key_candidates:
+            value = record.get(key)
+            if value is not None and value != "":
+                break
+        else:
+            raise RecordRejected(f"missing {self.key_field}")
+
+        if isinstance(value, (dict, list, bool)):
+            raise RecordRejected(f"{self.key_field}: expected a scalar value")
+        if isinstance(value, float) and value.is_integer():
+            value = int(value)
+        key = str(value).strip()
+
+        if self.audience == "email":
+            key = key.lower()
+            if not EMAIL_RE.match(key):
+                raise RecordRejected(f"{self.key_field}: invalid email address")
+        elif self.audience == "phone-number":
+            key = PHONE_STRIP_RE.sub("", key)
+            if not PHONE_RE.match(key):
+                raise RecordRejected(f"{self.key_field}: invalid phone number")
+        elif self.audience == "account-no" and not ACCOUNT_RE.match(key):
+            raise RecordRejected(f"{self.key_field}: invalid account number")
+
+        if len(key) > 255 or "\x00" in key:
+            raise RecordRejected(f"{self.key_field}: invalid customer key")
+        return key
+
+    def validate(self, record: Dict[str, Any]) -> Tuple[str, Dict[str, Any]]:
+        """Return (customer key, typed attributes) or raise RecordRejected"""
+        customer_id = self._key(record)
+        for field in self.fields:
+            value = record.get(field.name)
+            if value is None or value == "":
+                if field.required:
+                    raise RecordRejected(f"{field.name}: required")
+                record.pop(field.name, None)
+                continue
+            record[field.name] = field.validate(value)
+        return customer_id, record
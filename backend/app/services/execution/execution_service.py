@@ -0,0 +1,320 @@
+import os
+import time
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from ...models.journey_models import APIResponse
+from ..journey.load_service import JourneyLoadService
+from ..journey.utils import get_connection, ensure_uuid
+from .engine import CustomerState, ExecutionEngine, ExecutionEvent, STATUS_NAMES, WAITING
+from .plan import PlanCompileError, compile_plan
+from . import state_store
+from ...shared_services.logger_setup import setup_logger
+from ...shared_services.tracing import trace_methods
+
+logger = setup_logger()
+
+# Customers claimed (and locked) per transaction
+EXECUTION_BATCH_SIZE = int(os.getenv("EXECUTION_BATCH_SIZE", "1000"))
+
+
+@trace_methods
+class JourneyExecutionService:
+    """Service for publishing journeys and moving customers through them"""
+
+    def __init__(self, engine: Optional[ExecutionEngine] = None):
+        self.logger = logger
+        self.engine = engine or ExecutionEngine()
+        self.load_service = JourneyLoadService()
+        self.timer_listeners: List[Callable[[List[Tuple[str, str, datetime]]], None]] = []
+
+    async def publish_journey(self, journey_id: str) -> APIResponse:
+        """Compile the saved journey into a new execution plan version"""
+        try:
+            canvas_response = await self.load_service.load_compact_canvas(journey_id)
+            if not canvas_response.success:
+                return canvas_response
+
+            plan = compile_plan(str(ensure_uuid(journey_id)), canvas_response.data["canvas"])
+            with get_connection("journeys") as conn:
+                try:
+                    conn.rollback()
+                    with conn.cursor() as cursor:
+                        plan = state_store.save_plan(cursor, plan)
+                    conn.commit()
+                except Exception:
+                    conn.rollback()
+                    raise
+
+            return APIResponse(
+                success=True,
+                message="Journey published successfully",
+                data={"version": plan.version, "checksum": plan.checksum, "nodes": plan.num_nodes}
+            )
+
+        except PlanCompileError as e:
+            return APIResponse(
+                success=False,
+                message="Journey cannot be executed",
+                error=str(e)
+            )
+        except Exception as e:
+            self.logger.error(f"Error publishing journey: {e}")
+            return APIResponse(
+                success=False,
+                message="Failed to publish journey",
+                error=str(e)
+            )
+
+    async def enroll_customers(self, journey_id: str, customers: List[Dict[str, Any]],
+                               entry_node_id: Optional[str] = None) -> APIResponse:
+        """Place customers on an entry node of the latest published plan"""
+        try:
+            journey_id = str(ensure_uuid(journey_id))
+            now = datetime.now(timezone.utc)
+
+            with get_connection("journeys") as conn:
+                try:
+                    conn.rollback()
+                    with conn.cursor() as cursor:
+                        plan = state_store.load_plan(cursor, journey_id)
+                        if plan is None:
+                            return APIResponse(
+                                success=False,
+                                message="Journey has not been published",
+                                error="Journey has not been published"
+                            )
+
+                        entry_idx = plan.entry_index(entry_node_id)
+                        if entry_idx is None:
+                            return APIResponse(
+                                success=False,
+                                message="Unknown entry node",
+                                error=f"{entry_node_id} is not an entry node of this journey"
+                            )
+
+                        enrolled = state_store.enroll_customers(
+                            cursor, plan, entry_idx,
+                            ((c["customerId"], c.get("attributes")) for c in customers), now
+                        )
+                        entry_id = plan.node_ids[entry_idx]
+                        state_store.record_events(cursor, journey_id, [
+                            ExecutionEvent(customer_id, plan.version, entry_id, "entered", None, now)
+                            for customer_id in enrolled
+                        ])
+                    conn.commit()
+                except Exception:
+                    conn.rollback()
+                    raise
+
+            return APIResponse(
+                success=True,
+                message="Customers enrolled successfully",
+                data={
+                    "version": plan.version,
+                    "enrolled": len(enrolled),
+                    "skipped": len(customers) - len(enrolled)
+                }
+            )
+
+        except Exception as e:
+            self.logger.error(f"Error enrolling customers: {e}")
+            return APIResponse(
+                success=False,
+                message="Failed to enroll customers",
+                error=str(e)
+            )
+
+    def add_timer_listener(self, listener: Callable[[List[Tuple[str, str, datetime]]], None]) -> None:
+        """Register a callback receiving (journey_id, customer_id, due_at) for every new wait timer"""
+        self.timer_listeners.append(listener)
+
+    def _advance_claimed(self, cursor, journey_id: str, states: List[CustomerState], now: datetime,
+                         stats: Dict[str, int], timers: List[Tuple[str, str, datetime]]) -> None:
+        """Advance claimed customers of one journey and stage their new state, timers and events"""
+        # Customers keep the plan version they entered with
+        by_version: Dict[int, list] = {}
+        for state in states:
+            by_version.setdefault(state.plan_version, []).append(state)
+
+        events = []
+        for version, group in by_version.items():
+            plan = state_store.load_plan(cursor, journey_id, version)
+            group_events, transitions = self.engine.advance(plan, group, now)
+            events.extend(group_events)
+            stats["transitions"] += transitions
+
+        state_store.write_states(cursor, journey_id, states)
+        state_store.schedule_timers(cursor, journey_id, states)
+        state_store.record_events(cursor, journey_id, events)
+        stats["claimed"] += len(states)
+        stats["events"] += len(events)
+        timers.extend((journey_id, s.customer_id, s.due_at) for s in states if s.status == WAITING)
+
+    def _notify_timers(self, timers: List[Tuple[str, str, datetime]]) -> None:
+        if timers:
+            for listener in self.timer_listeners:
+                listener(timers)
+
+    def process_batch(self, journey_id: str, batch_size: int = EXECUTION_BATCH_SIZE,
+                      now: Optional[datetime] = None) -> Dict[str, int]:
+        """
+        Claim one batch of ready customers, advance them and persist the result in a
+        single transaction. Safe to run concurrently: claimed rows are locked and
+        skipped by other workers.
+        """
+        now = now or datetime.now(timezone.utc)
+        stats = {"claimed": 0, "transitions": 0, "events": 0}
+        timers: List[Tuple[str, str, datetime]] = []
+
+        with get_connection("journeys") as conn:
+            try:
+                conn.rollback()
+                with conn.cursor() as cursor:
+                    states = state_store.claim_due_customers(cursor, journey_id, now, batch_size)
+                    if states:
+                        self._advance_claimed(cursor, journey_id, states, now, stats, timers)
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+
+        self._notify_timers(timers)
+        return stats
+
+    def process_shards(self, shards: Sequence[int], batch_size: int = EXECUTION_BATCH_SIZE,
+                       now: Optional[datetime] = None) -> Dict[str, int]:
+        """Like process_batch, but claims ready customers of any journey within the given shards"""
+        now = now or datetime.now(timezone.utc)
+        stats = {"claimed": 0, "transitions": 0, "events": 0}
+        timers: List[Tuple[str, str, datetime]] = []
+        if not shards:
+            return stats
+
+        with get_connection("journeys") as conn:
+            try:
+                conn.rollback()
+                with conn.cursor() as cursor:
+                    claimed = state_store.claim_due_in_shards(cursor, shards, now, batch_size)
+                    for journey_id, states in claimed.items():
+                        self._advance_claimed(cursor, journey_id, states, now, stats, timers)
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+
+        self._notify_timers(timers)
+        return stats
+
+    def _wake(self, claim, now: datetime) -> Dict[str, int]:
+        """Claim timers with ``claim(cursor)`` and resume the matching waiting customers"""
+        stats = {"claimed": 0, "transitions": 0, "events": 0, "timers": 0}
+        timers: List[Tuple[str, str, datetime]] = []
+
+        with get_connection("journeys") as conn:
+            try:
+                conn.rollback()
+                with conn.cursor() as cursor:
+                    claimed = claim(cursor)
+                    stats["timers"] = len(claimed)
+                    by_journey: Dict[str, List[str]] = {}
+                    for journey_id, customer_id in claimed:
+                        by_journey.setdefault(journey_id, []).append(customer_id)
+                    for journey_id, customer_ids in by_journey.items():
+                        states = state_store.claim_waiting_customers(cursor, journey_id, customer_ids)
+                        if states:
+                            self._advance_claimed(cursor, journey_id, states, now, stats, timers)
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+
+        self._notify_timers(timers)
+        return stats
+
+    def wake_timers(self, keys: List[Tuple[str, str]], now: Optional[datetime] = None) -> Dict[str, int]:
+        """Resume the customers behind specific expired timers (as reported by a timer wheel)"""
+        now = now or datetime.now(timezone.utc)
+        return self._wake(lambda cursor: state_store.claim_timers(cursor, keys, now), now)
+
+    def wake_expired(self, now: Optional[datetime] = None, limit: int = EXECUTION_BATCH_SIZE,
+                     journey_id: Optional[str] = None, shards: Optional[Sequence[int]] = None) -> Dict[str, int]:
+        """Resume customers whose timers expired, oldest first (optionally for one journey or some shards)"""
+        now = now or datetime.now(timezone.utc)
+        return self._wake(lambda cursor: state_store.claim_expired_timers(cursor, now, limit, journey_id, shards), now)
+
+    async def run_journey(self, journey_id: str, batch_size: int = EXECUTION_BATCH_SIZE,
+                          max_batches: int = 10) -> APIResponse:
+        """Process due customers batch by batch until none are left or max_batches is reached"""
+        try:
+            journey_id = str(ensure_uuid(journey_id))
+            started = time.perf_counter()
+            totals = {"batches": 0, "claimed": 0, "transitions": 0, "events": 0}
+
+            for _ in range(max_batches):
+                now = datetime.now(timezone.utc)
+                stats = self.process_batch(journey_id, batch_size, now)
+                woken = self.wake_expired(now, batch_size, journey_id)
+                if not stats["claimed"] and not woken["timers"]:
+                    break
+                totals["batches"] += 1
+                for key in ("claimed", "transitions", "events"):
+                    totals[key] += stats[key] + woken[key]
+
+            elapsed = time.perf_counter() - started
+            totals["elapsedSeconds"] = round(elapsed, 4)
+            totals["transitionsPerSecond"] = round(totals["transitions"] / elapsed, 1) if elapsed else 0.0
+            return APIResponse(
+                success=True,
+                message="Journey execution batch completed",
+                data=totals
+            )
+
+        except Exception as e:
+            self.logger.error(f"Error running journey: {e}")
+            return APIResponse(
+                success=False,
+                message="Failed to run journey",
+                error=str(e)
+            )
+
+    async def get_execution_summary(self, journey_id: str) -> APIResponse:
+        """Customer counts per node and status"""
+        try:
+            journey_id = str(ensure_uuid(journey_id))
+            with get_connection("journeys") as conn:
+                with conn.cursor() as cursor:
+                    plan = state_store.load_plan(cursor, journey_id)
+                    rows = state_store.status_summary(cursor, journey_id)
+                    plans = {}
+                    positions = []
+                    totals = {name: 0 for name in STATUS_NAMES.values()}
+                    for version, node_idx, status, count in rows:
+                        if version not in plans:
+                            plans[version] = state_store.load_plan(cursor, journey_id, version)
+                        positions.append({
+                            "version": version,
+                            "nodeId": plans[version].node_ids[node_idx],
+                            "status": STATUS_NAMES[status],
+                            "customers": count
+                        })
+                        totals[STATUS_NAMES[status]] += count
+                conn.rollback()
+
+            return APIResponse(
+                success=True,
+                message="Execution summary retrieved successfully",
+                data={
+                    "publishedVersion": plan.version if plan else None,
+                    "totals": totals,
+                    "positions": positions
+                }
+            )
+
+        except Exception as e:
+            self.logger.error(f"Error getting execution summary: {e}")
+            return APIResponse(
+                success=False,
+                message="Failed to get execution summary",
+                error=str(e)
+            )
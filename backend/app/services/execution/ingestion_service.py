@@ -0,0 +1,343 @@
+"""
+Entry Source ingestion: streams an uploaded CSV/TSV/JSON file through validation into
+``journey_entry_staging`` with COPY, then enrolls the staged customers at the Entry node.
+
+Staging commits every INGEST_CHUNK_ROWS records and enrollment every
+INGEST_ENROLL_BATCH_SIZE rows, so neither memory nor transaction size grows with the
+file. Both stages run in a worker thread to keep the event loop free during multi-GB
+imports.
+"""
+import os
+import zlib
+from datetime import datetime, timezone
+from typing import Any, BinaryIO, Dict, List, Optional
+
+from starlette.concurrency import run_in_threadpool
+
+from ...models.journey_models import APIResponse
+from ..journey.utils import get_connection, ensure_uuid
+from .entry_sources import (
+    EntrySchema, IngestionError, RecordRejected, detect_format, open_stream, read_records,
+    INGEST_CHUNK_ROWS, INGEST_MAX_REJECT_SAMPLES,
+)
+from . import state_store
+from ...shared_services.logger_setup import setup_logger
+from ...shared_services.tracing import trace_methods
+from ...shared_services.serialization import dumps_str
+
+logger = setup_logger()
+
+# Staged rows enrolled per transaction
+INGEST_ENROLL_BATCH_SIZE = int(os.getenv("INGEST_ENROLL_BATCH_SIZE", "10000"))
+
+
+def _report(row: Dict[str, Any]) -> Dict[str, Any]:
+    """API view of an import row, with staging throughput"""
+    elapsed = ((row["staged_at"] or datetime.now(timezone.utc)) - row["started_at"]).total_seconds()
+    return {
+        "importId": str(row["id"]),
+        "planVersion": row["plan_version"],
+        "entryNodeId": row["entry_node_id"],
+        "filename": row["filename"],
+        "format": row["format"],
+        "status": row["status"],
+        "bytesRead": row["bytes_read"],
+        "rowsRead": row["rows_read"],
+        "rowsStaged": row["rows_staged"],
+        "rowsRejected": row["rows_rejected"],
+        "rowsEnrolled": row["rows_enrolled"],
+        "rejects": row["rejects"],
+        "warnings": row["warnings"],
+        "error": row["error"],
+        "startedAt": row["started_at"],
+        "stagedAt": row["staged_at"],
+        "finishedAt": row["finished_at"],
+        "elapsedSeconds": round(elapsed, 4),
+        "rowsPerSecond": round(row["rows_read"] / elapsed, 1) if elapsed > 0 else 0.0,
+        "megabytesPerSecond": round(row["bytes_read"] / 1e6 / elapsed, 2) if elapsed > 0 else 0.0,
+    }
+
+
+@trace_methods
+class EntryIngestionService:
+    """Service for importing Entry Source files into published journeys"""
+
+    def __init__(self):
+        self.logger = logger
+
+    async def import_file(self, journey_id: str, fileobj: BinaryIO, filename: Optional[str],
+                          fmt: Optional[str] = None, entry_node_id: Optional[str] = None,
+                          enroll: bool = False) -> APIResponse:
+        """Stage an uploaded file for an Entry node, optionally enrolling it straight away"""
+        return await run_in_threadpool(self._import_file, journey_id, fileobj, filename, fmt, entry_node_id, enroll)
+
+    async def enroll_import(self, journey_id: str, import_id: str) -> APIResponse:
+        """Enroll the customers of a staged import (resumes an interrupted enrollment)"""
+        return await run_in_threadpool(self._enroll_import, journey_id, import_id)
+
+    async def get_import(self, journey_id: str, import_id: str) -> APIResponse:
+        """Progress and report of an import"""
+        try:
+            with get_connection("journeys") as conn:
+                with conn.cursor() as cursor:
+                    row = state_store.load_import(cursor, str(ensure_uuid(journey_id)), str(ensure_uuid(import_id)))
+                conn.rollback()
+
+            if row is None:
+                return APIResponse(
+                    success=False,
+                    message="Import not found",
+                    error=f"No import {import_id} for journey {journey_id}"
+                )
+            return APIResponse(
+                success=True,
+                message="Import retrieved successfully",
+                data=_report(row)
+            )
+
+        except Exception as e:
+            self.logger.error(f"Error getting import: {e}")
+            return APIResponse(
+                success=False,
+                message="Failed to get import",
+                error=str(e)
+            )
+
+    # ------------------------------------------------------------------
+    # Staging
+    # ------------------------------------------------------------------
+
+    def _import_file(self, journey_id: str, fileobj: BinaryIO, filename: Optional[str],
+                     fmt: Optional[str], entry_node_id: Optional[str], enroll: bool) -> APIResponse:
+        import_id = None
+        try:
+            journey_id = str(ensure_uuid(journey_id))
+            fmt, gzipped = detect_format(filename, fmt)
+
+            with get_connection("journeys") as conn:
+                try:
+                    conn.rollback()
+                    with conn.cursor() as cursor:
+                        plan = state_store.load_plan(cursor, journey_id)
+                        if plan is None:
+                            return APIResponse(
+                                success=False,
+                                message="Journey has not been published",
+                                error="Journey has not been published"
+                            )
+                        entry_idx = plan.entry_index(entry_node_id)
+                        if entry_idx is None:
+                            return APIResponse(
+                                success=False,
+                                message="Unknown entry node",
+                                error=f"{entry_node_id} is not an entry node of this journey"
+                            )
+                        schema = EntrySchema(plan.node_data[entry_idx], plan.rule_attributes())
+                        import_id = state_store.create_import(
+                            cursor, journey_id, plan.version, plan.node_ids[entry_idx],
+                            filename, fmt, datetime.now(timezone.utc)
+                        )
+                    conn.commit()
+
+                    status = self._stage(conn, import_id, fileobj, fmt, gzipped, schema)
+                except Exception:
+                    conn.rollback()
+                    raise
+
+            if enroll and status == "staged":
+                return self._enroll_import(journey_id, import_id)
+            return self._import_response(journey_id, import_id)
+
+        except IngestionError as e:
+            return APIResponse(
+                success=False,
+                message="Entry source file cannot be imported",
+                error=str(e)
+            )
+        except Exception as e:
+            self.logger.error(f"Error importing entry source file: {e}")
+            if import_id is not None:
+                self._mark_failed(import_id, str(e))
+            return APIResponse(
+                success=False,
+                message="Failed to import entry source file",
+                error=str(e)
+            )
+
+    def _stage(self, conn, import_id: str, fileobj: BinaryIO, fmt: str, gzipped: bool, schema: EntrySchema) -> str:
+        """Validate and COPY records chunk by chunk, committing progress after each chunk; returns the status"""
+        stream, counter = open_stream(fileobj, gzipped)
+        totals = {"rows_read": 0, "rows_staged": 0, "rows_rejected": 0}
+        rejects: List[Dict[str, Any]] = []
+        warnings: List[str] = []
+        # Top-level JSON keys seen, to warn about rule attributes no record provides
+        seen_keys = set()
+        rows = []
+
+        def reject(number: int, reason: str) -> None:
+            totals["rows_rejected"] += 1
+            if len(rejects) < INGEST_MAX_REJECT_SAMPLES:
+                rejects.append({"record": number, "reason": reason})
+
+        def flush() -> None:
+            with conn.cursor() as cursor:
+                state_store.copy_staged_rows(cursor, import_id, rows)
+                totals["rows_staged"] += len(rows)
+                state_store.update_import(cursor, import_id, bytes_read=counter.bytes_read, **totals)
+            conn.commit()
+            rows.clear()
+
+        try:
+            columns, records = read_records(stream, fmt)
+            if columns is not None:
+                warnings.extend(schema.check_columns(columns))
+
+            for number, record, reason in records:
+                totals["rows_read"] += 1
+                if record is None:
+                    reject(number, reason)
+                    continue
+                if columns is None:
+                    seen_keys.update(record)
+                try:
+                    customer_id, attributes = schema.validate(record)
+                    payload = dumps_str(attributes)
+                except RecordRejected as e:
+                    reject(number, str(e))
+                    continue
+                except TypeError as e:
+                    reject(number, f"Unsupported value: {e}")
+                    continue
+                if "\\u0000" in payload:
+                    # Postgres JSONB cannot store NUL characters
+                    reject(number, "Record contains a NUL character")
+                    continue
+
+                rows.append((number, customer_id, payload))
+                if len(rows) >= INGEST_CHUNK_ROWS:
+                    flush()
+            flush()
+
+            if columns is None:
+                warnings.extend(schema.missing_rule_attributes(seen_keys))
+            status, error = "staged", None
+        except IngestionError as e:
+            conn.rollback()
+            status, error = "failed", str(e)
+        except (EOFError, OSError, zlib.error) as e:
+            # Truncated or corrupt gzip stream
+            conn.rollback()
+            status, error = "failed", f"Cannot read file: {e}"
+
+        now = datetime.now(timezone.utc)
+        with conn.cursor() as cursor:
+            if status == "failed":
+                state_store.discard_staged_rows(cursor, import_id)
+            state_store.update_import(
+                cursor, import_id, status=status, error=error, bytes_read=counter.bytes_read,
+                rejects=rejects, warnings=warnings, staged_at=now,
+                finished_at=now if status == "failed" else None, **totals
+            )
+        conn.commit()
+        self.logger.info(
+            f"Entry source import {import_id} {status}: {totals['rows_staged']} staged, "
+            f"{totals['rows_rejected']} rejected, {counter.bytes_read} bytes"
+        )
+        return status
+
+    # ------------------------------------------------------------------
+    # Enrollment
+    # ------------------------------------------------------------------
+
+    def _enroll_import(self, journey_id: str, import_id: str) -> APIResponse:
+        try:
+            journey_id = str(ensure_uuid(journey_id))
+            import_id = str(ensure_uuid(import_id))
+
+            with get_connection("journeys") as conn:
+                try:
+                    conn.rollback()
+                    with conn.cursor() as cursor:
+                        row = state_store.load_import(cursor, journey_id, import_id)
+                        if row is None:
+                            return APIResponse(
+                                success=False,
+                                message="Import not found",
+                                error=f"No import {import_id} for journey {journey_id}"
+                            )
+                        if row["status"] not in ("staged", "enrolling"):
+                            return APIResponse(
+                                success=False,
+                                message="Import cannot be enrolled",
+                                error=f"Import is {row['status']}; only staged imports can be enrolled"
+                            )
+                        plan = state_store.load_plan(cursor, journey_id, row["plan_version"])
+                        entry_idx = plan.node_ids.index(row["entry_node_id"])
+                        state_store.update_import(cursor, import_id, status="enrolling")
+                    conn.commit()
+
+                    while True:
+                        with conn.cursor() as cursor:
+                            consumed, _ = state_store.enroll_staged(
+                                cursor, import_id, plan, entry_idx,
+                                datetime.now(timezone.utc), INGEST_ENROLL_BATCH_SIZE
+                            )
+                            if consumed < INGEST_ENROLL_BATCH_SIZE:
+                                state_store.update_import(
+                                    cursor, import_id, status="enrolled", finished_at=datetime.now(timezone.utc)
+                                )
+                        conn.commit()
+                        if consumed < INGEST_ENROLL_BATCH_SIZE:
+                            break
+                except Exception:
+                    conn.rollback()
+                    raise
+
+            return self._import_response(journey_id, import_id)
+
+        except Exception as e:
+            self.logger.error(f"Error enrolling import: {e}")
+            return APIResponse(
+                success=False,
+                message="Failed to enroll import",
+                error=str(e)
+            )
+
+    # ------------------------------------------------------------------
+
+    def _import_response(self, journey_id: str, import_id: str) -> APIResponse:
+        with get_connection("journeys") as conn:
+            with conn.cursor() as cursor:
+                row = state_store.load_import(cursor, journey_id, import_id)
+            conn.rollback()
+
+        if row["status"] == "failed":
+            return APIResponse(
+                success=False,
+                message="Entry source file cannot be imported",
+                data=_report(row),
+                error=row["error"]
+            )
+        return APIResponse(
+            success=True,
+            message="Entry source file imported" if row["status"] == "staged" else "Entry source file enrolled",
+            data=_report(row)
+        )
+
+    def _mark_failed(self, import_id: str, error: str) -> None:
+        try:
+            with get_connection("journeys") as conn:
+                try:
+                    conn.rollback()
+                    with conn.cursor() as cursor:
+                        state_store.discard_staged_rows(cursor, import_id)
+                        state_store.update_import(
+                            cursor, import_id, status="failed", error=error,
+                            finished_at=datetime.now(timezone.utc)
+                        )
+                    conn.commit()
+                except Exception:
+                    conn.rollback()
+                    raise
+        except Exception as e:
+            self.logger.error(f"Error marking import {import_id} failed: {e}")
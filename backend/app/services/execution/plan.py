@@ -0,0 +1,391 @@
+"""
+Compiled execution plans.
+
+A saved journey (nodes + edges with free-form ``data``) is compiled once into an
+``ExecutionPlan``: nodes become integer indices with a kind code, every node gets its
+outgoing transition(s) resolved up front, and wait/loop/decision settings are parsed
+into small immutable records. Executing a step is then a few list lookups, with no
+JSON access or edge scanning per customer.
+"""
+import hashlib
+import os
+from datetime import datetime, timedelta, time
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+from zoneinfo import ZoneInfo
+
+from ..journey.compact_canvas import CompactCanvas
+from ..journey.graph_analysis import analyze_canvas
+from .rules import RuleCompileError, compile_rule
+from ...shared_services.logger_setup import setup_logger
+from ...shared_services.serialization import dumps
+
+logger = setup_logger()
+
+# Timezone used for calendar-based waits ("next Monday at 09:00")
+EXECUTION_TIMEZONE = ZoneInfo(os.getenv("EXECUTION_TIMEZONE", "UTC"))
+
+# Node kinds
+ENTRY = 0
+MESSAGE = 1
+WAIT = 2
+DECISION = 3
+LOOP = 4
+MERGE = 5
+GOAL = 6
+MILESTONE = 7
+EXIT = 8
+PASS = 9  # any other node type simply forwards the customer
+
+# Canvas node subtypes (frontend/src/config/nodeTypes.ts) -> kind
+KIND_BY_SUBTYPE = {
+    "entry": ENTRY,
+    "email": MESSAGE,
+    "sms": MESSAGE,
+    "webhook": MESSAGE,
+    "message": MESSAGE,
+    "wait": WAIT,
+    "decision": DECISION,
+    "decision-point": DECISION,
+    "segment": DECISION,
+    "loop": LOOP,
+    "merge": MERGE,
+    "join": MERGE,
+    "goal": GOAL,
+    "milestone": MILESTONE,
+    "end": EXIT,
+    "exit": EXIT,
+}
+
+# Subtypes with no run-time behaviour of their own yet: customers pass straight through
+PASS_SUBTYPES = {"action", "schedule", "sample", "ai-decision", "ai-copy", "ai-segment", "database"}
+
+WEEKDAYS = ["monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday"]
+
+# Edge labels recognised as the fallback branch of a decision
+FALLBACK_LABELS = {"else", "default", "otherwise", "no"}
+
+NO_NODE = -1
+
+
+class PlanCompileError(ValueError):
+    """Raised when a journey cannot be executed as designed"""
+
+
+class WaitSpec(NamedTuple):
+    wait_type: str            # "fixed" or "next-day"
+    delay_seconds: int        # fixed waits: days + hours
+    resume_time: Optional[time]
+    until_day: Optional[str]  # next-day waits: weekday name or "business-day"
+
+
+class Branch(NamedTuple):
+    label: str
+    target: int
+    config: Dict[str, Any]    # branchConfigs entry (title, condition, ...) or {}
+    rule: Optional[str] = None  # condition routing customers down this branch
+
+
+class LoopSpec(NamedTuple):
+    slot: int                 # index into a customer's loop_counts
+    max_loops: int
+    continue_target: int
+    exit_target: int
+
+
+def _parse_time(value: Any) -> Optional[time]:
+    if not value or not isinstance(value, str):
+        return None
+    try:
+        hours, minutes = value.split(":")[:2]
+        return time(int(hours), int(minutes))
+    except ValueError:
+        return None
+
+
+def _as_int(value: Any, default: int = 0) -> int:
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return default
+
+
+def _edge_label(data: Dict[str, Any]) -> str:
+    label = data.get("label") if isinstance(data, dict) else None
+    return label.strip() if isinstance(label, str) else ""
+
+
+def parse_wait(data: Dict[str, Any]) -> WaitSpec:
+    wait_type = data.get("waitType") or "fixed"
+    return WaitSpec(
+        wait_type=wait_type,
+        delay_seconds=_as_int(data.get("waitDays")) * 86400 + _as_int(data.get("waitHours")) * 3600,
+        resume_time=_parse_time(data.get("waitTime")),
+        until_day=(data.get("waitUntilDay") or "monday") if wait_type == "next-day" else None,
+    )
+
+
+def resume_at(spec: WaitSpec, now: datetime) -> datetime:
+    """When a customer entering a wait node at ``now`` (timezone-aware) may continue"""
+    local_now = now.astimezone(EXECUTION_TIMEZONE)
+
+    if spec.wait_type == "next-day":
+        day = local_now.date() + timedelta(days=1)
+        if spec.until_day == "business-day":
+            while day.weekday() >= 5:
+                day += timedelta(days=1)
+        elif spec.until_day in WEEKDAYS:
+            target = WEEKDAYS.index(spec.until_day)
+            day += timedelta(days=(target - day.weekday()) % 7)
+        return datetime.combine(day, spec.resume_time or time(0, 0), tzinfo=EXECUTION_TIMEZONE)
+
+    due = local_now + timedelta(seconds=spec.delay_seconds)
+    if spec.resume_time is not None:
+        due = due.replace(hour=spec.resume_time.hour, minute=spec.resume_time.minute, second=0, microsecond=0)
+        if due < local_now:
+            due += timedelta(days=1)
+    return due
+
+
+class ExecutionPlan:
+    """Immutable, index-based form of a journey graph"""
+    __slots__ = (
+        "journey_id", "version", "checksum",
+        "node_ids", "kinds", "next_node", "entry_nodes",
+        "waits", "branches", "fallback_branch", "loops", "num_loop_slots", "node_data",
+    )
+
+    def __init__(self, journey_id: str, node_ids: List[str], kinds: List[int], next_node: List[int],
+                 entry_nodes: List[int], waits: Dict[int, WaitSpec], branches: Dict[int, Tuple[Branch, ...]],
+                 fallback_branch: Dict[int, int], loops: Dict[int, LoopSpec], node_data: List[Dict[str, Any]],
+                 version: int = 0):
+        self.journey_id = journey_id
+        self.version = version
+        self.node_ids = tuple(node_ids)
+        self.kinds = tuple(kinds)
+        self.next_node = tuple(next_node)
+        self.entry_nodes = tuple(entry_nodes)
+        self.waits = waits
+        self.branches = branches
+        self.fallback_branch = fallback_branch
+        self.loops = loops
+        self.num_loop_slots = len(loops)
+        self.node_data = tuple(node_data)
+        self.checksum = hashlib.sha256(dumps(self._content())).hexdigest()
+
+    @property
+    def num_nodes(self) -> int:
+        return len(self.node_ids)
+
+    def with_version(self, version: int) -> "ExecutionPlan":
+        plan = ExecutionPlan.from_dict(self.to_dict())
+        plan.version = version
+        return plan
+
+    def entry_index(self, node_id: Optional[str] = None) -> Optional[int]:
+        """Index of the given entry node (the first entry if node_id is None); None if it is not an entry"""
+        if node_id is None:
+            return self.entry_nodes[0]
+        if node_id in self.node_ids and self.node_ids.index(node_id) in self.entry_nodes:
+            return self.node_ids.index(node_id)
+        return None
+
+    def rule_attributes(self) -> List[str]:
+        """Customer attributes referenced by any decision rule"""
+        names = set()
+        for branches in self.branches.values():
+            for branch in branches:
+                rule = compile_rule(branch.rule)
+                if rule is not None:
+                    names.update(rule.attribute_names)
+        return sorted(names)
+
+    # ------------------------------------------------------------------
+    # Serialization (stored in journey_execution_plans.plan)
+    # ------------------------------------------------------------------
+
+    def _content(self) -> Dict[str, Any]:
+        return {
+            "nodeIds": list(self.node_ids),
+            "kinds": list(self.kinds),
+            "next": list(self.next_node),
+            "entries": list(self.entry_nodes),
+            "waits": {
+                str(i): {
+                    "waitType": w.wait_type,
+                    "delaySeconds": w.delay_seconds,
+                    "resumeTime": w.resume_time.strftime("%H:%M") if w.resume_time else None,
+                    "untilDay": w.until_day,
+                } for i, w in self.waits.items()
+            },
+            "branches": {
+                str(i): [{"label": b.label, "target": b.target, "config": b.config, "rule": b.rule} for b in branches]
+                for i, branches in self.branches.items()
+            },
+            "fallback": {str(i): pos for i, pos in self.fallback_branch.items()},
+            "loops": {
+                str(i): {"slot": l.slot, "maxLoops": l.max_loops, "continue": l.continue_target, "exit": l.exit_target}
+                for i, l in self.loops.items()
+            },
+            "nodeData": list(self.node_data),
+        }
+
+    def to_dict(self) -> Dict[str, Any]:
+        content = self._content()
+        content["journeyId"] = self.journey_id
+        content["version"] = self.version
+        return content
+
+    @classmethod
+    def from_dict(cls, payload: Dict[str, Any]) -> "ExecutionPlan":
+        return cls(
+            journey_id=payload["journeyId"],
+            version=payload.get("version", 0),
+            node_ids=payload["nodeIds"],
+            kinds=payload["kinds"],
+            next_node=payload["next"],
+            entry_nodes=payload["entries"],
+            waits={
+                int(i): WaitSpec(w["waitType"], w["delaySeconds"], _parse_time(w["resumeTime"]), w["untilDay"])
+                for i, w in payload["waits"].items()
+            },
+            branches={
+                int(i): tuple(Branch(b["label"], b["target"], b["config"], b.get("rule")) for b in branches)
+                for i, branches in payload["branches"].items()
+            },
+            fallback_branch={int(i): pos for i, pos in payload["fallback"].items()},
+            loops={
+                int(i): LoopSpec(l["slot"], l["maxLoops"], l["continue"], l["exit"])
+                for i, l in payload["loops"].items()
+            },
+            node_data=payload["nodeData"],
+        )
+
+
+def _decision_branches(data: Dict[str, Any], out_edges: List[Tuple[str, int]]) -> Tuple[Tuple[Branch, ...], int]:
+    """Order a decision's outgoing edges by its branchConfigs and pick the fallback branch"""
+    remaining = list(out_edges)
+    branches = []
+    for config in data.get("branchConfigs") or []:
+        title = (config.get("title") or "").strip()
+        match = next((edge for edge in remaining if edge[0].lower() == title.lower()), None)
+        if match is not None:
+            remaining.remove(match)
+            rule = config.get("condition") or config.get("sqlQuery")
+            branches.append(Branch(title, match[1], dict(config), rule))
+
+    # Edges without a matching branch config keep their canvas order; on yes/no decisions
+    # the node's own condition routes to the "yes" edge
+    yes_labels = {"yes", str(data.get("yesLabel") or "yes").strip().lower(),
+                  str(data.get("yesAction") or "yes").strip().lower()}
+    for label, target in remaining:
+        rule = data.get("condition") if label.lower() in yes_labels else None
+        branches.append(Branch(label, target, {}, rule))
+
+    fallback = len(branches) - 1
+    for pos, branch in enumerate(branches):
+        if branch.label.lower() in FALLBACK_LABELS:
+            fallback = pos
+    return tuple(branches), fallback
+
+
+def _kind(journey_id: str, canvas: CompactCanvas, i: int) -> int:
+    subtype = canvas.subtype_of(i)
+    kind = KIND_BY_SUBTYPE.get(subtype)
+    if kind is None:
+        if subtype not in PASS_SUBTYPES:
+            logger.warning(f"Journey {journey_id}: node {canvas.node_ids[i]} has unknown subtype {subtype!r}; customers pass through it")
+        kind = PASS
+    return kind
+
+
+def compile_plan(journey_id: str, canvas: CompactCanvas) -> ExecutionPlan:
+    """Compile a journey canvas into an execution plan, rejecting graphs that cannot run"""
+    analysis = analyze_canvas(canvas)
+    if not analysis["entryNodes"]:
+        raise PlanCompileError("Journey has no entry node")
+    if analysis["illegalCycles"]:
+        raise PlanCompileError(f"Journey contains cycles without a loop node: {analysis['illegalCycles']}")
+
+    n = canvas.num_nodes
+    offsets, targets, edge_indices = (a.tolist() for a in canvas.adjacency())
+    kinds = [_kind(journey_id, canvas, i) for i in range(n)]
+
+    next_node = [NO_NODE] * n
+    waits: Dict[int, WaitSpec] = {}
+    branches: Dict[int, Tuple[Branch, ...]] = {}
+    fallback_branch: Dict[int, int] = {}
+    loops: Dict[int, LoopSpec] = {}
+
+    for i in range(n):
+        # Outgoing edges in canvas order
+        out_edges = sorted(
+            (edge_indices[pos], targets[pos]) for pos in range(offsets[i], offsets[i + 1])
+        )
+        out_edges = [(_edge_label(canvas.edge_data[e]), target) for e, target in out_edges]
+        data = canvas.node_data[i] or {}
+        kind = kinds[i]
+
+        if out_edges:
+            next_node[i] = out_edges[0][1]
+
+        if kind == WAIT:
+            waits[i] = parse_wait(data)
+        elif kind == DECISION and out_edges:
+            branches[i], fallback_branch[i] = _decision_branches(data, out_edges)
+            for branch in branches[i]:
+                try:
+                    compile_rule(branch.rule)
+                except RuleCompileError as e:
+                    raise PlanCompileError(f"Decision {canvas.node_ids[i]} branch {branch.label!r}: {e}") from e
+        elif kind == LOOP:
+            continue_labels = {"continue", str(data.get("continueLabel") or "continue").strip().lower()}
+            exit_labels = {"exit", str(data.get("exitLabel") or "exit").strip().lower()}
+            continue_target = exit_target = NO_NODE
+            unlabeled = []
+            for label, target in out_edges:
+                if label.lower() in continue_labels and continue_target == NO_NODE:
+                    continue_target = target
+                elif label.lower() in exit_labels and exit_target == NO_NODE:
+                    exit_target = target
+                else:
+                    unlabeled.append(target)
+            # Unlabeled edges fill the continue handle first, then exit
+            if continue_target == NO_NODE and unlabeled:
+                continue_target = unlabeled.pop(0)
+            if exit_target == NO_NODE and unlabeled:
+                exit_target = unlabeled.pop(0)
+            loops[i] = LoopSpec(len(loops), max(_as_int(data.get("maxLoops"), 3), 0), continue_target, exit_target)
+
+    entries = [canvas.node_index[node_id] for node_id in analysis["entryNodes"]]
+    # Only event titles, goal/milestone links, random split settings and entry source definitions are needed at run time
+    node_data = []
+    for i in range(n):
+        data = canvas.node_data[i] or {}
+        if kinds[i] == ENTRY:
+            node_data.append({
+                "audience": data.get("audience"),
+                "userField": data.get("userField"),
+                "dataDefinitions": data.get("dataDefinitions") or [],
+            })
+        elif kinds[i] == GOAL:
+            node_data.append({"title": data.get("title"), "goalId": data.get("goalId")})
+        elif kinds[i] == MILESTONE:
+            node_data.append({"title": data.get("title"), "milestoneId": data.get("milestoneId")})
+        elif kinds[i] == MESSAGE:
+            node_data.append({"title": data.get("title"), "channel": canvas.subtype_of(i)})
+        elif kinds[i] == DECISION and data.get("randomSample"):
+            node_data.append({"randomSample": True, "randomSeed": data.get("randomSeed") or 0})
+        else:
+            node_data.append({})
+    return ExecutionPlan(
+        journey_id=journey_id,
+        node_ids=canvas.node_ids,
+        kinds=kinds,
+        next_node=next_node,
+        entry_nodes=entries,
+        waits=waits,
+        branches=branches,
+        fallback_branch=fallback_branch,
+        loops=loops,
+        node_data=node_data,
+    )
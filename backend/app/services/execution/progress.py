@@ -0,0 +1,146 @@
+"""
+Goal and milestone rollups.
+
+Pure functions turning the aggregated counters (distinct customers that reached a goal or
+milestone node, customers that entered the journey) into the values stored on
+``journey_goals`` and ``journey_milestones``. Only goals/milestones linked to a node of a
+published plan are computed; the others keep whatever the frontend saved.
+"""
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Set, Tuple
+
+from .plan import ExecutionPlan, GOAL, MILESTONE
+from ..journey.milestone_graph import MilestoneGraph
+
+# Goal units measured as a share of the customers that entered the journey
+PERCENT_UNITS = {"%", "percent", "percentage"}
+# Statuses set by people; aggregation never overrides them
+MANUAL_STATUSES = {"cancelled", "deleted", "archived"}
+
+
+class GoalProgress(NamedTuple):
+    value: float
+    status: str
+
+
+class MilestoneProgress(NamedTuple):
+    own: int                  # share of entered customers that reached the milestone
+    progress: int             # own progress capped by the progress of its dependencies
+    status: str
+    blocked_by: Tuple[str, ...]  # dependencies that are not complete yet
+
+
+def link_targets(plan: ExecutionPlan, goals: Iterable[Tuple[str, str]],
+                 milestones: Iterable[Tuple[str, str]]) -> Dict[str, Tuple[str, str]]:
+    """
+    node_id -> ("goal" | "milestone", target id) for the goal and milestone nodes of a plan.
+    A node links by its goalId/milestoneId, or else by a case-insensitive title match
+    against the (id, title) pairs given.
+    """
+    by_title = {
+        GOAL: {title.strip().casefold(): target_id for target_id, title in goals if title},
+        MILESTONE: {title.strip().casefold(): target_id for target_id, title in milestones if title},
+    }
+    links = {}
+    for idx, kind in enumerate(plan.kinds):
+        if kind not in (GOAL, MILESTONE):
+            continue
+        data = plan.node_data[idx]
+        target_id = data.get("goalId" if kind == GOAL else "milestoneId")
+        if not target_id and isinstance(data.get("title"), str):
+            target_id = by_title[kind].get(data["title"].strip().casefold())
+        if target_id:
+            links[plan.node_ids[idx]] = ("goal" if kind == GOAL else "milestone", str(target_id))
+    return links
+
+
+def _share(reached: int, entered: int) -> float:
+    return 100.0 * reached / entered if entered else 0.0
+
+
+def goal_progress(target_value: float, unit: Optional[str], status: str,
+                  reached: int, entered: int) -> GoalProgress:
+    """Current value of a goal: customers that reached it, or their share when the unit is a percentage"""
+    if (unit or "").strip().lower() in PERCENT_UNITS:
+        value = round(_share(reached, entered), 2)
+    else:
+        value = float(reached)
+
+    if status in MANUAL_STATUSES:
+        return GoalProgress(value, status)
+    if target_value and value >= target_value:
+        return GoalProgress(value, "completed")
+    if value > 0:
+        return GoalProgress(value, "in-progress")
+    return GoalProgress(value, status if status in ("not-started", "active") else "not-started")
+
+
+def _as_utc(value: Optional[datetime]) -> Optional[datetime]:
+    if value is not None and value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value
+
+
+def milestone_progress(milestones: Dict[str, Dict[str, Any]], linked: Set[str],
+                       reached: Dict[str, int], entered: int,
+                       now: datetime) -> Dict[str, MilestoneProgress]:
+    """
+    Progress of the linked milestones. ``milestones`` maps milestone_id to its row
+    (progress, status, target_date, dependencies). A milestone is never further along
+    than its dependencies; unlinked dependencies count with their saved progress and
+    dependencies closing a cycle are ignored (see MilestoneGraph).
+    """
+    graph = MilestoneGraph([
+        {"id": milestone_id, "status": row["status"], "targetDate": row["target_date"],
+         "dependencies": row["dependencies"]}
+        for milestone_id, row in milestones.items()
+    ], allow_cycles=True)
+
+    own: Dict[str, int] = {}
+    for milestone_id, row in milestones.items():
+        if milestone_id in linked:
+            own[milestone_id] = min(int(_share(reached.get(milestone_id, 0), entered)), 100)
+        else:
+            own[milestone_id] = 100 if row["status"] == "completed" else int(row["progress"] or 0)
+
+    # Dependencies come first in the graph order, so one pass settles every milestone
+    effective: Dict[str, int] = {}
+    for i in graph.order:
+        milestone_id = graph.ids[i]
+        effective[milestone_id] = min(
+            [own[milestone_id]] + [effective[graph.ids[j]] for j in graph.dependencies[i]]
+        )
+
+    result = {}
+    for milestone_id in linked:
+        if milestone_id not in milestones:
+            continue
+        row = milestones[milestone_id]
+        progress = effective[milestone_id]
+        blocked_by = tuple(
+            graph.ids[j] for j in graph.dependencies[graph.index[milestone_id]] if effective[graph.ids[j]] < 100
+        )
+        status = row["status"]
+        target_date = _as_utc(row["target_date"])
+        if status not in MANUAL_STATUSES:
+            if progress >= 100:
+                status = "completed"
+            elif target_date is not None and target_date < now:
+                status = "overdue"
+            elif progress > 0:
+                status = "in-progress"
+            elif status not in ("pending", "active"):
+                status = "pending"
+        result[milestone_id] = MilestoneProgress(own[milestone_id], progress, status, blocked_by)
+    return result
+
+
+def goal_rollups(goals: List[Dict[str, Any]], linked: Set[str], reached: Dict[str, int],
+                 entered: int) -> Dict[str, GoalProgress]:
+    """Progress of the linked goals, keyed by goal_id"""
+    return {
+        row["goal_id"]: goal_progress(
+            float(row["target_value"] or 0), row["unit"], row["status"], reached.get(row["goal_id"], 0), entered
+        )
+        for row in goals if row["goal_id"] in linked
+    }
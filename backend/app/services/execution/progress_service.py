@@ -0,0 +1,231 @@
+"""
+Goal and milestone progress aggregation.
+
+Execution events are folded into per-journey counters incrementally: a watermark records
+the last event counted, and each pass reads only newer entered/goal/milestone events in
+batches of PROGRESS_BATCH_SIZE, updating the counters and the watermark in the same
+transaction. The rollups derived from the counters are then written to
+``journey_goals.current_value`` / ``journey_milestones.progress`` (and their statuses),
+which the journey_stats view and the journey API read.
+"""
+import os
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+from starlette.concurrency import run_in_threadpool
+
+from ...models.journey_models import APIResponse
+from ..journey.utils import get_connection, ensure_uuid
+from .progress import goal_rollups, link_targets, milestone_progress
+from . import state_store
+from ...shared_services.logger_setup import setup_logger
+from ...shared_services.tracing import trace_methods
+
+logger = setup_logger()
+
+# Events counted per transaction
+PROGRESS_BATCH_SIZE = int(os.getenv("PROGRESS_BATCH_SIZE", "10000"))
+# Events younger than this are left for the next pass (their sequence gaps may still fill)
+PROGRESS_SETTLE_SECONDS = float(os.getenv("PROGRESS_SETTLE_SECONDS", "5"))
+
+
+@trace_methods
+class JourneyProgressService:
+    """Service for aggregating goal and milestone progress from execution events"""
+
+    def __init__(self, batch_size: int = PROGRESS_BATCH_SIZE, settle_seconds: float = PROGRESS_SETTLE_SECONDS):
+        self.logger = logger
+        self.batch_size = batch_size
+        self.settle_seconds = settle_seconds
+
+    def _links(self, cursor, journey_id: str, goals: List[Dict[str, Any]],
+               milestones: Dict[str, Dict[str, Any]]) -> Dict[int, Dict[str, Tuple[str, str]]]:
+        """node links of every published plan version: {version: {node_id: (kind, target_id)}}"""
+        goal_titles = [(row["goal_id"], row["title"]) for row in goals]
+        milestone_titles = [(milestone_id, row["title"]) for milestone_id, row in milestones.items()]
+        return {
+            version: link_targets(state_store.load_plan(cursor, journey_id, version), goal_titles, milestone_titles)
+            for version in state_store.plan_versions(cursor, journey_id)
+        }
+
+    def _count_batch(self, conn, journey_id: str) -> Tuple[int, bool]:
+        """Count one batch of new events; returns (events counted, more events may be ready)"""
+        try:
+            conn.rollback()
+            with conn.cursor() as cursor:
+                last_event_id = state_store.lock_progress_watermark(cursor, journey_id)
+                if last_event_id is None:
+                    conn.rollback()
+                    return 0, False
+
+                rows = state_store.read_progress_events(
+                    cursor, journey_id, last_event_id, self.settle_seconds, self.batch_size
+                )
+                links = None
+                members = []
+                entered = 0
+                counted = 0
+                for event_id, customer_id, version, node_id, event_type, settled in rows:
+                    if not settled:
+                        break
+                    counted += 1
+                    last_event_id = event_id
+                    if event_type == "entered":
+                        entered += 1
+                        continue
+                    if links is None:
+                        links = self._links(
+                            cursor, journey_id,
+                            state_store.load_goal_rows(cursor, journey_id),
+                            state_store.load_milestone_rows(cursor, journey_id)
+                        )
+                    link = links.get(version, {}).get(node_id)
+                    if link is not None:
+                        members.append((link[0], link[1], customer_id))
+
+                if counted:
+                    state_store.add_progress(cursor, journey_id, members, entered, last_event_id)
+            conn.commit()
+            return counted, counted == len(rows) == self.batch_size
+        except Exception:
+            conn.rollback()
+            raise
+
+    def _rollups(self, cursor, journey_id: str, now: datetime) -> Dict[str, Any]:
+        """Current counters and the goal/milestone values derived from them"""
+        entered, last_event_id, updated_at, counters = state_store.load_progress(cursor, journey_id)
+        goals = state_store.load_goal_rows(cursor, journey_id)
+        milestones = state_store.load_milestone_rows(cursor, journey_id)
+
+        linked = {"goal": set(), "milestone": set()}
+        for links in self._links(cursor, journey_id, goals, milestones).values():
+            for kind, target_id in links.values():
+                linked[kind].add(target_id)
+        reached = {"goal": {}, "milestone": {}}
+        for (kind, target_id), customers in counters.items():
+            reached[kind][target_id] = customers
+
+        return {
+            "entered": entered,
+            "lastEventId": last_event_id,
+            "updatedAt": updated_at,
+            "goals": goals,
+            "milestones": milestones,
+            "reached": reached,
+            "goalProgress": goal_rollups(goals, linked["goal"], reached["goal"], entered),
+            "milestoneProgress": milestone_progress(milestones, linked["milestone"], reached["milestone"], entered, now),
+        }
+
+    def aggregate_journey(self, journey_id: str, now: Optional[datetime] = None) -> Dict[str, int]:
+        """Count the journey's new events and publish the rollups to its goals and milestones"""
+        now = now or datetime.now(timezone.utc)
+        journey_id = str(ensure_uuid(journey_id))
+        stats = {"events": 0, "goalsUpdated": 0, "milestonesUpdated": 0}
+
+        with get_connection("journeys") as conn:
+            while True:
+                counted, more = self._count_batch(conn, journey_id)
+                stats["events"] += counted
+                if not more:
+                    break
+
+            try:
+                conn.rollback()
+                with conn.cursor() as cursor:
+                    rollups = self._rollups(cursor, journey_id, now)
+                    stats["goalsUpdated"] = state_store.publish_goal_progress(
+                        cursor, journey_id,
+                        {goal_id: (p.value, p.status) for goal_id, p in rollups["goalProgress"].items()}
+                    )
+                    stats["milestonesUpdated"] = state_store.publish_milestone_progress(
+                        cursor, journey_id,
+                        {milestone_id: (p.progress, p.status) for milestone_id, p in rollups["milestoneProgress"].items()}
+                    )
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+
+        return stats
+
+    def aggregate_all(self, now: Optional[datetime] = None) -> Dict[str, int]:
+        """Aggregate every published journey; a failing journey does not stop the others"""
+        now = now or datetime.now(timezone.utc)
+        with get_connection("journeys") as conn:
+            with conn.cursor() as cursor:
+                journey_ids = state_store.progress_journeys(cursor)
+            conn.rollback()
+
+        totals = {"journeys": 0, "events": 0, "goalsUpdated": 0, "milestonesUpdated": 0}
+        for journey_id in journey_ids:
+            try:
+                stats = self.aggregate_journey(journey_id, now)
+            except Exception as e:
+                self.logger.error(f"Error aggregating progress of journey {journey_id}: {e}")
+                continue
+            totals["journeys"] += 1
+            for key, value in stats.items():
+                totals[key] += value
+        return totals
+
+    async def get_progress(self, journey_id: str, refresh: bool = False) -> APIResponse:
+        """Goal and milestone progress of a journey, optionally aggregating new events first"""
+        try:
+            journey_id = str(ensure_uuid(journey_id))
+            if refresh:
+                await run_in_threadpool(self.aggregate_journey, journey_id)
+
+            now = datetime.now(timezone.utc)
+            with get_connection("journeys") as conn:
+                with conn.cursor() as cursor:
+                    rollups = self._rollups(cursor, journey_id, now)
+                conn.rollback()
+
+            goals = []
+            for row in rollups["goals"]:
+                progress = rollups["goalProgress"].get(row["goal_id"])
+                goals.append({
+                    "goalId": row["goal_id"],
+                    "title": row["title"],
+                    "targetValue": float(row["target_value"]),
+                    "currentValue": progress.value if progress else float(row["current_value"] or 0),
+                    "unit": row["unit"],
+                    "status": progress.status if progress else row["status"],
+                    "customers": rollups["reached"]["goal"].get(row["goal_id"], 0),
+                    "linked": progress is not None,
+                })
+
+            milestones = []
+            for milestone_id, row in rollups["milestones"].items():
+                progress = rollups["milestoneProgress"].get(milestone_id)
+                milestones.append({
+                    "milestoneId": milestone_id,
+                    "title": row["title"],
+                    "progress": progress.progress if progress else row["progress"],
+                    "ownProgress": progress.own if progress else row["progress"],
+                    "status": progress.status if progress else row["status"],
+                    "customers": rollups["reached"]["milestone"].get(milestone_id, 0),
+                    "dependencies": row["dependencies"] or [],
+                    "blockedBy": list(progress.blocked_by) if progress else [],
+                    "linked": progress is not None,
+                })
+
+            return APIResponse(
+                success=True,
+                message="Journey progress retrieved successfully",
+                data={
+                    "customersEntered": rollups["entered"],
+                    "lastEventId": rollups["lastEventId"],
+                    "aggregatedAt": rollups["updatedAt"],
+                    "goals": goals,
+                    "milestones": milestones,
+                }
+            )
+
+        except Exception as e:
+            self.logger.error(f"Error getting journey progress: {e}")
+            return APIResponse(
+                success=False,
+                message="Failed to get journey progress",
+                error=str(e)
+            )
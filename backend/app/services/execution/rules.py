@@ -0,0 +1,522 @@
+"""
+Decision rule compiler.
+
+Decision nodes carry their conditions as text, either JavaScript-style expressions
+(``user.age > 18 && plan == "gold"``) or SQL (``SELECT * FROM customers WHERE age > 18``,
+of which only the WHERE clause is used). A condition is tokenized, normalized to a
+Python expression in which every attribute reference becomes a placeholder name, parsed
+with ``ast`` and checked against a small whitelist of node types. There is no eval():
+rules are interpreted by two evaluators with identical semantics:
+
+- ``CompiledRule.evaluate(attributes)``: the scalar reference, one customer at a time
+- ``CompiledRule.evaluate_batch(columns)``: vectorized over pandas/NumPy columns
+
+Semantics (shared by both evaluators):
+- attributes are looked up by exact (dotted) name, then nested dicts, then by the last
+  path segment, so ``user.age`` also finds a flat ``age`` attribute
+- comparisons follow SQL NULL rules: any comparison involving a missing value is false
+- comparing with a number coerces the attribute to a number (``"42"`` matches ``42``);
+  comparing with a string or boolean requires a value of that type
+- attribute-to-attribute comparisons and arithmetic are numeric; division or modulo by
+  zero yields a missing value
+- a bare value used as a condition is tested for truthiness
+"""
+import ast
+import math
+import operator
+import re
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from ...shared_services.metrics import register_cache
+
+TOKEN_RE = re.compile(r"""
+    (?P<ws>\s+)
+  | (?P<string>'(?:[^']|'')*'|"(?:[^"\\]|\\.)*")
+  | (?P<number>\d+(?:\.\d*)?(?:[eE][+-]?\d+)?|\.\d+(?:[eE][+-]?\d+)?)
+  | (?P<name>[A-Za-z_][A-Za-z0-9_]*(?:\.[A-Za-z_][A-Za-z0-9_]*)*)
+  | (?P<op>===|!==|==|!=|<>|<=|>=|&&|\|\||[=<>!()\[\],+\-*/%;])
+""", re.VERBOSE)
+
+OPERATOR_MAP = {"===": "==", "!==": "!=", "=": "==", "<>": "!=", "&&": " and ", "||": " or ", "!": " not "}
+KEYWORD_MAP = {
+    "and": " and ", "or": " or ", "not": " not ", "in": " in ", "is": " is ",
+    "null": "None", "none": "None", "undefined": "None", "true": "True", "false": "False",
+}
+# Tokens that end the WHERE clause of a SQL condition
+SQL_CLAUSE_END = {"order", "group", "limit", "having", "offset", ";"}
+
+COMPARE_OPS = {
+    ast.Eq: operator.eq, ast.NotEq: operator.ne,
+    ast.Lt: operator.lt, ast.LtE: operator.le, ast.Gt: operator.gt, ast.GtE: operator.ge,
+}
+ARITHMETIC_OPS = {ast.Add: operator.add, ast.Sub: operator.sub, ast.Mult: operator.mul,
+                  ast.Div: operator.truediv, ast.Mod: operator.mod}
+
+ALLOWED_NODES = (
+    ast.Expression, ast.BoolOp, ast.And, ast.Or, ast.UnaryOp, ast.Not, ast.USub, ast.UAdd,
+    ast.BinOp, ast.Compare, ast.Name, ast.Load, ast.Constant, ast.Tuple, ast.List,
+    ast.In, ast.NotIn, ast.Is, ast.IsNot, *COMPARE_OPS, *ARITHMETIC_OPS,
+)
+
+
+class RuleCompileError(ValueError):
+    """Raised when a decision condition is not in the supported rule language"""
+
+
+# ============================================================================
+# PARSING
+# ============================================================================
+
+def _tokenize(text: str) -> List[Tuple[str, str]]:
+    tokens = []
+    pos = 0
+    while pos < len(text):
+        match = TOKEN_RE.match(text, pos)
+        if not match:
+            raise RuleCompileError(f"Unexpected character {text[pos]!r} in condition")
+        pos = match.end()
+        if match.lastgroup != "ws":
+            tokens.append((match.lastgroup, match.group()))
+    return tokens
+
+
+def _where_clause(tokens: List[Tuple[str, str]]) -> Optional[List[Tuple[str, str]]]:
+    """WHERE-clause tokens of a SELECT statement; [] if it has no WHERE; None if not SQL"""
+    if not tokens or tokens[0][0] != "name" or tokens[0][1].lower() != "select":
+        return None
+    for i, (kind, value) in enumerate(tokens):
+        if kind == "name" and value.lower() == "where":
+            clause = []
+            for token in tokens[i + 1:]:
+                if token[1].lower() in SQL_CLAUSE_END:
+                    break
+                clause.append(token)
+            return clause
+    return []
+
+
+def _string_literal(token: str) -> str:
+    if token[0] == "'":
+        return repr(token[1:-1].replace("''", "'"))
+    return repr(ast.literal_eval(token))
+
+
+def normalize_condition(text: str) -> Tuple[str, Dict[str, str]]:
+    """
+    Translate a JS/SQL condition into a Python expression.
+    Returns (expression, {placeholder: attribute name}); expression is "" for an empty
+    condition and "True" for a SELECT without WHERE.
+    """
+    tokens = _tokenize(text or "")
+    clause = _where_clause(tokens)
+    if clause is not None:
+        if not clause:
+            return "True", {}
+        tokens = clause
+
+    fields: Dict[str, str] = {}
+    aliases: Dict[str, str] = {}
+    parts = []
+    # Parentheses opened right after IN become tuples, so `IN ('a')` still is a list
+    parens: List[bool] = []
+    previous = None
+    for kind, value in tokens:
+        if value == "(":
+            parens.append(previous is not None and previous[1].lower() == "in")
+        elif value == ")" and parens and parens.pop():
+            parts.append(",")
+        previous = (kind, value)
+
+        if kind == "string":
+            parts.append(_string_literal(value))
+        elif kind == "number":
+            parts.append(value)
+        elif kind == "name":
+            keyword = KEYWORD_MAP.get(value.lower())
+            if keyword is not None:
+                parts.append(keyword)
+            else:
+                if value not in aliases:
+                    aliases[value] = f"_f{len(aliases)}"
+                    fields[aliases[value]] = value
+                parts.append(aliases[value])
+        elif value == ";":
+            continue
+        else:
+            parts.append(OPERATOR_MAP.get(value, value))
+    return "".join(parts).strip(), fields
+
+
+def _validate(tree: ast.AST, fields: Dict[str, str]) -> None:
+    for node in ast.walk(tree):
+        if not isinstance(node, ALLOWED_NODES):
+            raise RuleCompileError(f"Unsupported construct in condition: {type(node).__name__}")
+        if isinstance(node, ast.Name) and node.id not in fields:
+            raise RuleCompileError(f"Unknown name in condition: {node.id}")
+        if isinstance(node, ast.Constant) and not isinstance(node.value, (int, float, str, bool, type(None))):
+            raise RuleCompileError("Unsupported literal in condition")
+        if isinstance(node, (ast.Tuple, ast.List)) and not all(isinstance(e, ast.Constant) for e in node.elts):
+            raise RuleCompileError("IN lists may only contain literals")
+        if isinstance(node, ast.Compare):
+            operands = [node.left, *node.comparators]
+            for op, right in zip(node.ops, operands[1:]):
+                if isinstance(op, (ast.Is, ast.IsNot)) and not (isinstance(right, ast.Constant) and right.value is None):
+                    raise RuleCompileError("IS / IS NOT may only be used with NULL")
+                if isinstance(op, (ast.In, ast.NotIn)) and not isinstance(right, (ast.Tuple, ast.List)):
+                    raise RuleCompileError("IN requires a list of literals")
+
+
+# ============================================================================
+# SCALAR HELPERS
+# ============================================================================
+
+def lookup(attributes: Dict[str, Any], name: str) -> Any:
+    """Resolve an attribute reference against one customer's attributes"""
+    if name in attributes:
+        return attributes[name]
+    if "." in name:
+        value: Any = attributes
+        for part in name.split("."):
+            if not isinstance(value, dict) or part not in value:
+                value = None
+                break
+            value = value[part]
+        if value is not None:
+            return value
+        return attributes.get(name.rsplit(".", 1)[1])
+    return None
+
+
+def _missing(value: Any) -> bool:
+    return value is None or (isinstance(value, float) and math.isnan(value))
+
+
+def _to_number(value: Any) -> Optional[float]:
+    if _missing(value):
+        return None
+    if isinstance(value, (bool, int, float)):
+        number = float(value)
+    elif isinstance(value, str):
+        try:
+            number = float(value)
+        except ValueError:
+            return None
+    else:
+        return None
+    return None if math.isnan(number) else number
+
+
+def _truthy(value: Any) -> bool:
+    return not _missing(value) and bool(value)
+
+
+def _kind(value: Any) -> str:
+    if isinstance(value, bool):
+        return "bool"
+    if isinstance(value, (int, float)):
+        return "number"
+    if isinstance(value, str):
+        return "string"
+    return "none"
+
+
+def _scalar_compare(left: Any, op: type, right: Any, right_const: bool, left_const: bool) -> bool:
+    if _missing(left) or _missing(right):
+        return False
+    # The literal side decides how the attribute side is interpreted
+    if right_const and not left_const:
+        kind = _kind(right)
+    elif left_const and not right_const:
+        kind = _kind(left)
+    elif left_const and right_const:
+        kind = _kind(right) if _kind(left) == _kind(right) else "number"
+    else:
+        kind = "number"
+
+    if kind == "number":
+        left, right = _to_number(left), _to_number(right)
+        if left is None or right is None:
+            return False
+    elif kind == "string":
+        if not (isinstance(left, str) and isinstance(right, str)):
+            return False
+    elif kind == "bool":
+        if not (isinstance(left, bool) and isinstance(right, bool)):
+            return False
+        if op not in (ast.Eq, ast.NotEq):
+            left, right = float(left), float(right)
+    return COMPARE_OPS[op](left, right)
+
+
+# ============================================================================
+# VECTOR HELPERS
+# ============================================================================
+
+def _series_numbers(series: pd.Series) -> pd.Series:
+    if pd.api.types.is_bool_dtype(series) or pd.api.types.is_numeric_dtype(series):
+        return series.astype(float)
+    return series.map(_to_number).astype(float)
+
+
+def _series_of_type(series: pd.Series, kind: str) -> np.ndarray:
+    """Mask of elements holding a value of the given literal kind"""
+    if kind == "bool":
+        if pd.api.types.is_bool_dtype(series):
+            return np.ones(len(series), dtype=bool)
+        return series.map(lambda v: isinstance(v, bool)).to_numpy(dtype=bool)
+    if kind == "string":
+        if pd.api.types.infer_dtype(series, skipna=True) == "string":
+            return series.notna().to_numpy(dtype=bool)
+        return series.map(lambda v: isinstance(v, str)).to_numpy(dtype=bool)
+    return np.zeros(len(series), dtype=bool)
+
+
+def _vector_compare(left: Any, op: type, right: Any, size: int) -> np.ndarray:
+    left_const = not isinstance(left, pd.Series)
+    right_const = not isinstance(right, pd.Series)
+    if left_const and right_const:
+        return np.full(size, _scalar_compare(left, op, right, True, True), dtype=bool)
+
+    if right_const:
+        series, const, compare = left, right, COMPARE_OPS[op]
+    else:
+        # Put the attribute on the left by flipping the comparison
+        flipped = {ast.Lt: ast.Gt, ast.Gt: ast.Lt, ast.LtE: ast.GtE, ast.GtE: ast.LtE}.get(op, op)
+        if not left_const:
+            numbers_l, numbers_r = _series_numbers(left), _series_numbers(right)
+            valid = (numbers_l.notna() & numbers_r.notna()).to_numpy(dtype=bool)
+            result = COMPARE_OPS[op](numbers_l.fillna(0), numbers_r.fillna(0)).to_numpy(dtype=bool)
+            return result & valid
+        series, const, compare = right, left, COMPARE_OPS[flipped]
+
+    if _missing(const):
+        return np.zeros(size, dtype=bool)
+    kind = _kind(const)
+    if kind == "number":
+        numbers = _series_numbers(series)
+        return (compare(numbers.fillna(0), float(const)) & numbers.notna()).to_numpy(dtype=bool)
+
+    valid = _series_of_type(series, kind)
+    if not valid.any():
+        return valid
+    if kind == "bool" and op not in (ast.Eq, ast.NotEq):
+        values = series[valid].astype(float)
+        const = float(const)
+    else:
+        values = series[valid]
+    result = np.zeros(size, dtype=bool)
+    result[valid] = compare(values, const).to_numpy(dtype=bool)
+    return result
+
+
+def _vector_truthy(value: Any, size: int) -> np.ndarray:
+    if not isinstance(value, pd.Series):
+        return np.full(size, _truthy(value), dtype=bool)
+    if pd.api.types.is_bool_dtype(value):
+        return value.to_numpy(dtype=bool)
+    if pd.api.types.is_numeric_dtype(value):
+        return (value.fillna(0) != 0).to_numpy(dtype=bool)
+    return value.map(_truthy).to_numpy(dtype=bool)
+
+
+# ============================================================================
+# COMPILED RULE
+# ============================================================================
+
+class CompiledRule:
+    """A validated decision condition with scalar and vectorized evaluators"""
+    __slots__ = ("source", "expression", "fields", "tree")
+
+    def __init__(self, source: str, expression: str, fields: Dict[str, str], tree: ast.AST):
+        self.source = source
+        self.expression = expression
+        self.fields = fields
+        self.tree = tree
+
+    @property
+    def attribute_names(self) -> List[str]:
+        return list(self.fields.values())
+
+    # -- scalar reference -------------------------------------------------
+
+    def evaluate(self, attributes: Dict[str, Any]) -> bool:
+        """Evaluate for a single customer"""
+        return self._test(self.tree.body, attributes)
+
+    def _value(self, node: ast.AST, attributes: Dict[str, Any]) -> Any:
+        if isinstance(node, ast.Constant):
+            return node.value
+        if isinstance(node, ast.Name):
+            return lookup(attributes, self.fields[node.id])
+        if isinstance(node, ast.UnaryOp) and isinstance(node.op, (ast.USub, ast.UAdd)):
+            number = _to_number(self._value(node.operand, attributes))
+            if number is None:
+                return None
+            return -number if isinstance(node.op, ast.USub) else number
+        if isinstance(node, ast.BinOp):
+            left = _to_number(self._value(node.left, attributes))
+            right = _to_number(self._value(node.right, attributes))
+            if left is None or right is None:
+                return None
+            if isinstance(node.op, (ast.Div, ast.Mod)) and right == 0:
+                return None
+            result = ARITHMETIC_OPS[type(node.op)](left, right)
+            return None if math.isnan(result) or math.isinf(result) else result
+        return self._test(node, attributes)
+
+    def _test(self, node: ast.AST, attributes: Dict[str, Any]) -> bool:
+        if isinstance(node, ast.BoolOp):
+            if isinstance(node.op, ast.And):
+                return all(self._test(v, attributes) for v in node.values)
+            return any(self._test(v, attributes) for v in node.values)
+        if isinstance(node, ast.UnaryOp) and isinstance(node.op, ast.Not):
+            return not self._test(node.operand, attributes)
+        if isinstance(node, ast.Compare):
+            operands = [node.left, *node.comparators]
+            for left_node, op, right_node in zip(operands, node.ops, operands[1:]):
+                left = self._value(left_node, attributes)
+                if isinstance(op, (ast.Is, ast.IsNot)):
+                    result = _missing(left) == isinstance(op, ast.Is)
+                elif isinstance(op, (ast.In, ast.NotIn)):
+                    if _missing(left):
+                        return False
+                    found = any(
+                        _scalar_compare(left, ast.Eq, e.value, True, isinstance(left_node, ast.Constant))
+                        for e in right_node.elts
+                    )
+                    result = found == isinstance(op, ast.In)
+                else:
+                    right = self._value(right_node, attributes)
+                    result = _scalar_compare(
+                        left, type(op), right,
+                        isinstance(right_node, ast.Constant), isinstance(left_node, ast.Constant)
+                    )
+                if not result:
+                    return False
+            return True
+        return _truthy(self._value(node, attributes))
+
+    # -- vectorized -------------------------------------------------------
+
+    def evaluate_batch(self, columns: "pd.DataFrame | Dict[str, pd.Series]", size: Optional[int] = None) -> np.ndarray:
+        """
+        Evaluate for a batch of customers. ``columns`` maps attribute names to Series
+        (a DataFrame works); see ``attribute_columns`` to build it from attribute dicts.
+        """
+        if size is None:
+            size = len(columns) if isinstance(columns, pd.DataFrame) else len(next(iter(columns.values()), []))
+        return self._test_vec(self.tree.body, columns, size)
+
+    def _column(self, columns, name: str, size: int) -> pd.Series:
+        if name in columns:
+            return columns[name]
+        short = name.rsplit(".", 1)[-1]
+        if short in columns:
+            return columns[short]
+        return pd.Series([None] * size, dtype=object)
+
+    def _value_vec(self, node: ast.AST, columns, size: int) -> Any:
+        if isinstance(node, ast.Constant):
+            return node.value
+        if isinstance(node, ast.Name):
+            return self._column(columns, self.fields[node.id], size)
+        if isinstance(node, ast.UnaryOp) and isinstance(node.op, (ast.USub, ast.UAdd)):
+            operand = self._value_vec(node.operand, columns, size)
+            if not isinstance(operand, pd.Series):
+                number = _to_number(operand)
+                return None if number is None else (-number if isinstance(node.op, ast.USub) else number)
+            numbers = _series_numbers(operand)
+            return -numbers if isinstance(node.op, ast.USub) else numbers
+        if isinstance(node, ast.BinOp):
+            left = self._value_vec(node.left, columns, size)
+            right = self._value_vec(node.right, columns, size)
+            left = _series_numbers(left) if isinstance(left, pd.Series) else _to_number(left)
+            right = _series_numbers(right) if isinstance(right, pd.Series) else _to_number(right)
+            if left is None or right is None:
+                return pd.Series(np.full(size, np.nan))
+            with np.errstate(divide="ignore", invalid="ignore"):
+                if isinstance(node.op, (ast.Div, ast.Mod)):
+                    if isinstance(right, pd.Series):
+                        right = right.where(right != 0)
+                    elif right == 0:
+                        return pd.Series(np.full(size, np.nan))
+                result = ARITHMETIC_OPS[type(node.op)](left, right)
+            if not isinstance(result, pd.Series):
+                return None if math.isnan(result) or math.isinf(result) else result
+            return result.replace([np.inf, -np.inf], np.nan)
+        return pd.Series(self._test_vec(node, columns, size))
+
+    def _test_vec(self, node: ast.AST, columns, size: int) -> np.ndarray:
+        if isinstance(node, ast.BoolOp):
+            masks = [self._test_vec(v, columns, size) for v in node.values]
+            reduce = np.logical_and if isinstance(node.op, ast.And) else np.logical_or
+            return reduce.reduce(masks)
+        if isinstance(node, ast.UnaryOp) and isinstance(node.op, ast.Not):
+            return ~self._test_vec(node.operand, columns, size)
+        if isinstance(node, ast.Compare):
+            result = np.ones(size, dtype=bool)
+            operands = [node.left, *node.comparators]
+            for left_node, op, right_node in zip(operands, node.ops, operands[1:]):
+                left = self._value_vec(left_node, columns, size)
+                if isinstance(op, (ast.Is, ast.IsNot)):
+                    missing = left.isna().to_numpy(dtype=bool) if isinstance(left, pd.Series) \
+                        else np.full(size, _missing(left))
+                    result &= missing if isinstance(op, ast.Is) else ~missing
+                elif isinstance(op, (ast.In, ast.NotIn)):
+                    found = np.zeros(size, dtype=bool)
+                    for element in right_node.elts:
+                        found |= _vector_compare(left, ast.Eq, element.value, size)
+                    if isinstance(op, ast.In):
+                        result &= found
+                    else:
+                        present = left.notna().to_numpy(dtype=bool) if isinstance(left, pd.Series) \
+                            else np.full(size, not _missing(left))
+                        result &= present & ~found
+                else:
+                    right = self._value_vec(right_node, columns, size)
+                    result &= _vector_compare(left, type(op), right, size)
+            return result
+        return _vector_truthy(self._value_vec(node, columns, size), size)
+
+
+@lru_cache(maxsize=1024)
+def compile_rule(text: Optional[str]) -> Optional[CompiledRule]:
+    """Compile a condition; returns None for an empty condition (never matches)"""
+    expression, fields = normalize_condition(text or "")
+    if not expression:
+        return None
+    try:
+        tree = ast.parse(expression, mode="eval")
+    except SyntaxError as e:
+        raise RuleCompileError(f"Invalid condition {text!r}: {e.msg}") from e
+    _validate(tree, fields)
+    # JavaScript-style `x == null` / `x != null` mean IS NULL / IS NOT NULL
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Compare):
+            node.ops = [
+                (ast.Is() if isinstance(op, ast.Eq) else ast.IsNot())
+                if isinstance(op, (ast.Eq, ast.NotEq)) and isinstance(right, ast.Constant) and right.value is None
+                else op
+                for op, right in zip(node.ops, node.comparators)
+            ]
+    return CompiledRule(text, expression, fields, tree)
+
+
+def _compiled_rule_stats() -> Tuple[int, int, int]:
+    info = compile_rule.cache_info()
+    return info.hits, info.misses, info.currsize
+
+
+register_cache("compiled_rules", _compiled_rule_stats)
+
+
+def attribute_columns(attributes: Sequence[Dict[str, Any]], names: Sequence[str]) -> Dict[str, pd.Series]:
+    """Columns for the referenced attributes of a batch of customers"""
+    return {
+        name: pd.Series([lookup(a, name) for a in attributes])
+        for name in names
+    }
@@ -0,0 +1,145 @@
+"""
+Delay-queue scheduler for Wait nodes.
+
+Durable state lives in ``journey_wait_timers`` (one row per waiting customer, indexed by
+``due_at``). Each scheduler process mirrors the timers due within a sliding horizon into
+an in-memory TimerWheel, so it knows exactly which customers expire on each tick without
+polling the table:
+
+- timers created by this process are pushed into the wheel as soon as they commit
+- every ``refill_seconds`` the next slice of the horizon is loaded from the table, which
+  also picks up timers written by other processes
+- expired wheel entries are claimed by key (``SKIP LOCKED``) and woken in batches
+- a periodic sweep claims anything overdue by ``due_at`` as a safety net, e.g. timers
+  created by another process for a slice this process had already loaded
+
+On start-up (or after a crash) ``recover`` rebuilds the wheel from the table; nothing
+is lost because a timer row is only deleted in the transaction that resumes its customer.
+A scheduler run by an execution worker is restricted to the worker's shards and is
+rebuilt whenever they change.
+"""
+import os
+import threading
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from .execution_service import JourneyExecutionService, EXECUTION_BATCH_SIZE
+from .timer_wheel import TimerWheel
+from . import state_store
+from ..journey.utils import get_connection
+from ...shared_services.logger_setup import setup_logger
+
+logger = setup_logger()
+
+# How far ahead timers are mirrored in memory
+SCHEDULER_HORIZON_SECONDS = int(os.getenv("SCHEDULER_HORIZON_SECONDS", "600"))
+# Wheel resolution / main loop period
+SCHEDULER_TICK_SECONDS = float(os.getenv("SCHEDULER_TICK_SECONDS", "1.0"))
+# Overdue sweep period
+SCHEDULER_SWEEP_SECONDS = int(os.getenv("SCHEDULER_SWEEP_SECONDS", "30"))
+
+
+class WaitScheduler:
+    """Wakes waiting customers when their timers expire"""
+
+    def __init__(self, execution_service: Optional[JourneyExecutionService] = None,
+                 horizon_seconds: int = SCHEDULER_HORIZON_SECONDS,
+                 tick_seconds: float = SCHEDULER_TICK_SECONDS,
+                 sweep_seconds: int = SCHEDULER_SWEEP_SECONDS,
+                 batch_size: int = EXECUTION_BATCH_SIZE,
+                 shards: Optional[Sequence[int]] = None):
+        self.logger = logger
+        self.execution_service = execution_service or JourneyExecutionService()
+        self.horizon = timedelta(seconds=horizon_seconds)
+        self.tick_seconds = tick_seconds
+        self.sweep_interval = timedelta(seconds=sweep_seconds)
+        self.batch_size = batch_size
+        self.wheel: Optional[TimerWheel] = None
+        self.loaded_until: Optional[datetime] = None
+        self.last_sweep: Optional[datetime] = None
+        # None = every shard
+        self.shards = sorted(shards) if shards is not None else None
+        self._lock = threading.Lock()
+        self.execution_service.add_timer_listener(self.schedule)
+
+    def schedule(self, timers: List[Tuple[str, str, datetime]]) -> None:
+        """Mirror newly committed timers that fall inside the loaded horizon"""
+        with self._lock:
+            if self.wheel is None:
+                return
+            for journey_id, customer_id, due_at in timers:
+                if due_at < self.loaded_until:
+                    self.wheel.schedule((journey_id, customer_id), due_at.timestamp())
+
+    def _load(self, start: Optional[datetime], end: datetime) -> int:
+        with get_connection("journeys") as conn:
+            with conn.cursor() as cursor:
+                timers = state_store.load_timers(cursor, start, end, self.shards)
+            conn.rollback()
+        with self._lock:
+            for journey_id, customer_id, due_at in timers:
+                self.wheel.schedule((journey_id, customer_id), due_at.timestamp())
+            self.loaded_until = end
+        return len(timers)
+
+    def recover(self, now: Optional[datetime] = None) -> int:
+        """(Re)build the wheel from the timer table"""
+        now = now or datetime.now(timezone.utc)
+        with self._lock:
+            self.wheel = TimerWheel(now.timestamp(), tick_seconds=self.tick_seconds)
+            self.loaded_until = now
+        self.last_sweep = now
+        loaded = self._load(None, now + self.horizon)
+        self.logger.info(f"Wait scheduler recovered {loaded} timers due before {self.loaded_until}")
+        return loaded
+
+    def set_shards(self, shards: Sequence[int], now: Optional[datetime] = None) -> None:
+        """Switch to a new shard set; the wheel is rebuilt so it only holds timers of those shards"""
+        shards = sorted(shards)
+        if shards == self.shards and self.wheel is not None:
+            return
+        self.shards = shards
+        self.recover(now)
+
+    def tick(self, now: Optional[datetime] = None) -> Dict[str, int]:
+        """Advance the wheel to ``now`` and wake every customer whose timer expired"""
+        now = now or datetime.now(timezone.utc)
+        if self.wheel is None:
+            self.recover(now)
+
+        # Keep at least half a horizon of timers in memory
+        if now + self.horizon / 2 >= self.loaded_until:
+            self._load(self.loaded_until, now + self.horizon)
+
+        with self._lock:
+            expired = self.wheel.advance(now.timestamp())
+
+        totals = {"timers": 0, "claimed": 0, "transitions": 0, "events": 0}
+        for start in range(0, len(expired), self.batch_size):
+            stats = self.execution_service.wake_timers(expired[start:start + self.batch_size], now)
+            for key in totals:
+                totals[key] += stats[key]
+
+        if now - self.last_sweep >= self.sweep_interval:
+            self.last_sweep = now
+            while True:
+                stats = self.execution_service.wake_expired(now, self.batch_size, shards=self.shards)
+                for key in totals:
+                    totals[key] += stats[key]
+                if stats["timers"] < self.batch_size:
+                    break
+
+        return totals
+
+    def run_forever(self, stop_event: Optional[threading.Event] = None) -> None:
+        """Tick until ``stop_event`` is set"""
+        stop_event = stop_event or threading.Event()
+        self.recover()
+        while not stop_event.is_set():
+            try:
+                totals = self.tick()
+                if totals["timers"]:
+                    self.logger.info(f"Wait scheduler woke {totals['claimed']} customers ({totals['transitions']} transitions)")
+            except Exception as e:
+                self.logger.error(f"Wait scheduler tick failed: {e}")
+            stop_event.wait(self.tick_seconds)
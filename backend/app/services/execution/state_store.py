@@ -0,0 +1,585 @@
+"""
+Postgres persistence for execution plans, customer states and events.
+
+Every function takes an open cursor so callers control the transaction: a worker claims
+a batch, advances it and writes it back inside one transaction, which keeps the row locks
+taken by ``FOR UPDATE SKIP LOCKED`` until the new states are committed.
+"""
+import csv
+import io
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+from uuid import UUID
+
+from psycopg2.extras import execute_values
+
+from .engine import CustomerState, ExecutionEvent, READY, WAITING
+from .plan import ExecutionPlan
+from ...shared_services.revision_cache import RevisionCache
+from ...shared_services.serialization import to_jsonb
+
+# Rows per statement for batched writes
+WRITE_PAGE_SIZE = 1000
+
+# Plans are immutable per version, so a version never needs to be re-read
+plan_cache = RevisionCache("execution_plans", maxsize=512)
+
+
+def save_plan(cursor, plan: ExecutionPlan) -> ExecutionPlan:
+    """Store a compiled plan as a new version (or reuse the latest version if unchanged)"""
+    journey_uuid = UUID(plan.journey_id)
+    cursor.execute("""
+        SELECT version, checksum FROM journey_execution_plans
+        WHERE journey_id = %s ORDER BY version DESC LIMIT 1
+    """, (journey_uuid,))
+    latest = cursor.fetchone()
+    if latest and latest[1] == plan.checksum:
+        return plan.with_version(latest[0])
+
+    versioned = plan.with_version((latest[0] if latest else 0) + 1)
+    cursor.execute("""
+        INSERT INTO journey_execution_plans (journey_id, version, checksum, plan)
+        VALUES (%s, %s, %s, %s)
+    """, (journey_uuid, versioned.version, versioned.checksum, to_jsonb(versioned.to_dict())))
+    return versioned
+
+
+def load_plan(cursor, journey_id: str, version: Optional[int] = None) -> Optional[ExecutionPlan]:
+    """Load a plan version (the latest if version is None)"""
+    if version is not None:
+        cached = plan_cache.get((journey_id, version), version)
+        if cached is not None:
+            return cached
+
+    if version is None:
+        cursor.execute("""
+            SELECT plan FROM journey_execution_plans
+            WHERE journey_id = %s ORDER BY version DESC LIMIT 1
+        """, (UUID(journey_id),))
+    else:
+        cursor.execute("""
+            SELECT plan FROM journey_execution_plans
+            WHERE journey_id = %s AND version = %s
+        """, (UUID(journey_id), version))
+    row = cursor.fetchone()
+    if not row:
+        return None
+
+    plan = ExecutionPlan.from_dict(row[0])
+    plan_cache.put((journey_id, plan.version), plan.version, plan)
+    return plan
+
+
+def enroll_customers(cursor, plan: ExecutionPlan, entry_idx: int,
+                     customers: Iterable[Tuple[str, Dict[str, Any]]], now: datetime) -> List[str]:
+    """Insert new customers at an entry node; customers already in the journey are left untouched"""
+    rows = [
+        (UUID(plan.journey_id), customer_id, plan.version, entry_idx, READY, now, to_jsonb(attributes or {}))
+        for customer_id, attributes in customers
+    ]
+    if not rows:
+        return []
+    inserted = execute_values(cursor, """
+        INSERT INTO journey_customer_states
+            (journey_id, customer_id, plan_version, node_idx, status, due_at, attributes)
+        VALUES %s
+        ON CONFLICT (journey_id, customer_id) DO NOTHING
+        RETURNING customer_id
+    """, rows, template="(%s, %s, %s, %s, %s, %s, %s::jsonb)", page_size=WRITE_PAGE_SIZE, fetch=True)
+    return [row[0] for row in inserted]
+
+
+def _states_from_rows(rows) -> List[CustomerState]:
+    return [
+        CustomerState(
+            customer_id=row[0],
+            plan_version=row[1],
+            node_idx=row[2],
+            status=row[3],
+            due_at=row[4],
+            loop_counts=row[5],
+            attributes=row[6],
+        )
+        for row in rows
+    ]
+
+
+def claim_due_customers(cursor, journey_id: str, now: datetime, limit: int) -> List[CustomerState]:
+    """Lock up to ``limit`` ready customers; rows locked by other workers are skipped"""
+    cursor.execute("""
+        SELECT customer_id, plan_version, node_idx, status, due_at, loop_counts, attributes
+        FROM journey_customer_states
+        WHERE journey_id = %s AND status = 0 AND due_at <= %s
+        ORDER BY due_at
+        LIMIT %s
+        FOR UPDATE SKIP LOCKED
+    """, (UUID(journey_id), now, limit))
+    return _states_from_rows(cursor.fetchall())
+
+
+def claim_due_in_shards(cursor, shards: Sequence[int], now: datetime, limit: int) -> Dict[str, List[CustomerState]]:
+    """Lock up to ``limit`` ready customers of any journey in the given shards, grouped by journey"""
+    cursor.execute("""
+        SELECT journey_id, customer_id, plan_version, node_idx, status, due_at, loop_counts, attributes
+        FROM journey_customer_states
+        WHERE shard = ANY(%s::smallint[]) AND status = 0 AND due_at <= %s
+        ORDER BY due_at
+        LIMIT %s
+        FOR UPDATE SKIP LOCKED
+    """, (list(shards), now, limit))
+    by_journey: Dict[str, list] = {}
+    for row in cursor.fetchall():
+        by_journey.setdefault(str(row[0]), []).append(row[1:])
+    return {journey_id: _states_from_rows(rows) for journey_id, rows in by_journey.items()}
+
+
+def claim_waiting_customers(cursor, journey_id: str, customer_ids: Sequence[str]) -> List[CustomerState]:
+    """
+    Lock specific waiting customers whose timers were just claimed. The timer row lock
+    already makes the caller the only waker of these customers, so this waits for (rather
+    than skips) any other lock instead of dropping a customer whose timer is gone.
+    """
+    cursor.execute("""
+        SELECT customer_id, plan_version, node_idx, status, due_at, loop_counts, attributes
+        FROM journey_customer_states
+        WHERE journey_id = %s AND customer_id = ANY(%s) AND status = 1
+        FOR UPDATE
+    """, (UUID(journey_id), list(customer_ids)))
+    return _states_from_rows(cursor.fetchall())
+
+
+def schedule_timers(cursor, journey_id: str, states: Sequence[CustomerState]) -> None:
+    """Create (or move) the wait timer of every customer in the batch that is now waiting"""
+    journey_uuid = UUID(journey_id)
+    rows = [(journey_uuid, s.customer_id, s.due_at) for s in states if s.status == WAITING]
+    if not rows:
+        return
+    execute_values(cursor, """
+        INSERT INTO journey_wait_timers (journey_id, customer_id, due_at)
+        VALUES %s
+        ON CONFLICT (journey_id, customer_id) DO UPDATE SET due_at = EXCLUDED.due_at
+    """, rows, page_size=WRITE_PAGE_SIZE)
+
+
+def claim_expired_timers(cursor, now: datetime, limit: int, journey_id: Optional[str] = None,
+                         shards: Optional[Sequence[int]] = None) -> List[Tuple[str, str]]:
+    """
+    Delete and return up to ``limit`` expired timers as (journey_id, customer_id), oldest first,
+    optionally restricted to one journey or to a set of shards.
+    The delete only becomes permanent when the caller commits, so timers of a batch that
+    fails (or a process that dies) mid-way are claimed again later.
+    """
+    filters, params = ["due_at <= %s"], [now]
+    if journey_id:
+        filters.append("journey_id = %s")
+        params.append(UUID(journey_id))
+    if shards is not None:
+        filters.append("shard = ANY(%s::smallint[])")
+        params.append(list(shards))
+    cursor.execute(f"""
+        DELETE FROM journey_wait_timers
+        WHERE ctid IN (
+            SELECT ctid FROM journey_wait_timers
+            WHERE {" AND ".join(filters)}
+            ORDER BY due_at
+            LIMIT %s
+            FOR UPDATE SKIP LOCKED
+        )
+        RETURNING journey_id, customer_id
+    """, (*params, limit))
+    return [(str(row[0]), row[1]) for row in cursor.fetchall()]
+
+
+def claim_timers(cursor, keys: Sequence[Tuple[str, str]], now: datetime) -> List[Tuple[str, str]]:
+    """Delete and return the given (journey_id, customer_id) timers if they have expired"""
+    if not keys:
+        return []
+    rows = execute_values(cursor, """
+        DELETE FROM journey_wait_timers
+        WHERE ctid IN (
+            SELECT t.ctid FROM journey_wait_timers t
+            JOIN (VALUES %s) AS v(journey_id, customer_id, cutoff)
+              ON t.journey_id = v.journey_id AND t.customer_id = v.customer_id
+            WHERE t.due_at <= v.cutoff
+            FOR UPDATE OF t SKIP LOCKED
+        )
+        RETURNING journey_id, customer_id
+    """, [(UUID(journey_id), customer_id, now) for journey_id, customer_id in keys],
+        template="(%s::uuid, %s, %s::timestamptz)", page_size=len(keys), fetch=True)
+    return [(str(row[0]), row[1]) for row in rows]
+
+
+def load_timers(cursor, start: Optional[datetime], end: datetime,
+                shards: Optional[Sequence[int]] = None) -> List[Tuple[str, str, datetime]]:
+    """
+    Timers due in [start, end) as (journey_id, customer_id, due_at); start=None loads
+    everything before end. ``shards`` restricts the result to the given shards.
+    """
+    filters, params = ["due_at < %s"], [end]
+    if start is not None:
+        filters.append("due_at >= %s")
+        params.append(start)
+    if shards is not None:
+        filters.append("shard = ANY(%s::smallint[])")
+        params.append(list(shards))
+    cursor.execute(f"""
+        SELECT journey_id, customer_id, due_at FROM journey_wait_timers
+        WHERE {" AND ".join(filters)}
+    """, params)
+    return [(str(row[0]), row[1], row[2]) for row in cursor.fetchall()]
+
+
+def write_states(cursor, journey_id: str, states: Sequence[CustomerState]) -> None:
+    """Write advanced customer states back in bulk"""
+    if not states:
+        return
+    journey_uuid = UUID(journey_id)
+    rows = [
+        (journey_uuid, s.customer_id, s.node_idx, s.status, s.due_at, s.loop_counts)
+        for s in states
+    ]
+    execute_values(cursor, """
+        UPDATE journey_customer_states AS s
+        SET node_idx = v.node_idx,
+            status = v.status,
+            due_at = COALESCE(v.due_at, s.due_at),
+            loop_counts = v.loop_counts,
+            updated_at = NOW()
+        FROM (VALUES %s) AS v(journey_id, customer_id, node_idx, status, due_at, loop_counts)
+        WHERE s.journey_id = v.journey_id AND s.customer_id = v.customer_id
+    """, rows, template="(%s, %s, %s::integer, %s::smallint, %s::timestamptz, %s::smallint[])",
+        page_size=WRITE_PAGE_SIZE)
+
+
+def record_events(cursor, journey_id: str, events: Sequence[ExecutionEvent]) -> None:
+    """Append execution events in bulk"""
+    if not events:
+        return
+    journey_uuid = UUID(journey_id)
+    execute_values(cursor, """
+        INSERT INTO journey_execution_events
+            (journey_id, customer_id, plan_version, node_id, event_type, detail, occurred_at)
+        VALUES %s
+    """, [(journey_uuid, *event) for event in events], page_size=WRITE_PAGE_SIZE)
+
+
+def status_summary(cursor, journey_id: str) -> List[Tuple[int, int, int, int]]:
+    """(plan_version, node_idx, status, customers) for every occupied position"""
+    cursor.execute("""
+        SELECT plan_version, node_idx, status, count(*)
+        FROM journey_customer_states
+        WHERE journey_id = %s
+        GROUP BY plan_version, node_idx, status
+        ORDER BY plan_version, node_idx, status
+    """, (UUID(journey_id),))
+    return cursor.fetchall()
+
+
+# ============================================================================
+# ENTRY SOURCE IMPORTS
+# ============================================================================
+
+IMPORT_COLUMNS = (
+    "id", "journey_id", "plan_version", "entry_node_id", "filename", "format", "status",
+    "bytes_read", "rows_read", "rows_staged", "rows_rejected", "rows_enrolled",
+    "rejects", "warnings", "error", "started_at", "staged_at", "finished_at",
+)
+
+
+def create_import(cursor, journey_id: str, plan_version: int, entry_node_id: str,
+                  filename: Optional[str], fmt: str, started_at: datetime) -> str:
+    """Register a new entry source import and return its id"""
+    cursor.execute("""
+        INSERT INTO journey_entry_imports (journey_id, plan_version, entry_node_id, filename, format, started_at)
+        VALUES (%s, %s, %s, %s, %s, %s)
+        RETURNING id
+    """, (UUID(journey_id), plan_version, entry_node_id, filename, fmt, started_at))
+    return str(cursor.fetchone()[0])
+
+
+def copy_staged_rows(cursor, import_id: str, rows: Sequence[Tuple[int, str, str]]) -> None:
+    """COPY validated (record number, customer id, attributes JSON) rows into the staging table"""
+    if not rows:
+        return
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for record_number, customer_id, attributes in rows:
+        writer.writerow((import_id, record_number, customer_id, attributes))
+    buffer.seek(0)
+    cursor.copy_expert("""
+        COPY journey_entry_staging (import_id, record_number, customer_id, attributes)
+        FROM STDIN WITH (FORMAT csv)
+    """, buffer)
+
+
+def update_import(cursor, import_id: str, **values: Any) -> None:
+    """Update counters/status of an import; keyword names are journey_entry_imports columns"""
+    columns = [name for name in values if name in IMPORT_COLUMNS]
+    assignments = ", ".join(
+        f"{name} = %s::jsonb" if name in ("rejects", "warnings") else f"{name} = %s"
+        for name in columns
+    )
+    params = [to_jsonb(values[name]) if name in ("rejects", "warnings") else values[name] for name in columns]
+    cursor.execute(
+        f"UPDATE journey_entry_imports SET {assignments} WHERE id = %s",
+        (*params, UUID(import_id))
+    )
+
+
+def discard_staged_rows(cursor, import_id: str) -> None:
+    cursor.execute("DELETE FROM journey_entry_staging WHERE import_id = %s", (UUID(import_id),))
+
+
+def load_import(cursor, journey_id: str, import_id: str) -> Optional[Dict[str, Any]]:
+    """Import row as a dict keyed by column name"""
+    cursor.execute(f"""
+        SELECT {", ".join(IMPORT_COLUMNS)} FROM journey_entry_imports
+        WHERE id = %s AND journey_id = %s
+    """, (UUID(import_id), UUID(journey_id)))
+    row = cursor.fetchone()
+    return dict(zip(IMPORT_COLUMNS, row)) if row else None
+
+
+def enroll_staged(cursor, import_id: str, plan: ExecutionPlan, entry_idx: int,
+                  now: datetime, limit: int) -> Tuple[int, int]:
+    """
+    Move the next ``limit`` staged rows of an import into the journey, first occurrence
+    of a customer winning. Staged rows are deleted as they are consumed, so an interrupted
+    enrollment resumes where it stopped. Returns (rows consumed, customers enrolled).
+    """
+    journey_uuid = UUID(plan.journey_id)
+    cursor.execute("""
+        WITH batch AS (
+            DELETE FROM journey_entry_staging
+            WHERE import_id = %(import_id)s AND record_number IN (
+                SELECT record_number FROM journey_entry_staging
+                WHERE import_id = %(import_id)s
+                ORDER BY record_number LIMIT %(limit)s
+            )
+            RETURNING record_number, customer_id, attributes
+        ), enrolled AS (
+            INSERT INTO journey_customer_states
+                (journey_id, customer_id, plan_version, node_idx, status, due_at, attributes)
+            SELECT DISTINCT ON (customer_id)
+                %(journey_id)s, customer_id, %(version)s, %(node_idx)s, %(status)s, %(now)s, attributes
+            FROM batch
+            ORDER BY customer_id, record_number
+            ON CONFLICT (journey_id, customer_id) DO NOTHING
+            RETURNING customer_id
+        ), entered AS (
+            INSERT INTO journey_execution_events
+                (journey_id, customer_id, plan_version, node_id, event_type, detail, occurred_at)
+            SELECT %(journey_id)s, customer_id, %(version)s, %(node_id)s, 'entered', NULL, %(now)s
+            FROM enrolled
+        ), progress AS (
+            UPDATE journey_entry_imports
+            SET rows_enrolled = rows_enrolled + (SELECT count(*) FROM enrolled)
+            WHERE id = %(import_id)s
+        )
+        SELECT (SELECT count(*) FROM batch), (SELECT count(*) FROM enrolled)
+    """, {
+        "import_id": UUID(import_id), "limit": limit, "journey_id": journey_uuid,
+        "version": plan.version, "node_idx": entry_idx, "node_id": plan.node_ids[entry_idx],
+        "status": READY, "now": now,
+    })
+    consumed, enrolled = cursor.fetchone()
+    return consumed, enrolled
+
+
+# ============================================================================
+# EXECUTION WORKERS
+# ============================================================================
+
+def heartbeat_worker(cursor, worker_id: str, hostname: str, pid: int, shards: Sequence[int]) -> None:
+    """Register a worker or refresh its heartbeat (database clock, so hosts need not agree on time)"""
+    cursor.execute("""
+        INSERT INTO execution_workers (worker_id, hostname, pid, shards, heartbeat_at)
+        VALUES (%s, %s, %s, %s::smallint[], NOW())
+        ON CONFLICT (worker_id) DO UPDATE
+        SET heartbeat_at = NOW(), shards = EXCLUDED.shards
+    """, (worker_id, hostname, pid, list(shards)))
+
+
+def live_workers(cursor, ttl_seconds: float) -> List[str]:
+    """Ids of workers that sent a heartbeat within ``ttl_seconds``; long-dead workers are pruned"""
+    cursor.execute("""
+        DELETE FROM execution_workers WHERE heartbeat_at < NOW() - make_interval(secs => %s)
+    """, (ttl_seconds * 10,))
+    cursor.execute("""
+        SELECT worker_id FROM execution_workers
+        WHERE heartbeat_at >= NOW() - make_interval(secs => %s)
+        ORDER BY worker_id
+    """, (ttl_seconds,))
+    return [row[0] for row in cursor.fetchall()]
+
+
+def remove_worker(cursor, worker_id: str) -> None:
+    cursor.execute("DELETE FROM execution_workers WHERE worker_id = %s", (worker_id,))
+
+
+
+# ============================================================================
+# GOAL AND MILESTONE PROGRESS
+# ============================================================================
+
+def progress_journeys(cursor) -> List[str]:
+    """Journeys with at least one published plan"""
+    cursor.execute("SELECT DISTINCT journey_id FROM journey_execution_plans")
+    return [str(row[0]) for row in cursor.fetchall()]
+
+
+def plan_versions(cursor, journey_id: str) -> List[int]:
+    cursor.execute("""
+        SELECT version FROM journey_execution_plans WHERE journey_id = %s ORDER BY version
+    """, (UUID(journey_id),))
+    return [row[0] for row in cursor.fetchall()]
+
+
+def lock_progress_watermark(cursor, journey_id: str) -> Optional[int]:
+    """
+    Lock the progress watermark of a journey for this transaction and return the last
+    counted event id; None if another aggregator holds it.
+    """
+    journey_uuid = UUID(journey_id)
+    cursor.execute("""
+        INSERT INTO journey_progress_watermarks (journey_id) VALUES (%s)
+        ON CONFLICT (journey_id) DO NOTHING
+    """, (journey_uuid,))
+    cursor.execute("""
+        SELECT last_event_id FROM journey_progress_watermarks
+        WHERE journey_id = %s
+        FOR UPDATE SKIP LOCKED
+    """, (journey_uuid,))
+    row = cursor.fetchone()
+    return row[0] if row else None
+
+
+def read_progress_events(cursor, journey_id: str, after_id: int, settle_seconds: float,
+                         limit: int) -> List[Tuple[int, str, int, str, str, bool]]:
+    """
+    The next entered/goal/milestone events after ``after_id`` as
+    (id, customer_id, plan_version, node_id, event_type, settled). Events younger than
+    ``settle_seconds`` are not settled: a transaction still in flight may hold a lower id.
+    """
+    cursor.execute("""
+        SELECT id, customer_id, plan_version, node_id, event_type,
+               occurred_at < NOW() - make_interval(secs => %s)
+        FROM journey_execution_events
+        WHERE journey_id = %s AND id > %s AND event_type IN ('entered', 'goal', 'milestone')
+        ORDER BY id
+        LIMIT %s
+    """, (settle_seconds, UUID(journey_id), after_id, limit))
+    return cursor.fetchall()
+
+
+def add_progress(cursor, journey_id: str, members: Sequence[Tuple[str, str, str]],
+                 entered: int, last_event_id: int) -> None:
+    """
+    Count (kind, target_id, customer_id) arrivals - each customer once per target - and
+    new entries, and move the watermark past the events they came from
+    """
+    journey_uuid = UUID(journey_id)
+    if members:
+        execute_values(cursor, """
+            WITH arrivals (journey_id, kind, target_id, customer_id) AS (VALUES %s),
+            counted AS (
+                INSERT INTO journey_progress_members (journey_id, kind, target_id, customer_id)
+                SELECT DISTINCT journey_id, kind, target_id, customer_id FROM arrivals
+                ON CONFLICT DO NOTHING
+                RETURNING journey_id, kind, target_id
+            )
+            INSERT INTO journey_progress_counters (journey_id, kind, target_id, customers)
+            SELECT journey_id, kind, target_id, count(*) FROM counted GROUP BY journey_id, kind, target_id
+            ON CONFLICT (journey_id, kind, target_id) DO UPDATE
+            SET customers = journey_progress_counters.customers + EXCLUDED.customers, updated_at = NOW()
+        """, [(journey_uuid, kind, target_id, customer_id) for kind, target_id, customer_id in members],
+            template="(%s::uuid, %s, %s, %s)", page_size=len(members))
+    cursor.execute("""
+        UPDATE journey_progress_watermarks
+        SET last_event_id = %s, customers_entered = customers_entered + %s, updated_at = NOW()
+        WHERE journey_id = %s
+    """, (last_event_id, entered, journey_uuid))
+
+
+def load_progress(cursor, journey_id: str) -> Tuple[int, int, Optional[datetime], Dict[Tuple[str, str], int]]:
+    """(customers entered, last counted event id, updated_at, {(kind, target_id): customers})"""
+    journey_uuid = UUID(journey_id)
+    cursor.execute("""
+        SELECT customers_entered, last_event_id, updated_at FROM journey_progress_watermarks
+        WHERE journey_id = %s
+    """, (journey_uuid,))
+    entered, last_event_id, updated_at = cursor.fetchone() or (0, 0, None)
+    cursor.execute("""
+        SELECT kind, target_id, customers FROM journey_progress_counters WHERE journey_id = %s
+    """, (journey_uuid,))
+    return entered, last_event_id, updated_at, {(kind, target_id): count for kind, target_id, count in cursor.fetchall()}
+
+
+def load_goal_rows(cursor, journey_id: str) -> List[Dict[str, Any]]:
+    cursor.execute("""
+        SELECT goal_id, title, target_value, current_value, unit, status
+        FROM journey_goals WHERE journey_id = %s ORDER BY created_at, goal_id
+    """, (UUID(journey_id),))
+    columns = ("goal_id", "title", "target_value", "current_value", "unit", "status")
+    return [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+
+def load_milestone_rows(cursor, journey_id: str) -> Dict[str, Dict[str, Any]]:
+    """Milestones keyed by milestone_id, in display order"""
+    cursor.execute("""
+        SELECT milestone_id, title, progress, status, target_date, dependencies
+        FROM journey_milestones WHERE journey_id = %s ORDER BY sort_order, created_at, milestone_id
+    """, (UUID(journey_id),))
+    columns = ("milestone_id", "title", "progress", "status", "target_date", "dependencies")
+    return {row[0]: dict(zip(columns, row)) for row in cursor.fetchall()}
+
+
+def publish_goal_progress(cursor, journey_id: str, rollups: Dict[str, Tuple[float, str]]) -> int:
+    """
+    Write goal values/statuses and mark exactly these goals ``execution_linked`` (saves then
+    leave their values alone); rows already up to date are not touched. Returns rows changed.
+    """
+    journey_uuid = UUID(journey_id)
+    cursor.execute("""
+        UPDATE journey_goals SET execution_linked = FALSE
+        WHERE journey_id = %s AND execution_linked AND NOT (goal_id = ANY(%s))
+    """, (journey_uuid, list(rollups)))
+    if not rollups:
+        return 0
+    changed = execute_values(cursor, """
+        UPDATE journey_goals AS g
+        SET current_value = v.value, status = v.status, execution_linked = TRUE, updated_at = NOW()
+        FROM (VALUES %s) AS v (journey_id, goal_id, value, status)
+        WHERE g.journey_id = v.journey_id AND g.goal_id = v.goal_id
+          AND (g.current_value IS DISTINCT FROM v.value OR g.status IS DISTINCT FROM v.status
+               OR NOT g.execution_linked)
+        RETURNING 1
+    """, [(journey_uuid, goal_id, value, status) for goal_id, (value, status) in rollups.items()],
+        template="(%s::uuid, %s, %s::decimal(15,2), %s)", page_size=WRITE_PAGE_SIZE, fetch=True)
+    # cursor.rowcount would only count the last page
+    return len(changed)
+
+
+def publish_milestone_progress(cursor, journey_id: str, rollups: Dict[str, Tuple[int, str]]) -> int:
+    """
+    Write milestone progress/statuses and mark exactly these milestones ``execution_linked``;
+    rows already up to date are not touched. Returns rows changed.
+    """
+    journey_uuid = UUID(journey_id)
+    cursor.execute("""
+        UPDATE journey_milestones SET execution_linked = FALSE
+        WHERE journey_id = %s AND execution_linked AND NOT (milestone_id = ANY(%s))
+    """, (journey_uuid, list(rollups)))
+    if not rollups:
+        return 0
+    changed = execute_values(cursor, """
+        UPDATE journey_milestones AS m
+        SET progress = v.progress, status = v.status, execution_linked = TRUE, updated_at = NOW()
+        FROM (VALUES %s) AS v (journey_id, milestone_id, progress, status)
+        WHERE m.journey_id = v.journey_id AND m.milestone_id = v.milestone_id
+          AND (m.progress IS DISTINCT FROM v.progress OR m.status IS DISTINCT FROM v.status
+               OR NOT m.execution_linked)
+        RETURNING 1
+    """, [(journey_uuid, milestone_id, progress, status) for milestone_id, (progress, status) in rollups.items()],
+        template="(%s::uuid, %s, %s::integer, %s)", page_size=WRITE_PAGE_SIZE, fetch=True)
+    return len(changed)
@@ -0,0 +1,106 @@
+"""
+Hierarchical timing wheel.
+
+Timers are bucketed by expiry tick into ``levels`` wheels of ``2**bits`` slots each.
+Level 0 slots are one tick wide, level 1 slots span a full level-0 revolution, and so on.
+Scheduling is O(1) (compute the level and slot, append); advancing the clock empties one
+level-0 slot per tick and, whenever a lower level wraps, cascades a single higher-level
+slot down. Timers further out than the top level sit in an overflow list that is
+re-placed each time the top level wraps.
+"""
+import math
+from typing import Dict, Hashable, List, Tuple
+
+
+class TimerWheel:
+    """In-memory hierarchical timer wheel keyed by arbitrary hashable timer ids"""
+
+    def __init__(self, start: float, tick_seconds: float = 1.0, bits: int = 8, levels: int = 4):
+        self.tick_seconds = tick_seconds
+        self.bits = bits
+        self.levels = levels
+        self.mask = (1 << bits) - 1
+        self.span = 1 << (bits * levels)
+        self.current_tick = int(math.floor(start / tick_seconds))
+        self.wheels: List[List[List[Tuple[int, Hashable]]]] = [
+            [[] for _ in range(1 << bits)] for _ in range(levels)
+        ]
+        self.overflow: List[Tuple[int, Hashable]] = []
+        self._ready: List[Hashable] = []
+        # Live due tick per timer; entries left in slots after a reschedule/cancel are skipped
+        self._due: Dict[Hashable, int] = {}
+
+    def __len__(self) -> int:
+        return len(self._due)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._due
+
+    def _place(self, due_tick: int, key: Hashable) -> None:
+        delta = due_tick - self.current_tick
+        if delta <= 0:
+            self._ready.append(key)
+            return
+        for level in range(self.levels):
+            if delta < 1 << (self.bits * (level + 1)):
+                slot = (due_tick >> (self.bits * level)) & self.mask
+                self.wheels[level][slot].append((due_tick, key))
+                return
+        self.overflow.append((due_tick, key))
+
+    def schedule(self, key: Hashable, due: float) -> None:
+        """Add or reschedule a timer to fire at ``due`` (epoch seconds)"""
+        due_tick = int(math.ceil(due / self.tick_seconds))
+        self._due[key] = due_tick
+        self._place(due_tick, key)
+
+    def cancel(self, key: Hashable) -> None:
+        self._due.pop(key, None)
+
+    def _cascade(self, level: int, tick: int) -> None:
+        slot = (tick >> (self.bits * level)) & self.mask
+        entries = self.wheels[level][slot]
+        self.wheels[level][slot] = []
+        for due_tick, key in entries:
+            if self._due.get(key) == due_tick:
+                self._place(due_tick, key)
+
+    def advance(self, now: float) -> List[Hashable]:
+        """Move the clock to ``now`` and return the ids of every timer that expired"""
+        target = int(math.floor(now / self.tick_seconds))
+        if not self._due:
+            self.current_tick = max(self.current_tick, target)
+            self._ready = []
+            return []
+
+        expired = []
+        while self.current_tick < target:
+            self.current_tick += 1
+            tick = self.current_tick
+
+            for level in range(1, self.levels):
+                if tick & ((1 << (self.bits * level)) - 1):
+                    break
+                self._cascade(level, tick)
+            if tick % self.span == 0 and self.overflow:
+                pending, self.overflow = self.overflow, []
+                for due_tick, key in pending:
+                    if self._due.get(key) == due_tick:
+                        self._place(due_tick, key)
+
+            slot = tick & self.mask
+            bucket = self.wheels[0][slot]
+            if bucket:
+                self.wheels[0][slot] = []
+                for due_tick, key in bucket:
+                    if self._due.get(key) == due_tick:
+                        del self._due[key]
+                        expired.append(key)
+
+        for key in self._ready:
+            due_tick = self._due.get(key)
+            if due_tick is not None and due_tick <= self.current_tick:
+                del self._due[key]
+                expired.append(key)
+        self._ready = []
+        return expired
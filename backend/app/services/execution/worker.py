@@ -0,0 +1,194 @@
+"""
+Execution workers: separate processes, on one or many hosts, that share the execution load.
+
+Customers are hashed into NUM_SHARDS shards by (journey_id, customer_id) - the generated
+``shard`` column of journey_customer_states and journey_wait_timers. Every worker sends a
+heartbeat to ``execution_workers`` and, from the set of live workers, computes the shards it
+owns with rendezvous (highest random weight) hashing. All workers compute the same
+assignment, so rebalancing needs no coordinator, and a worker joining or leaving only
+moves the shards that hash to it (about 1/N of them).
+
+Ownership is enforced with session-level advisory locks held on a dedicated connection:
+a worker processes only the shards whose lock it holds, releases shards it no longer
+owns, and the locks of a crashed worker disappear with its connection. Claims still use
+``FOR UPDATE SKIP LOCKED``, so a brief overlap while a shard changes hands can never
+advance the same customer twice.
+"""
+import hashlib
+import os
+import socket
+import threading
+import uuid
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Sequence, Set, Tuple
+
+from .execution_service import JourneyExecutionService, EXECUTION_BATCH_SIZE
+from .progress_service import JourneyProgressService
+from .scheduler import WaitScheduler
+from . import state_store
+from ..journey.utils import get_connection
+from ...shared_services.logger_setup import setup_logger
+
+logger = setup_logger()
+
+# Must match the shard expression in migrations/versions/0002_execution_schema.py
+NUM_SHARDS = 256
+# First key of the two-key advisory locks; the second key is the shard
+SHARD_LOCK_NAMESPACE = 0x4A45
+
+WORKER_HEARTBEAT_SECONDS = float(os.getenv("WORKER_HEARTBEAT_SECONDS", "5"))
+# A worker without a heartbeat for this long is considered gone and its shards move
+WORKER_TTL_SECONDS = float(os.getenv("WORKER_TTL_SECONDS", "20"))
+# Pause between polls when there was less than a full batch of work
+WORKER_IDLE_SECONDS = float(os.getenv("WORKER_IDLE_SECONDS", "0.5"))
+# How often goal/milestone progress is aggregated, by the worker that owns shard 0
+PROGRESS_INTERVAL_SECONDS = float(os.getenv("PROGRESS_INTERVAL_SECONDS", "30"))
+
+
+def rendezvous_weight(worker_id: str, shard: int) -> int:
+    digest = hashlib.blake2b(f"{worker_id}:{shard}".encode(), digest_size=8).digest()
+    return int.from_bytes(digest, "big")
+
+
+def assign_shards(worker_id: str, workers: Sequence[str], num_shards: int = NUM_SHARDS) -> List[int]:
+    """Shards owned by ``worker_id`` when ``workers`` are alive"""
+    if worker_id not in workers:
+        return []
+    return [
+        shard for shard in range(num_shards)
+        if max(workers, key=lambda w: rendezvous_weight(w, shard)) == worker_id
+    ]
+
+
+class ExecutionWorker:
+    """Processes ready customers and expired wait timers of the shards it owns"""
+
+    def __init__(self, worker_id: Optional[str] = None,
+                 execution_service: Optional[JourneyExecutionService] = None,
+                 batch_size: int = EXECUTION_BATCH_SIZE,
+                 heartbeat_seconds: float = WORKER_HEARTBEAT_SECONDS,
+                 ttl_seconds: float = WORKER_TTL_SECONDS,
+                 idle_seconds: float = WORKER_IDLE_SECONDS,
+                 progress_seconds: float = PROGRESS_INTERVAL_SECONDS):
+        self.logger = logger
+        self.hostname = socket.gethostname()
+        self.pid = os.getpid()
+        self.worker_id = worker_id or f"{self.hostname}-{self.pid}-{uuid.uuid4().hex[:6]}"
+        self.execution_service = execution_service or JourneyExecutionService()
+        self.scheduler = WaitScheduler(self.execution_service, batch_size=batch_size, shards=[])
+        self.batch_size = batch_size
+        self.heartbeat_seconds = heartbeat_seconds
+        self.ttl_seconds = ttl_seconds
+        self.idle_seconds = idle_seconds
+        self.progress_service = JourneyProgressService()
+        self.progress_seconds = progress_seconds
+        self.last_progress: Optional[datetime] = None
+        self.held: Set[int] = set()
+        self.last_heartbeat: Optional[datetime] = None
+        self.lock_conn = None
+
+    def rebalance(self) -> Tuple[List[int], List[int]]:
+        """
+        Heartbeat, recompute the owned shards and take/release their advisory locks.
+        Shards still locked by their previous owner are retried on the next heartbeat.
+        Returns (acquired, released).
+        """
+        with self.lock_conn.cursor() as cursor:
+            state_store.heartbeat_worker(cursor, self.worker_id, self.hostname, self.pid, sorted(self.held))
+            workers = state_store.live_workers(cursor, self.ttl_seconds)
+            desired = set(assign_shards(self.worker_id, workers))
+
+            released = sorted(self.held - desired)
+            if released:
+                cursor.execute("""
+                    SELECT pg_advisory_unlock(%s, shard) FROM unnest(%s::int[]) AS shard
+                """, (SHARD_LOCK_NAMESPACE, released))
+            acquired: List[int] = []
+            wanted = sorted(desired - self.held)
+            if wanted:
+                cursor.execute("""
+                    SELECT shard FROM unnest(%s::int[]) AS shard
+                    WHERE pg_try_advisory_lock(%s, shard)
+                """, (wanted, SHARD_LOCK_NAMESPACE))
+                acquired = [row[0] for row in cursor.fetchall()]
+
+        self.held = (self.held - set(released)) | set(acquired)
+        if acquired or released:
+            self.scheduler.set_shards(self.held)
+            self.logger.info(
+                f"Worker {self.worker_id}: {len(workers)} live workers, holding {len(self.held)} shards "
+                f"(+{len(acquired)} -{len(released)}, {len(desired - self.held)} pending)"
+            )
+        return acquired, released
+
+    def step(self, now: Optional[datetime] = None) -> Dict[str, int]:
+        """One poll: heartbeat if due, then a batch of ready customers and the expired timers (and progress, if due)"""
+        now = now or datetime.now(timezone.utc)
+        if self.last_heartbeat is None or (now - self.last_heartbeat).total_seconds() >= self.heartbeat_seconds:
+            self.rebalance()
+            self.last_heartbeat = now
+
+        totals = {"claimed": 0, "transitions": 0, "events": 0, "timers": 0}
+        if not self.held:
+            return totals
+
+        if 0 in self.held and (
+            self.last_progress is None or (now - self.last_progress).total_seconds() >= self.progress_seconds
+        ):
+            self.last_progress = now
+            self.progress_service.aggregate_all(now)
+
+        stats = self.execution_service.process_shards(sorted(self.held), self.batch_size, now)
+        woken = self.scheduler.tick(now)
+        for key in totals:
+            totals[key] = stats.get(key, 0) + woken.get(key, 0)
+        totals["ready"] = stats["claimed"]
+        return totals
+
+    def _release_all(self) -> None:
+        try:
+            with self.lock_conn.cursor() as cursor:
+                cursor.execute("SELECT pg_advisory_unlock_all()")
+                state_store.remove_worker(cursor, self.worker_id)
+        except Exception as e:
+            self.logger.error(f"Worker {self.worker_id} failed to release its shards: {e}")
+
+    def run_forever(self, stop_event: Optional[threading.Event] = None) -> None:
+        """Poll until ``stop_event`` is set, reconnecting (and re-acquiring shards) if the lock connection drops"""
+        stop_event = stop_event or threading.Event()
+        self.logger.info(f"Execution worker {self.worker_id} starting")
+
+        while not stop_event.is_set():
+            try:
+                with get_connection("journeys") as conn:
+                    conn.rollback()
+                    conn.autocommit = True
+                    self.lock_conn = conn
+                    try:
+                        self._poll(stop_event)
+                    finally:
+                        if not conn.closed:
+                            self._release_all()
+                            conn.autocommit = False
+                        self.lock_conn = None
+                        self.held = set()
+                        self.last_heartbeat = None
+            except Exception as e:
+                self.logger.error(f"Execution worker {self.worker_id} lost its coordination connection: {e}")
+                stop_event.wait(self.heartbeat_seconds)
+
+        self.logger.info(f"Execution worker {self.worker_id} stopped")
+
+    def _poll(self, stop_event: threading.Event) -> None:
+        while not stop_event.is_set():
+            try:
+                totals = self.step()
+            except Exception as e:
+                if self.lock_conn.closed:
+                    raise
+                self.logger.error(f"Execution worker {self.worker_id} step failed: {e}")
+                stop_event.wait(self.idle_seconds)
+                continue
+            # Keep going while there is a backlog of ready customers
+            if totals.get("ready", 0) < self.batch_size:
+                stop_event.wait(self.idle_seconds)
@@ -0,0 +1 @@
+# Background job queue package
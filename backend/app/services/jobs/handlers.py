@@ -0,0 +1,21 @@
+from typing import Dict
+
+from .queue import JobType
+from ..reports.report_service import (
+    JourneyReportService, REPORT_JOB, REPORT_JOB_CONCURRENCY, REPORT_JOB_TIMEOUT_SECONDS,
+)
+from ..journey.snapshot_service import JourneySnapshotService, SNAPSHOT_JOB, SNAPSHOT_JOB_CONCURRENCY
+
+# Every job type the workers run; a queued job of any other type waits until one knows it
+JOB_TYPES: Dict[str, JobType] = {
+    REPORT_JOB: JobType(
+        JourneyReportService().run_job,
+        concurrency=REPORT_JOB_CONCURRENCY,
+        timeout_seconds=REPORT_JOB_TIMEOUT_SECONDS,
+    ),
+    SNAPSHOT_JOB: JobType(
+        JourneySnapshotService().run_job,
+        concurrency=SNAPSHOT_JOB_CONCURRENCY,
+        timeout_seconds=120,
+    ),
+}
@@ -0,0 +1,386 @@
+"""
+Postgres-backed background job queue.
+
+Jobs are rows in ``jobs`` (migrations/versions/0003_jobs_schema.py). ``enqueue``
+inserts one inside the caller's transaction, so a job exists exactly when the change that asked for it commits.
+Workers claim the highest-priority due job with ``FOR UPDATE SKIP LOCKED``, holding a
+lease (``locked_until``) for the job type's timeout while the handler runs outside any
+transaction:
+
+- priorities: higher ``priority`` first, then oldest ``run_at``
+- retries: a failed attempt is queued again after an exponential backoff with jitter
+  until ``max_attempts``; a job whose lease expired counts as a failed attempt
+- idempotency keys: enqueueing an existing (job_type, idempotency_key) returns that job;
+  with ``rerun_running`` a job that is running is queued once more when it completes
+- concurrency: a job type is only claimed while fewer than its ``concurrency`` jobs are
+  running across all workers (claims are serialized by an advisory lock to make the
+  count exact)
+"""
+import os
+import random
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, NamedTuple, Optional, Tuple
+from uuid import UUID
+
+from ...models.journey_models import APIResponse
+from ..journey.utils import get_connection
+from ...shared_services.logger_setup import setup_logger
+from ...shared_services.serialization import to_jsonb
+
+logger = setup_logger()
+
+JOB_MAX_ATTEMPTS = int(os.getenv("JOB_MAX_ATTEMPTS", "5"))
+# Delay before the second attempt; doubles for every further attempt up to the maximum
+JOB_BACKOFF_SECONDS = float(os.getenv("JOB_BACKOFF_SECONDS", "10"))
+JOB_BACKOFF_MAX_SECONDS = float(os.getenv("JOB_BACKOFF_MAX_SECONDS", "3600"))
+# Finished jobs (and with them their idempotency keys) are purged after this long
+JOB_RETENTION_DAYS = int(os.getenv("JOB_RETENTION_DAYS", "7"))
+
+JOB_STATUSES = ("queued", "running", "done", "failed", "cancelled")
+
+JOB_COLUMNS = (
+    "id", "job_type", "payload", "priority", "status", "idempotency_key", "attempts", "max_attempts",
+    "run_at", "locked_by", "locked_until", "result", "error", "created_at", "started_at", "finished_at",
+    "rerun",
+)
+
+
+class JobType(NamedTuple):
+    """How workers run one type of job"""
+    handler: Callable[[Dict[str, Any]], Optional[Dict[str, Any]]]  # payload -> result
+    concurrency: int = 1         # jobs of this type running at once across all workers
+    timeout_seconds: int = 900   # lease; a job running longer is assumed lost and retried
+
+
+def retry_delay(attempts: int) -> float:
+    """Backoff before the next attempt after ``attempts`` failed ones (full jitter on the upper half)"""
+    delay = min(JOB_BACKOFF_SECONDS * 2 ** max(attempts - 1, 0), JOB_BACKOFF_MAX_SECONDS)
+    return delay * random.uniform(0.5, 1.0)
+
+
+def enqueue(cursor, job_type: str, payload: Dict[str, Any], priority: int = 0,
+            idempotency_key: Optional[str] = None, max_attempts: int = JOB_MAX_ATTEMPTS,
+            delay_seconds: float = 0, retry_finished: bool = False,
+            rerun_running: bool = False) -> Tuple[UUID, str]:
+    """
+    Queue a job in the caller's transaction; returns (job id, status). With an
+    idempotency key that is already in use the existing job is returned unchanged, or
+    - with ``retry_finished`` - queued again if it had finished, or - with
+    ``rerun_running`` - queued again once its running attempt completes (for jobs that
+    read the current state of what they process, which the attempt may have read already).
+    """
+    cursor.execute("""
+        INSERT INTO jobs (job_type, payload, priority, idempotency_key, max_attempts, run_at)
+        VALUES (%s, %s, %s, %s, %s, NOW() + make_interval(secs => %s))
+        ON CONFLICT (job_type, idempotency_key) WHERE idempotency_key IS NOT NULL
+        DO UPDATE SET status = 'queued', payload = EXCLUDED.payload, priority = EXCLUDED.priority,
+                      max_attempts = EXCLUDED.max_attempts, run_at = EXCLUDED.run_at, attempts = 0,
+                      result = NULL, error = NULL, started_at = NULL, finished_at = NULL, rerun = FALSE
+            WHERE %s AND jobs.status IN ('done', 'failed', 'cancelled')
+        RETURNING id, status
+    """, (job_type, to_jsonb(payload), priority, idempotency_key, max_attempts, delay_seconds, retry_finished))
+    row = cursor.fetchone()
+    if row is None and rerun_running:
+        # The conflicting row stays locked by the insert above until the caller commits,
+        # so the running attempt cannot complete in between without seeing the flag
+        cursor.execute("""
+            UPDATE jobs SET rerun = TRUE
+            WHERE job_type = %s AND idempotency_key = %s AND status = 'running'
+            RETURNING id, status
+        """, (job_type, idempotency_key))
+        row = cursor.fetchone()
+    if row is None:
+        cursor.execute("SELECT id, status FROM jobs WHERE job_type = %s AND idempotency_key = %s",
+                       (job_type, idempotency_key))
+        row = cursor.fetchone()
+    return row[0], row[1]
+
+
+def job_view(row: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "jobId": str(row["id"]),
+        "type": row["job_type"],
+        "status": row["status"],
+        "priority": row["priority"],
+        "idempotencyKey": row["idempotency_key"],
+        "attempts": row["attempts"],
+        "maxAttempts": row["max_attempts"],
+        "runAt": row["run_at"],
+        "lockedBy": row["locked_by"],
+        "lockedUntil": row["locked_until"],
+        "payload": row["payload"],
+        "result": row["result"],
+        "error": row["error"],
+        "createdAt": row["created_at"],
+        "startedAt": row["started_at"],
+        "finishedAt": row["finished_at"],
+        "rerun": row["rerun"],
+    }
+
+
+def _job_uuid(job_id: str) -> Optional[UUID]:
+    try:
+        return UUID(job_id)
+    except ValueError:
+        return None
+
+
+class JobQueueService:
+    """Service for claiming, finishing and inspecting background jobs"""
+
+    def __init__(self):
+        self.logger = logger
+
+    # ------------------------------------------------------------------
+    # Worker side
+    # ------------------------------------------------------------------
+
+    def _expire_leases(self, cursor) -> None:
+        """Jobs whose worker vanished: queue them again, or fail them when out of attempts"""
+        cursor.execute("""
+            UPDATE jobs
+            SET status = CASE WHEN attempts < max_attempts THEN 'queued' ELSE 'failed' END,
+                error = 'Job timed out or its worker stopped',
+                run_at = NOW(),
+                finished_at = CASE WHEN attempts < max_attempts THEN NULL ELSE NOW() END,
+                locked_by = NULL, locked_until = NULL, rerun = FALSE
+            WHERE status = 'running' AND locked_until < NOW()
+        """)
+
+    def claim(self, conn, job_types: Dict[str, JobType], worker_id: str) -> Optional[Dict[str, Any]]:
+        """Take the next due job of the given types whose concurrency limit allows it, and lease it"""
+        if not job_types:
+            return None
+        names = list(job_types)
+        try:
+            conn.rollback()
+            with conn.cursor() as cursor:
+                # One claim at a time, so the running counts below cannot race; claims are short
+                cursor.execute("SELECT pg_advisory_xact_lock(hashtext('jobs:claim'))")
+                self._expire_leases(cursor)
+                cursor.execute(f"""
+                    WITH limits (job_type, concurrency, timeout_seconds) AS (
+                        SELECT * FROM unnest(%(types)s::text[], %(concurrency)s::int[], %(timeouts)s::int[])
+                    ),
+                    running AS (
+                        SELECT job_type, count(*) AS jobs FROM jobs
+                        WHERE status = 'running' AND job_type = ANY(%(types)s)
+                        GROUP BY job_type
+                    ),
+                    candidate AS (
+                        SELECT j.id, l.timeout_seconds
+                        FROM jobs j
+                        JOIN limits l ON l.job_type = j.job_type
+                        LEFT JOIN running r ON r.job_type = j.job_type
+                        WHERE j.status = 'queued' AND j.run_at <= NOW()
+                          AND coalesce(r.jobs, 0) < l.concurrency
+                        ORDER BY j.priority DESC, j.run_at
+                        LIMIT 1
+                        FOR UPDATE OF j SKIP LOCKED
+                    )
+                    UPDATE jobs SET status = 'running', attempts = attempts + 1, started_at = NOW(),
+                                    locked_by = %(worker)s,
+                                    locked_until = NOW() + make_interval(secs => candidate.timeout_seconds)
+                    FROM candidate
+                    WHERE jobs.id = candidate.id
+                    RETURNING {", ".join("jobs." + column for column in JOB_COLUMNS)}
+                """, {
+                    "types": names,
+                    "concurrency": [job_types[name].concurrency for name in names],
+                    "timeouts": [job_types[name].timeout_seconds for name in names],
+                    "worker": worker_id,
+                })
+                row = cursor.fetchone()
+            conn.commit()
+            return dict(zip(JOB_COLUMNS, row)) if row else None
+        except Exception:
+            conn.rollback()
+            raise
+
+    def complete(self, conn, job: Dict[str, Any], result: Optional[Dict[str, Any]]) -> bool:
+        """
+        Mark a claimed job done, or queue it again if it was re-enqueued with
+        ``rerun_running`` meanwhile; False if its lease was lost to another worker
+        """
+        try:
+            conn.rollback()
+            with conn.cursor() as cursor:
+                cursor.execute("""
+                    UPDATE jobs SET status = CASE WHEN rerun THEN 'queued' ELSE 'done' END,
+                                    result = %s, error = NULL,
+                                    finished_at = CASE WHEN rerun THEN NULL ELSE NOW() END,
+                                    run_at = CASE WHEN rerun THEN NOW() ELSE run_at END,
+                                    attempts = CASE WHEN rerun THEN 0 ELSE attempts END,
+                                    rerun = FALSE, locked_by = NULL, locked_until = NULL
+                    WHERE id = %s AND status = 'running' AND attempts = %s
+                """, (to_jsonb(result) if result is not None else None, job["id"], job["attempts"]))
+                updated = cursor.rowcount == 1
+            conn.commit()
+            return updated
+        except Exception:
+            conn.rollback()
+            raise
+
+    def fail(self, conn, job: Dict[str, Any], error: str) -> Optional[str]:
+        """Record a failed attempt: queue it again after a backoff or fail it for good; returns the new status"""
+        retry = job["attempts"] < job["max_attempts"]
+        try:
+            conn.rollback()
+            with conn.cursor() as cursor:
+                cursor.execute("""
+                    UPDATE jobs
+                    SET status = %s, error = %s, run_at = NOW() + make_interval(secs => %s),
+                        finished_at = CASE WHEN %s THEN NULL ELSE NOW() END,
+                        locked_by = NULL, locked_until = NULL, rerun = FALSE
+                    WHERE id = %s AND status = 'running' AND attempts = %s
+                """, ("queued" if retry else "failed", error, retry_delay(job["attempts"]) if retry else 0,
+                      retry, job["id"], job["attempts"]))
+                updated = cursor.rowcount == 1
+            conn.commit()
+            if not updated:
+                return None
+            return "queued" if retry else "failed"
+        except Exception:
+            conn.rollback()
+            raise
+
+    def purge(self, conn, retention_days: int = JOB_RETENTION_DAYS) -> int:
+        """Delete jobs that finished more than ``retention_days`` ago"""
+        try:
+            conn.rollback()
+            with conn.cursor() as cursor:
+                cursor.execute("""
+                    DELETE FROM jobs
+                    WHERE status IN ('done', 'failed', 'cancelled') AND finished_at < %s
+                """, (datetime.now(timezone.utc) - timedelta(days=retention_days),))
+                deleted = cursor.rowcount
+            conn.commit()
+            return deleted
+        except Exception:
+            conn.rollback()
+            raise
+
+    # ------------------------------------------------------------------
+    # API
+    # ------------------------------------------------------------------
+
+    async def get_job(self, job_id: str) -> APIResponse:
+        """Status, attempts and result of a job"""
+        try:
+            with get_connection("jobs") as conn:
+                with conn.cursor() as cursor:
+                    cursor.execute(f"SELECT {', '.join(JOB_COLUMNS)} FROM jobs WHERE id = %s", (_job_uuid(job_id),))
+                    row = cursor.fetchone()
+                conn.rollback()
+
+            if row is None:
+                return APIResponse(
+                    success=False,
+                    message="Job not found",
+                    error=f"No job {job_id}"
+                )
+            return APIResponse(
+                success=True,
+                message="Job retrieved successfully",
+                data=job_view(dict(zip(JOB_COLUMNS, row)))
+            )
+
+        except Exception as e:
+            self.logger.error(f"Error getting job: {e}")
+            return APIResponse(
+                success=False,
+                message="Failed to get job",
+                error=str(e)
+            )
+
+    async def list_jobs(self, job_type: Optional[str] = None, status: Optional[str] = None,
+                        limit: int = 50) -> APIResponse:
+        """Job counts per type and status, and the most recent jobs matching the filters"""
+        try:
+            if status is not None and status not in JOB_STATUSES:
+                return APIResponse(
+                    success=False,
+                    message="Invalid job status",
+                    error=f"Status must be one of {', '.join(JOB_STATUSES)}"
+                )
+
+            with get_connection("jobs") as conn:
+                with conn.cursor() as cursor:
+                    cursor.execute("SELECT job_type, status, count(*) FROM jobs GROUP BY job_type, status")
+                    counts: Dict[str, Dict[str, int]] = {}
+                    for row_type, row_status, jobs in cursor.fetchall():
+                        counts.setdefault(row_type, {})[row_status] = jobs
+
+                    cursor.execute(f"""
+                        SELECT {', '.join(JOB_COLUMNS)} FROM jobs
+                        WHERE (%(type)s::text IS NULL OR job_type = %(type)s)
+                          AND (%(status)s::text IS NULL OR status = %(status)s)
+                        ORDER BY created_at DESC
+                        LIMIT %(limit)s
+                    """, {"type": job_type, "status": status, "limit": limit})
+                    rows = cursor.fetchall()
+                conn.rollback()
+
+            return APIResponse(
+                success=True,
+                message="Jobs retrieved successfully",
+                data={
+                    "counts": counts,
+                    "jobs": [job_view(dict(zip(JOB_COLUMNS, row))) for row in rows],
+                }
+            )
+
+        except Exception as e:
+            self.logger.error(f"Error listing jobs: {e}")
+            return APIResponse(
+                success=False,
+                message="Failed to list jobs",
+                error=str(e)
+            )
+
+    async def cancel_job(self, job_id: str) -> APIResponse:
+        """Cancel a job that has not started (or is waiting for a retry)"""
+        try:
+            with get_connection("jobs") as conn:
+                try:
+                    conn.rollback()
+                    with conn.cursor() as cursor:
+                        cursor.execute("""
+                            UPDATE jobs SET status = 'cancelled', finished_at = NOW()
+                            WHERE id = %s AND status = 'queued'
+                            RETURNING id
+                        """, (_job_uuid(job_id),))
+                        cancelled = cursor.fetchone() is not None
+                        if not cancelled:
+                            cursor.execute("SELECT status FROM jobs WHERE id = %s", (_job_uuid(job_id),))
+                            row = cursor.fetchone()
+                    conn.commit()
+                except Exception:
+                    conn.rollback()
+                    raise
+
+            if not cancelled:
+                if row is None:
+                    return APIResponse(
+                        success=False,
+                        message="Job not found",
+                        error=f"No job {job_id}"
+                    )
+                return APIResponse(
+                    success=False,
+                    message="Job cannot be cancelled",
+                    error=f"Job is {row[0]}; only queued jobs can be cancelled"
+                )
+            return APIResponse(
+                success=True,
+                message="Job cancelled successfully",
+                data={"jobId": job_id, "status": "cancelled"}
+            )
+
+        except Exception as e:
+            self.logger.error(f"Error cancelling job: {e}")
+            return APIResponse(
+                success=False,
+                message="Failed to cancel job",
+                error=str(e)
+            )
@@ -0,0 +1,114 @@
+import os
+import socket
+import threading
+import time
+from typing import Dict, List, Optional
+
+from ..journey.utils import get_connection
+from .queue import JobQueueService, JobType
+from .handlers import JOB_TYPES
+from ..journey.snapshot_service import JourneySnapshotService
+from ...shared_services.logger_setup import setup_logger
+from ...shared_services.tracing import span
+
+logger = setup_logger()
+
+# Jobs run at once by one process (the per-type limits still apply across processes)
+JOB_WORKER_THREADS = int(os.getenv("JOB_WORKER_THREADS", "2"))
+# Pause between queue polls when no job is due
+JOB_POLL_SECONDS = float(os.getenv("JOB_POLL_SECONDS", "2"))
+# Finished job purge and snapshot partition maintenance, in their own thread
+JOB_PURGE_INTERVAL_SECONDS = float(os.getenv("JOB_PURGE_INTERVAL_SECONDS", "3600"))
+
+
+class JobWorker:
+    """Runs queued background jobs in a few threads of a worker process"""
+
+    def __init__(self, job_types: Optional[Dict[str, JobType]] = None, threads: int = JOB_WORKER_THREADS,
+                 poll_seconds: float = JOB_POLL_SECONDS):
+        self.logger = logger
+        self.queue = JobQueueService()
+        self.snapshots = JourneySnapshotService()
+        self.job_types = job_types if job_types is not None else JOB_TYPES
+        self.threads = threads
+        self.poll_seconds = poll_seconds
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}"
+
+    def run_next(self, worker_id: Optional[str] = None) -> Optional[str]:
+        """Claim and run one due job, if any; returns the job id"""
+        worker_id = worker_id or self.worker_id
+        with get_connection("jobs") as conn:
+            job = self.queue.claim(conn, self.job_types, worker_id)
+        if job is None:
+            return None
+
+        # The handler opens its own connections; none is held while it runs
+        started = time.perf_counter()
+        try:
+            with span(f"job {job['job_type']}", {"job.id": str(job["id"]), "job.attempt": job["attempts"]}):
+                result = self.job_types[job["job_type"]].handler(job["payload"])
+        except Exception as e:
+            with get_connection("jobs") as conn:
+                status = self.queue.fail(conn, job, str(e))
+            self.logger.error(
+                f"Job {job['id']} ({job['job_type']}) failed on attempt {job['attempts']}/{job['max_attempts']}: "
+                f"{e}{'; retrying later' if status == 'queued' else ''}"
+            )
+            return str(job["id"])
+
+        with get_connection("jobs") as conn:
+            if not self.queue.complete(conn, job, result):
+                self.logger.warning(f"Job {job['id']} ({job['job_type']}) finished after its lease expired")
+        self.logger.info(f"Job {job['id']} ({job['job_type']}) done in {time.perf_counter() - started:.3f}s")
+        return str(job["id"])
+
+    def maintain(self) -> None:
+        """Delete old finished jobs and keep the snapshot partitions ahead of time (and within retention)"""
+        with get_connection("jobs") as conn:
+            try:
+                deleted = self.queue.purge(conn)
+                if deleted:
+                    self.logger.info(f"Purged {deleted} finished jobs")
+            except Exception as e:
+                self.logger.error(f"Job purge failed: {e}")
+            try:
+                self.snapshots.maintain_partitions(conn)
+            except Exception as e:
+                self.logger.error(f"Snapshot partition maintenance failed: {e}")
+
+    def run_maintenance(self, stop_event: threading.Event) -> None:
+        """Run maintain() now and every JOB_PURGE_INTERVAL_SECONDS, however busy the queue is"""
+        while not stop_event.is_set():
+            try:
+                self.maintain()
+            except Exception as e:
+                self.logger.error(f"Job maintenance failed: {e}")
+            stop_event.wait(JOB_PURGE_INTERVAL_SECONDS)
+
+    def run_forever(self, stop_event: Optional[threading.Event] = None) -> None:
+        stop_event = stop_event or threading.Event()
+        worker_id = f"{self.worker_id}:{threading.current_thread().name}"
+        self.logger.info(f"Job worker {worker_id} starting")
+        while not stop_event.is_set():
+            try:
+                if self.run_next(worker_id) is not None:
+                    continue
+            except Exception as e:
+                self.logger.error(f"Job worker poll failed: {e}")
+            stop_event.wait(self.poll_seconds)
+        self.logger.info(f"Job worker {worker_id} stopped")
+
+    def start_maintenance(self, stop_event: threading.Event) -> threading.Thread:
+        """Run only the maintenance, in a daemon thread (processes that do not run jobs)"""
+        thread = threading.Thread(target=self.run_maintenance, args=(stop_event,), name="job-maintenance", daemon=True)
+        thread.start()
+        return thread
+
+    def start(self, stop_event: threading.Event) -> List[threading.Thread]:
+        """Run in daemon threads next to other work in this process, plus the maintenance thread"""
+        threads = [self.start_maintenance(stop_event)]
+        for index in range(self.threads):
+            thread = threading.Thread(target=self.run_forever, args=(stop_event,), name=f"job-worker-{index}", daemon=True)
+            thread.start()
+            threads.append(thread)
+        return threads
@@ -0,0 +1,70 @@
+from typing import Optional
+
+from ...models.journey_models import APIResponse
+from .utils import get_connection, ensure_uuid
+from .load_service import JourneyLoadService
+from .graph_analysis import analyze_canvas
+from ...shared_services.prepared import PreparedStatement
+from ...shared_services.revision_cache import RevisionCache
+from ...shared_services.logger_setup import setup_logger
+from ...shared_services.tracing import trace_methods
+
+logger = setup_logger()
+
+# Analysis results are pure functions of the graph, so they are cached per journey revision
+analysis_cache = RevisionCache("journey_analysis", maxsize=256)
+
+# Nodes and edges are only written by saves, and every save bumps journeys.revision
+JOURNEY_REVISION = PreparedStatement("journey_revision", "SELECT revision FROM journeys WHERE id = %s")
+
+
+@trace_methods
+class JourneyAnalysisService:
+    """Service for structural analysis of journey graphs"""
+
+    def __init__(self):
+        self.logger = logger
+        self.load_service = JourneyLoadService()
+
+    def get_revision(self, journey_id: str) -> Optional[int]:
+        """Current revision of a journey, or None if the journey does not exist"""
+        with get_connection("journeys") as conn:
+            with conn.cursor() as cursor:
+                JOURNEY_REVISION.execute(cursor, (ensure_uuid(journey_id),))
+                row = cursor.fetchone()
+        return row[0] if row else None
+
+    async def analyze_journey(self, journey_id: str) -> APIResponse:
+        """Detect unreachable nodes, dangling edges and illegal cycles; compute ordering and longest path"""
+        try:
+            revision = self.get_revision(journey_id)
+            if revision is None:
+                return APIResponse(
+                    success=False,
+                    message="Journey not found",
+                    error="Journey not found"
+                )
+
+            analysis = analysis_cache.get(journey_id, revision)
+            if analysis is None:
+                canvas_response = await self.load_service.load_compact_canvas(journey_id)
+                if not canvas_response.success:
+                    return canvas_response
+                analysis = analyze_canvas(canvas_response.data["canvas"])
+                # A save between reading the revision and the canvas must not be cached under the old revision
+                if self.get_revision(journey_id) == revision:
+                    analysis_cache.put(journey_id, revision, analysis)
+
+            return APIResponse(
+                success=True,
+                message="Journey analysis completed successfully",
+                data={"revision": revision, "analysis": analysis}
+            )
+
+        except Exception as e:
+            self.logger.error(f"Error analyzing journey: {e}")
+            return APIResponse(
+                success=False,
+                message="Failed to analyze journey",
+                error=str(e)
+            )
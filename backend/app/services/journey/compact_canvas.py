@@ -0,0 +1,297 @@
+"""
+Compact, array-backed representation of a journey canvas for server-side processing.
+
+The API shape (a list of node dicts with nested ``position`` dicts, plus a list of edge
+dicts) costs several Python objects per node. ``CompactCanvas`` stores the same content
+column by column: positions in a NumPy array, node/edge types as codes into a shared
+interned string table, and edges as integer source/target indices with a lazily built
+CSR adjacency. It converts losslessly to and from the API shape.
+"""
+import sys
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .utils import safe_json_parse
+
+
+class StringTable:
+    """Interns a small vocabulary of strings (node types, subtypes, edge types) as int codes"""
+    __slots__ = ("values", "_codes")
+
+    # Code used for missing (None) values
+    NONE_CODE = -1
+
+    def __init__(self):
+        self.values: List[str] = []
+        self._codes: Dict[str, int] = {}
+
+    def code(self, value: Optional[str]) -> int:
+        if value is None:
+            return self.NONE_CODE
+        code = self._codes.get(value)
+        if code is None:
+            code = len(self.values)
+            value = sys.intern(value)
+            self.values.append(value)
+            self._codes[value] = code
+        return code
+
+    def lookup(self, value: Optional[str]) -> Optional[int]:
+        """Code of an existing value, or None if the value never occurred"""
+        if value is None:
+            return self.NONE_CODE
+        return self._codes.get(value)
+
+    def value(self, code: int) -> Optional[str]:
+        return None if code == self.NONE_CODE else self.values[code]
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+
+class CompactCanvas:
+    """Columnar container for journey nodes and edges"""
+    __slots__ = (
+        "strings",
+        # nodes
+        "node_ids", "node_index", "node_type_codes", "node_subtype_codes",
+        "positions", "has_position", "node_data", "node_selected",
+        # edges
+        "edge_ids", "edge_src", "edge_dst", "edge_type_codes",
+        "edge_data", "edge_style", "edge_selected", "edge_animated", "dangling_endpoints",
+        # lazily built adjacency
+        "_out_offsets", "_out_targets", "_out_edges",
+    )
+
+    def __init__(self):
+        self.strings = StringTable()
+
+        self.node_ids: List[str] = []
+        self.node_index: Dict[str, int] = {}
+        self.node_type_codes = np.empty(0, dtype=np.int16)
+        self.node_subtype_codes = np.empty(0, dtype=np.int16)
+        self.positions = np.empty((0, 2), dtype=np.float64)
+        self.has_position = np.empty(0, dtype=bool)
+        self.node_data: List[Dict[str, Any]] = []
+        self.node_selected = np.empty(0, dtype=bool)
+
+        self.edge_ids: List[str] = []
+        self.edge_src = np.empty(0, dtype=np.int32)
+        self.edge_dst = np.empty(0, dtype=np.int32)
+        self.edge_type_codes = np.empty(0, dtype=np.int16)
+        self.edge_data: List[Dict[str, Any]] = []
+        self.edge_style: List[Dict[str, Any]] = []
+        self.edge_selected = np.empty(0, dtype=bool)
+        self.edge_animated = np.empty(0, dtype=bool)
+        # Original (source, target) ids of edges whose endpoints are not nodes of this canvas,
+        # keyed by edge index; their edge_src/edge_dst entry is -1 for the unknown side
+        self.dangling_endpoints: Dict[int, Tuple[str, str]] = {}
+
+        self._out_offsets = None
+        self._out_targets = None
+        self._out_edges = None
+
+    # ------------------------------------------------------------------
+    # Construction
+    # ------------------------------------------------------------------
+
+    def _set_nodes(self, ids, types, subtypes, xs, ys, has_position, data, selected) -> None:
+        code = self.strings.code
+        self.node_ids = [sys.intern(node_id) for node_id in ids]
+        self.node_index = {node_id: i for i, node_id in enumerate(self.node_ids)}
+        self.node_type_codes = np.fromiter((code(t) for t in types), dtype=np.int16, count=len(self.node_ids))
+        self.node_subtype_codes = np.fromiter((code(t) for t in subtypes), dtype=np.int16, count=len(self.node_ids))
+        self.positions = np.column_stack((
+            np.asarray(xs, dtype=np.float64), np.asarray(ys, dtype=np.float64)
+        )) if self.node_ids else np.empty((0, 2), dtype=np.float64)
+        self.has_position = np.asarray(has_position, dtype=bool)
+        self.node_data = data
+        self.node_selected = np.asarray(selected, dtype=bool)
+
+    def _set_edges(self, ids, sources, targets, types, data, styles, selected, animated) -> None:
+        count = len(ids)
+        index = self.node_index
+        self.edge_ids = list(ids)
+        self.edge_src = np.empty(count, dtype=np.int32)
+        self.edge_dst = np.empty(count, dtype=np.int32)
+        self.dangling_endpoints = {}
+        for i, (source, target) in enumerate(zip(sources, targets)):
+            src = index.get(source, -1)
+            dst = index.get(target, -1)
+            self.edge_src[i] = src
+            self.edge_dst[i] = dst
+            if src < 0 or dst < 0:
+                self.dangling_endpoints[i] = (source, target)
+        code = self.strings.code
+        self.edge_type_codes = np.fromiter((code(t) for t in types), dtype=np.int16, count=count)
+        self.edge_data = data
+        self.edge_style = styles
+        self.edge_selected = np.asarray(selected, dtype=bool)
+        self.edge_animated = np.asarray(animated, dtype=bool)
+        self._out_offsets = self._out_targets = self._out_edges = None
+
+    @classmethod
+    def from_api(cls, nodes: Iterable[Any], edges: Iterable[Any]) -> "CompactCanvas":
+        """
+        Build from API-shaped nodes/edges (dicts using "node-subtype", or NodeData/EdgeData models).
+        Values are kept as given (an explicit null ``data`` stays null); absent keys take the
+        model defaults.
+        """
+        nodes = [n if isinstance(n, dict) else n.model_dump(by_alias=True) for n in nodes]
+        edges = [e if isinstance(e, dict) else e.model_dump(by_alias=True) for e in edges]
+        canvas = cls()
+
+        positions = [n.get("position") for n in nodes]
+        canvas._set_nodes(
+            ids=[n["id"] for n in nodes],
+            types=[n.get("type") for n in nodes],
+            subtypes=[n.get("node-subtype", n.get("node_subtype")) for n in nodes],
+            xs=[p["x"] if p else 0.0 for p in positions],
+            ys=[p["y"] if p else 0.0 for p in positions],
+            has_position=[p is not None for p in positions],
+            data=[n.get("data", {}) for n in nodes],
+            selected=[bool(n.get("selected", False)) for n in nodes],
+        )
+        canvas._set_edges(
+            ids=[e["id"] for e in edges],
+            sources=[e["source"] for e in edges],
+            targets=[e["target"] for e in edges],
+            types=[e.get("type") for e in edges],
+            data=[e.get("data", {}) for e in edges],
+            styles=[e.get("style", {}) for e in edges],
+            selected=[bool(e.get("selected", False)) for e in edges],
+            animated=[bool(e.get("animated", False)) for e in edges],
+        )
+        return canvas
+
+    @classmethod
+    def from_rows(cls, node_rows: Sequence[tuple], edge_rows: Sequence[tuple]) -> "CompactCanvas":
+        """
+        Build straight from database rows without creating per-node dicts.
+        node_rows: (node_id, node_type, node_subtype, position_x, position_y, data, selected)
+        edge_rows: (edge_id, source_node, target_node, data, selected, edge_type, animated, style)
+        """
+        canvas = cls()
+        canvas._set_nodes(
+            ids=[r[0] for r in node_rows],
+            types=[r[1] for r in node_rows],
+            subtypes=[r[2] for r in node_rows],
+            xs=[float(r[3] or 0) for r in node_rows],
+            ys=[float(r[4] or 0) for r in node_rows],
+            has_position=np.ones(len(node_rows), dtype=bool),
+            data=[safe_json_parse(r[5]) for r in node_rows],
+            selected=[bool(r[6]) for r in node_rows],
+        )
+        canvas._set_edges(
+            ids=[r[0] for r in edge_rows],
+            sources=[r[1] for r in edge_rows],
+            targets=[r[2] for r in edge_rows],
+            types=[r[5] for r in edge_rows],
+            data=[safe_json_parse(r[3]) for r in edge_rows],
+            styles=[safe_json_parse(r[7]) for r in edge_rows],
+            selected=[bool(r[4]) for r in edge_rows],
+            animated=[bool(r[6]) for r in edge_rows],
+        )
+        return canvas
+
+    # ------------------------------------------------------------------
+    # Conversion back to the API shape
+    # ------------------------------------------------------------------
+
+    def node_to_api(self, i: int) -> Dict[str, Any]:
+        return {
+            "id": self.node_ids[i],
+            "type": self.strings.value(int(self.node_type_codes[i])),
+            "node-subtype": self.strings.value(int(self.node_subtype_codes[i])),
+            "position": {"x": float(self.positions[i, 0]), "y": float(self.positions[i, 1])}
+            if self.has_position[i] else None,
+            "data": self.node_data[i],
+            "selected": bool(self.node_selected[i]),
+        }
+
+    def edge_to_api(self, i: int) -> Dict[str, Any]:
+        if i in self.dangling_endpoints:
+            source, target = self.dangling_endpoints[i]
+        else:
+            source, target = self.node_ids[self.edge_src[i]], self.node_ids[self.edge_dst[i]]
+        return {
+            "id": self.edge_ids[i],
+            "source": source,
+            "target": target,
+            "data": self.edge_data[i],
+            "selected": bool(self.edge_selected[i]),
+            "type": self.strings.value(int(self.edge_type_codes[i])),
+            "animated": bool(self.edge_animated[i]),
+            "style": self.edge_style[i],
+        }
+
+    def to_api(self) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+        """Return (nodes, edges) in the API/frontend shape"""
+        return (
+            [self.node_to_api(i) for i in range(self.num_nodes)],
+            [self.edge_to_api(i) for i in range(self.num_edges)],
+        )
+
+    # ------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------
+
+    @property
+    def num_nodes(self) -> int:
+        return len(self.node_ids)
+
+    @property
+    def num_edges(self) -> int:
+        return len(self.edge_ids)
+
+    def subtype_of(self, i: int) -> Optional[str]:
+        return self.strings.value(int(self.node_subtype_codes[i]))
+
+    def subtype_mask(self, subtype: str) -> np.ndarray:
+        """Boolean mask of nodes with the given node-subtype"""
+        code = self.strings.lookup(subtype)
+        if code is None:
+            return np.zeros(self.num_nodes, dtype=bool)
+        return self.node_subtype_codes == code
+
+    def subtype_counts(self) -> Dict[str, int]:
+        """Number of nodes per node-subtype"""
+        codes, counts = np.unique(self.node_subtype_codes, return_counts=True)
+        return {self.strings.value(int(c)) or "": int(n) for c, n in zip(codes, counts)}
+
+    def valid_edge_mask(self) -> np.ndarray:
+        """Edges whose source and target both exist on this canvas"""
+        return (self.edge_src >= 0) & (self.edge_dst >= 0)
+
+    def _build_adjacency(self) -> None:
+        valid = np.flatnonzero(self.valid_edge_mask()).astype(np.int32)
+        src = self.edge_src[valid]
+        order = np.argsort(src, kind="stable")
+        counts = np.bincount(src, minlength=self.num_nodes)
+        offsets = np.zeros(self.num_nodes + 1, dtype=np.int64)
+        np.cumsum(counts, out=offsets[1:])
+        self._out_offsets = offsets
+        self._out_edges = valid[order]
+        self._out_targets = self.edge_dst[self._out_edges]
+
+    def adjacency(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        CSR out-adjacency over valid edges: (offsets, targets, edge_indices).
+        Successors of node i are targets[offsets[i]:offsets[i + 1]].
+        """
+        if self._out_offsets is None:
+            self._build_adjacency()
+        return self._out_offsets, self._out_targets, self._out_edges
+
+    def successors(self, i: int) -> np.ndarray:
+        offsets, targets, _ = self.adjacency()
+        return targets[offsets[i]:offsets[i + 1]]
+
+    def out_degree(self) -> np.ndarray:
+        offsets, _, _ = self.adjacency()
+        return np.diff(offsets)
+
+    def in_degree(self) -> np.ndarray:
+        dst = self.edge_dst[self.valid_edge_mask()]
+        return np.bincount(dst, minlength=self.num_nodes)
@@ -1,13 +1,15 @@
-import json
 from typing import Optional
 from uuid import UUID
 
 from ...models.journey_models import CompleteJourneyState, APIResponse
-from .utils import get_connection, json_serial
+from .utils import get_connection
+from ...shared_services.serialization import to_jsonb
 from ...shared_services.logger_setup import setup_logger
+from ...shared_services.tracing import trace_methods
 
 logger = setup_logger()
 
+@trace_methods
 class JourneyCreateService:
     """Service for creating new journeys"""
     
@@ -28,7 +30,7 @@ class JourneyCreateService:
                                            is_archived, is_locked, is_read_only, is_editable, 
                                            is_view_only, user_id, created_at, updated_at)
                         VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-                        RETURNING id
+                        RETURNING id, revision
                     """, (
                         journey_data.name, journey_data.description,
                         journey_data.isPublished, journey_data.isDeleted, journey_data.isArchived,
@@ -36,8 +38,8 @@ class JourneyCreateService:
                         journey_data.isViewOnly, user_id, journey_data.createdAt, journey_data.updatedAt
                     ))
                     
-                    # Get the generated journey ID
-                    journey_id = cursor.fetchone()[0]
+                    # Get the generated journey ID and its first revision
+                    journey_id, revision = cursor.fetchone()
                     
                     # Insert nodes
                     for node in journey_data.nodes:
@@ -47,7 +49,7 @@ class JourneyCreateService:
                             VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
                         """, (
                             journey_id, node.id, node.type, node.node_subtype,
-                            node.position.x, node.position.y, json.dumps(node.data), node.selected
+                            node.position.x, node.position.y, to_jsonb(node.data), node.selected
                         ))
                     
                     # Insert edges
@@ -58,7 +60,7 @@ class JourneyCreateService:
                             VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
                         """, (
                             journey_id, edge.id, edge.source, edge.target,
-                            json.dumps(edge.data), edge.selected, edge.type, edge.animated, json.dumps(edge.style)
+                            to_jsonb(edge.data), edge.selected, edge.type, edge.animated, to_jsonb(edge.style)
                         ))
                     
                     # Insert goals
@@ -82,7 +84,7 @@ class JourneyCreateService:
                             VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
                         """, (
                             journey_id, milestone.id, milestone.title, milestone.description,
-                            milestone.targetDate, milestone.status.value, milestone.progress, json.dumps(milestone.dependencies)
+                            milestone.targetDate, milestone.status.value, milestone.progress, to_jsonb(milestone.dependencies)
                         ))
                     
                     # Insert reports
@@ -93,7 +95,7 @@ class JourneyCreateService:
                             VALUES (%s, %s, %s, %s, %s, %s)
                         """, (
                             journey_id, report.id, report.name, report.type.value,
-                            report.generatedAt, json.dumps(report.data)
+                            report.generatedAt, to_jsonb(report.data)
                         ))
                     
                     # Commit transaction
@@ -103,7 +105,7 @@ class JourneyCreateService:
                     return APIResponse(
                         success=True,
                         message="Journey created successfully",
-                        data={"journey_id": str(journey_id)}
+                        data={"journey_id": str(journey_id), "revision": revision}
                     )
                     
         except Exception as e:
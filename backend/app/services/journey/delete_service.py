@@ -1,9 +1,11 @@
 from ...models.journey_models import APIResponse
 from .utils import get_connection, ensure_uuid
 from ...shared_services.logger_setup import setup_logger
+from ...shared_services.tracing import trace_methods
 
 logger = setup_logger()
 
+@trace_methods
 class JourneyDeleteService:
     """Service for deleting journeys"""
     
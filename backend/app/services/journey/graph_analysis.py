@@ -0,0 +1,185 @@
+"""
+Linear-time structural analysis of a journey graph.
+
+All passes run over the integer CSR adjacency of a CompactCanvas:
+- reachability from Entry nodes (BFS)
+- dangling edges (endpoints that are not nodes of the journey)
+- strongly connected components (iterative Tarjan); a cycle is legal only if it
+  passes through a Loop node
+- topological order and longest path over the SCC condensation, where every
+  cycle counts as a single step
+"""
+from collections import deque
+from typing import Any, Dict, List, Tuple
+
+from .compact_canvas import CompactCanvas
+
+ENTRY_SUBTYPE = "entry"
+LOOP_SUBTYPE = "loop"
+
+
+def strongly_connected_components(num_nodes: int, offsets: List[int], targets: List[int]) -> Tuple[List[int], List[List[int]]]:
+    """
+    Iterative Tarjan SCC.
+    Returns (component id per node, members per component). Components are emitted
+    in reverse topological order of the condensation (sinks first).
+    """
+    index = [-1] * num_nodes
+    low = [0] * num_nodes
+    on_stack = [False] * num_nodes
+    component = [-1] * num_nodes
+    components: List[List[int]] = []
+    stack: List[int] = []
+    counter = 0
+
+    for root in range(num_nodes):
+        if index[root] != -1:
+            continue
+        index[root] = low[root] = counter
+        counter += 1
+        stack.append(root)
+        on_stack[root] = True
+        work = [[root, offsets[root]]]
+
+        while work:
+            frame = work[-1]
+            v, pos = frame
+            if pos < offsets[v + 1]:
+                frame[1] = pos + 1
+                w = targets[pos]
+                if index[w] == -1:
+                    index[w] = low[w] = counter
+                    counter += 1
+                    stack.append(w)
+                    on_stack[w] = True
+                    work.append([w, offsets[w]])
+                elif on_stack[w] and index[w] < low[v]:
+                    low[v] = index[w]
+                continue
+
+            work.pop()
+            if work:
+                parent = work[-1][0]
+                if low[v] < low[parent]:
+                    low[parent] = low[v]
+            if low[v] == index[v]:
+                members = []
+                comp_id = len(components)
+                while True:
+                    w = stack.pop()
+                    on_stack[w] = False
+                    component[w] = comp_id
+                    members.append(w)
+                    if w == v:
+                        break
+                components.append(members)
+
+    return component, components
+
+
+def analyze_canvas(canvas: CompactCanvas) -> Dict[str, Any]:
+    """Run every structural check over a canvas and return a JSON-ready report"""
+    n = canvas.num_nodes
+    node_ids = canvas.node_ids
+    offsets_arr, targets_arr, _ = canvas.adjacency()
+    offsets = offsets_arr.tolist()
+    targets = targets_arr.tolist()
+
+    entry_mask = canvas.subtype_mask(ENTRY_SUBTYPE)
+    loop_mask = canvas.subtype_mask(LOOP_SUBTYPE).tolist()
+    entries = entry_mask.nonzero()[0].tolist()
+
+    # Reachability from Entry nodes
+    reached = [False] * n
+    queue = deque(entries)
+    for i in entries:
+        reached[i] = True
+    while queue:
+        v = queue.popleft()
+        for pos in range(offsets[v], offsets[v + 1]):
+            w = targets[pos]
+            if not reached[w]:
+                reached[w] = True
+                queue.append(w)
+    unreachable = [node_ids[i] for i in range(n) if not reached[i]]
+
+    # Dangling edges
+    dangling = []
+    for i, (source, target) in sorted(canvas.dangling_endpoints.items()):
+        dangling.append({
+            "id": canvas.edge_ids[i],
+            "source": source,
+            "target": target,
+            "missingSource": source not in canvas.node_index,
+            "missingTarget": target not in canvas.node_index,
+        })
+
+    # Cycles
+    component, components = strongly_connected_components(n, offsets, targets)
+    has_self_loop = [False] * n
+    valid_edges = canvas.valid_edge_mask()
+    for v in canvas.edge_src[valid_edges & (canvas.edge_src == canvas.edge_dst)].tolist():
+        has_self_loop[v] = True
+
+    cyclic = [False] * len(components)
+    loop_cycles = 0
+    illegal_cycles = []
+    for comp_id, members in enumerate(components):
+        if len(members) > 1 or has_self_loop[members[0]]:
+            cyclic[comp_id] = True
+            if any(loop_mask[v] for v in members):
+                loop_cycles += 1
+            else:
+                illegal_cycles.append([node_ids[v] for v in reversed(members)])
+
+    # Topological order over the condensation (Tarjan emits sinks first)
+    topo_components = list(range(len(components) - 1, -1, -1))
+    topological_order = [node_ids[v] for c in topo_components for v in reversed(components[c])]
+
+    # Longest path over the condensation, one step per component
+    comp_successors: List[List[int]] = [[] for _ in components]
+    for v in range(n):
+        cv = component[v]
+        for pos in range(offsets[v], offsets[v + 1]):
+            cw = component[targets[pos]]
+            if cw != cv:
+                comp_successors[cv].append(cw)
+
+    depth = [0] * len(components)
+    parent = [-1] * len(components)
+    for c in topo_components:
+        next_depth = depth[c] + 1
+        for d in comp_successors[c]:
+            if next_depth > depth[d]:
+                depth[d] = next_depth
+                parent[d] = c
+
+    longest_nodes = []
+    if components:
+        end = max(range(len(components)), key=depth.__getitem__)
+        chain = []
+        while end != -1:
+            chain.append(end)
+            end = parent[end]
+        for c in reversed(chain):
+            members = components[c]
+            # A cycle is represented by its Loop node when it has one
+            representative = next((v for v in members if loop_mask[v]), members[-1])
+            longest_nodes.append(node_ids[representative])
+
+    return {
+        "nodeCount": n,
+        "edgeCount": canvas.num_edges,
+        "entryNodes": [node_ids[i] for i in entries],
+        "unreachableNodes": unreachable,
+        "danglingEdges": dangling,
+        "illegalCycles": illegal_cycles,
+        "loopCycles": loop_cycles,
+        "isAcyclic": not any(cyclic),
+        "topologicalOrder": topological_order,
+        "longestPath": {
+            "length": max(len(longest_nodes) - 1, 0),
+            "nodes": longest_nodes,
+        },
+        "valid": bool(entries) and not unreachable and not dangling and not illegal_cycles,
+    }
@@ -3,9 +3,11 @@ from typing import Optional
 from ...models.journey_models import APIResponse
 from .utils import get_connection
 from ...shared_services.logger_setup import setup_logger
+from ...shared_services.tracing import trace_methods
 
 logger = setup_logger()
 
+@trace_methods
 class JourneyListService:
     """Service for listing journeys"""
     
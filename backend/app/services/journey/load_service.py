@@ -1,12 +1,122 @@
 from typing import Optional
 from uuid import UUID
 
-from ...models.journey_models import CompleteJourneyState, APIResponse
+from ...models.journey_models import (
+    CompleteJourneyState, APIResponse, NodeData, EdgeData, GoalData, MilestoneData, ReportData,
+    Position, GoalStatus, MilestoneStatus, Priority, ReportType
+)
 from .utils import get_connection, ensure_uuid, safe_json_parse
+from .compact_canvas import CompactCanvas
 from ...shared_services.logger_setup import setup_logger
+from ...shared_services.prepared import PreparedStatement
+from ...shared_services.tracing import trace_methods
 
 logger = setup_logger()
 
+# Hot per-journey reads, prepared once per pooled connection
+JOURNEY_METADATA = PreparedStatement("journey_metadata", """
+    SELECT name, description, is_published, is_deleted, is_archived,
+           is_locked, is_read_only, is_editable, is_view_only,
+           created_at, updated_at, revision
+    FROM journeys WHERE id = %s
+""")
+JOURNEY_NODES = PreparedStatement("journey_nodes_by_journey", """
+    SELECT node_id, node_type, node_subtype, position_x, position_y, data, selected
+    FROM journey_nodes WHERE journey_id = %s
+""")
+JOURNEY_EDGES = PreparedStatement("journey_edges_by_journey", """
+    SELECT edge_id, source_node, target_node, data, selected, edge_type, animated, style
+    FROM journey_edges WHERE journey_id = %s
+""")
+JOURNEY_GOALS = PreparedStatement("journey_goals_by_journey", """
+    SELECT goal_id, title, description, target_value, current_value, unit,
+           deadline, status, priority, category, created_at, updated_at
+    FROM journey_goals WHERE journey_id = %s
+""")
+JOURNEY_MILESTONES = PreparedStatement("journey_milestones_by_journey", """
+    SELECT milestone_id, title, description, target_date, status, progress, dependencies, created_at, updated_at
+    FROM journey_milestones WHERE journey_id = %s
+""")
+JOURNEY_REPORTS = PreparedStatement("journey_reports_by_journey", """
+    SELECT report_id, name, report_type, generated_at, data
+    FROM journey_reports WHERE journey_id = %s
+""")
+
+def _coerce_enum(enum_cls, value, default):
+    """Map a stored status/priority/type string onto its enum, falling back to the default"""
+    try:
+        return enum_cls(value)
+    except ValueError:
+        return default
+
+# Row -> model builders for trusted database rows (no field-by-field validation)
+
+def node_from_row(row) -> NodeData:
+    """Build NodeData from a (node_id, node_type, node_subtype, position_x, position_y, data, selected) row"""
+    return NodeData.model_construct(
+        id=row[0],
+        type=row[1],
+        node_subtype=row[2],
+        position=Position.model_construct(x=float(row[3] or 0), y=float(row[4] or 0)),
+        data=safe_json_parse(row[5]),
+        selected=bool(row[6])
+    )
+
+def edge_from_row(row) -> EdgeData:
+    """Build EdgeData from a (edge_id, source_node, target_node, data, selected, edge_type, animated, style) row"""
+    return EdgeData.model_construct(
+        id=row[0],
+        source=row[1],
+        target=row[2],
+        data=safe_json_parse(row[3]),
+        selected=bool(row[4]),
+        type=row[5],
+        animated=bool(row[6]),
+        style=safe_json_parse(row[7])
+    )
+
+def goal_from_row(row) -> GoalData:
+    """Build GoalData from a journey_goals row"""
+    return GoalData.model_construct(
+        id=row[0],
+        title=row[1],
+        description=row[2] or "",
+        targetValue=float(row[3] or 0),
+        currentValue=float(row[4] or 0),
+        unit=row[5],
+        deadline=row[6],
+        status=_coerce_enum(GoalStatus, row[7], GoalStatus.NOT_STARTED),
+        priority=_coerce_enum(Priority, row[8], Priority.MEDIUM),
+        category=row[9] or "",
+        createdAt=row[10],
+        updatedAt=row[11]
+    )
+
+def milestone_from_row(row) -> MilestoneData:
+    """Build MilestoneData from a journey_milestones row"""
+    return MilestoneData.model_construct(
+        id=row[0],
+        title=row[1],
+        description=row[2] or "",
+        targetDate=row[3],
+        status=_coerce_enum(MilestoneStatus, row[4], MilestoneStatus.PENDING),
+        progress=row[5] or 0,
+        dependencies=safe_json_parse(row[6]) or [],
+        createdAt=row[7],
+        updatedAt=row[8]
+    )
+
+def report_from_row(row) -> ReportData:
+    """Build ReportData from a journey_reports row"""
+    return ReportData.model_construct(
+        id=row[0],
+        name=row[1],
+        type=_coerce_enum(ReportType, row[2], ReportType.SUMMARY),
+        generatedAt=row[3],
+        data=safe_json_parse(row[4])
+    )
+
+@trace_methods
 class JourneyLoadService:
     """Service for loading journeys"""
     
@@ -21,12 +131,7 @@ class JourneyLoadService:
                     journey_uuid = ensure_uuid(journey_id)
                     
                     # Get journey metadata
-                    cursor.execute("""
-                        SELECT name, description, is_published, is_deleted, is_archived,
-                               is_locked, is_read_only, is_editable, is_view_only,
-                               created_at, updated_at
-                        FROM journeys WHERE id = %s
-                    """, (journey_uuid,))
+                    JOURNEY_METADATA.execute(cursor, (journey_uuid,))
                     
                     journey_row = cursor.fetchone()
                     if not journey_row:
@@ -37,127 +142,52 @@ class JourneyLoadService:
                         )
                     
                     # Get nodes
-                    cursor.execute("""
-                        SELECT node_id, node_type, node_subtype, position_x, position_y, data, selected
-                        FROM journey_nodes WHERE journey_id = %s
-                    """, (journey_uuid,))
+                    JOURNEY_NODES.execute(cursor, (journey_uuid,))
                     nodes_data = cursor.fetchall()
                     
                     # Get edges
-                    cursor.execute("""
-                        SELECT edge_id, source_node, target_node, data, selected, edge_type, animated, style
-                        FROM journey_edges WHERE journey_id = %s
-                    """, (journey_uuid,))
+                    JOURNEY_EDGES.execute(cursor, (journey_uuid,))
                     edges_data = cursor.fetchall()
                     
                     # Get goals
-                    cursor.execute("""
-                        SELECT goal_id, title, description, target_value, current_value, unit,
-                               deadline, status, priority, category, created_at, updated_at
-                        FROM journey_goals WHERE journey_id = %s
-                    """, (journey_uuid,))
+                    JOURNEY_GOALS.execute(cursor, (journey_uuid,))
                     goals_data = cursor.fetchall()
                     
                     # Get milestones
-                    cursor.execute("""
-                        SELECT milestone_id, title, description, target_date, status, progress, dependencies, created_at, updated_at
-                        FROM journey_milestones WHERE journey_id = %s
-                    """, (journey_uuid,))
+                    JOURNEY_MILESTONES.execute(cursor, (journey_uuid,))
                     milestones_data = cursor.fetchall()
                     
                     # Get reports
-                    cursor.execute("""
-                        SELECT report_id, name, report_type, generated_at, data
-                        FROM journey_reports WHERE journey_id = %s
-                    """, (journey_uuid,))
+                    JOURNEY_REPORTS.execute(cursor, (journey_uuid,))
                     reports_data = cursor.fetchall()
                     
-                    # Build complete journey state
-                    journey_state = CompleteJourneyState(
+                    # Rows come from our own database, so build the models with
+                    # model_construct instead of validating every field again
+                    journey_state = CompleteJourneyState.model_construct(
                         id=journey_id,
                         name=journey_row[0],
-                        description=journey_row[1],
+                        description=journey_row[1] or "",
                         createdAt=journey_row[9],
                         updatedAt=journey_row[10],
-                        isPublished=journey_row[2],
-                        isDeleted=journey_row[3],
-                        isArchived=journey_row[4],
-                        isLocked=journey_row[5],
-                        isReadOnly=journey_row[6],
-                        isEditable=journey_row[7],
-                        isViewOnly=journey_row[8],
-                        nodes=[], edges=[], goals=[], milestones=[], reports=[]
+                        revision=journey_row[11],
+                        isPublished=bool(journey_row[2]),
+                        isDeleted=bool(journey_row[3]),
+                        isArchived=bool(journey_row[4]),
+                        isLocked=bool(journey_row[5]),
+                        isReadOnly=bool(journey_row[6]),
+                        isEditable=bool(journey_row[7]),
+                        isViewOnly=bool(journey_row[8]),
+                        nodes=[node_from_row(row) for row in nodes_data],
+                        edges=[edge_from_row(row) for row in edges_data],
+                        goals=[goal_from_row(row) for row in goals_data],
+                        milestones=[milestone_from_row(row) for row in milestones_data],
+                        reports=[report_from_row(row) for row in reports_data]
                     )
                     
-                    # Process nodes
-                    for node_row in nodes_data:
-                        journey_state.nodes.append({
-                            "id": node_row[0],
-                            "type": node_row[1],
-                            "node-subtype": node_row[2],
-                            "position": {"x": node_row[3], "y": node_row[4]},
-                            "data": safe_json_parse(node_row[5]),
-                            "selected": node_row[6]
-                        })
-                    
-                    # Process edges
-                    for edge_row in edges_data:
-                        journey_state.edges.append({
-                            "id": edge_row[0],
-                            "source": edge_row[1],
-                            "target": edge_row[2],
-                            "data": safe_json_parse(edge_row[3]),
-                            "selected": edge_row[4],
-                            "type": edge_row[5],
-                            "animated": edge_row[6],
-                            "style": safe_json_parse(edge_row[7])
-                        })
-                    
-                    # Process goals
-                    for goal_row in goals_data:
-                        journey_state.goals.append({
-                            "id": goal_row[0],
-                            "title": goal_row[1],
-                            "description": goal_row[2],
-                            "targetValue": goal_row[3],
-                            "currentValue": goal_row[4],
-                            "unit": goal_row[5],
-                            "deadline": goal_row[6],
-                            "status": goal_row[7],
-                            "priority": goal_row[8],
-                            "category": goal_row[9],
-                            "createdAt": goal_row[10],
-                            "updatedAt": goal_row[11]
-                        })
-                    
-                    # Process milestones
-                    for milestone_row in milestones_data:
-                        journey_state.milestones.append({
-                            "id": milestone_row[0],
-                            "title": milestone_row[1],
-                            "description": milestone_row[2],
-                            "targetDate": milestone_row[3],
-                            "status": milestone_row[4],
-                            "progress": milestone_row[5],
-                            "dependencies": safe_json_parse(milestone_row[6]) or [],
-                            "createdAt": milestone_row[7],
-                            "updatedAt": milestone_row[8]
-                        })
-                    
-                    # Process reports
-                    for report_row in reports_data:
-                        journey_state.reports.append({
-                            "id": report_row[0],
-                            "name": report_row[1],
-                            "type": report_row[2],
-                            "generatedAt": report_row[3],
-                            "data": safe_json_parse(report_row[4])
-                        })
-                    
                     return APIResponse(
                         success=True,
                         message="Journey loaded successfully",
-                        data={"journey": journey_state.dict()}
+                        data={"journey": journey_state}
                     )
                     
         except Exception as e:
@@ -176,17 +206,11 @@ class JourneyLoadService:
                     journey_uuid = ensure_uuid(journey_id)
                     
                     # Get nodes
-                    cursor.execute("""
-                        SELECT node_id, node_type, node_subtype, position_x, position_y, data, selected
-                        FROM journey_nodes WHERE journey_id = %s
-                    """, (journey_uuid,))
+                    JOURNEY_NODES.execute(cursor, (journey_uuid,))
                     nodes_data = cursor.fetchall()
                     
                     # Get edges
-                    cursor.execute("""
-                        SELECT edge_id, source_node, target_node, data, selected, edge_type, animated, style
-                        FROM journey_edges WHERE journey_id = %s
-                    """, (journey_uuid,))
+                    JOURNEY_EDGES.execute(cursor, (journey_uuid,))
                     edges_data = cursor.fetchall()
                     
                     # Process nodes
@@ -229,6 +253,33 @@ class JourneyLoadService:
                 error=str(e)
             )
     
+    async def load_compact_canvas(self, journey_id: str) -> APIResponse:
+        """Load nodes and edges into a CompactCanvas for server-side processing"""
+        try:
+            with get_connection("journeys") as conn:
+                with conn.cursor() as cursor:
+                    journey_uuid = ensure_uuid(journey_id)
+                    
+                    JOURNEY_NODES.execute(cursor, (journey_uuid,))
+                    nodes_data = cursor.fetchall()
+                    
+                    JOURNEY_EDGES.execute(cursor, (journey_uuid,))
+                    edges_data = cursor.fetchall()
+                    
+                    return APIResponse(
+                        success=True,
+                        message="Canvas loaded successfully",
+                        data={"canvas": CompactCanvas.from_rows(nodes_data, edges_data)}
+                    )
+                    
+        except Exception as e:
+            self.logger.error(f"Error loading compact canvas: {e}")
+            return APIResponse(
+                success=False,
+                message="Failed to load journey canvas",
+                error=str(e)
+            )
+    
     async def get_journey_goals(self, journey_id: str) -> APIResponse:
         """Get journey goals only"""
         try:
@@ -236,11 +287,7 @@ class JourneyLoadService:
                 with conn.cursor() as cursor:
                     journey_uuid = ensure_uuid(journey_id)
                     
-                    cursor.execute("""
-                        SELECT goal_id, title, description, target_value, current_value, unit,
-                               deadline, status, priority, category, created_at, updated_at
-                        FROM journey_goals WHERE journey_id = %s
-                    """, (journey_uuid,))
+                    JOURNEY_GOALS.execute(cursor, (journey_uuid,))
                     goals_data = cursor.fetchall()
                     
                     goals = []
@@ -281,10 +328,7 @@ class JourneyLoadService:
                 with conn.cursor() as cursor:
                     journey_uuid = ensure_uuid(journey_id)
                     
-                    cursor.execute("""
-                        SELECT milestone_id, title, description, target_date, status, progress, dependencies, created_at, updated_at
-                        FROM journey_milestones WHERE journey_id = %s
-                    """, (journey_uuid,))
+                    JOURNEY_MILESTONES.execute(cursor, (journey_uuid,))
                     milestones_data = cursor.fetchall()
                     
                     milestones = []
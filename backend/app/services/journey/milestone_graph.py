@@ -0,0 +1,290 @@
+"""
+Milestone dependency graph.
+
+``journey_milestones.dependencies`` lists the milestone ids a milestone waits for. The
+graph is built once per milestone revision (O(V + E), Kahn's algorithm, rejecting cycles)
+into integer adjacency lists, a topological rank and per-milestone counters:
+
+- ``pending[i]``: dependencies of i that are not satisfied yet; i is ready when it is 0.
+  A status change only touches the dependents of the changed milestone.
+- ``estimate[i]``: earliest completion of i, the latest of its own targetDate and the
+  estimates of its unfinished dependencies. A status change re-evaluates dependents in
+  rank order and stops wherever an estimate does not move.
+
+The critical path is the dependency chain that determines the latest estimate.
+"""
+import heapq
+import threading
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Sequence
+
+# Statuses after which a milestone no longer holds up its dependents
+SATISFIED_STATUSES = {"completed", "cancelled", "deleted", "archived"}
+
+NO_ESTIMATE = 0.0
+
+
+class MilestoneCycleError(ValueError):
+    """Raised when milestone dependencies form a cycle"""
+
+    def __init__(self, cycle: List[str]):
+        self.cycle = cycle
+        super().__init__(f"Milestone dependencies contain a cycle: {' -> '.join(cycle)}")
+
+
+class StatusChange(NamedTuple):
+    unblocked: List[str]   # dependents that became ready
+    blocked: List[str]     # dependents that are waiting again
+
+
+def _timestamp(value: Any) -> float:
+    """Epoch seconds of a targetDate (naive values are UTC); NO_ESTIMATE when missing"""
+    if value is None:
+        return NO_ESTIMATE
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.timestamp()
+
+
+def _datetime(timestamp: float) -> Optional[datetime]:
+    return datetime.fromtimestamp(timestamp, timezone.utc) if timestamp != NO_ESTIMATE else None
+
+
+def find_cycle(dependencies: Sequence[Sequence[int]], candidates: Iterable[int]) -> List[int]:
+    """A dependency cycle among ``candidates`` (nodes Kahn's algorithm could not order), first node repeated"""
+    color: Dict[int, int] = {}
+    for root in candidates:
+        if root in color:
+            continue
+        path = [root]
+        color[root] = 1
+        work = [iter(dependencies[root])]
+        while work:
+            for dependency in work[-1]:
+                if color.get(dependency) == 1:
+                    return path[path.index(dependency):] + [dependency]
+                if dependency not in color:
+                    color[dependency] = 1
+                    path.append(dependency)
+                    work.append(iter(dependencies[dependency]))
+                    break
+            else:
+                color[path.pop()] = 2
+                work.pop()
+    return []
+
+
+class MilestoneGraph:
+    """In-memory dependency DAG of a journey's milestones"""
+
+    def __init__(self, milestones: Sequence[Dict[str, Any]], allow_cycles: bool = False):
+        """
+        ``milestones`` are dicts with ``id``, ``status``, ``targetDate`` and ``dependencies``.
+        Unknown dependency ids are ignored (listed in ``missing``). With ``allow_cycles``
+        the dependencies closing a cycle are dropped instead of raising MilestoneCycleError.
+        """
+        self._lock = threading.Lock()
+        self.ids = [str(m["id"]) for m in milestones]
+        self.index = {milestone_id: i for i, milestone_id in enumerate(self.ids)}
+        n = len(self.ids)
+
+        self.missing: Dict[str, List[str]] = {}
+        self.dependencies: List[List[int]] = [[] for _ in range(n)]
+        for i, milestone in enumerate(milestones):
+            seen = set()
+            for dependency in milestone.get("dependencies") or []:
+                j = self.index.get(str(dependency))
+                if j is None:
+                    self.missing.setdefault(self.ids[i], []).append(str(dependency))
+                elif j not in seen:
+                    seen.add(j)
+                    self.dependencies[i].append(j)
+
+        self.dependents: List[List[int]] = [[] for _ in range(n)]
+        for i, deps in enumerate(self.dependencies):
+            for j in deps:
+                self.dependents[j].append(i)
+
+        # Kahn's algorithm: dependencies before dependents
+        indegree = [len(deps) for deps in self.dependencies]
+        order = [i for i in range(n) if indegree[i] == 0]
+        for i in order:
+            for d in self.dependents[i]:
+                indegree[d] -= 1
+                if indegree[d] == 0:
+                    order.append(d)
+        cyclic = len(order) < n
+        if cyclic:
+            unordered = [i for i in range(n) if indegree[i] > 0]
+            if not allow_cycles:
+                cycle = find_cycle(self.dependencies, unordered)
+                raise MilestoneCycleError([self.ids[i] for i in cycle])
+            order.extend(unordered)
+
+        self.order = order
+        self.rank = [0] * n
+        for position, i in enumerate(order):
+            self.rank[i] = position
+        if cyclic:
+            # Drop the dependencies that point forward in the order (they close a cycle)
+            self.dependencies = [
+                [j for j in deps if self.rank[j] < self.rank[i]] for i, deps in enumerate(self.dependencies)
+            ]
+            self.dependents = [[] for _ in range(n)]
+            for i, deps in enumerate(self.dependencies):
+                for j in deps:
+                    self.dependents[j].append(i)
+
+        self.status = [str(m.get("status") or "pending") for m in milestones]
+        self.target = [_timestamp(m.get("targetDate")) for m in milestones]
+        self.satisfied = [status in SATISFIED_STATUSES for status in self.status]
+        self.pending = [sum(1 for j in deps if not self.satisfied[j]) for deps in self.dependencies]
+        self.estimate = [NO_ESTIMATE] * n
+        self.driver = [-1] * n
+        for i in order:
+            self._evaluate(i)
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    # ------------------------------------------------------------------
+    # Incremental updates
+    # ------------------------------------------------------------------
+
+    def _evaluate(self, i: int) -> bool:
+        """Recompute the estimate of i from its dependencies; True if it changed"""
+        if self.satisfied[i]:
+            estimate, driver = NO_ESTIMATE, -1
+        else:
+            estimate, driver = self.target[i], -1
+            for j in self.dependencies[i]:
+                if self.estimate[j] > estimate:
+                    estimate, driver = self.estimate[j], j
+        changed = estimate != self.estimate[i]
+        self.estimate[i] = estimate
+        self.driver[i] = driver
+        return changed
+
+    def _propagate(self, start: int) -> None:
+        """Re-evaluate the dependents of ``start`` in rank order, stopping where estimates do not change"""
+        queue = [(self.rank[d], d) for d in self.dependents[start]]
+        heapq.heapify(queue)
+        queued = set(d for _, d in queue)
+        while queue:
+            _, i = heapq.heappop(queue)
+            queued.discard(i)
+            if self._evaluate(i):
+                for d in self.dependents[i]:
+                    if d not in queued:
+                        queued.add(d)
+                        heapq.heappush(queue, (self.rank[d], d))
+
+    def set_status(self, milestone_id: str, status: str) -> StatusChange:
+        """Apply a status change; touches only the dependents of the milestone (and estimates that move)"""
+        with self._lock:
+            i = self.index[milestone_id]
+            self.status[i] = status
+            satisfied = status in SATISFIED_STATUSES
+            unblocked: List[str] = []
+            blocked: List[str] = []
+            if satisfied != self.satisfied[i]:
+                self.satisfied[i] = satisfied
+                for d in self.dependents[i]:
+                    if satisfied:
+                        self.pending[d] -= 1
+                        if self.pending[d] == 0 and not self.satisfied[d]:
+                            unblocked.append(self.ids[d])
+                    else:
+                        if self.pending[d] == 0 and not self.satisfied[d]:
+                            blocked.append(self.ids[d])
+                        self.pending[d] += 1
+                if self._evaluate(i):
+                    self._propagate(i)
+            return StatusChange(unblocked, blocked)
+
+    def set_target_date(self, milestone_id: str, target_date: Any) -> None:
+        with self._lock:
+            i = self.index[milestone_id]
+            self.target[i] = _timestamp(target_date)
+            if self._evaluate(i):
+                self._propagate(i)
+
+    # ------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------
+
+    def is_ready(self, milestone_id: str) -> bool:
+        i = self.index[milestone_id]
+        return not self.satisfied[i] and self.pending[i] == 0
+
+    def ready(self) -> List[str]:
+        """Unfinished milestones whose dependencies are all satisfied, in dependency order"""
+        return [self.ids[i] for i in self.order if not self.satisfied[i] and self.pending[i] == 0]
+
+    def blocked_by(self, milestone_id: str) -> List[str]:
+        i = self.index[milestone_id]
+        return [self.ids[j] for j in self.dependencies[i] if not self.satisfied[j]]
+
+    def topological_order(self) -> List[str]:
+        return [self.ids[i] for i in self.order]
+
+    def critical_path(self) -> List[str]:
+        """Chain of unfinished milestones that determines the latest completion estimate, earliest first"""
+        with self._lock:
+            # Satisfied milestones carry NO_ESTIMATE, so the plain max only sees unfinished ones
+            latest_estimate = max(self.estimate, default=NO_ESTIMATE)
+            if latest_estimate == NO_ESTIMATE:
+                return []
+            estimate = self.estimate
+            latest = max((i for i, value in enumerate(estimate) if value == latest_estimate), key=self.rank.__getitem__)
+            path = []
+            while latest != -1:
+                path.append(self.ids[latest])
+                latest = self.driver[latest]
+            path.reverse()
+            return path
+
+    def earliest_completion(self, milestone_id: Optional[str] = None,
+                            now: Optional[datetime] = None) -> Optional[datetime]:
+        """
+        Earliest completion estimate of a milestone (of all milestones if None); never
+        before ``now``. None when nothing is left or no target dates constrain it.
+        """
+        if milestone_id is None:
+            estimate = max(self.estimate, default=NO_ESTIMATE)
+        else:
+            estimate = self.estimate[self.index[milestone_id]]
+        if estimate == NO_ESTIMATE:
+            return None
+        if now is not None:
+            estimate = max(estimate, now.timestamp())
+        return _datetime(estimate)
+
+    def summary(self, now: Optional[datetime] = None) -> Dict[str, Any]:
+        """Readiness, estimates and critical path of every milestone (API view)"""
+        now = now or datetime.now(timezone.utc)
+        milestones = []
+        for i in self.order:
+            milestone_id = self.ids[i]
+            estimate = self.earliest_completion(milestone_id, now) if not self.satisfied[i] else None
+            target = _datetime(self.target[i])
+            milestones.append({
+                "milestoneId": milestone_id,
+                "status": self.status[i],
+                "ready": not self.satisfied[i] and self.pending[i] == 0,
+                "blockedBy": self.blocked_by(milestone_id),
+                "targetDate": target,
+                "estimatedCompletion": estimate,
+                "slipSeconds": max(round((estimate - target).total_seconds()), 0) if estimate and target else 0,
+                "missingDependencies": self.missing.get(milestone_id, []),
+            })
+        return {
+            "order": self.topological_order(),
+            "ready": self.ready(),
+            "criticalPath": self.critical_path(),
+            "earliestCompletion": self.earliest_completion(now=now),
+            "milestones": milestones,
+        }
+
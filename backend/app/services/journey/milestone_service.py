@@ -0,0 +1,152 @@
+from typing import Optional, Tuple
+
+from ...models.journey_models import APIResponse
+from .utils import get_connection, ensure_uuid, safe_json_parse
+from .milestone_graph import MilestoneGraph, MilestoneCycleError
+from ...shared_services.prepared import PreparedStatement
+from ...shared_services.revision_cache import RevisionCache
+from ...shared_services.logger_setup import setup_logger
+from ...shared_services.tracing import trace_methods
+
+logger = setup_logger()
+
+# Dependency graphs per journey, valid for one revision of its milestone rows
+graph_cache = RevisionCache("milestone_graphs", maxsize=256)
+
+# Fingerprint of everything the graph is built from; computed in the database so the
+# rows are only shipped when the graph has to be rebuilt
+MILESTONE_REVISION = PreparedStatement("milestone_revision", """
+    SELECT md5(coalesce(string_agg(
+        milestone_id || '|' || coalesce(status, '') || '|' || coalesce(target_date::text, '') || '|' || coalesce(dependencies::text, ''),
+        ',' ORDER BY milestone_id
+    ), ''))
+    FROM journey_milestones WHERE journey_id = %s
+""")
+
+
+@trace_methods
+class JourneyMilestoneService:
+    """Service for milestone dependency resolution"""
+
+    def __init__(self):
+        self.logger = logger
+
+    def _revision(self, cursor, journey_uuid) -> str:
+        MILESTONE_REVISION.execute(cursor, (journey_uuid,))
+        return cursor.fetchone()[0]
+
+    def _graph(self, cursor, journey_uuid) -> Tuple[MilestoneGraph, str]:
+        """Cached graph for the current revision, rebuilt from the rows when they changed"""
+        revision = self._revision(cursor, journey_uuid)
+        graph = graph_cache.get(str(journey_uuid), revision)
+        if graph is None:
+            cursor.execute("""
+                SELECT milestone_id, status, target_date, dependencies
+                FROM journey_milestones WHERE journey_id = %s
+                ORDER BY sort_order, created_at, milestone_id
+            """, (journey_uuid,))
+            graph = MilestoneGraph([
+                {"id": row[0], "status": row[1], "targetDate": row[2], "dependencies": safe_json_parse(row[3]) or []}
+                for row in cursor.fetchall()
+            ], allow_cycles=True)
+            graph_cache.put(str(journey_uuid), revision, graph)
+        return graph, revision
+
+    async def get_milestone_dependencies(self, journey_id: str) -> APIResponse:
+        """Ready/blocked milestones, earliest completion estimates and the critical path"""
+        try:
+            journey_uuid = ensure_uuid(journey_id)
+            with get_connection("journeys") as conn:
+                with conn.cursor() as cursor:
+                    graph, revision = self._graph(cursor, journey_uuid)
+                conn.rollback()
+
+            return APIResponse(
+                success=True,
+                message="Milestone dependencies resolved successfully",
+                data={"revision": revision, **graph.summary()}
+            )
+
+        except Exception as e:
+            self.logger.error(f"Error resolving milestone dependencies: {e}")
+            return APIResponse(
+                success=False,
+                message="Failed to resolve milestone dependencies",
+                error=str(e)
+            )
+
+    async def update_milestone_status(self, journey_id: str, milestone_id: str, status: str,
+                                      progress: Optional[int] = None) -> APIResponse:
+        """Change one milestone's status and report the milestones it unblocks (or blocks again)"""
+        try:
+            journey_uuid = ensure_uuid(journey_id)
+            with get_connection("journeys") as conn:
+                try:
+                    conn.rollback()
+                    with conn.cursor() as cursor:
+                        # Serialize status changes per journey so the cached graph follows the rows
+                        cursor.execute("SELECT pg_advisory_xact_lock(hashtext(%s))", (f"milestones:{journey_uuid}",))
+                        graph, _ = self._graph(cursor, journey_uuid)
+                        if milestone_id not in graph.index:
+                            conn.rollback()
+                            return APIResponse(
+                                success=False,
+                                message="Milestone not found",
+                                error=f"No milestone {milestone_id} in journey {journey_id}"
+                            )
+
+                        # Journey row first, in the same order as saves, so the two cannot deadlock
+                        cursor.execute(
+                            "UPDATE journeys SET revision = revision + 1 WHERE id = %s RETURNING revision",
+                            (journey_uuid,)
+                        )
+                        journey_revision = cursor.fetchone()[0]
+                        cursor.execute("""
+                            UPDATE journey_milestones
+                            SET status = %s, progress = COALESCE(%s, progress), updated_at = NOW()
+                            WHERE journey_id = %s AND milestone_id = %s
+                        """, (status, progress, journey_uuid, milestone_id))
+                        revision = self._revision(cursor, journey_uuid)
+                    conn.commit()
+                except Exception:
+                    conn.rollback()
+                    raise
+
+            change = graph.set_status(milestone_id, status)
+            graph_cache.put(str(journey_uuid), revision, graph)
+
+            return APIResponse(
+                success=True,
+                message="Milestone status updated successfully",
+                data={
+                    "revision": revision,
+                    "journeyRevision": journey_revision,
+                    "milestoneId": milestone_id,
+                    "status": status,
+                    "unblocked": change.unblocked,
+                    "blocked": change.blocked,
+                    "ready": graph.ready(),
+                    "criticalPath": graph.critical_path(),
+                    "earliestCompletion": graph.earliest_completion(),
+                }
+            )
+
+        except Exception as e:
+            self.logger.error(f"Error updating milestone status: {e}")
+            return APIResponse(
+                success=False,
+                message="Failed to update milestone status",
+                error=str(e)
+            )
+
+
+def check_milestone_cycles(milestones) -> Optional[str]:
+    """Error message if the given milestones (dicts or MilestoneData) have cyclic dependencies"""
+    try:
+        MilestoneGraph([
+            m if isinstance(m, dict) else {"id": m.id, "dependencies": m.dependencies}
+            for m in milestones
+        ])
+    except MilestoneCycleError as e:
+        return str(e)
+    return None
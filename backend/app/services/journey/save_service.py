@@ -1,23 +1,201 @@
-import json
 from typing import Optional
 from uuid import UUID
 from datetime import datetime
 
 from ...models.journey_models import CompleteJourneyState, APIResponse
-from .utils import get_connection, ensure_uuid, json_serial
+from .utils import get_connection, ensure_uuid
+from .milestone_service import check_milestone_cycles
+from .snapshot_service import SNAPSHOT_JOB
+from ..jobs.queue import enqueue
+from ...shared_services.serialization import to_jsonb
 from ...shared_services.logger_setup import setup_logger
+from ...shared_services.prepared import PreparedStatement
+from ...shared_services.tracing import trace_methods
 
 logger = setup_logger()
 
+# Message of the APIResponse returned when a save names a revision that is no longer current
+REVISION_CONFLICT = "Journey was modified by another save"
+
+# Upserts run once per row on every save, prepared once per pooled connection and
+# sent in batches
+JOURNEY_UPSERT = PreparedStatement("journey_upsert", """
+    INSERT INTO journeys (
+        id, name, description, is_published, is_deleted, is_archived,
+        is_locked, is_read_only, is_editable, is_view_only, updated_at
+    ) VALUES (
+        %s, %s, %s, %s, %s, %s,
+        %s, %s, %s, %s, %s
+    )
+    ON CONFLICT (id) DO UPDATE SET
+        name = EXCLUDED.name,
+        description = EXCLUDED.description,
+        is_published = EXCLUDED.is_published,
+        is_deleted = EXCLUDED.is_deleted,
+        is_archived = EXCLUDED.is_archived,
+        is_locked = EXCLUDED.is_locked,
+        is_read_only = EXCLUDED.is_read_only,
+        is_editable = EXCLUDED.is_editable,
+        is_view_only = EXCLUDED.is_view_only,
+        updated_at = EXCLUDED.updated_at,
+        revision = journeys.revision + 1
+    WHERE journeys.revision = COALESCE(%s::bigint, journeys.revision)
+    RETURNING revision
+""")
+# Partial saves take the journey row (and its next revision) before touching child rows,
+# so they serialize with full saves of the same journey
+JOURNEY_REVISION_BUMP = PreparedStatement("journey_revision_bump", """
+    UPDATE journeys SET revision = revision + 1
+    WHERE id = %s AND revision = COALESCE(%s::bigint, revision)
+    RETURNING revision
+""")
+NODE_UPSERT = PreparedStatement("journey_node_upsert", """
+    INSERT INTO journey_nodes (journey_id, node_id, node_type, node_subtype,
+                            position_x, position_y, data, selected, updated_at)
+    VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
+    ON CONFLICT (journey_id, node_id)
+    DO UPDATE SET
+        node_type = EXCLUDED.node_type,
+        node_subtype = EXCLUDED.node_subtype,
+        position_x = EXCLUDED.position_x,
+        position_y = EXCLUDED.position_y,
+        data = EXCLUDED.data,
+        selected = EXCLUDED.selected,
+        updated_at = EXCLUDED.updated_at
+""")
+EDGE_UPSERT = PreparedStatement("journey_edge_upsert", """
+    INSERT INTO journey_edges (journey_id, edge_id, source_node, target_node,
+                            data, selected, edge_type, animated, style, updated_at)
+    VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+    ON CONFLICT (journey_id, edge_id)
+    DO UPDATE SET
+        source_node = EXCLUDED.source_node,
+        target_node = EXCLUDED.target_node,
+        data = EXCLUDED.data,
+        selected = EXCLUDED.selected,
+        edge_type = EXCLUDED.edge_type,
+        animated = EXCLUDED.animated,
+        style = EXCLUDED.style,
+        updated_at = EXCLUDED.updated_at
+""")
+# Values and statuses the execution engine publishes (execution_linked rows) are kept
+GOAL_UPSERT = PreparedStatement("journey_goal_upsert", """
+    INSERT INTO journey_goals (journey_id, goal_id, title, description,
+                            target_value, current_value, unit, deadline,
+                            status, priority, category, updated_at)
+    VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+    ON CONFLICT (journey_id, goal_id)
+    DO UPDATE SET
+        title = EXCLUDED.title,
+        description = EXCLUDED.description,
+        target_value = EXCLUDED.target_value,
+        current_value = CASE WHEN journey_goals.execution_linked THEN journey_goals.current_value ELSE EXCLUDED.current_value END,
+        unit = EXCLUDED.unit,
+        deadline = EXCLUDED.deadline,
+        status = CASE WHEN journey_goals.execution_linked THEN journey_goals.status ELSE EXCLUDED.status END,
+        priority = EXCLUDED.priority,
+        category = EXCLUDED.category,
+        updated_at = EXCLUDED.updated_at
+""")
+MILESTONE_UPSERT = PreparedStatement("journey_milestone_upsert", """
+    INSERT INTO journey_milestones (journey_id, milestone_id, title, description,
+                                 target_date, status, progress, dependencies, updated_at)
+    VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
+    ON CONFLICT (journey_id, milestone_id)
+    DO UPDATE SET
+        title = EXCLUDED.title,
+        description = EXCLUDED.description,
+        target_date = EXCLUDED.target_date,
+        status = CASE WHEN journey_milestones.execution_linked THEN journey_milestones.status ELSE EXCLUDED.status END,
+        progress = CASE WHEN journey_milestones.execution_linked THEN journey_milestones.progress ELSE EXCLUDED.progress END,
+        dependencies = EXCLUDED.dependencies,
+        updated_at = EXCLUDED.updated_at
+""")
+# Milestone-only saves also carry the display order
+MILESTONE_ORDER_UPSERT = PreparedStatement("journey_milestone_order_upsert", """
+    INSERT INTO journey_milestones (journey_id, milestone_id, title, description,
+                                 target_date, status, progress, dependencies, sort_order, updated_at)
+    VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+    ON CONFLICT (journey_id, milestone_id)
+    DO UPDATE SET
+        title = EXCLUDED.title,
+        description = EXCLUDED.description,
+        target_date = EXCLUDED.target_date,
+        status = CASE WHEN journey_milestones.execution_linked THEN journey_milestones.status ELSE EXCLUDED.status END,
+        progress = CASE WHEN journey_milestones.execution_linked THEN journey_milestones.progress ELSE EXCLUDED.progress END,
+        dependencies = EXCLUDED.dependencies,
+        sort_order = EXCLUDED.sort_order,
+        updated_at = EXCLUDED.updated_at
+""")
+# Reports built by the report jobs belong to the server: saves leave them alone
+REPORT_UPSERT = PreparedStatement("journey_report_upsert", """
+    INSERT INTO journey_reports (journey_id, report_id, name, report_type,
+                               generated_at, data, updated_at)
+    VALUES (%s, %s, %s, %s, %s, %s, %s)
+    ON CONFLICT (journey_id, report_id)
+    DO UPDATE SET
+        name = EXCLUDED.name,
+        report_type = EXCLUDED.report_type,
+        generated_at = EXCLUDED.generated_at,
+        data = EXCLUDED.data,
+        updated_at = EXCLUDED.updated_at
+    WHERE NOT journey_reports.server_built
+""")
+
+def _expected(expected_revision: Optional[int], data: Optional[dict]) -> Optional[int]:
+    """Revision a partial save is based on: the explicit one, else the payload's "revision" key"""
+    if expected_revision is not None:
+        return expected_revision
+    revision = (data or {}).get("revision")
+    return int(revision) if revision is not None else None
+
+@trace_methods
 class JourneySaveService:
     """Service for saving/updating journeys"""
     
     def __init__(self):
         self.logger = logger
     
-    async def save_journey(self, journey_id: str, journey_data: CompleteJourneyState) -> APIResponse:
-        """Save/update an existing journey"""
+    def _claim_revision(self, cursor, journey_uuid: UUID, expected_revision: Optional[int]) -> Optional[int]:
+        """Bump the journey's revision if it is still ``expected_revision`` (any, if None); None on conflict"""
+        JOURNEY_REVISION_BUMP.execute(cursor, (journey_uuid, expected_revision))
+        row = cursor.fetchone()
+        return row[0] if row else None
+    
+    def _conflict(self, cursor, journey_uuid: UUID) -> APIResponse:
+        """Roll back a save whose revision check failed and report the journey's current revision"""
+        cursor.execute("ROLLBACK")
+        cursor.execute("SELECT revision FROM journeys WHERE id = %s", (journey_uuid,))
+        row = cursor.fetchone()
+        if not row:
+            return APIResponse(
+                success=False,
+                message="Journey not found",
+                error="Journey not found"
+            )
+        self.logger.info(f"Rejected stale save of journey {journey_uuid} (now at revision {row[0]})")
+        return APIResponse(
+            success=False,
+            message=REVISION_CONFLICT,
+            data={"journey_id": str(journey_uuid), "revision": row[0]},
+            error=f"Journey is at revision {row[0]}; reload it and apply the changes again"
+        )
+    
+    async def save_journey(self, journey_id: str, journey_data: CompleteJourneyState,
+                           expected_revision: Optional[int] = None) -> APIResponse:
+        """
+        Save/update an existing journey. Only applies while the journey is at
+        ``expected_revision`` (default: ``journey_data.revision``; None saves unconditionally).
+        """
         try:
+            cycle_error = check_milestone_cycles(journey_data.milestones)
+            if cycle_error:
+                return APIResponse(
+                    success=False,
+                    message=cycle_error,
+                    error=cycle_error
+                )
+
             with get_connection("journeys") as conn:
                 with conn.cursor() as cursor:
                     # Start transaction
@@ -26,143 +204,71 @@ class JourneySaveService:
                     journey_uuid = ensure_uuid(journey_id)
                     
                     # Upsert journey metadata (insert if missing, otherwise update)
-                    cursor.execute("""
-                        INSERT INTO journeys (
-                            id, name, description, is_published, is_deleted, is_archived,
-                            is_locked, is_read_only, is_editable, is_view_only, updated_at
-                        ) VALUES (
-                            %s, %s, %s, %s, %s, %s,
-                            %s, %s, %s, %s, %s
-                        )
-                        ON CONFLICT (id) DO UPDATE SET
-                            name = EXCLUDED.name,
-                            description = EXCLUDED.description,
-                            is_published = EXCLUDED.is_published,
-                            is_deleted = EXCLUDED.is_deleted,
-                            is_archived = EXCLUDED.is_archived,
-                            is_locked = EXCLUDED.is_locked,
-                            is_read_only = EXCLUDED.is_read_only,
-                            is_editable = EXCLUDED.is_editable,
-                            is_view_only = EXCLUDED.is_view_only,
-                            updated_at = EXCLUDED.updated_at
-                    """, (
+                    JOURNEY_UPSERT.execute(cursor, (
                         journey_uuid,
                         journey_data.name, journey_data.description, journey_data.isPublished,
                         journey_data.isDeleted, journey_data.isArchived, journey_data.isLocked,
                         journey_data.isReadOnly, journey_data.isEditable, journey_data.isViewOnly,
-                        journey_data.updatedAt
+                        journey_data.updatedAt,
+                        expected_revision if expected_revision is not None else journey_data.revision
                     ))
+                    row = cursor.fetchone()
+                    if not row:
+                        return self._conflict(cursor, journey_uuid)
+                    revision = row[0]
                     
                     # Upsert nodes (INSERT ... ON CONFLICT ... DO UPDATE)
-                    for node in journey_data.nodes:
-                        cursor.execute("""
-                            INSERT INTO journey_nodes (journey_id, node_id, node_type, node_subtype,
-                                                    position_x, position_y, data, selected, updated_at)
-                            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
-                            ON CONFLICT (journey_id, node_id) 
-                            DO UPDATE SET 
-                                node_type = EXCLUDED.node_type,
-                                node_subtype = EXCLUDED.node_subtype,
-                                position_x = EXCLUDED.position_x,
-                                position_y = EXCLUDED.position_y,
-                                data = EXCLUDED.data,
-                                selected = EXCLUDED.selected,
-                                updated_at = EXCLUDED.updated_at
-                        """, (
+                    NODE_UPSERT.execute_batch(cursor, [
+                        (
                             journey_uuid, node.id, node.type, node.node_subtype,
-                            node.position.x if node.position else 0, 
-                            node.position.y if node.position else 0, 
-                            json.dumps(node.data), node.selected,
+                            node.position.x if node.position else 0,
+                            node.position.y if node.position else 0,
+                            to_jsonb(node.data), node.selected,
                             journey_data.updatedAt
-                        ))
+                        )
+                        for node in journey_data.nodes
+                    ])
                     
                     # Upsert edges
-                    for edge in journey_data.edges:
-                        cursor.execute("""
-                            INSERT INTO journey_edges (journey_id, edge_id, source_node, target_node,
-                                                    data, selected, edge_type, animated, style, updated_at)
-                            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-                            ON CONFLICT (journey_id, edge_id) 
-                            DO UPDATE SET 
-                                source_node = EXCLUDED.source_node,
-                                target_node = EXCLUDED.target_node,
-                                data = EXCLUDED.data,
-                                selected = EXCLUDED.selected,
-                                edge_type = EXCLUDED.edge_type,
-                                animated = EXCLUDED.animated,
-                                style = EXCLUDED.style,
-                                updated_at = EXCLUDED.updated_at
-                        """, (
+                    EDGE_UPSERT.execute_batch(cursor, [
+                        (
                             journey_uuid, edge.id, edge.source, edge.target,
-                            json.dumps(edge.data), edge.selected, edge.type, edge.animated, json.dumps(edge.style),
+                            to_jsonb(edge.data), edge.selected, edge.type, edge.animated, to_jsonb(edge.style),
                             journey_data.updatedAt
-                        ))
+                        )
+                        for edge in journey_data.edges
+                    ])
                     
                     # Upsert goals
-                    for goal in journey_data.goals:
-                        cursor.execute("""
-                            INSERT INTO journey_goals (journey_id, goal_id, title, description,
-                                                    target_value, current_value, unit, deadline,
-                                                    status, priority, category, updated_at)
-                            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-                            ON CONFLICT (journey_id, goal_id) 
-                            DO UPDATE SET 
-                                title = EXCLUDED.title,
-                                description = EXCLUDED.description,
-                                target_value = EXCLUDED.target_value,
-                                current_value = EXCLUDED.current_value,
-                                unit = EXCLUDED.unit,
-                                deadline = EXCLUDED.deadline,
-                                status = EXCLUDED.status,
-                                priority = EXCLUDED.priority,
-                                category = EXCLUDED.category,
-                                updated_at = EXCLUDED.updated_at
-                        """, (
+                    GOAL_UPSERT.execute_batch(cursor, [
+                        (
                             journey_uuid, goal.id, goal.title, goal.description,
                             goal.targetValue, goal.currentValue, goal.unit, goal.deadline,
                             goal.status.value, goal.priority.value, goal.category,
                             journey_data.updatedAt
-                        ))
+                        )
+                        for goal in journey_data.goals
+                    ])
                     
                     # Upsert milestones
-                    for milestone in journey_data.milestones:
-                        cursor.execute("""
-                            INSERT INTO journey_milestones (journey_id, milestone_id, title, description,
-                                                         target_date, status, progress, dependencies, updated_at)
-                            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
-                            ON CONFLICT (journey_id, milestone_id) 
-                            DO UPDATE SET 
-                                title = EXCLUDED.title,
-                                description = EXCLUDED.description,
-                                target_date = EXCLUDED.target_date,
-                                status = EXCLUDED.status,
-                                progress = EXCLUDED.progress,
-                                dependencies = EXCLUDED.dependencies,
-                                updated_at = EXCLUDED.updated_at
-                        """, (
+                    MILESTONE_UPSERT.execute_batch(cursor, [
+                        (
                             journey_uuid, milestone.id, milestone.title, milestone.description,
-                            milestone.targetDate, milestone.status.value, milestone.progress, json.dumps(milestone.dependencies),
+                            milestone.targetDate, milestone.status.value, milestone.progress, to_jsonb(milestone.dependencies),
                             journey_data.updatedAt
-                        ))
+                        )
+                        for milestone in journey_data.milestones
+                    ])
                     
                     # Upsert reports
-                    for report in journey_data.reports:
-                        cursor.execute("""
-                            INSERT INTO journey_reports (journey_id, report_id, name, report_type,
-                                                       generated_at, data, updated_at)
-                            VALUES (%s, %s, %s, %s, %s, %s, %s)
-                            ON CONFLICT (journey_id, report_id) 
-                            DO UPDATE SET 
-                                name = EXCLUDED.name,
-                                report_type = EXCLUDED.report_type,
-                                generated_at = EXCLUDED.generated_at,
-                                data = EXCLUDED.data,
-                                updated_at = EXCLUDED.updated_at
-                        """, (
+                    REPORT_UPSERT.execute_batch(cursor, [
+                        (
                             journey_uuid, report.id, report.name, report.type.value,
-                            report.generatedAt, json.dumps(report.data),
+                            report.generatedAt, to_jsonb(report.data),
                             journey_data.updatedAt
-                        ))
+                        )
+                        for report in journey_data.reports
+                    ])
                     
                     # Clean up orphaned records (items that exist in DB but not in current state)
                     # This handles deletions from the frontend
@@ -188,35 +294,25 @@ class JourneySaveService:
                     
                     cursor.execute("""
                         DELETE FROM journey_reports 
-                        WHERE journey_id = %s AND report_id NOT IN %s
+                        WHERE journey_id = %s AND NOT server_built AND report_id NOT IN %s
                     """, (journey_uuid, tuple(report.id for report in journey_data.reports) if journey_data.reports else ('',)))
                     
+                    # Archive the saved state off the request path. The job snapshots the
+                    # journey as stored when it runs, so saves share one queued job per journey;
+                    # a save landing while it runs makes it run once more
+                    enqueue(
+                        cursor, SNAPSHOT_JOB, {"journeyId": str(journey_uuid)},
+                        idempotency_key=str(journey_uuid), retry_finished=True, rerun_running=True
+                    )
+
                     # Commit transaction
                     cursor.execute("COMMIT")
                     
-                    # Write snapshot (best-effort, separate connection)
-                    try:
-                        with get_connection("journey_snapshots") as snap_conn:
-                            with snap_conn.cursor() as snap_cur:
-                                snap_cur.execute(
-                                    "INSERT INTO journey_snapshots (journey_id, snapshot) VALUES (%s, %s)",
-                                    (
-                                        journey_uuid,
-                                        json.dumps(
-                                            journey_data.dict() if hasattr(journey_data, 'dict') else journey_data,
-                                            default=json_serial
-                                        )
-                                    )
-                                )
-                                snap_conn.commit()
-                    except Exception as snap_err:
-                        self.logger.error(f"Failed to write journey snapshot: {snap_err}")
-                    
                     self.logger.info(f"Journey saved successfully: {journey_id}")
                     return APIResponse(
                         success=True,
                         message="Journey saved successfully",
-                        data={"journey_id": journey_id}
+                        data={"journey_id": journey_id, "revision": revision}
                     )
                     
         except Exception as e:
@@ -227,8 +323,9 @@ class JourneySaveService:
                 error=str(e)
             )
     
-    async def save_journey_canvas(self, journey_id: str, canvas_data: dict) -> APIResponse:
-        """Save journey canvas data (nodes and edges only)"""
+    async def save_journey_canvas(self, journey_id: str, canvas_data: dict,
+                                  expected_revision: Optional[int] = None) -> APIResponse:
+        """Save journey canvas data (nodes and edges only), conditional on the revision like save_journey"""
         try:
             with get_connection("journeys") as conn:
                 with conn.cursor() as cursor:
@@ -236,50 +333,30 @@ class JourneySaveService:
                     cursor.execute("BEGIN")
                     
                     journey_uuid = ensure_uuid(journey_id)
+                    revision = self._claim_revision(cursor, journey_uuid, _expected(expected_revision, canvas_data))
+                    if revision is None:
+                        return self._conflict(cursor, journey_uuid)
                     
                     # Upsert nodes
-                    for node in canvas_data.get("nodes", []):
-                        cursor.execute("""
-                            INSERT INTO journey_nodes (journey_id, node_id, node_type, node_subtype,
-                                                    position_x, position_y, data, selected, updated_at)
-                            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
-                            ON CONFLICT (journey_id, node_id) 
-                            DO UPDATE SET 
-                                node_type = EXCLUDED.node_type,
-                                node_subtype = EXCLUDED.node_subtype,
-                                position_x = EXCLUDED.position_x,
-                                position_y = EXCLUDED.position_y,
-                                data = EXCLUDED.data,
-                                selected = EXCLUDED.selected,
-                                updated_at = EXCLUDED.updated_at
-                        """, (
+                    NODE_UPSERT.execute_batch(cursor, [
+                        (
                             journey_uuid, node["id"], node["type"], node.get("node-subtype"),
-                            node.get("position", {}).get("x", 0), node.get("position", {}).get("y", 0), 
-                            json.dumps(node["data"]), node.get("selected", False),
+                            node.get("position", {}).get("x", 0), node.get("position", {}).get("y", 0),
+                            to_jsonb(node["data"]), node.get("selected", False),
                             datetime.now()
-                        ))
+                        )
+                        for node in canvas_data.get("nodes", [])
+                    ])
                     
                     # Upsert edges
-                    for edge in canvas_data.get("edges", []):
-                        cursor.execute("""
-                            INSERT INTO journey_edges (journey_id, edge_id, source_node, target_node,
-                                                    data, selected, edge_type, animated, style, updated_at)
-                            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-                            ON CONFLICT (journey_id, edge_id) 
-                            DO UPDATE SET 
-                                source_node = EXCLUDED.source_node,
-                                target_node = EXCLUDED.target_node,
-                                data = EXCLUDED.data,
-                                selected = EXCLUDED.selected,
-                                edge_type = EXCLUDED.edge_type,
-                                animated = EXCLUDED.animated,
-                                style = EXCLUDED.style,
-                                updated_at = EXCLUDED.updated_at
-                        """, (
+                    EDGE_UPSERT.execute_batch(cursor, [
+                        (
                             journey_uuid, edge["id"], edge["source"], edge["target"],
-                            json.dumps(edge["data"]), edge.get("selected", False), edge["type"], edge.get("animated", False), json.dumps(edge.get("style", {})),
+                            to_jsonb(edge["data"]), edge.get("selected", False), edge["type"], edge.get("animated", False), to_jsonb(edge.get("style", {})),
                             datetime.now()
-                        ))
+                        )
+                        for edge in canvas_data.get("edges", [])
+                    ])
                     
                     # Clean up orphaned records
                     cursor.execute("""
@@ -299,7 +376,7 @@ class JourneySaveService:
                     return APIResponse(
                         success=True,
                         message="Canvas saved successfully",
-                        data={"journey_id": journey_id}
+                        data={"journey_id": journey_id, "revision": revision}
                     )
                     
         except Exception as e:
@@ -310,8 +387,9 @@ class JourneySaveService:
                 error=str(e)
             )
     
-    async def save_journey_goals(self, journey_id: str, goals_data: dict) -> APIResponse:
-        """Save journey goals only"""
+    async def save_journey_goals(self, journey_id: str, goals_data: dict,
+                                 expected_revision: Optional[int] = None) -> APIResponse:
+        """Save journey goals only, conditional on the revision like save_journey"""
         try:
             with get_connection("journeys") as conn:
                 with conn.cursor() as cursor:
@@ -319,9 +397,13 @@ class JourneySaveService:
                     cursor.execute("BEGIN")
                     
                     journey_uuid = ensure_uuid(journey_id)
+                    revision = self._claim_revision(cursor, journey_uuid, _expected(expected_revision, goals_data))
+                    if revision is None:
+                        return self._conflict(cursor, journey_uuid)
                     
                     # Upsert goals
                     goals = goals_data.get("goals", [])
+                    rows = []
                     for goal in goals:
                         # Handle both status and priority formats: string or object
                         status_value = goal["status"]
@@ -336,30 +418,15 @@ class JourneySaveService:
                         elif not isinstance(priority_value, str):
                             priority_value = "medium"
                         
-                        cursor.execute("""
-                            INSERT INTO journey_goals (journey_id, goal_id, title, description,
-                                                    target_value, current_value, unit, deadline,
-                                                    status, priority, category, updated_at)
-                            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-                            ON CONFLICT (journey_id, goal_id) 
-                            DO UPDATE SET 
-                                title = EXCLUDED.title,
-                                description = EXCLUDED.description,
-                                target_value = EXCLUDED.target_value,
-                                current_value = EXCLUDED.current_value,
-                                unit = EXCLUDED.unit,
-                                deadline = EXCLUDED.deadline,
-                                status = EXCLUDED.status,
-                                priority = EXCLUDED.priority,
-                                category = EXCLUDED.category,
-                                updated_at = EXCLUDED.updated_at
-                        """, (
+                        rows.append((
                             journey_uuid, goal["id"], goal["title"], goal["description"],
                             goal["targetValue"], goal["currentValue"], goal["unit"], goal["deadline"],
                             status_value, priority_value, goal["category"],
                             datetime.now()
                         ))
                     
+                    GOAL_UPSERT.execute_batch(cursor, rows)
+                    
                     # Clean up orphaned records
                     cursor.execute("""
                         DELETE FROM journey_goals 
@@ -373,7 +440,7 @@ class JourneySaveService:
                     return APIResponse(
                         success=True,
                         message="Goals saved successfully",
-                        data={"journey_id": journey_id}
+                        data={"journey_id": journey_id, "revision": revision}
                     )
                     
         except Exception as e:
@@ -384,18 +451,31 @@ class JourneySaveService:
                 error=str(e)
             )
     
-    async def save_journey_milestones(self, journey_id: str, milestones_data: dict) -> APIResponse:
-        """Save journey milestones only"""
+    async def save_journey_milestones(self, journey_id: str, milestones_data: dict,
+                                      expected_revision: Optional[int] = None) -> APIResponse:
+        """Save journey milestones only, conditional on the revision like save_journey"""
         try:
+            cycle_error = check_milestone_cycles(milestones_data.get("milestones", []))
+            if cycle_error:
+                return APIResponse(
+                    success=False,
+                    message=cycle_error,
+                    error=cycle_error
+                )
+
             with get_connection("journeys") as conn:
                 with conn.cursor() as cursor:
                     # Start transaction
                     cursor.execute("BEGIN")
                     
                     journey_uuid = ensure_uuid(journey_id)
+                    revision = self._claim_revision(cursor, journey_uuid, _expected(expected_revision, milestones_data))
+                    if revision is None:
+                        return self._conflict(cursor, journey_uuid)
                     
                     # Upsert milestones
                     milestones = milestones_data.get("milestones", [])
+                    rows = []
                     for milestone in milestones:
                         # Handle both status formats: string or object
                         status_value = milestone["status"]
@@ -404,26 +484,14 @@ class JourneySaveService:
                         elif not isinstance(status_value, str):
                             status_value = "pending"
                         
-                        cursor.execute("""
-                            INSERT INTO journey_milestones (journey_id, milestone_id, title, description,
-                                                         target_date, status, progress, dependencies, sort_order, updated_at)
-                            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-                            ON CONFLICT (journey_id, milestone_id) 
-                            DO UPDATE SET 
-                                title = EXCLUDED.title,
-                                description = EXCLUDED.description,
-                                target_date = EXCLUDED.target_date,
-                                status = EXCLUDED.status,
-                                progress = EXCLUDED.progress,
-                                dependencies = EXCLUDED.dependencies,
-                                sort_order = EXCLUDED.sort_order,
-                                updated_at = EXCLUDED.updated_at
-                        """, (
+                        rows.append((
                             journey_uuid, milestone["id"], milestone["title"], milestone["description"],
-                            milestone["targetDate"], status_value, milestone["progress"], json.dumps(milestone.get("dependencies", [])),
+                            milestone["targetDate"], status_value, milestone["progress"], to_jsonb(milestone.get("dependencies", [])),
                             milestone.get("sortOrder", 0), datetime.now()
                         ))
                     
+                    MILESTONE_ORDER_UPSERT.execute_batch(cursor, rows)
+                    
                     # Clean up orphaned records
                     cursor.execute("""
                         DELETE FROM journey_milestones 
@@ -437,7 +505,7 @@ class JourneySaveService:
                     return APIResponse(
                         success=True,
                         message="Milestones saved successfully",
-                        data={"journey_id": journey_id}
+                        data={"journey_id": journey_id, "revision": revision}
                     )
                     
         except Exception as e:
@@ -0,0 +1,121 @@
+import asyncio
+import os
+from typing import Any, Dict, List
+
+from psycopg2 import sql
+
+from .utils import get_connection, ensure_uuid
+from .load_service import JourneyLoadService
+from ...shared_services.logger_setup import setup_logger
+from ...shared_services.tracing import trace_methods
+
+logger = setup_logger()
+
+# Job type of the full-state archive written after every save
+SNAPSHOT_JOB = "journey_snapshot"
+SNAPSHOT_JOB_CONCURRENCY = int(os.getenv("SNAPSHOT_JOB_CONCURRENCY", "2"))
+# journey_snapshots is partitioned by month: partitions created after the current month,
+# months kept before it (0 keeps everything), and what happens to older months - "drop",
+# or "detach" to leave them as standalone tables for archiving
+SNAPSHOT_PARTITIONS_AHEAD = int(os.getenv("SNAPSHOT_PARTITIONS_AHEAD", "2"))
+SNAPSHOT_RETENTION_MONTHS = int(os.getenv("SNAPSHOT_RETENTION_MONTHS", "0"))
+SNAPSHOT_RETENTION_ACTION = os.getenv("SNAPSHOT_RETENTION_ACTION", "drop")
+
+
+@trace_methods
+class JourneySnapshotService:
+    """Service for archiving the complete state of a journey into journey_snapshots"""
+
+    def __init__(self):
+        self.logger = logger
+        self.load_service = JourneyLoadService()
+
+    def run_job(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """Job handler: snapshot the journey as it is stored now"""
+        journey_id = payload["journeyId"]
+        result = asyncio.run(self.load_service.load_journey(journey_id))
+        if not result.success:
+            if result.message == "Journey not found":
+                # Deleted since it was saved; nothing left to archive
+                return {"skipped": result.message}
+            raise RuntimeError(result.error or result.message)
+
+        with get_connection("journey_snapshots") as conn:
+            try:
+                conn.rollback()
+                with conn.cursor() as cursor:
+                    cursor.execute(
+                        "INSERT INTO journey_snapshots (journey_id, snapshot) VALUES (%s, %s) RETURNING id",
+                        (ensure_uuid(journey_id), result.data["journey"].model_dump_json())
+                    )
+                    snapshot_id = cursor.fetchone()[0]
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+
+        return {"snapshotId": str(snapshot_id)}
+
+    def maintain_partitions(self, conn) -> Dict[str, List[str]]:
+        """
+        Create the monthly journey_snapshots partitions through SNAPSHOT_PARTITIONS_AHEAD
+        months from now, and for any month whose rows ended up in the default partition
+        (journey_snapshots_partition() moves them over); detach (and unless SNAPSHOT_RETENTION_ACTION is "detach",
+        drop) the months that ended more than SNAPSHOT_RETENTION_MONTHS months before the
+        current one. Runs in one worker at a time; the others skip.
+        """
+        created: List[str] = []
+        removed: List[str] = []
+        try:
+            conn.rollback()
+            with conn.cursor() as cursor:
+                cursor.execute("SELECT pg_try_advisory_xact_lock(hashtext('journey_snapshots_partitions'))")
+                if not cursor.fetchone()[0]:
+                    conn.rollback()
+                    return {"created": created, "removed": removed}
+
+                cursor.execute("""
+                    SELECT month::date
+                    FROM (
+                        SELECT generate_series(
+                            date_trunc('month', NOW()),
+                            date_trunc('month', NOW()) + make_interval(months => %s),
+                            INTERVAL '1 month'
+                        ) AS month
+                        UNION
+                        SELECT DISTINCT date_trunc('month', taken_at) FROM journey_snapshots_default
+                    ) AS months
+                    WHERE to_regclass('journey_snapshots_p' || to_char(month, 'YYYYMM')) IS NULL
+                    ORDER BY month
+                """, (SNAPSHOT_PARTITIONS_AHEAD,))
+                for (month,) in cursor.fetchall():
+                    cursor.execute("SELECT journey_snapshots_partition(%s)", (month,))
+                    created.append(cursor.fetchone()[0])
+
+                if SNAPSHOT_RETENTION_MONTHS > 0:
+                    cursor.execute("""
+                        SELECT c.relname
+                        FROM pg_inherits i
+                        JOIN pg_class c ON c.oid = i.inhrelid
+                        WHERE i.inhparent = 'journey_snapshots'::regclass
+                          AND c.relname ~ '^journey_snapshots_p[0-9]{6}$'
+                          AND to_date(right(c.relname, 6), 'YYYYMM') + INTERVAL '1 month'
+                              <= date_trunc('month', NOW()) - make_interval(months => %s)
+                        ORDER BY c.relname
+                    """, (SNAPSHOT_RETENTION_MONTHS,))
+                    for (name,) in cursor.fetchall():
+                        cursor.execute(sql.SQL("ALTER TABLE journey_snapshots DETACH PARTITION {}").format(sql.Identifier(name)))
+                        if SNAPSHOT_RETENTION_ACTION != "detach":
+                            cursor.execute(sql.SQL("DROP TABLE {}").format(sql.Identifier(name)))
+                        removed.append(name)
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+
+        if created:
+            self.logger.info(f"Created snapshot partitions {', '.join(created)}")
+        if removed:
+            action = "Detached" if SNAPSHOT_RETENTION_ACTION == "detach" else "Dropped"
+            self.logger.info(f"{action} snapshot partitions {', '.join(removed)}")
+        return {"created": created, "removed": removed}
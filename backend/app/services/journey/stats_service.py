@@ -1,9 +1,18 @@
 from ...models.journey_models import JourneyStats, APIResponse
 from .utils import get_connection, ensure_uuid
 from ...shared_services.logger_setup import setup_logger
+from ...shared_services.prepared import PreparedStatement
+from ...shared_services.tracing import trace_methods
 
 logger = setup_logger()
 
+JOURNEY_STATS = PreparedStatement("journey_stats_by_journey", """
+    SELECT total_nodes, total_edges, total_goals, completed_goals,
+           total_milestones, completed_milestones, total_reports
+    FROM journey_stats WHERE journey_id = %s
+""")
+
+@trace_methods
 class JourneyStatsService:
     """Service for journey statistics"""
     
@@ -17,11 +26,7 @@ class JourneyStatsService:
                 with conn.cursor() as cursor:
                     journey_uuid = ensure_uuid(journey_id)
                     
-                    cursor.execute("""
-                        SELECT total_nodes, total_edges, total_goals, completed_goals,
-                               total_milestones, completed_milestones, total_reports
-                        FROM journey_stats WHERE journey_id = %s
-                    """, (journey_uuid,))
+                    JOURNEY_STATS.execute(cursor, (journey_uuid,))
                     
                     stats_row = cursor.fetchone()
                     if not stats_row:
@@ -44,7 +49,7 @@ class JourneyStatsService:
                     return APIResponse(
                         success=True,
                         message="Journey stats retrieved successfully",
-                        data={"stats": stats.dict()}
+                        data={"stats": stats.model_dump()}
                     )
                     
         except Exception as e:
@@ -0,0 +1,228 @@
+import os
+from itertools import chain
+from typing import Iterator, Optional
+from uuid import uuid4
+
+from .utils import get_connection, ensure_uuid
+from ...shared_services.logger_setup import setup_logger
+from ...shared_services.tracing import trace_methods
+
+logger = setup_logger()
+
+# Rows fetched per round trip by the server-side cursors
+STREAM_ITERSIZE = int(os.getenv("JOURNEY_STREAM_ITERSIZE", "2000"))
+# Approximate size of each chunk handed to the StreamingResponse
+STREAM_CHUNK_BYTES = int(os.getenv("JOURNEY_STREAM_CHUNK_BYTES", str(64 * 1024)))
+
+# Each query returns one pre-serialized JSON object per row, shaped exactly like the
+# non-streaming API responses, so Python never materializes per-row dicts.
+JOURNEY_META_JSON_SQL = """
+    SELECT json_build_object(
+        'id', id::text,
+        'name', name,
+        'description', description,
+        'createdAt', created_at,
+        'updatedAt', updated_at,
+        'revision', revision,
+        'isPublished', is_published,
+        'isDeleted', is_deleted,
+        'isArchived', is_archived,
+        'isLocked', is_locked,
+        'isReadOnly', is_read_only,
+        'isEditable', is_editable,
+        'isViewOnly', is_view_only
+    )::text
+    FROM journeys WHERE id = %s
+"""
+
+NODES_JSON_SQL = """
+    SELECT json_build_object(
+        'id', node_id,
+        'type', node_type,
+        'node-subtype', node_subtype,
+        'position', json_build_object('x', position_x, 'y', position_y),
+        'data', COALESCE(data, '{}'::jsonb),
+        'selected', selected
+    )::text
+    FROM journey_nodes WHERE journey_id = %s
+"""
+
+EDGES_JSON_SQL = """
+    SELECT json_build_object(
+        'id', edge_id,
+        'source', source_node,
+        'target', target_node,
+        'data', COALESCE(data, '{}'::jsonb),
+        'selected', selected,
+        'type', edge_type,
+        'animated', animated,
+        'style', COALESCE(style, '{}'::jsonb)
+    )::text
+    FROM journey_edges WHERE journey_id = %s
+"""
+
+GOALS_JSON_SQL = """
+    SELECT json_build_object(
+        'id', goal_id,
+        'title', title,
+        'description', description,
+        'targetValue', target_value,
+        'currentValue', current_value,
+        'unit', unit,
+        'deadline', deadline,
+        'status', status,
+        'priority', priority,
+        'category', category,
+        'createdAt', created_at,
+        'updatedAt', updated_at
+    )::text
+    FROM journey_goals WHERE journey_id = %s
+"""
+
+MILESTONES_JSON_SQL = """
+    SELECT json_build_object(
+        'id', milestone_id,
+        'title', title,
+        'description', description,
+        'targetDate', target_date,
+        'status', status,
+        'progress', progress,
+        'dependencies', COALESCE(dependencies, '[]'::jsonb),
+        'createdAt', created_at,
+        'updatedAt', updated_at
+    )::text
+    FROM journey_milestones WHERE journey_id = %s
+"""
+
+REPORTS_JSON_SQL = """
+    SELECT json_build_object(
+        'id', report_id,
+        'name', name,
+        'type', report_type,
+        'generatedAt', generated_at,
+        'data', COALESCE(data, '{}'::jsonb)
+    )::text
+    FROM journey_reports WHERE journey_id = %s
+"""
+
+
+class _ChunkBuffer:
+    """Accumulates JSON fragments and releases them in bounded chunks"""
+
+    def __init__(self, chunk_bytes: int = STREAM_CHUNK_BYTES):
+        self.chunk_bytes = chunk_bytes
+        self.parts = []
+        self.size = 0
+
+    def add(self, fragment: str) -> Optional[bytes]:
+        self.parts.append(fragment)
+        self.size += len(fragment)
+        if self.size >= self.chunk_bytes:
+            return self.flush()
+        return None
+
+    def flush(self) -> Optional[bytes]:
+        if not self.parts:
+            return None
+        chunk = "".join(self.parts).encode("utf-8")
+        self.parts = []
+        self.size = 0
+        return chunk
+
+
+@trace_methods
+class JourneyStreamService:
+    """Service for streaming large journeys straight from server-side cursors"""
+
+    def __init__(self):
+        self.logger = logger
+
+    def _stream_array(self, conn, sql: str, journey_uuid, buffer: _ChunkBuffer) -> Iterator[bytes]:
+        """Stream the rows of a JSON-producing query as the elements of a JSON array"""
+        # Named cursors are server-side: only `itersize` rows live in memory at a time
+        with conn.cursor(name=f"journey_stream_{uuid4().hex}") as cursor:
+            cursor.itersize = STREAM_ITERSIZE
+            cursor.execute(sql, (journey_uuid,))
+            separator = ""
+            for (row_json,) in cursor:
+                chunk = buffer.add(separator + row_json)
+                if chunk:
+                    yield chunk
+                separator = ","
+
+    def _begin_snapshot(self, conn) -> None:
+        """Read every section from one consistent snapshot"""
+        # Pooled connections may carry a transaction opened/closed with raw BEGIN/COMMIT
+        # statements, which leaves psycopg2's own status out of sync; a rollback resets it
+        # so the named cursors below run inside a real transaction.
+        conn.rollback()
+        with conn.cursor() as cursor:
+            cursor.execute("SET TRANSACTION ISOLATION LEVEL REPEATABLE READ READ ONLY")
+
+    def _generate_journey(self, journey_uuid) -> Iterator[bytes]:
+        with get_connection("journeys") as conn:
+            try:
+                self._begin_snapshot(conn)
+                with conn.cursor() as cursor:
+                    cursor.execute(JOURNEY_META_JSON_SQL, (journey_uuid,))
+                    meta_row = cursor.fetchone()
+                if not meta_row:
+                    return
+
+                buffer = _ChunkBuffer()
+                # Re-open the metadata object so the collections can be appended to it
+                buffer.add('{"success":true,"message":"Journey loaded successfully","data":null,"journey":')
+                buffer.add(meta_row[0][:-1])
+                yield buffer.flush()
+
+                sections = (
+                    ("nodes", NODES_JSON_SQL),
+                    ("edges", EDGES_JSON_SQL),
+                    ("goals", GOALS_JSON_SQL),
+                    ("milestones", MILESTONES_JSON_SQL),
+                    ("reports", REPORTS_JSON_SQL),
+                )
+                for name, sql in sections:
+                    buffer.add(f',"{name}":[')
+                    yield from self._stream_array(conn, sql, journey_uuid, buffer)
+                    buffer.add("]")
+
+                buffer.add("}}")
+                yield buffer.flush()
+            finally:
+                conn.rollback()
+
+    def _generate_canvas(self, journey_uuid) -> Iterator[bytes]:
+        with get_connection("journeys") as conn:
+            try:
+                self._begin_snapshot(conn)
+
+                buffer = _ChunkBuffer()
+                buffer.add('{"success":true,"message":"Canvas data loaded successfully","data":{"nodes":[')
+                yield buffer.flush()
+                yield from self._stream_array(conn, NODES_JSON_SQL, journey_uuid, buffer)
+                buffer.add('],"edges":[')
+                yield from self._stream_array(conn, EDGES_JSON_SQL, journey_uuid, buffer)
+                buffer.add(']},"error":null}')
+                yield buffer.flush()
+            finally:
+                conn.rollback()
+
+    def stream_journey(self, journey_id: str) -> Optional[Iterator[bytes]]:
+        """
+        Stream a complete journey as JSON chunks.
+        Returns None when the journey does not exist, so callers can still answer 404
+        before any bytes are sent.
+        """
+        body = self._generate_journey(ensure_uuid(journey_id))
+        first_chunk = next(body, None)
+        if first_chunk is None:
+            return None
+        return chain((first_chunk,), body)
+
+    def stream_journey_canvas(self, journey_id: str) -> Iterator[bytes]:
+        """Stream journey canvas data (nodes and edges only) as JSON chunks"""
+        body = self._generate_canvas(ensure_uuid(journey_id))
+        # Pull the envelope eagerly so connection errors surface before the response starts
+        first_chunk = next(body)
+        return chain((first_chunk,), body)
@@ -1,9 +1,8 @@
-import json
 from typing import Any, Dict, List, Optional
 from uuid import UUID
-from datetime import datetime
 
 from ...shared_services.db import get_postgres_connection
+from ...shared_services.serialization import loads
 from ...shared_services.logger_setup import setup_logger
 
 logger = setup_logger()
@@ -16,22 +15,16 @@ def safe_json_parse(value: Any) -> Dict[str, Any]:
         return value
     if isinstance(value, (bytes, bytearray)):
         try:
-            return json.loads(value.decode("utf-8"))
+            return loads(value)
         except Exception:
             return {}
     if isinstance(value, str):
         try:
-            return json.loads(value)
+            return loads(value)
         except Exception:
             return {}
     return {}
 
-def json_serial(obj: Any) -> str:
-    """JSON serializer for datetime objects"""
-    if isinstance(obj, datetime):
-        return obj.isoformat()
-    raise TypeError(f"Object of type {type(obj)} is not JSON serializable")
-
 def ensure_uuid(journey_id: str) -> UUID:
     """Convert string to UUID, handling potential errors"""
     try:
@@ -0,0 +1 @@
+# Report generation package
@@ -0,0 +1,320 @@
+"""
+Report builders for the ``progress``, ``performance`` and ``summary`` report types.
+
+Each builder takes a cursor, a journey id and an optional [start, end) window over
+``journey_execution_events.occurred_at``. Counting and percentiles happen in SQL; the
+grouped rows are reshaped (daily series, funnels, shares, rolling rates) with pandas, so
+no per-event Python loop runs however many events fall in the window.
+"""
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from uuid import UUID
+
+import pandas as pd
+
+from ..execution import state_store
+from ..execution.engine import STATUS_NAMES
+from ..journey.milestone_graph import MilestoneGraph
+from ..journey.utils import safe_json_parse
+
+# Days of the rolling completion rate in performance reports
+ROLLING_DAYS = 7
+DURATION_PERCENTILES = (0.5, 0.9, 0.99)
+
+
+def _window(start: Optional[datetime], end: Optional[datetime]) -> Tuple[str, list]:
+    """SQL condition (prefixed with AND) and params restricting events to the window"""
+    sql, params = "", []
+    if start is not None:
+        sql += " AND occurred_at >= %s"
+        params.append(start)
+    if end is not None:
+        sql += " AND occurred_at < %s"
+        params.append(end)
+    return sql, params
+
+
+def _node_titles(cursor, journey_uuid: UUID) -> Dict[str, Dict[str, Any]]:
+    cursor.execute("""
+        SELECT node_id, node_subtype, data->>'title' FROM journey_nodes WHERE journey_id = %s
+    """, (journey_uuid,))
+    return {row[0]: {"subtype": row[1], "title": row[2] or row[0]} for row in cursor.fetchall()}
+
+
+def _daily(frame: pd.DataFrame, columns: str, start: Optional[datetime],
+           end: Optional[datetime]) -> pd.DataFrame:
+    """Pivot (day, <columns>, count) rows into one column per series and one row per day, gaps filled with 0"""
+    if frame.empty:
+        return pd.DataFrame()
+    table = frame.pivot_table(index="day", columns=columns, values="count", aggfunc="sum", fill_value=0)
+    first = pd.Timestamp(start).normalize() if start is not None else table.index.min()
+    last = pd.Timestamp(end).normalize() if end is not None else table.index.max()
+    if table.index.tz is not None:
+        first = first.tz_localize(table.index.tz) if first.tzinfo is None else first.tz_convert(table.index.tz)
+        last = last.tz_localize(table.index.tz) if last.tzinfo is None else last.tz_convert(table.index.tz)
+    days = pd.date_range(min(first, table.index.min()), max(last, table.index.max()), freq="D")
+    return table.reindex(days, fill_value=0)
+
+
+def _series(table: pd.DataFrame) -> Dict[str, Any]:
+    if table.empty:
+        return {"days": [], "series": {}}
+    return {
+        "days": [day.strftime("%Y-%m-%d") for day in table.index],
+        "series": {str(column): table[column].astype(int).tolist() for column in table.columns},
+    }
+
+
+# ============================================================================
+# PROGRESS
+# ============================================================================
+
+def build_progress(cursor, journey_id: str, start: Optional[datetime], end: Optional[datetime]) -> Dict[str, Any]:
+    """Goal attainment, milestone completion and dependency outlook, with daily arrivals"""
+    journey_uuid = UUID(journey_id)
+    window_sql, window_params = _window(start, end)
+
+    goals = state_store.load_goal_rows(cursor, journey_id)
+    milestones = state_store.load_milestone_rows(cursor, journey_id)
+    graph = MilestoneGraph([
+        {"id": milestone_id, "status": row["status"], "targetDate": row["target_date"],
+         "dependencies": safe_json_parse(row["dependencies"]) or []}
+        for milestone_id, row in milestones.items()
+    ], allow_cycles=True)
+    outlook = graph.summary()
+
+    cursor.execute(f"""
+        SELECT date_trunc('day', occurred_at) AS day, event_type, node_id, count(*)
+        FROM journey_execution_events
+        WHERE journey_id = %s AND event_type IN ('entered', 'goal', 'milestone'){window_sql}
+        GROUP BY 1, 2, 3
+    """, (journey_uuid, *window_params))
+    frame = pd.DataFrame(cursor.fetchall(), columns=["day", "event_type", "node_id", "count"])
+
+    titles = _node_titles(cursor, journey_uuid)
+    if not frame.empty:
+        frame["series"] = frame["event_type"].where(
+            frame["event_type"] == "entered",
+            frame["event_type"] + ": " + frame["node_id"].map(lambda n: titles.get(n, {}).get("title", n))
+        )
+    daily = _daily(frame, "series", start, end)
+
+    return {
+        "goals": [
+            {
+                "goalId": row["goal_id"],
+                "title": row["title"],
+                "targetValue": float(row["target_value"] or 0),
+                "currentValue": float(row["current_value"] or 0),
+                "unit": row["unit"],
+                "status": row["status"],
+                "attainment": round(float(row["current_value"] or 0) / float(row["target_value"]), 4)
+                if row["target_value"] else None,
+            }
+            for row in goals
+        ],
+        "milestones": [
+            {
+                "milestoneId": item["milestoneId"],
+                "title": milestones[item["milestoneId"]]["title"],
+                "progress": milestones[item["milestoneId"]]["progress"],
+                "status": item["status"],
+                "targetDate": item["targetDate"],
+                "estimatedCompletion": item["estimatedCompletion"],
+                "blockedBy": item["blockedBy"],
+            }
+            for item in outlook["milestones"]
+        ],
+        "criticalPath": outlook["criticalPath"],
+        "earliestCompletion": outlook["earliestCompletion"],
+        "arrivals": _series(daily),
+        "cumulativeArrivals": _series(daily.cumsum() if not daily.empty else daily),
+    }
+
+
+# ============================================================================
+# PERFORMANCE
+# ============================================================================
+
+def build_performance(cursor, journey_id: str, start: Optional[datetime], end: Optional[datetime]) -> Dict[str, Any]:
+    """Node funnel, branch split, outcomes, time to finish and daily throughput"""
+    journey_uuid = UUID(journey_id)
+    window_sql, window_params = _window(start, end)
+    params = (journey_uuid, *window_params)
+    titles = _node_titles(cursor, journey_uuid)
+
+    cursor.execute(f"""
+        SELECT node_id, event_type, count(*), count(DISTINCT customer_id)
+        FROM journey_execution_events
+        WHERE journey_id = %s{window_sql}
+        GROUP BY 1, 2
+    """, params)
+    events = pd.DataFrame(cursor.fetchall(), columns=["node_id", "event_type", "events", "customers"])
+
+    funnel: List[Dict[str, Any]] = []
+    outcomes = {"entered": 0, "completed": 0, "exited": 0, "failed": 0}
+    if not events.empty:
+        totals = events.groupby("event_type")["customers"].sum()
+        for name in outcomes:
+            outcomes[name] = int(totals.get(name, 0))
+        reach = events.groupby("node_id").agg(events=("events", "sum"), customers=("customers", "max"))
+        reach["reachRate"] = (reach["customers"] / outcomes["entered"]).round(4) if outcomes["entered"] else 0.0
+        reach = reach.sort_values(["customers", "events"], ascending=False)
+        funnel = [
+            {
+                "nodeId": node_id,
+                "title": titles.get(node_id, {}).get("title", node_id),
+                "nodeType": titles.get(node_id, {}).get("subtype"),
+                "customers": int(row.customers),
+                "events": int(row.events),
+                "reachRate": float(row.reachRate),
+            }
+            for node_id, row in reach.iterrows()
+        ]
+
+    cursor.execute(f"""
+        SELECT node_id, detail, count(*) AS count
+        FROM journey_execution_events
+        WHERE journey_id = %s AND event_type = 'branch'{window_sql}
+        GROUP BY 1, 2
+    """, params)
+    branches = pd.DataFrame(cursor.fetchall(), columns=["node_id", "detail", "count"])
+    decisions: Dict[str, Any] = {}
+    if not branches.empty:
+        branches["share"] = (branches["count"] / branches.groupby("node_id")["count"].transform("sum")).round(4)
+        for node_id, group in branches.groupby("node_id"):
+            decisions[node_id] = {
+                "title": titles.get(node_id, {}).get("title", node_id),
+                "branches": [
+                    {"label": row.detail, "customers": int(row.count), "share": float(row.share)}
+                    for row in group.sort_values("count", ascending=False).itertuples()
+                ],
+            }
+
+    cursor.execute(f"""
+        WITH finished AS (
+            SELECT customer_id,
+                   min(occurred_at) FILTER (WHERE event_type = 'entered') AS entered_at,
+                   max(occurred_at) FILTER (WHERE event_type IN ('completed', 'exited')) AS finished_at
+            FROM journey_execution_events
+            WHERE journey_id = %s AND event_type IN ('entered', 'completed', 'exited'){window_sql}
+            GROUP BY customer_id
+        )
+        SELECT count(*), avg(seconds), percentile_cont(%s::float8[]) WITHIN GROUP (ORDER BY seconds)
+        FROM (
+            SELECT extract(epoch FROM finished_at - entered_at) AS seconds FROM finished
+            WHERE entered_at IS NOT NULL AND finished_at IS NOT NULL
+        ) durations
+    """, (*params, list(DURATION_PERCENTILES)))
+    finished, mean_seconds, percentiles = cursor.fetchone()
+    time_to_finish = {
+        "customers": finished,
+        "meanSeconds": round(float(mean_seconds), 3) if mean_seconds is not None else None,
+        **{
+            f"p{int(q * 100)}Seconds": round(value, 3) if value is not None else None
+            for q, value in zip(DURATION_PERCENTILES, percentiles or [None] * len(DURATION_PERCENTILES))
+        },
+    }
+
+    cursor.execute(f"""
+        SELECT date_trunc('day', occurred_at) AS day, event_type, count(*)
+        FROM journey_execution_events
+        WHERE journey_id = %s AND event_type IN ('entered', 'completed', 'exited', 'failed'){window_sql}
+        GROUP BY 1, 2
+    """, params)
+    daily = _daily(pd.DataFrame(cursor.fetchall(), columns=["day", "event_type", "count"]), "event_type", start, end)
+    rolling: Dict[str, Any] = {"days": [], "rate": []}
+    if not daily.empty and "entered" in daily and "completed" in daily:
+        window_sums = daily[["entered", "completed"]].rolling(ROLLING_DAYS, min_periods=1).sum()
+        rate = (window_sums["completed"] / window_sums["entered"].where(window_sums["entered"] > 0)).round(4)
+        rolling = {
+            "days": [day.strftime("%Y-%m-%d") for day in daily.index],
+            "rate": [None if pd.isna(value) else float(value) for value in rate],
+        }
+
+    return {
+        "outcomes": outcomes,
+        "completionRate": round(outcomes["completed"] / outcomes["entered"], 4) if outcomes["entered"] else None,
+        "funnel": funnel,
+        "decisions": decisions,
+        "timeToFinish": time_to_finish,
+        "throughput": _series(daily),
+        "rollingCompletionRate": {"windowDays": ROLLING_DAYS, **rolling},
+    }
+
+
+# ============================================================================
+# SUMMARY
+# ============================================================================
+
+def build_summary(cursor, journey_id: str, start: Optional[datetime], end: Optional[datetime]) -> Dict[str, Any]:
+    """Headline numbers: structure, current customer positions and window outcomes"""
+    journey_uuid = UUID(journey_id)
+    window_sql, window_params = _window(start, end)
+
+    cursor.execute("""
+        SELECT journey_name, total_nodes, total_edges, total_goals, completed_goals,
+               total_milestones, completed_milestones, total_reports
+        FROM journey_stats WHERE journey_id = %s
+    """, (journey_uuid,))
+    row = cursor.fetchone() or (None, 0, 0, 0, 0, 0, 0, 0)
+    structure = dict(zip(
+        ("name", "totalNodes", "totalEdges", "totalGoals", "completedGoals",
+         "totalMilestones", "completedMilestones", "totalReports"),
+        row
+    ))
+
+    cursor.execute("""
+        SELECT status, count(*) FROM journey_customer_states WHERE journey_id = %s GROUP BY status
+    """, (journey_uuid,))
+    customers = {name: 0 for name in STATUS_NAMES.values()}
+    for status, count in cursor.fetchall():
+        customers[STATUS_NAMES[status]] = count
+
+    cursor.execute(f"""
+        SELECT count(*) FILTER (WHERE event_type = 'entered'),
+               count(*) FILTER (WHERE event_type = 'completed'),
+               count(*) FILTER (WHERE event_type = 'exited'),
+               count(*) FILTER (WHERE event_type = 'failed'),
+               count(*) FILTER (WHERE event_type = 'message'),
+               count(*) FILTER (WHERE event_type = 'goal'),
+               count(*)
+        FROM journey_execution_events
+        WHERE journey_id = %s{window_sql}
+    """, (journey_uuid, *window_params))
+    entered, completed, exited, failed, messages, goals_reached, total_events = cursor.fetchone()
+
+    titles = _node_titles(cursor, journey_uuid)
+    cursor.execute(f"""
+        SELECT node_id, count(DISTINCT customer_id) AS customers
+        FROM journey_execution_events
+        WHERE journey_id = %s AND event_type IN ('message', 'goal', 'milestone'){window_sql}
+        GROUP BY node_id ORDER BY customers DESC LIMIT 5
+    """, (journey_uuid, *window_params))
+    top_nodes = [
+        {"nodeId": node_id, "title": titles.get(node_id, {}).get("title", node_id), "customers": count}
+        for node_id, count in cursor.fetchall()
+    ]
+
+    return {
+        "structure": structure,
+        "customers": customers,
+        "window": {
+            "events": total_events,
+            "entered": entered,
+            "completed": completed,
+            "exited": exited,
+            "failed": failed,
+            "messagesSent": messages,
+            "goalsReached": goals_reached,
+            "completionRate": round(completed / entered, 4) if entered else None,
+        },
+        "topNodes": top_nodes,
+    }
+
+
+REPORT_BUILDERS: Dict[str, Callable[..., Dict[str, Any]]] = {
+    "progress": build_progress,
+    "performance": build_performance,
+    "summary": build_summary,
+}
@@ -0,0 +1,264 @@
+"""
+Server-side journey reports.
+
+Requesting a report never builds it on the request path: if ``journey_reports`` already
+holds the report for the journey's current revision and the same window, it is returned;
+otherwise a ``report`` job is queued (keyed by report and revision, so repeated requests
+share it) and a job worker builds it (``run_job``), writing the result into
+``journey_reports`` flagged ``server_built``, so editor saves never delete or overwrite it.
+
+The revision covers everything a report reads - the journey graph, goals, milestones,
+published plans and, while the window is still open, the newest execution event - so a
+stored report is reused until one of them changes.
+"""
+import hashlib
+import os
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Optional, Tuple
+from uuid import UUID
+
+from ...models.journey_models import APIResponse
+from ..journey.utils import get_connection, ensure_uuid, safe_json_parse
+from .builders import REPORT_BUILDERS
+from ..jobs.queue import enqueue
+from ...shared_services.logger_setup import setup_logger
+from ...shared_services.tracing import trace_methods
+from ...shared_services.serialization import to_jsonb
+
+logger = setup_logger()
+
+REPORT_JOB = "report"
+# Reports built at once across all workers; each holds a database snapshot while it runs
+REPORT_JOB_CONCURRENCY = int(os.getenv("REPORT_JOB_CONCURRENCY", "2"))
+# A build still running after this long is assumed lost and is retried
+REPORT_JOB_TIMEOUT_SECONDS = int(os.getenv("REPORT_JOB_TIMEOUT_SECONDS", "900"))
+REPORT_MAX_ATTEMPTS = int(os.getenv("REPORT_MAX_ATTEMPTS", "3"))
+# Reports are requested by someone waiting for them
+REPORT_JOB_PRIORITY = 10
+# Windows that ended longer ago than this no longer receive events
+REPORT_SETTLE_SECONDS = int(os.getenv("REPORT_SETTLE_SECONDS", "60"))
+
+REPORT_REVISION_SQL = """
+    SELECT j.updated_at,
+           (SELECT count(*) || ':' || coalesce(max(updated_at)::text, '') FROM journey_nodes WHERE journey_id = j.id),
+           (SELECT count(*) || ':' || coalesce(max(updated_at)::text, '') FROM journey_edges WHERE journey_id = j.id),
+           (SELECT count(*) || ':' || coalesce(max(updated_at)::text, '') FROM journey_goals WHERE journey_id = j.id),
+           (SELECT count(*) || ':' || coalesce(max(updated_at)::text, '') FROM journey_milestones WHERE journey_id = j.id),
+           (SELECT max(version) FROM journey_execution_plans WHERE journey_id = j.id),
+           CASE WHEN %(open)s
+                THEN (SELECT max(id) FROM journey_execution_events WHERE journey_id = j.id)
+           END
+    FROM journeys j
+    WHERE j.id = %(journey_id)s
+"""
+
+def report_key(report_type: str, start: Optional[datetime], end: Optional[datetime]) -> str:
+    """report_id of a report type over a window, e.g. performance-20270101T000000Z-now"""
+    def stamp(value: Optional[datetime], missing: str) -> str:
+        if value is None:
+            return missing
+        return value.astimezone(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+    return f"{report_type}-{stamp(start, 'start')}-{stamp(end, 'now')}"
+
+
+def report_revision(cursor, journey_uuid: UUID, end: Optional[datetime], now: datetime) -> Optional[str]:
+    """Revision tag of everything a report over a window ending at ``end`` reads; None if no journey"""
+    window_open = end is None or end > now - timedelta(seconds=REPORT_SETTLE_SECONDS)
+    cursor.execute(REPORT_REVISION_SQL, {"journey_id": journey_uuid, "open": window_open})
+    row = cursor.fetchone()
+    if not row:
+        return None
+    return hashlib.blake2b(repr(row).encode("utf-8"), digest_size=8).hexdigest()
+
+
+@trace_methods
+class JourneyReportService:
+    """Service for requesting, building and reading server-side journey reports"""
+
+    def __init__(self):
+        self.logger = logger
+
+    # ------------------------------------------------------------------
+    # Request path
+    # ------------------------------------------------------------------
+
+    def _load_report(self, cursor, journey_uuid: UUID, report_id: str) -> Optional[Dict[str, Any]]:
+        cursor.execute("""
+            SELECT report_id, name, report_type, generated_at, data
+            FROM journey_reports WHERE journey_id = %s AND report_id = %s
+        """, (journey_uuid, report_id))
+        row = cursor.fetchone()
+        if not row:
+            return None
+        return {"id": row[0], "name": row[1], "type": row[2], "generatedAt": row[3], "data": safe_json_parse(row[4])}
+
+    async def request_report(self, journey_id: str, report_type: str, start: Optional[datetime] = None,
+                             end: Optional[datetime] = None, name: Optional[str] = None) -> APIResponse:
+        """Return the stored report if it is current, otherwise queue a job that builds it"""
+        try:
+            journey_uuid = ensure_uuid(journey_id)
+            if report_type not in REPORT_BUILDERS:
+                return APIResponse(
+                    success=False,
+                    message="Unknown report type",
+                    error=f"Report type must be one of {', '.join(REPORT_BUILDERS)}"
+                )
+            if start is not None and end is not None and start >= end:
+                return APIResponse(
+                    success=False,
+                    message="Invalid report window",
+                    error="windowStart must be before windowEnd"
+                )
+
+            report_id = report_key(report_type, start, end)
+            now = datetime.now(timezone.utc)
+            with get_connection("journeys") as conn:
+                try:
+                    conn.rollback()
+                    with conn.cursor() as cursor:
+                        revision = report_revision(cursor, journey_uuid, end, now)
+                        if revision is None:
+                            conn.rollback()
+                            return APIResponse(
+                                success=False,
+                                message="Journey not found",
+                                error="Journey not found"
+                            )
+
+                        report = self._load_report(cursor, journey_uuid, report_id)
+                        if report is not None and report["data"].get("revision") == revision:
+                            conn.rollback()
+                            return APIResponse(
+                                success=True,
+                                message="Report is up to date",
+                                data={"status": "ready", "reportId": report_id, "report": report}
+                            )
+
+                        # A finished job under the same key built a report that has been replaced
+                        # since, so it runs again; a queued or running one is shared
+                        job_id, _ = enqueue(
+                            cursor, REPORT_JOB,
+                            {
+                                "journeyId": str(journey_uuid),
+                                "reportId": report_id,
+                                "type": report_type,
+                                "name": name or f"{report_type.capitalize()} report",
+                                "windowStart": start.isoformat() if start else None,
+                                "windowEnd": end.isoformat() if end else None,
+                            },
+                            priority=REPORT_JOB_PRIORITY,
+                            idempotency_key=f"{journey_uuid}:{report_id}:{revision}",
+                            max_attempts=REPORT_MAX_ATTEMPTS,
+                            retry_finished=True
+                        )
+                    conn.commit()
+                except Exception:
+                    conn.rollback()
+                    raise
+
+            return APIResponse(
+                success=True,
+                message="Report queued",
+                data={"status": "queued", "reportId": report_id, "jobId": str(job_id), "revision": revision}
+            )
+
+        except Exception as e:
+            self.logger.error(f"Error requesting report: {e}")
+            return APIResponse(
+                success=False,
+                message="Failed to request report",
+                error=str(e)
+            )
+
+    async def get_report(self, journey_id: str, report_id: str) -> APIResponse:
+        """A stored report, flagged stale when the journey changed since it was built"""
+        try:
+            journey_uuid = ensure_uuid(journey_id)
+            with get_connection("journeys") as conn:
+                with conn.cursor() as cursor:
+                    report = self._load_report(cursor, journey_uuid, report_id)
+                    window = (report or {}).get("data", {}).get("window") or {}
+                    end = datetime.fromisoformat(window["end"]) if window.get("end") else None
+                    revision = report_revision(cursor, journey_uuid, end, datetime.now(timezone.utc))
+                conn.rollback()
+
+            if report is None:
+                return APIResponse(
+                    success=False,
+                    message="Report not found",
+                    error=f"No report {report_id} for journey {journey_id}"
+                )
+            return APIResponse(
+                success=True,
+                message="Report retrieved successfully",
+                data={"report": report, "stale": report["data"].get("revision") != revision}
+            )
+
+        except Exception as e:
+            self.logger.error(f"Error getting report: {e}")
+            return APIResponse(
+                success=False,
+                message="Failed to get report",
+                error=str(e)
+            )
+
+    # ------------------------------------------------------------------
+    # Job handler
+    # ------------------------------------------------------------------
+
+    def _build(self, conn, journey_uuid: UUID, report_type: str, start: Optional[datetime],
+               end: Optional[datetime]) -> Tuple[Dict[str, Any], str]:
+        """Build a report from one consistent snapshot; returns (data, revision)"""
+        conn.rollback()
+        try:
+            with conn.cursor() as cursor:
+                cursor.execute("SET TRANSACTION ISOLATION LEVEL REPEATABLE READ READ ONLY")
+                revision = report_revision(cursor, journey_uuid, end, datetime.now(timezone.utc))
+                if revision is None:
+                    raise ValueError(f"Journey {journey_uuid} not found")
+                started = time.perf_counter()
+                data = REPORT_BUILDERS[report_type](cursor, str(journey_uuid), start, end)
+            elapsed = time.perf_counter() - started
+        finally:
+            conn.rollback()
+
+        data = {
+            "revision": revision,
+            "window": {
+                "start": start.isoformat() if start else None,
+                "end": end.isoformat() if end else None,
+            },
+            "buildSeconds": round(elapsed, 4),
+            **data,
+        }
+        return data, revision
+
+    def run_job(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """Job handler: build the requested report and store it in journey_reports"""
+        journey_uuid = ensure_uuid(payload["journeyId"])
+        start = datetime.fromisoformat(payload["windowStart"]) if payload.get("windowStart") else None
+        end = datetime.fromisoformat(payload["windowEnd"]) if payload.get("windowEnd") else None
+
+        with get_connection("journeys") as conn:
+            data, revision = self._build(conn, journey_uuid, payload["type"], start, end)
+            try:
+                with conn.cursor() as cursor:
+                    cursor.execute("""
+                        INSERT INTO journey_reports (journey_id, report_id, name, report_type, generated_at, data, server_built)
+                        VALUES (%s, %s, %s, %s, NOW(), %s, TRUE)
+                        ON CONFLICT (journey_id, report_id)
+                        DO UPDATE SET name = EXCLUDED.name, report_type = EXCLUDED.report_type,
+                                      generated_at = EXCLUDED.generated_at, data = EXCLUDED.data,
+                                      server_built = TRUE
+                    """, (journey_uuid, payload["reportId"], payload["name"], payload["type"], to_jsonb(data)))
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+
+        self.logger.info(
+            f"Built {payload['type']} report {payload['reportId']} for journey {journey_uuid} "
+            f"in {data['buildSeconds']}s"
+        )
+        return {"reportId": payload["reportId"], "revision": revision, "buildSeconds": data["buildSeconds"]}
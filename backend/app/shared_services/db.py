@@ -1,5 +1,6 @@
 import os
 import threading
+import time
 from contextlib import contextmanager
 
 from typing import List, Dict, Any, Optional, TypedDict, Union
@@ -9,11 +10,14 @@ import psycopg2
 import psycopg2.pool
 import requests
 
-from psycopg2.extras import Json, RealDictCursor, register_uuid
+from psycopg2.extras import Json, RealDictCursor, register_uuid, register_default_json, register_default_jsonb
+
+import orjson
 
 import numpy as np
 
 from .logger_setup import setup_logger
+from .metrics import TimedCursor, DB_POOL_WAIT, DB_POOL_CONNECTIONS_IN_USE, DB_POOL_ERRORS
 
 load_dotenv()
 
@@ -61,7 +65,8 @@ def get_postgres_connection(table_name: str = None):
     """
     Get a connection, preferring the global pool. Only yield ONCE.
     We don't catch user code exceptions here; cleanup runs in finally.
-    Also registers UUID adapter for psycopg2.
+    Also registers UUID adapter and orjson JSON decoders for psycopg2, and times every
+    statement (see metrics.TimedCursor).
     """
     conn = None
     pool = None
@@ -69,14 +74,21 @@ def get_postgres_connection(table_name: str = None):
 
     try:
         # Try to get a pooled connection; if pool creation or getconn fails, fall back
+        started = time.perf_counter()
         try:
             pool = get_connection_pool()
             conn = pool.getconn()
             got_from_pool = True
+            DB_POOL_WAIT.labels("pool").observe(time.perf_counter() - started)
         except Exception as e:
             logger.error(f"Error obtaining pooled connection: {e}")
+            DB_POOL_ERRORS.inc()
             pool = None
+            started = time.perf_counter()
             conn = psycopg2.connect(database_url)
+            DB_POOL_WAIT.labels("direct").observe(time.perf_counter() - started)
+        DB_POOL_CONNECTIONS_IN_USE.inc()
+        conn.cursor_factory = TimedCursor
 
         # Ensure UUID adaptation on this connection
         try:
@@ -84,10 +96,18 @@ def get_postgres_connection(table_name: str = None):
         except Exception as e:
             logger.error(f"Failed to register UUID adapter: {e}")
 
+        # Decode JSON/JSONB columns with orjson instead of the stdlib json module
+        try:
+            register_default_json(conn_or_curs=conn, loads=orjson.loads)
+            register_default_jsonb(conn_or_curs=conn, loads=orjson.loads)
+        except Exception as e:
+            logger.error(f"Failed to register JSON decoders: {e}")
+
         yield conn
 
     finally:
         if conn:
+            DB_POOL_CONNECTIONS_IN_USE.dec()
             if got_from_pool and pool is not None:
                 try:
                     pool.putconn(conn)
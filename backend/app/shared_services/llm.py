@@ -1,6 +1,7 @@
 from openai import OpenAI
 from typing import List, Dict, Any, Optional
 import os
+import time
 from dotenv import load_dotenv
 from pydantic import BaseModel
 import instructor
@@ -10,6 +11,9 @@ import google.generativeai as genai
 from instructor import patch
 import tiktoken
 
+from .metrics import observe_llm_call
+from .tracing import span
+
 def count_tokens(text: str, model: str = "gpt-4") -> int:
     """
     Count tokens for any model using tiktoken.
@@ -153,48 +157,63 @@ async def call_llm_api(messages: List[Dict[str, str]],
     input_tokens = count_tokens_in_messages(messages, model)
     print(f"📊 Input tokens: {input_tokens}")
     
-    try:
-        # If a response model is provided, use it for structured output
-        if response_format:
-            response = openrouter_client.chat.completions.create(
-                model=model,
-                messages=messages,
-                max_tokens=max_tokens,
-                temperature=temperature,
-                response_model=response_format,
-                max_retries=3,
-                extra_headers={
-                    "HTTP-Referer": "https://mwalimu.ai", # Optional. Site URL for rankings on openrouter.ai.
-                    "X-Title": "Mwalimu", # Optional. Site title for rankings on openrouter.ai.
-                }
-            )
-            result = response
-        else:
-            # For unstructured responses
-            response = openrouter_client.chat.completions.create(
-                model=model,
-                messages=messages,
-                max_tokens=max_tokens,
-                temperature=temperature,
-                max_retries=3
-            )
-            result = response.choices[0].message.content
+    started = time.perf_counter()
+    with span("llm.chat", {
+        "gen_ai.system": "openrouter",
+        "gen_ai.request.model": model,
+        "gen_ai.request.max_tokens": max_tokens,
+        "gen_ai.request.temperature": temperature,
+        "gen_ai.usage.input_tokens": input_tokens,
+    }) as llm_span:
+        try:
+            # If a response model is provided, use it for structured output
+            if response_format:
+                response = openrouter_client.chat.completions.create(
+                    model=model,
+                    messages=messages,
+                    max_tokens=max_tokens,
+                    temperature=temperature,
+                    response_model=response_format,
+                    max_retries=3,
+                    extra_headers={
+                        "HTTP-Referer": "https://mwalimu.ai", # Optional. Site URL for rankings on openrouter.ai.
+                        "X-Title": "Mwalimu", # Optional. Site title for rankings on openrouter.ai.
+                    }
+                )
+                result = response
+            else:
+                # For unstructured responses
+                response = openrouter_client.chat.completions.create(
+                    model=model,
+                    messages=messages,
+                    max_tokens=max_tokens,
+                    temperature=temperature,
+                    max_retries=3
+                )
+                result = response.choices[0].message.content
         
-        # Count output tokens (approximate)
-        if hasattr(result, 'message_to_user'):
-            output_text = result.message_to_user or ""
-        elif hasattr(result, 'content'):
-            output_text = result.content or ""
-        else:
-            output_text = str(result)
+            # Count output tokens (approximate)
+            if hasattr(result, 'message_to_user'):
+                output_text = result.message_to_user or ""
+            elif hasattr(result, 'content'):
+                output_text = result.content or ""
+            else:
+                output_text = str(result)
         
-        output_tokens = count_tokens(output_text, model)
-        print(f"📊 Output tokens: {output_tokens}")
-        print(f"📊 Total tokens: {input_tokens + output_tokens}")
+            output_tokens = count_tokens(output_text, model)
+            print(f"📊 Output tokens: {output_tokens}")
+            print(f"📊 Total tokens: {input_tokens + output_tokens}")
         
-        return result
-    except Exception as e:
-        print(f"Error in OpenRouter API call: {e}")
-        raise
+            # Prefer the provider's own token counts (instructor keeps the raw completion)
+            usage = getattr(getattr(response, "_raw_response", response), "usage", None)
+            input_tokens = getattr(usage, "prompt_tokens", None) or input_tokens
+            output_tokens = getattr(usage, "completion_tokens", None) or output_tokens
+            observe_llm_call("openrouter", model, time.perf_counter() - started, "ok", input_tokens, output_tokens)
+            llm_span.set_attributes({"gen_ai.usage.input_tokens": input_tokens, "gen_ai.usage.output_tokens": output_tokens})
+            return result
+        except Exception as e:
+            print(f"Error in OpenRouter API call: {e}")
+            observe_llm_call("openrouter", model, time.perf_counter() - started, "error", input_tokens)
+            raise
 
 
@@ -0,0 +1,225 @@
+"""
+Prometheus metrics, served by GET /metrics.
+
+Metric names and label sets are part of the monitoring contract: add new metrics
+instead of renaming or relabelling existing ones. Label values are kept bounded -
+routes are path templates (``/api/journeys/{journey_id}``), queries are the calling
+function, caches are cache names - so series do not grow with traffic.
+
+- cvm_http_request_duration_seconds{method, route, status}
+- cvm_http_requests_in_progress{method}
+- cvm_db_query_duration_seconds{query, statement} and cvm_db_query_errors_total
+- cvm_db_pool_wait_seconds{source}, cvm_db_pool_connections_in_use, cvm_db_pool_errors_total
+- cvm_llm_request_duration_seconds{provider, model, status}, cvm_llm_tokens_total{provider, model, direction}
+- cvm_cache_requests_total{cache, result}, cvm_cache_entries{cache}
+
+With several server processes set PROMETHEUS_MULTIPROC_DIR (see prometheus_client's
+multiprocess mode); cache metrics are then left out, as they are read live from memory.
+"""
+import os
+import sys
+import time
+from typing import Callable, Dict, Tuple
+
+import psycopg2.extensions
+from prometheus_client import (
+    CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Gauge, Histogram, generate_latest,
+)
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily
+from starlette.responses import Response
+
+from .query_stats import query_stats
+from .tracing import child_span
+
+HTTP_REQUEST_DURATION = Histogram(
+    "cvm_http_request_duration_seconds", "HTTP request latency until the response body is sent",
+    ["method", "route", "status"],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30),
+)
+HTTP_REQUESTS_IN_PROGRESS = Gauge(
+    "cvm_http_requests_in_progress", "HTTP requests being handled", ["method"], multiprocess_mode="livesum",
+)
+
+DB_QUERY_DURATION = Histogram(
+    "cvm_db_query_duration_seconds", "Time spent in cursor.execute, by calling function and statement",
+    ["query", "statement"],
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10),
+)
+DB_QUERY_ERRORS = Counter(
+    "cvm_db_query_errors_total", "Statements that raised, by calling function and statement", ["query", "statement"],
+)
+DB_POOL_WAIT = Histogram(
+    "cvm_db_pool_wait_seconds", "Time to obtain a database connection (source: pool or direct fallback)",
+    ["source"],
+    buckets=(0.0001, 0.0005, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5),
+)
+DB_POOL_CONNECTIONS_IN_USE = Gauge(
+    "cvm_db_pool_connections_in_use", "Database connections checked out", multiprocess_mode="livesum",
+)
+DB_POOL_ERRORS = Counter(
+    "cvm_db_pool_errors_total", "Failures to get a pooled connection (a direct connection is opened instead)",
+)
+
+LLM_REQUEST_DURATION = Histogram(
+    "cvm_llm_request_duration_seconds", "LLM API call latency", ["provider", "model", "status"],
+    buckets=(0.25, 0.5, 1, 2, 4, 8, 15, 30, 60, 120),
+)
+LLM_TOKENS = Counter(
+    "cvm_llm_tokens_total", "LLM tokens (direction: input or output)", ["provider", "model", "direction"],
+)
+
+
+# ----------------------------------------------------------------------
+# Database
+# ----------------------------------------------------------------------
+
+# Modules whose frames are skipped when attributing a statement to its caller
+_HELPER_MODULES = ("psycopg2", __name__.rsplit(".", 1)[0] + ".prepared")
+
+
+def _caller() -> str:
+    """module.function of the code that issued a statement, skipping psycopg2 helpers such as execute_values
+    and PreparedStatement"""
+    frame = sys._getframe(2)  # _caller <- TimedCursor.execute <- caller
+    while frame is not None and frame.f_globals.get("__name__", "").startswith(_HELPER_MODULES):
+        frame = frame.f_back
+    if frame is None:
+        return "unknown"
+    code = frame.f_code
+    return f"{frame.f_globals.get('__name__', 'unknown')}.{getattr(code, 'co_qualname', code.co_name)}"
+
+
+def _statement(query) -> str:
+    """Leading SQL keyword (SELECT, INSERT, WITH, ...)"""
+    if isinstance(query, bytes):
+        query = query.decode("utf-8", "replace")
+    if not isinstance(query, str):
+        return "COMPOSED"
+    words = query.lstrip().split(None, 1)
+    return words[0][:16].upper() if words else "EMPTY"
+
+
+class TimedCursor(psycopg2.extensions.cursor):
+    """
+    Cursor recording every execute/executemany in cvm_db_query_duration_seconds, as a
+    span with its row count when it runs inside a traced operation, and in query_stats
+    (fingerprints, slow-query plans)
+    """
+
+    def _run(self, method, query, caller: str, vars):
+        statement = _statement(query)
+        started = time.perf_counter()
+        with child_span(f"db {statement}", {
+            "db.system": "postgresql",
+            "db.operation": statement,
+            "db.statement": query if isinstance(query, str) else None,
+            "code.function": caller,
+        }) as span:
+            try:
+                result = method(query, vars)
+            except Exception:
+                DB_QUERY_ERRORS.labels(caller, statement).inc()
+                DB_QUERY_DURATION.labels(caller, statement).observe(time.perf_counter() - started)
+                raise
+            seconds = time.perf_counter() - started
+            DB_QUERY_DURATION.labels(caller, statement).observe(seconds)
+            span.set_attribute("db.rowcount", self.rowcount)
+        query_stats.observe(self, query, vars, caller, seconds)
+        return result
+
+    def execute(self, query, vars=None):
+        return self._run(super().execute, query, _caller(), vars)
+
+    def executemany(self, query, vars_list):
+        return self._run(super().executemany, query, _caller(), vars_list)
+
+
+# ----------------------------------------------------------------------
+# LLM
+# ----------------------------------------------------------------------
+
+def observe_llm_call(provider: str, model: str, seconds: float, status: str,
+                     input_tokens: int = 0, output_tokens: int = 0) -> None:
+    LLM_REQUEST_DURATION.labels(provider, model, status).observe(seconds)
+    if input_tokens:
+        LLM_TOKENS.labels(provider, model, "input").inc(input_tokens)
+    if output_tokens:
+        LLM_TOKENS.labels(provider, model, "output").inc(output_tokens)
+
+
+# ----------------------------------------------------------------------
+# Caches
+# ----------------------------------------------------------------------
+
+# name -> () -> (hits, misses, entries)
+_caches: Dict[str, Callable[[], Tuple[int, int, int]]] = {}
+
+
+def register_cache(name: str, stats: Callable[[], Tuple[int, int, int]]) -> None:
+    """Expose an in-process cache; ``stats`` returns its (hits, misses, entries) counters"""
+    _caches[name] = stats
+
+
+class CacheCollector:
+    """Reads the registered caches' counters at scrape time, so lookups stay free of metric updates"""
+
+    def collect(self):
+        requests = CounterMetricFamily("cvm_cache_requests", "Cache lookups (result: hit or miss)", labels=["cache", "result"])
+        entries = GaugeMetricFamily("cvm_cache_entries", "Entries held by a cache", labels=["cache"])
+        for name, stats in list(_caches.items()):
+            hits, misses, size = stats()
+            requests.add_metric([name, "hit"], hits)
+            requests.add_metric([name, "miss"], misses)
+            entries.add_metric([name], size)
+        yield requests
+        yield entries
+
+
+REGISTRY.register(CacheCollector())
+
+
+# ----------------------------------------------------------------------
+# HTTP
+# ----------------------------------------------------------------------
+
+class MetricsMiddleware:
+    """ASGI middleware timing each request until its last body chunk is sent (covers streaming responses)"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        status = [500]
+
+        async def send_with_status(message):
+            if message["type"] == "http.response.start":
+                status[0] = message["status"]
+            await send(message)
+
+        in_progress = HTTP_REQUESTS_IN_PROGRESS.labels(method)
+        in_progress.inc()
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            in_progress.dec()
+            # The router stores the matched route in the scope; its path is the template
+            route = getattr(scope.get("route"), "path", None) or "unmatched"
+            HTTP_REQUEST_DURATION.labels(method, route, str(status[0])).observe(time.perf_counter() - started)
+
+
+def metrics_response() -> Response:
+    """Prometheus text exposition of this process (or of all processes in multiprocess mode)"""
+    if os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+        from prometheus_client import multiprocess
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    # CONTENT_TYPE_LATEST already names the charset, so set the header as is
+    return Response(generate_latest(registry), headers={"Content-Type": CONTENT_TYPE_LATEST})
@@ -0,0 +1,79 @@
+"""
+Server-side prepared statements for the hot, fixed journey queries.
+
+psycopg2 has no statement cache of its own: every ``cursor.execute`` sends the full SQL
+text, which Postgres parses, analyzes and plans again. A PreparedStatement is declared
+once at module level; the first time it runs on a pooled connection it is sent as
+``PREPARE <name> AS ...`` and from then on only ``EXECUTE <name> (...)`` goes over the
+wire, so the server skips parsing and, once it settles on a generic plan, planning.
+
+Prepared statements belong to the database session, so the names prepared on each
+connection are remembered for as long as the connection object lives; a connection the
+pool reopens starts empty. Set PREPARED_STATEMENTS=0 when connecting through a pooler
+that does not keep sessions (pgbouncer in transaction mode): the statements then run as
+plain SQL.
+"""
+import os
+import re
+import threading
+import weakref
+from typing import Iterable, Sequence, Set
+
+from psycopg2.extras import execute_batch
+
+PREPARED_STATEMENTS = os.getenv("PREPARED_STATEMENTS", "1").lower() not in ("0", "false", "no")
+
+_PLACEHOLDER = re.compile(r"%s")
+
+# connection -> names prepared in its session
+_prepared: "weakref.WeakKeyDictionary[object, Set[str]]" = weakref.WeakKeyDictionary()
+_lock = threading.Lock()
+
+
+def _is_prepared(conn, name: str) -> bool:
+    with _lock:
+        return name in _prepared.get(conn, ())
+
+
+def _mark_prepared(conn, name: str) -> None:
+    with _lock:
+        _prepared.setdefault(conn, set()).add(name)
+
+
+class PreparedStatement:
+    """A fixed statement with positional ``%s`` parameters, prepared once per connection"""
+
+    def __init__(self, name: str, sql: str):
+        if "%(" in sql:
+            raise ValueError(f"Prepared statement {name} must use positional %s parameters")
+        self.name = name
+        self.sql = sql
+        self.params = len(_PLACEHOLDER.findall(sql))
+        counter = iter(range(1, self.params + 1))
+        self._prepare = f"PREPARE {name} AS {_PLACEHOLDER.sub(lambda _: f'${next(counter)}', sql)}"
+        self._execute = f"EXECUTE {name}" + (f" ({', '.join(['%s'] * self.params)})" if self.params else "")
+
+    def _ensure(self, cursor) -> None:
+        conn = cursor.connection
+        if not _is_prepared(conn, self.name):
+            cursor.execute(self._prepare)
+            _mark_prepared(conn, self.name)
+
+    def execute(self, cursor, vars: Sequence = ()) -> None:
+        """Run the statement on ``cursor``; fetch the results from the cursor as usual"""
+        if not PREPARED_STATEMENTS:
+            cursor.execute(self.sql, vars)
+            return
+        self._ensure(cursor)
+        cursor.execute(self._execute, vars)
+
+    def execute_batch(self, cursor, vars_list: Iterable[Sequence], page_size: int = 100) -> None:
+        """Run the statement once per parameter tuple, ``page_size`` executions per round trip"""
+        vars_list = list(vars_list)
+        if not vars_list:
+            return
+        if not PREPARED_STATEMENTS:
+            execute_batch(cursor, self.sql, vars_list, page_size=page_size)
+            return
+        self._ensure(cursor)
+        execute_batch(cursor, self._execute, vars_list, page_size=page_size)
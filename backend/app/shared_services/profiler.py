@@ -0,0 +1,326 @@
+"""
+In-process profiling for a running server, served by the admin router.
+
+- SamplingProfiler: a background thread that reads every thread's Python stack
+  (``sys._current_frames``) at a fixed interval and counts the stacks. The output is
+  collapsed ("folded") stacks - ``thread;outer (file:line);...;leaf (file:line) count``
+  per line - which flamegraph.pl, speedscope and inferno read directly.
+- ProfilingMiddleware: samples a single request when it carries ``X-Profile: 1`` and a
+  valid ``X-Admin-Token``; the response names the stored profile in ``X-Profile-Id``.
+- tracemalloc snapshots: top allocation sites, optionally diffed against the previous snapshot.
+
+Everything is off until an admin turns it on, so it is safe to leave in production
+builds: the middleware costs one header lookup per request. The admin surface only
+exists when ADMIN_TOKEN is set. Profiles and snapshots belong to the process that
+served the request - with several server workers, each keeps its own.
+"""
+import hmac
+import os
+import sys
+import threading
+import time
+import tracemalloc
+import uuid
+from collections import Counter, OrderedDict
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+from .logger_setup import setup_logger
+
+logger = setup_logger()
+
+PROFILE_INTERVAL_MS = float(os.getenv("PROFILE_INTERVAL_MS", "5"))
+PROFILE_MAX_SECONDS = float(os.getenv("PROFILE_MAX_SECONDS", "300"))
+# Finished profiles kept in memory for download
+PROFILE_HISTORY = int(os.getenv("PROFILE_HISTORY", "20"))
+# Requests profiled at the same time (each runs its own sampler thread)
+PROFILE_MAX_CONCURRENT_REQUESTS = int(os.getenv("PROFILE_MAX_CONCURRENT_REQUESTS", "2"))
+
+# Leaf frames of threads that are waiting rather than working; left out unless idle stacks are asked for
+IDLE_LEAVES = {
+    ("selectors.py", "select"),
+    ("thread.py", "_worker"),
+    ("threading.py", "wait"),
+    ("threading.py", "_wait_for_tstate_lock"),
+    ("queue.py", "get"),
+    ("socket.py", "accept"),
+    ("ssl.py", "read"),
+}
+
+_backend_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+
+
+def admin_authorized(token: Optional[str]) -> bool:
+    """True when ADMIN_TOKEN is set and ``token`` matches it"""
+    expected = os.getenv("ADMIN_TOKEN")
+    return bool(expected and token) and hmac.compare_digest(token.encode("utf-8"), expected.encode("utf-8"))
+
+
+def new_profile_id() -> str:
+    return uuid.uuid4().hex[:12]
+
+
+def _short_path(filename: str) -> str:
+    if filename.startswith(_backend_dir):
+        return os.path.relpath(filename, _backend_dir)
+    marker = filename.rfind("site-packages" + os.sep)
+    if marker >= 0:
+        return filename[marker + len("site-packages") + 1:]
+    return os.path.basename(filename)
+
+
+class SamplingProfiler:
+    """Counts the stacks of all threads every ``interval`` seconds until stopped or ``max_seconds`` pass"""
+
+    def __init__(self, interval: float, max_seconds: float, include_idle: bool = False, label: str = ""):
+        self.interval = interval
+        self.max_seconds = max_seconds
+        self.include_idle = include_idle
+        self.label = label
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self.started_at: Optional[datetime] = None
+        self.stopped_at: Optional[datetime] = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        # code object -> frame label, so each function is formatted once
+        self._labels: Dict[Any, str] = {}
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> None:
+        self.started_at = datetime.now(timezone.utc)
+        self._thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join()
+
+    def _frame_label(self, code) -> str:
+        label = self._labels.get(code)
+        if label is None:
+            label = f"{code.co_name} ({_short_path(code.co_filename)}:{code.co_firstlineno})"
+            self._labels[code] = label
+        return label
+
+    def _sample(self, own_ident: int, thread_names: Dict[int, str]) -> None:
+        for ident, frame in sys._current_frames().items():
+            if ident == own_ident:
+                continue
+            code = frame.f_code
+            if not self.include_idle and (os.path.basename(code.co_filename), code.co_name) in IDLE_LEAVES:
+                continue
+            stack: List[str] = []
+            while frame is not None:
+                stack.append(self._frame_label(frame.f_code))
+                frame = frame.f_back
+            stack.append(thread_names.get(ident, f"thread-{ident}"))
+            self.stacks[";".join(reversed(stack))] += 1
+        self.samples += 1
+
+    def _run(self) -> None:
+        own_ident = threading.get_ident()
+        deadline = time.monotonic() + self.max_seconds
+        while not self._stop.is_set() and time.monotonic() < deadline:
+            thread_names = {thread.ident: thread.name for thread in threading.enumerate()}
+            self._sample(own_ident, thread_names)
+            self._stop.wait(self.interval)
+        self.stopped_at = datetime.now(timezone.utc)
+
+    def folded(self) -> str:
+        """Collapsed stacks, heaviest first"""
+        return "".join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "label": self.label,
+            "running": self.running,
+            "intervalMs": round(self.interval * 1000, 3),
+            "samples": self.samples,
+            "stacks": len(self.stacks),
+            "startedAt": self.started_at,
+            "stoppedAt": self.stopped_at,
+            "pid": os.getpid(),
+        }
+
+
+def _location(traceback: tracemalloc.Traceback, key_type: str) -> str:
+    if key_type == "traceback":
+        return "\n".join(f"{_short_path(frame.filename)}:{frame.lineno}" for frame in traceback)
+    frame = traceback[0]
+    return _short_path(frame.filename) if key_type == "filename" else f"{_short_path(frame.filename)}:{frame.lineno}"
+
+
+class ProfilerRegistry:
+    """The process-wide profiler, the per-request profilers and the finished profiles"""
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self.current: Optional[SamplingProfiler] = None
+        self.profiles: "OrderedDict[str, SamplingProfiler]" = OrderedDict()
+        self._request_profiles = 0
+        self._previous_snapshot: Optional[tracemalloc.Snapshot] = None
+
+    def _store(self, profiler: SamplingProfiler, profile_id: Optional[str] = None) -> str:
+        profile_id = profile_id or new_profile_id()
+        with self._lock:
+            self.profiles[profile_id] = profiler
+            while len(self.profiles) > PROFILE_HISTORY:
+                self.profiles.popitem(last=False)
+        return profile_id
+
+    # ------------------------------------------------------------------
+    # Sampling
+    # ------------------------------------------------------------------
+
+    def start(self, interval_ms: float = PROFILE_INTERVAL_MS, max_seconds: float = PROFILE_MAX_SECONDS,
+              include_idle: bool = False) -> Optional[SamplingProfiler]:
+        """Start the process-wide profiler; None if one is already running"""
+        with self._lock:
+            if self.current is not None and self.current.running:
+                return None
+            if self.current is not None:
+                # Stopped by max_seconds and never collected; keep it with the others
+                self._store(self.current)
+            self.current = SamplingProfiler(interval_ms / 1000, max_seconds, include_idle, label="manual")
+            self.current.start()
+        logger.info(f"Sampling profiler started (every {interval_ms}ms, at most {max_seconds}s)")
+        return self.current
+
+    def stop(self) -> Optional[str]:
+        """Stop the process-wide profiler and keep its profile; the profile id, or None if none was started"""
+        with self._lock:
+            profiler, self.current = self.current, None
+        if profiler is None:
+            return None
+        profiler.stop()
+        logger.info(f"Sampling profiler stopped after {profiler.samples} samples")
+        return self._store(profiler)
+
+    def begin_request(self, label: str) -> Optional[SamplingProfiler]:
+        """Sampler for one request, or None when PROFILE_MAX_CONCURRENT_REQUESTS are already profiled"""
+        with self._lock:
+            if self._request_profiles >= PROFILE_MAX_CONCURRENT_REQUESTS:
+                return None
+            self._request_profiles += 1
+        profiler = SamplingProfiler(PROFILE_INTERVAL_MS / 1000, PROFILE_MAX_SECONDS, label=label)
+        profiler.start()
+        return profiler
+
+    def end_request(self, profiler: SamplingProfiler, profile_id: str) -> None:
+        profiler.stop()
+        with self._lock:
+            self._request_profiles -= 1
+        self._store(profiler, profile_id)
+
+    def get(self, profile_id: str) -> Optional[SamplingProfiler]:
+        with self._lock:
+            return self.profiles.get(profile_id)
+
+    def status(self) -> Dict[str, Any]:
+        with self._lock:
+            current = self.current
+            profiles = [{"id": profile_id, **profiler.summary()} for profile_id, profiler in reversed(self.profiles.items())]
+        return {
+            "pid": os.getpid(),
+            "current": current.summary() if current is not None else None,
+            "profiles": profiles,
+            "tracemalloc": tracemalloc.is_tracing(),
+        }
+
+    # ------------------------------------------------------------------
+    # tracemalloc
+    # ------------------------------------------------------------------
+
+    def start_tracemalloc(self, frames: int) -> bool:
+        """Start tracing allocations; False if already tracing"""
+        if tracemalloc.is_tracing():
+            return False
+        tracemalloc.start(frames)
+        self._previous_snapshot = None
+        logger.info(f"tracemalloc started ({frames} frames)")
+        return True
+
+    def stop_tracemalloc(self) -> bool:
+        if not tracemalloc.is_tracing():
+            return False
+        tracemalloc.stop()
+        self._previous_snapshot = None
+        logger.info("tracemalloc stopped")
+        return True
+
+    def snapshot(self, limit: int, key_type: str = "lineno", compare: bool = False) -> Dict[str, Any]:
+        """Top ``limit`` allocation sites, or the top changes since the previous snapshot when ``compare``"""
+        snapshot = tracemalloc.take_snapshot().filter_traces([
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap*>"),
+        ])
+        current, peak = tracemalloc.get_traced_memory()
+        previous, self._previous_snapshot = self._previous_snapshot, snapshot
+
+        if compare and previous is not None:
+            entries = [{
+                "location": _location(stat.traceback, key_type),
+                "sizeKiB": round(stat.size / 1024, 1),
+                "sizeDiffKiB": round(stat.size_diff / 1024, 1),
+                "count": stat.count,
+                "countDiff": stat.count_diff,
+            } for stat in snapshot.compare_to(previous, key_type)[:limit]]
+        else:
+            entries = [{
+                "location": _location(stat.traceback, key_type),
+                "sizeKiB": round(stat.size / 1024, 1),
+                "count": stat.count,
+            } for stat in snapshot.statistics(key_type)[:limit]]
+
+        return {
+            "pid": os.getpid(),
+            "tracedKiB": round(current / 1024, 1),
+            "peakKiB": round(peak / 1024, 1),
+            "compared": compare and previous is not None,
+            "allocations": entries,
+        }
+
+
+profiler_registry = ProfilerRegistry()
+
+
+class ProfilingMiddleware:
+    """ASGI middleware profiling a request sent with ``X-Profile: 1`` and a valid ``X-Admin-Token``"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        headers = dict(scope.get("headers") or [])
+        if headers.get(b"x-profile") not in (b"1", b"true") or not admin_authorized(
+            headers.get(b"x-admin-token", b"").decode("latin-1")
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        profiler = profiler_registry.begin_request(f"{scope['method']} {scope['path']}")
+        if profiler is None:
+            await self.app(scope, receive, send)
+            return
+
+        # The id goes out with the response headers; the profile is stored under it once the body is sent
+        profile_id = new_profile_id()
+
+        async def send_with_profile_id(message):
+            if message["type"] == "http.response.start":
+                message = {**message, "headers": [*message.get("headers", []), (b"x-profile-id", profile_id.encode())]}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_profile_id)
+        finally:
+            profiler_registry.end_request(profiler, profile_id)
@@ -0,0 +1,241 @@
+"""
+Statement fingerprints, timings and slow-query plans, served by the admin router.
+
+Every statement run through TimedCursor is reduced to a fingerprint - literals and
+parameters become ``?``, value lists and VALUES rows collapse - so the same query with
+different arguments, or the variants of a dynamic WHERE clause, aggregate into one
+entry with its calls, total/mean/max time and rows.
+
+Statements slower than SLOW_QUERY_MS are explained on the same connection, sampled
+(SLOW_QUERY_EXPLAIN_SAMPLE) and at most once per fingerprint every
+SLOW_QUERY_EXPLAIN_INTERVAL_SECONDS, with a plain ``EXPLAIN (FORMAT JSON)``: the plan is
+shown, nothing is executed.
+
+With SLOW_QUERY_EXPLAIN_ANALYZE=1, SELECT / WITH statements that change no data and call
+no functions (beyond a few pure built-ins) get ``EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON)``
+instead, so the query runs a second time and the caller waits for it. Function calls are
+excluded because they can have side effects a savepoint does not undo - session advisory
+locks (``pg_try_advisory_lock``), partition DDL, sequences.
+
+The EXPLAIN runs inside a savepoint, so a failure cannot abort the caller's transaction.
+Statements on autocommit connections (the execution workers' shard lock session) are
+never explained. Only normalized statement text is kept, never parameter values.
+"""
+import hashlib
+import os
+import random
+import re
+import threading
+import time
+from datetime import datetime, timezone
+from functools import lru_cache
+from typing import Any, Dict, List, Optional
+
+import psycopg2.extensions
+
+from .logger_setup import setup_logger
+
+logger = setup_logger()
+
+SLOW_QUERY_MS = float(os.getenv("SLOW_QUERY_MS", "200"))
+# Fraction of slow statements explained (0 turns EXPLAIN capture off)
+SLOW_QUERY_EXPLAIN_SAMPLE = float(os.getenv("SLOW_QUERY_EXPLAIN_SAMPLE", "0.1"))
+SLOW_QUERY_EXPLAIN_INTERVAL_SECONDS = float(os.getenv("SLOW_QUERY_EXPLAIN_INTERVAL_SECONDS", "300"))
+# Re-run eligible slow SELECTs under EXPLAIN ANALYZE for actual row counts and timings
+SLOW_QUERY_EXPLAIN_ANALYZE = os.getenv("SLOW_QUERY_EXPLAIN_ANALYZE", "0").lower() in ("1", "true", "yes")
+# Fingerprints tracked; beyond this the least expensive entry is dropped
+QUERY_STATS_MAX_FINGERPRINTS = int(os.getenv("QUERY_STATS_MAX_FINGERPRINTS", "2000"))
+
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r"(?<![\w$])-?\d+(?:\.\d+)?(?:e[+-]?\d+)?\b", re.IGNORECASE)
+_PLACEHOLDER = re.compile(r"%(?:\(\w+\))?s")
+_WHITESPACE = re.compile(r"\s+")
+_VALUE = r"\?(?:::\w+(?:\[\])?)?"
+_LIST = re.compile(rf"{_VALUE}(?:\s*,\s*{_VALUE})+")
+_ROWS = re.compile(r"\((?:\?|\.\.\.)\)(?:\s*,\s*\((?:\?|\.\.\.)\))+")
+_EXPLAINABLE = ("SELECT", "WITH", "INSERT", "UPDATE", "DELETE", "VALUES", "MERGE", "EXECUTE")
+_MODIFIES = re.compile(r"\b(INSERT|UPDATE|DELETE|MERGE)\b", re.IGNORECASE)
+_CALL = re.compile(r"(?<![\w.$])([a-z_][\w.]*)\s*\(", re.IGNORECASE)
+# Words followed by "(" that are syntax rather than function calls, and pure built-ins
+# safe to run twice
+_NOT_CALLS = {
+    "select", "from", "where", "and", "or", "not", "in", "exists", "any", "all", "some", "as",
+    "on", "join", "lateral", "using", "values", "with", "over", "filter", "within", "cast",
+    "is", "then", "else", "when", "case", "by", "union", "except", "intersect", "recursive",
+    "count", "sum", "min", "max", "avg", "coalesce", "nullif", "greatest", "least",
+    "lower", "upper", "length", "now", "date_trunc", "extract", "array_agg", "string_agg",
+    "json_build_object", "jsonb_build_object", "json_agg", "jsonb_agg", "row_number",
+}
+
+
+def _normalize(text: str) -> str:
+    text = _STRING.sub("?", text)
+    text = _PLACEHOLDER.sub("?", text)
+    text = _NUMBER.sub("?", text)
+    text = _WHITESPACE.sub(" ", text).strip()
+    text = _LIST.sub("...", text)
+    return _ROWS.sub("(...)", text)
+
+
+@lru_cache(maxsize=4096)
+def _normalize_cached(text: str) -> str:
+    return _normalize(text)
+
+
+def normalize(query) -> str:
+    """Statement text with literals and parameters replaced by ``?`` and lists collapsed"""
+    if isinstance(query, bytes):
+        # Statements built by execute_values / mogrify carry their values; each one is different
+        return _normalize(query.decode("utf-8", "replace"))
+    if not isinstance(query, str):
+        query = str(query)
+    return _normalize_cached(query)
+
+
+def explain_options(normalized: str) -> Optional[str]:
+    """EXPLAIN options for a normalized statement, or None if it must not be explained"""
+    upper = normalized.upper()
+    if not upper.startswith(_EXPLAINABLE):
+        return None  # BEGIN, COMMIT, SET, DDL, ...
+    if (SLOW_QUERY_EXPLAIN_ANALYZE and upper.startswith(("SELECT", "WITH"))
+            and not _MODIFIES.search(normalized)
+            and all(name.lower() in _NOT_CALLS for name in _CALL.findall(normalized))):
+        return "ANALYZE, BUFFERS, FORMAT JSON"
+    return "FORMAT JSON"
+
+
+def fingerprint(normalized: str) -> str:
+    return hashlib.md5(normalized.encode("utf-8")).hexdigest()[:12]
+
+
+class QueryStats:
+    """Per-fingerprint counters plus the latest captured plan"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries: Dict[str, Dict[str, Any]] = {}
+        self.since = datetime.now(timezone.utc)
+
+    def observe(self, cursor, query, vars, caller: str, seconds: float) -> None:
+        """Record one successful statement; explain it if it was slow and sampled"""
+        normalized = normalize(query)
+        key = fingerprint(normalized)
+        milliseconds = seconds * 1000
+        rows = max(cursor.rowcount, 0)
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                if len(self._entries) >= QUERY_STATS_MAX_FINGERPRINTS:
+                    cheapest = min(self._entries, key=lambda k: self._entries[k]["totalMs"])
+                    del self._entries[cheapest]
+                entry = self._entries[key] = {
+                    "fingerprint": key,
+                    "statement": normalized[:2000],
+                    "caller": caller,
+                    "calls": 0,
+                    "totalMs": 0.0,
+                    "maxMs": 0.0,
+                    "rows": 0,
+                    "slowCalls": 0,
+                    "lastSeen": None,
+                    "plan": None,
+                    "planCapturedAt": None,
+                    "planMs": None,
+                    "_explainedAt": 0.0,
+                }
+            entry["calls"] += 1
+            entry["totalMs"] += milliseconds
+            entry["maxMs"] = max(entry["maxMs"], milliseconds)
+            entry["rows"] += rows
+            entry["caller"] = caller
+            entry["lastSeen"] = time.time()
+
+            explain = False
+            if milliseconds >= SLOW_QUERY_MS:
+                entry["slowCalls"] += 1
+                now = time.monotonic()
+                if (SLOW_QUERY_EXPLAIN_SAMPLE > 0 and random.random() < SLOW_QUERY_EXPLAIN_SAMPLE
+                        and (not entry["_explainedAt"] or now - entry["_explainedAt"] >= SLOW_QUERY_EXPLAIN_INTERVAL_SECONDS)):
+                    entry["_explainedAt"] = now
+                    explain = True
+
+        if explain:
+            self._explain(cursor, query, vars, key, normalized, caller, milliseconds)
+
+    def _explain(self, cursor, query, vars, key: str, normalized: str, caller: str, milliseconds: float) -> None:
+        if getattr(cursor, "name", None):
+            return  # server-side cursor: the statement is still open
+        conn = cursor.connection
+        if conn.autocommit:
+            return  # no transaction to contain the EXPLAIN in
+        options = explain_options(normalized)
+        if options is None:
+            return
+        # The server's view: services that run BEGIN/COMMIT as statements leave psycopg2's own flag stale
+        use_savepoint = conn.info.transaction_status == psycopg2.extensions.TRANSACTION_STATUS_INTRANS
+
+        try:
+            statement = cursor.mogrify(query, vars)
+            # A plain cursor, so the EXPLAIN itself is neither timed nor explained
+            with conn.cursor(cursor_factory=psycopg2.extensions.cursor) as explain_cursor:
+                if use_savepoint:
+                    explain_cursor.execute("SAVEPOINT query_stats_explain")
+                try:
+                    explain_cursor.execute(b"EXPLAIN (" + options.encode() + b") " + statement)
+                    plan = explain_cursor.fetchone()[0]
+                finally:
+                    if use_savepoint:
+                        explain_cursor.execute("ROLLBACK TO SAVEPOINT query_stats_explain")
+                        explain_cursor.execute("RELEASE SAVEPOINT query_stats_explain")
+        except Exception as e:
+            logger.warning(f"Could not explain slow query {key} ({caller}): {e}")
+            return
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                entry["plan"] = plan
+                entry["planCapturedAt"] = time.time()
+                entry["planMs"] = round(milliseconds, 3)
+
+        top = plan[0] if isinstance(plan, list) and plan else {}
+        logger.warning(
+            f"Slow query {key} from {caller}: {milliseconds:.1f}ms "
+            f"(plan: {top.get('Plan', {}).get('Node Type', '?')}"
+            f"{', executed in %.1fms' % top['Execution Time'] if 'Execution Time' in top else ''}) {normalized[:300]}"
+        )
+
+    def report(self, limit: int = 20, order_by: str = "totalMs") -> List[Dict[str, Any]]:
+        """Top ``limit`` fingerprints by totalMs, meanMs, maxMs, calls or slowCalls (without plans)"""
+        with self._lock:
+            entries = [self._public(entry, with_plan=False) for entry in self._entries.values()]
+        entries.sort(key=lambda entry: entry[order_by], reverse=True)
+        return entries[:limit]
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            entry = self._entries.get(key)
+            return self._public(entry, with_plan=True) if entry is not None else None
+
+    def reset(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.since = datetime.now(timezone.utc)
+
+    @staticmethod
+    def _public(entry: Dict[str, Any], with_plan: bool) -> Dict[str, Any]:
+        public = {key: value for key, value in entry.items() if not key.startswith("_")}
+        public["totalMs"] = round(entry["totalMs"], 3)
+        public["maxMs"] = round(entry["maxMs"], 3)
+        public["meanMs"] = round(entry["totalMs"] / entry["calls"], 3) if entry["calls"] else 0.0
+        public["hasPlan"] = entry["plan"] is not None
+        for field in ("lastSeen", "planCapturedAt"):
+            if public[field] is not None:
+                public[field] = datetime.fromtimestamp(public[field], timezone.utc)
+        if not with_plan:
+            del public["plan"]
+        return public
+
+
+query_stats = QueryStats()
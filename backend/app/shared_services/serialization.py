@@ -0,0 +1,53 @@
+"""
+Fast JSON serialization helpers built on orjson.
+Used for API responses and for encoding JSONB query parameters.
+"""
+from decimal import Decimal
+from typing import Any
+
+import orjson
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+# datetime, date, UUID, Enum and dataclasses are handled natively by orjson
+ORJSON_OPTIONS = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+
+
+def orjson_default(obj: Any) -> Any:
+    """Fallback for types orjson does not serialize natively"""
+    if isinstance(obj, Decimal):
+        return float(obj)
+    if isinstance(obj, BaseModel):
+        # Python-mode dump keeps datetimes/UUIDs/Decimals native for orjson to encode
+        return obj.model_dump(by_alias=True)
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    raise TypeError(f"Object of type {type(obj)} is not JSON serializable")
+
+
+def dumps(obj: Any) -> bytes:
+    """Serialize an object to JSON bytes"""
+    return orjson.dumps(obj, default=orjson_default, option=ORJSON_OPTIONS)
+
+
+def dumps_str(obj: Any) -> str:
+    """Serialize an object to a JSON string"""
+    return orjson.dumps(obj, default=orjson_default, option=ORJSON_OPTIONS).decode("utf-8")
+
+
+def loads(data: Any) -> Any:
+    """Parse JSON from str, bytes, bytearray or memoryview"""
+    return orjson.loads(data)
+
+
+def to_jsonb(obj: Any) -> str:
+    """Encode a value as a JSONB query parameter (psycopg2 adapts bytes as bytea, so return str)"""
+    return dumps_str(obj)
+
+
+class ORJSONResponse(JSONResponse):
+    """JSON response rendered with orjson, accepting plain data or Pydantic models"""
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
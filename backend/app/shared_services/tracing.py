@@ -0,0 +1,222 @@
+"""
+OpenTelemetry tracing.
+
+Spans cover HTTP requests (TracingMiddleware), service methods (``trace_methods``),
+graph nodes and helpers (``traced``), SQL statements (TimedCursor, with row counts)
+and LLM calls (with token counts), so a slow request can be attributed to the step
+that took the time.
+
+Tracing is configured by ``setup_tracing`` from the environment:
+
+- OTEL_EXPORTER_OTLP_ENDPOINT / OTEL_EXPORTER_OTLP_TRACES_ENDPOINT: export over
+  OTLP/HTTP to a collector (e.g. http://localhost:4318)
+- TRACE_FILE: append every span as one JSON object per line
+- OTEL_SERVICE_NAME, OTEL_TRACES_SAMPLER(_ARG): the standard SDK settings
+
+Without an exporter, or without the opentelemetry packages installed, every span is
+a no-op and the instrumentation costs one flag check.
+"""
+import functools
+import inspect
+import os
+import threading
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Optional
+
+from .logger_setup import setup_logger
+
+try:
+    from opentelemetry import propagate, trace
+    from opentelemetry.trace import SpanKind
+except ImportError:  # tracing stays disabled
+    trace = None
+
+logger = setup_logger()
+
+_enabled = False
+_tracer = None
+
+
+class _NoopSpan:
+    """Stands in for a span while tracing is disabled"""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        pass
+
+    def set_attributes(self, attributes: Dict[str, Any]) -> None:
+        pass
+
+    def is_recording(self) -> bool:
+        return False
+
+
+NOOP_SPAN = _NoopSpan()
+
+
+def _file_exporter(path: str):
+    from opentelemetry.sdk.trace.export import SpanExporter, SpanExportResult
+
+    class FileSpanExporter(SpanExporter):
+        """Appends finished spans to a file, one JSON object per line"""
+
+        def __init__(self):
+            self._lock = threading.Lock()
+            self._file = open(path, "a", encoding="utf-8")
+
+        def export(self, spans):
+            with self._lock:
+                for span in spans:
+                    self._file.write(span.to_json(indent=None) + "\n")
+                self._file.flush()
+            return SpanExportResult.SUCCESS
+
+        def shutdown(self):
+            with self._lock:
+                self._file.close()
+
+    return FileSpanExporter()
+
+
+def setup_tracing(service_name: str) -> bool:
+    """Install the tracer provider and exporters configured in the environment; True if tracing is on"""
+    global _enabled, _tracer
+    if _enabled:
+        return True
+    otlp = os.getenv("OTEL_EXPORTER_OTLP_TRACES_ENDPOINT") or os.getenv("OTEL_EXPORTER_OTLP_ENDPOINT")
+    trace_file = os.getenv("TRACE_FILE")
+    if not (otlp or trace_file):
+        return False
+    if trace is None:
+        logger.warning("Tracing is configured but the opentelemetry packages are not installed")
+        return False
+
+    from opentelemetry.sdk.resources import Resource
+    from opentelemetry.sdk.trace import TracerProvider
+    from opentelemetry.sdk.trace.export import BatchSpanProcessor
+
+    provider = TracerProvider(resource=Resource.create({"service.name": os.getenv("OTEL_SERVICE_NAME", service_name)}))
+    if otlp:
+        from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+        provider.add_span_processor(BatchSpanProcessor(OTLPSpanExporter()))
+    if trace_file:
+        provider.add_span_processor(BatchSpanProcessor(_file_exporter(trace_file)))
+    trace.set_tracer_provider(provider)
+
+    _tracer = trace.get_tracer("cvm")
+    _enabled = True
+    logger.info(f"Tracing enabled for {service_name} ({', '.join(filter(None, [otlp, trace_file]))})")
+    return True
+
+
+def tracing_enabled() -> bool:
+    return _enabled
+
+
+def _attributes(attributes: Dict[str, Any]) -> Dict[str, Any]:
+    """Span attributes must be primitives; drop None and stringify anything else"""
+    return {
+        key: value if isinstance(value, (str, bool, int, float)) else str(value)
+        for key, value in attributes.items() if value is not None
+    }
+
+
+def span(name: str, attributes: Optional[Dict[str, Any]] = None, kind=None):
+    """Context manager for a span named ``name`` (a no-op span while tracing is disabled)"""
+    if not _enabled:
+        return NOOP_SPAN
+    return _tracer.start_as_current_span(
+        name, kind=kind or SpanKind.INTERNAL, attributes=_attributes(attributes or {})
+    )
+
+
+def child_span(name: str, attributes: Optional[Dict[str, Any]] = None):
+    """A span only when there is a recording parent, e.g. SQL statements outside any request stay untraced"""
+    if not _enabled or not trace.get_current_span().is_recording():
+        return NOOP_SPAN
+    return span(name, attributes)
+
+
+def traced(name: Optional[str] = None) -> Callable:
+    """Decorator wrapping every call of a function or coroutine function in a span"""
+    def decorate(func: Callable) -> Callable:
+        span_name = name or f"{func.__module__}.{func.__qualname__}"
+        attributes = {"code.function": func.__qualname__, "code.namespace": func.__module__}
+
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                if not _enabled:
+                    return await func(*args, **kwargs)
+                with span(span_name, attributes):
+                    return await func(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return func(*args, **kwargs)
+            with span(span_name, attributes):
+                return func(*args, **kwargs)
+        return wrapper
+
+    return decorate
+
+
+def trace_methods(cls: type) -> type:
+    """Class decorator: a span per call of each public method (generators are left alone)"""
+    for attr, value in list(vars(cls).items()):
+        if attr.startswith("_") or not inspect.isfunction(value):
+            continue
+        if inspect.isgeneratorfunction(value) or inspect.isasyncgenfunction(value):
+            continue
+        setattr(cls, attr, traced(f"{cls.__name__}.{attr}")(value))
+    return cls
+
+
+@contextmanager
+def _server_span(scope):
+    headers = {key.decode("latin-1"): value.decode("latin-1") for key, value in scope.get("headers", [])}
+    with _tracer.start_as_current_span(
+        f"{scope['method']} {scope['path']}",
+        context=propagate.extract(headers),
+        kind=SpanKind.SERVER,
+        attributes={"http.request.method": scope["method"], "url.path": scope["path"]},
+    ) as server_span:
+        yield server_span
+
+
+class TracingMiddleware:
+    """ASGI middleware opening a server span per request, continuing an incoming traceparent"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not _enabled:
+            await self.app(scope, receive, send)
+            return
+
+        status = [500]
+
+        async def send_with_status(message):
+            if message["type"] == "http.response.start":
+                status[0] = message["status"]
+            await send(message)
+
+        with _server_span(scope) as server_span:
+            try:
+                await self.app(scope, receive, send_with_status)
+            finally:
+                route = getattr(scope.get("route"), "path", None)
+                if route:
+                    server_span.update_name(f"{scope['method']} {route}")
+                    server_span.set_attribute("http.route", route)
+                server_span.set_attribute("http.response.status_code", status[0])
+                if status[0] >= 500:
+                    server_span.set_status(trace.Status(trace.StatusCode.ERROR))
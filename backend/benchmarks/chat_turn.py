@@ -0,0 +1,312 @@
+"""
+Chat turn benchmark.
+
+    python -m benchmarks.chat_turn                                    # history 0, 10, 100, 1000
+    python -m benchmarks.chat_turn --history 0,500 --llm-latency-ms 0 --repeat 10
+
+Runs one chat turn - populate_state -> build_graph (compiled) -> router_node ->
+respond_to_user_node - for synthetic users whose stored history (conversations and
+progress logs, plus goals, habits and milestones in proportion) has the given size.
+The LLM is replaced by a fake that waits ``--llm-latency-ms`` (+/- jitter) and returns
+a fixed RouterOutput, so the numbers show what the turn costs on our side and how that
+grows with history.
+
+Per history size it reports the time of every stage (p50/p95), the router prompt size
+(tokens and characters), the serialized state size and the peak memory allocated per
+stage (from a separate pass under tracemalloc, which slows code down). The synthetic
+users are written to the chat tables (users, goals, habits, milestones, progress_logs,
+user_summaries, conversations) of the configured database and deleted afterwards.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import statistics
+import sys
+import time
+import tracemalloc
+from contextlib import redirect_stdout
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+from dotenv import load_dotenv
+
+from .persistence import BACKEND_DIR, RESULTS_DIR, _git
+
+STAGES = ["populate", "build_graph", "router", "respond", "serialize"]
+# Synthetic user ids start here, far above real Telegram ids in test databases
+USER_ID_BASE = 9_000_000_000
+
+
+class FakeLLM:
+    """Stands in for call_llm_api: waits the configured latency and records the prompt size"""
+
+    def __init__(self, latency_ms: float, jitter_ms: float, seed: int):
+        self.latency = latency_ms / 1000
+        self.jitter = jitter_ms / 1000
+        self.rng = random.Random(seed)
+        self.prompt_tokens = 0
+        self.prompt_chars = 0
+
+    async def __call__(self, messages: List[Dict[str, str]], response_format=None, **kwargs):
+        from app.models.pydantic_models import RouterOutput, UserIntent
+        from app.shared_services.llm import count_tokens_in_messages
+
+        self.prompt_tokens = count_tokens_in_messages(messages)
+        self.prompt_chars = sum(len(message.get("content") or "") for message in messages)
+        delay = self.latency + self.rng.uniform(-self.jitter, self.jitter)
+        if delay > 0:
+            await asyncio.sleep(delay)
+        return RouterOutput(
+            next_agents=["respond_to_user"],
+            reasoning="benchmark",
+            confidence=0.9,
+            intent=UserIntent.UNKNOWN,
+            message_to_user="Thanks! Let's keep going with your goals.",
+        )
+
+
+# ----------------------------------------------------------------------
+# Synthetic users
+# ----------------------------------------------------------------------
+
+def history_counts(history: int) -> Dict[str, int]:
+    """Rows per table for a user with ``history`` conversations"""
+    goals = max(1, history // 20)
+    return {
+        "conversations": history,
+        "progress_logs": history,
+        "goals": goals,
+        "habits": goals,
+        "milestones": goals * 3,
+    }
+
+
+def seed_user(cursor, user_id: int, history: int, rng: random.Random) -> None:
+    from psycopg2.extras import execute_values
+
+    counts = history_counts(history)
+    now = datetime.now(timezone.utc)
+    today = date.today()
+
+    cursor.execute(
+        "INSERT INTO users (user_id, first_name, timezone, created_at) VALUES (%s, %s, %s, %s)",
+        (user_id, f"Bench{user_id - USER_ID_BASE}", "UTC", now)
+    )
+    cursor.execute(
+        "INSERT INTO user_summaries (user_id, summary, last_updated) VALUES (%s, %s, %s)",
+        (user_id, "Motivated, prefers short check-ins. " * 5, now)
+    )
+    goal_ids = [row[0] for row in execute_values(cursor, """
+        INSERT INTO goals (user_id, title, description, status, start_date, target_date, created_at, last_updated)
+        VALUES %s RETURNING goal_id
+    """, [
+        (user_id, f"Goal {i}", f"Synthetic goal {i} " + "x" * rng.randint(20, 100), "active",
+         today - timedelta(days=rng.randint(0, 365)), today + timedelta(days=rng.randint(1, 365)), now, now)
+        for i in range(counts["goals"])
+    ], fetch=True)]
+    habit_ids = [row[0] for row in execute_values(cursor, """
+        INSERT INTO habits (user_id, description, frequency_type, frequency_value, created_at, last_updated)
+        VALUES %s RETURNING habit_id
+    """, [
+        (user_id, f"Synthetic habit {i}", rng.choice(["daily", "weekly", "monthly"]), rng.randint(1, 5), now, now)
+        for i in range(counts["habits"])
+    ], fetch=True)]
+    execute_values(cursor, """
+        INSERT INTO milestones (goal_id, description, status, target_date, created_at, last_updated) VALUES %s
+    """, [
+        (rng.choice(goal_ids), f"Synthetic milestone {i}", rng.choice(["pending", "completed"]),
+         today + timedelta(days=rng.randint(1, 180)), now, now)
+        for i in range(counts["milestones"])
+    ])
+    execute_values(cursor, """
+        INSERT INTO progress_logs (user_id, related_goal_id, related_habit_id, log_type, content, created_at, last_updated)
+        VALUES %s
+    """, [
+        (user_id, rng.choice(goal_ids), rng.choice(habit_ids), rng.choice(["reflection", "habit_completed", "achievement"]),
+         "Did the thing today. " * rng.randint(1, 8), now - timedelta(hours=i), now - timedelta(hours=i))
+        for i in range(counts["progress_logs"])
+    ])
+    execute_values(cursor, """
+        INSERT INTO conversations (user_id, conversation_type, conversation_data, created_at) VALUES %s
+    """, [
+        (user_id, rng.choice(["goal_planning", "progress_update", "general_chat"]), json.dumps({
+            "user": "How am I doing this week? " * rng.randint(1, 4),
+            "assistant": "You're on track with most of your goals. " * rng.randint(1, 6),
+        }), now - timedelta(hours=i))
+        for i in range(counts["conversations"])
+    ])
+
+
+def delete_users(cursor, user_ids: List[int]) -> None:
+    cursor.execute("DELETE FROM progress_logs WHERE user_id = ANY(%s)", (user_ids,))
+    cursor.execute(
+        "DELETE FROM milestones WHERE goal_id IN (SELECT goal_id FROM goals WHERE user_id = ANY(%s))", (user_ids,)
+    )
+    for table in ("habits", "goals", "conversations", "user_summaries", "users"):
+        cursor.execute(f"DELETE FROM {table} WHERE user_id = ANY(%s)", (user_ids,))
+
+
+# ----------------------------------------------------------------------
+# Measurement
+# ----------------------------------------------------------------------
+
+async def chat_turn(user_id: int, message: str, memory: bool) -> Tuple[Dict[str, float], Dict[str, int], int]:
+    """One turn; returns (seconds per stage, peak bytes per stage if ``memory``, serialized state bytes)"""
+    from app.agents.respond_to_user import respond_to_user_node
+    from app.agents.router_agent import router_node
+    from app.graph.graph import build_graph
+    from app.models.pydantic_models import GoalGetterState
+    from app.shared_services.get_conversation_history import populate_state
+
+    timings: Dict[str, float] = {}
+    peaks: Dict[str, int] = {}
+    results: Dict[str, Any] = {}
+
+    async def stage(name: str, work):
+        if memory:
+            tracemalloc.reset_peak()
+            baseline = tracemalloc.get_traced_memory()[0]
+        started = time.perf_counter()
+        result = work()
+        if asyncio.iscoroutine(result):
+            result = await result
+        timings[name] = time.perf_counter() - started
+        if memory:
+            peaks[name] = tracemalloc.get_traced_memory()[1] - baseline
+        results[name] = result
+
+    await stage("populate", lambda: populate_state(str(user_id), message))
+    if results["populate"] is None:
+        raise RuntimeError(f"populate_state returned nothing for user {user_id}")
+    await stage("build_graph", lambda: build_graph().compile())
+    await stage("router", lambda: router_node(results["populate"]))
+    await stage("respond", lambda: respond_to_user_node(results["router"]))
+    await stage("serialize", lambda: GoalGetterState(**{**results["router"], **results["respond"]}).model_dump_json())
+    return timings, peaks, len(results["serialize"])
+
+
+def _percentiles(values: List[float]) -> Dict[str, float]:
+    p50, p95 = np.percentile([value * 1000 for value in values], [50, 95])
+    return {"p50": round(float(p50), 3), "p95": round(float(p95), 3), "mean": round(statistics.fmean(values) * 1000, 3)}
+
+
+async def run_history(history: int, args, llm: FakeLLM, connection) -> Dict[str, Any]:
+    rng = random.Random(args.seed + history)
+    user_ids = [USER_ID_BASE + history * 1000 + i for i in range(args.users)]
+    with connection() as conn:
+        with conn.cursor() as cursor:
+            delete_users(cursor, user_ids)
+            for user_id in user_ids:
+                seed_user(cursor, user_id, history, rng)
+        conn.commit()
+
+    stage_times: Dict[str, List[float]] = {name: [] for name in STAGES}
+    prompt_tokens, prompt_chars, state_bytes = [], [], []
+    try:
+        # The router prints the whole state on the way in and out; that cost counts, the output does not
+        with open(os.devnull, "w") as devnull, redirect_stdout(devnull):
+            for i in range(args.warmup + args.repeat):
+                timings, _, size = await chat_turn(user_ids[i % len(user_ids)], args.message, memory=False)
+                if i < args.warmup:
+                    continue
+                for name, seconds in timings.items():
+                    stage_times[name].append(seconds)
+                prompt_tokens.append(llm.prompt_tokens)
+                prompt_chars.append(llm.prompt_chars)
+                state_bytes.append(size)
+
+            tracemalloc.start()
+            try:
+                _, peaks, _ = await chat_turn(user_ids[0], args.message, memory=True)
+            finally:
+                tracemalloc.stop()
+    finally:
+        with connection() as conn:
+            with conn.cursor() as cursor:
+                delete_users(cursor, user_ids)
+            conn.commit()
+
+    return {
+        "rows": history_counts(history),
+        "stages": {name: _percentiles(values) for name, values in stage_times.items()},
+        "total": _percentiles([sum(values) for values in zip(*stage_times.values())]),
+        "promptTokens": int(statistics.median(prompt_tokens)),
+        "promptChars": int(statistics.median(prompt_chars)),
+        "stateBytes": int(statistics.median(state_bytes)),
+        "peakMemoryKiB": {name: round(peak / 1024, 1) for name, peak in peaks.items()},
+    }
+
+
+def summary_table(results: Dict[str, Any]) -> str:
+    header = f"{'history':>7} " + " ".join(f"{name + ' ms':>15}" for name in STAGES) + f" {'tokens':>8} {'state KiB':>10}"
+    lines = [header]
+    for history, result in results.items():
+        lines.append(
+            f"{history:>7} " + " ".join(f"{result['stages'][name]['p50']:>15.2f}" for name in STAGES)
+            + f" {result['promptTokens']:>8} {result['stateBytes'] / 1024:>10.1f}"
+        )
+    return "\n".join(lines)
+
+
+async def run(args) -> Dict[str, Any]:
+    sys.path.insert(0, BACKEND_DIR)
+    import app.agents.router_agent as router_agent
+    from app.shared_services.db import get_postgres_connection
+
+    llm = FakeLLM(args.llm_latency_ms, args.llm_jitter_ms, args.seed)
+    router_agent.call_llm_api = llm
+
+    results: Dict[str, Any] = {}
+    for history in [int(size) for size in args.history.split(",") if size.strip()]:
+        print(f"Chat turn with {history} history rows ({args.repeat} turns)...", file=sys.stderr, flush=True)
+        results[str(history)] = await run_history(history, args, llm, get_postgres_connection)
+    return results
+
+
+def main(argv: Optional[List[str]] = None) -> Tuple[str, Dict[str, Any]]:
+    parser = argparse.ArgumentParser(description="Benchmark a chat turn with a fake LLM")
+    parser.add_argument("--history", default="0,10,100,1000", help="comma-separated history sizes (conversations per user)")
+    parser.add_argument("--users", type=int, default=3, help="synthetic users per history size (turns rotate over them)")
+    parser.add_argument("--repeat", type=int, default=10, help="measured turns per history size")
+    parser.add_argument("--warmup", type=int, default=1, help="unmeasured turns before measuring")
+    parser.add_argument("--llm-latency-ms", type=float, default=800, help="simulated LLM latency")
+    parser.add_argument("--llm-jitter-ms", type=float, default=200, help="uniform +/- jitter on the simulated latency")
+    parser.add_argument("--message", default="I read 10 pages today, how am I doing on my reading goal?")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="result file (default: benchmarks/results/chat-<commit>-<time>.json)")
+    args = parser.parse_args(argv)
+
+    load_dotenv()
+    commit = _git("rev-parse", "HEAD")
+    started = datetime.now(timezone.utc)
+    results = asyncio.run(run(args))
+
+    report = {
+        "benchmark": "chat_turn",
+        "commit": commit,
+        "dirty": bool(_git("status", "--porcelain", "--untracked-files=no")),
+        "createdAt": started.isoformat(),
+        "config": {
+            "history": args.history, "users": args.users, "repeat": args.repeat, "warmup": args.warmup,
+            "llmLatencyMs": args.llm_latency_ms, "llmJitterMs": args.llm_jitter_ms, "seed": args.seed,
+        },
+        "results": results,
+    }
+
+    output = args.output or os.path.join(
+        RESULTS_DIR, f"chat-{(commit or 'unknown')[:8]}-{started.strftime('%Y%m%dT%H%M%SZ')}.json"
+    )
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+
+    print(summary_table(results))
+    print(f"Results written to {output}")
+    return output, report
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""
+Compare two persistence benchmark results.
+
+    python -m benchmarks.compare base.json head.json [--threshold 0.2] [--min-ms 2]
+
+Prints the p50/p95 ratio (head / base) of every operation measured in both files and
+flags regressions: a p95 more than ``threshold`` slower (and at least ``min-ms`` slower,
+so noise on sub-millisecond operations does not count) or more SQL statements per
+operation. Exits with status 1 when there is a regression.
+"""
+import argparse
+import json
+import sys
+from typing import Any, Dict, List, Optional
+
+
+def _load(path: str) -> Dict[str, Any]:
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def compare(base: Dict[str, Any], head: Dict[str, Any], threshold: float, min_ms: float) -> List[Dict[str, Any]]:
+    rows = []
+    for size, head_result in head["results"].items():
+        base_result = base["results"].get(size)
+        if not base_result:
+            continue
+        for name, after in head_result["operations"].items():
+            before = base_result["operations"].get(name)
+            if not before:
+                continue
+            p50_ratio = after["p50"] / before["p50"] if before["p50"] else None
+            p95_ratio = after["p95"] / before["p95"] if before["p95"] else None
+            slower = (
+                p95_ratio is not None and p95_ratio > 1 + threshold and after["p95"] - before["p95"] >= min_ms
+            )
+            more_statements = after["statements"] > before["statements"]
+            rows.append({
+                "size": size, "operation": name, "before": before, "after": after,
+                "p50Ratio": p50_ratio, "p95Ratio": p95_ratio,
+                "regression": slower or more_statements,
+            })
+    return rows
+
+
+def _ratio(value: Optional[float]) -> str:
+    return f"{value:.2f}x" if value is not None else "-"
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Compare two benchmarks.persistence result files")
+    parser.add_argument("base", help="result file of the baseline commit")
+    parser.add_argument("head", help="result file of the commit under test")
+    parser.add_argument("--threshold", type=float, default=0.2, help="relative p95 slowdown counted as a regression")
+    parser.add_argument("--min-ms", type=float, default=2.0, help="ignore p95 slowdowns smaller than this")
+    args = parser.parse_args(argv)
+
+    base, head = _load(args.base), _load(args.head)
+    print(f"base {(base.get('commit') or 'unknown')[:8]}{' (dirty)' if base.get('dirty') else ''}  "
+          f"head {(head.get('commit') or 'unknown')[:8]}{' (dirty)' if head.get('dirty') else ''}")
+
+    rows = compare(base, head, args.threshold, args.min_ms)
+    print(f"{'size':>7} {'operation':<17} {'p50 ms':>17} {'p50':>7} {'p95 ms':>17} {'p95':>7} {'stmts':>9}")
+    for row in rows:
+        before, after = row["before"], row["after"]
+        print(
+            f"{row['size']:>7} {row['operation']:<17} "
+            f"{before['p50']:>8.2f}{after['p50']:>9.2f} {_ratio(row['p50Ratio']):>7} "
+            f"{before['p95']:>8.2f}{after['p95']:>9.2f} {_ratio(row['p95Ratio']):>7} "
+            f"{before['statements']:>4}{after['statements']:>5}"
+            f"{'  REGRESSION' if row['regression'] else ''}"
+        )
+
+    regressions = [row for row in rows if row["regression"]]
+    if regressions:
+        print(f"{len(regressions)} regression(s)")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
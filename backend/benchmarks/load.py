@@ -0,0 +1,320 @@
+"""
+HTTP load test of the journey API.
+
+    python -m benchmarks.load --serve --workers 2                     # start uvicorn main:app itself
+    python -m benchmarks.load --base-url http://localhost:8001 --scenario autosave --concurrency 1,8,32
+
+Drives a running server (or one started with ``--serve``) with closed-loop virtual
+users, stepping through increasing concurrency levels so the results form a saturation
+curve: throughput levels off and latency climbs once the workers or the DB pool are
+the bottleneck. Scenarios:
+
+- autosave: an editing session - each user saves its own journey with 1% of the nodes
+  changed, reloading it every tenth iteration
+- dashboard: list polling - the journey list of the shared user, then one journey's stats
+- duplicate: bulk duplicates of a seeded journey (the copies are deleted afterwards)
+- mixed: users split 60/30/10 over autosave, dashboard and duplicate
+
+Each step reports throughput, p50/p95/p99 latency and the error rate overall and per
+operation; the run is written as JSON next to the persistence results. All journeys the
+run creates are hard-deleted at the end.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import time
+from collections import Counter, defaultdict
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+import httpx
+import numpy as np
+
+from .persistence import BACKEND_DIR, RESULTS_DIR, _git
+from .synthetic import make_journey, touch
+
+SCENARIOS = ["autosave", "dashboard", "duplicate", "mixed"]
+MIXED_WEIGHTS = [("autosave", 0.6), ("dashboard", 0.3), ("duplicate", 0.1)]
+
+
+class LoadTest:
+    """Seeded journeys plus the virtual-user loops of each scenario"""
+
+    def __init__(self, client: httpx.AsyncClient, size: int, seed: int, think_seconds: float):
+        self.client = client
+        self.size = size
+        self.seed = seed
+        self.think_seconds = think_seconds
+        self.user_id = f"loadtest-{os.getpid()}-{int(time.time())}"
+        self.journey = make_journey(size, seed)
+        self.created: List[str] = []
+        self.user_journeys: List[str] = []
+        self.shared_journeys: List[str] = []
+        # (operation, seconds, status) of every request in the current step
+        self.samples: List[Tuple[str, float, int]] = []
+
+    # ------------------------------------------------------------------
+    # Requests
+    # ------------------------------------------------------------------
+
+    async def request(self, operation: str, method: str, path: str, **kwargs) -> Optional[httpx.Response]:
+        started = time.perf_counter()
+        try:
+            response = await self.client.request(method, path, **kwargs)
+            status = response.status_code
+        except httpx.HTTPError:
+            response, status = None, 0
+        self.samples.append((operation, time.perf_counter() - started, status))
+        return response
+
+    async def _create(self, name: str) -> str:
+        response = await self.client.post("/api/journeys/", json={
+            "name": name, "description": "benchmarks/load.py", "user_id": self.user_id,
+        })
+        response.raise_for_status()
+        journey_id = response.json()["journey"]["id"]
+        self.created.append(journey_id)
+        return journey_id
+
+    async def _seed_journey(self, name: str) -> str:
+        journey_id = await self._create(name)
+        response = await self.client.post(
+            f"/api/journeys/{journey_id}/save", json={"journey": {**self.journey, "id": journey_id}}
+        )
+        response.raise_for_status()
+        return journey_id
+
+    async def setup(self, users: int) -> None:
+        """One journey per autosave user, plus a few shared ones that dashboard and duplicate users read"""
+        while len(self.shared_journeys) < 5:
+            self.shared_journeys.append(await self._seed_journey(f"Load test shared {len(self.shared_journeys)}"))
+        while len(self.user_journeys) < users:
+            self.user_journeys.append(await self._seed_journey(f"Load test user {len(self.user_journeys)}"))
+
+    async def cleanup(self) -> None:
+        for journey_id in self.created:
+            try:
+                await self.client.delete(f"/api/journeys/{journey_id}", params={"hard_delete": True})
+            except httpx.HTTPError:
+                pass
+        self.created.clear()
+
+    # ------------------------------------------------------------------
+    # Scenarios (one iteration each)
+    # ------------------------------------------------------------------
+
+    async def autosave(self, user: int, iteration: int, rng: random.Random) -> None:
+        journey_id = self.user_journeys[user]
+        edited = touch(self.journey, 0.01, seed=rng.randrange(1 << 30))
+        await self.request("save", "POST", f"/api/journeys/{journey_id}/save",
+                           json={"journey": {**edited, "id": journey_id}})
+        if iteration % 10 == 9:
+            await self.request("load", "GET", f"/api/journeys/{journey_id}")
+
+    async def dashboard(self, user: int, iteration: int, rng: random.Random) -> None:
+        await self.request("list", "GET", "/api/journeys/", params={"user_id": self.user_id, "limit": 50})
+        await self.request("stats", "GET", f"/api/journeys/{rng.choice(self.shared_journeys)}/stats")
+
+    async def duplicate(self, user: int, iteration: int, rng: random.Random) -> None:
+        response = await self.request("duplicate", "POST", f"/api/journeys/{rng.choice(self.shared_journeys)}/duplicate")
+        if response is not None and response.status_code == 200:
+            self.created.append(response.json()["journey"]["id"])
+
+    def scenario_for(self, scenario: str, user: int, users: int) -> str:
+        if scenario != "mixed":
+            return scenario
+        # Deterministic split of the users by weight
+        position = (user + 0.5) / users
+        cumulative = 0.0
+        for name, weight in MIXED_WEIGHTS:
+            cumulative += weight
+            if position <= cumulative:
+                return name
+        return MIXED_WEIGHTS[-1][0]
+
+    async def _user(self, scenario: str, user: int, deadline: float) -> None:
+        run = getattr(self, scenario)
+        rng = random.Random(self.seed * 1000 + user)
+        iteration = 0
+        while time.perf_counter() < deadline:
+            await run(user, iteration, rng)
+            iteration += 1
+            if self.think_seconds:
+                await asyncio.sleep(rng.uniform(0.5, 1.5) * self.think_seconds)
+
+    # ------------------------------------------------------------------
+    # Steps
+    # ------------------------------------------------------------------
+
+    async def step(self, scenario: str, users: int, duration: float, warmup: float) -> Dict[str, Any]:
+        """Run ``users`` virtual users for warmup + duration seconds; only requests after the warmup count"""
+        self.samples = []
+        started = time.perf_counter()
+        measure_from = started + warmup
+        deadline = measure_from + duration
+
+        async def drop_warmup():
+            await asyncio.sleep(warmup)
+            self.samples = []
+
+        await asyncio.gather(drop_warmup(), *(
+            self._user(self.scenario_for(scenario, user, users), user, deadline) for user in range(users)
+        ))
+        kept = self.samples
+        elapsed = time.perf_counter() - measure_from
+
+        by_operation: Dict[str, List[Tuple[float, int]]] = defaultdict(list)
+        for operation, seconds, status in kept:
+            by_operation[operation].append((seconds, status))
+
+        return {
+            "concurrency": users,
+            "seconds": round(elapsed, 2),
+            **_summary([(seconds, status) for _, seconds, status in kept], elapsed),
+            "operations": {operation: _summary(samples, elapsed) for operation, samples in sorted(by_operation.items())},
+        }
+
+
+def _summary(samples: List[Tuple[float, int]], elapsed: float) -> Dict[str, Any]:
+    if not samples:
+        return {"requests": 0, "throughput": 0.0, "errorRate": 0.0, "p50": None, "p95": None, "p99": None, "statuses": {}}
+    latencies = [seconds * 1000 for seconds, _ in samples]
+    errors = sum(1 for _, status in samples if not 200 <= status < 300)
+    p50, p95, p99 = np.percentile(latencies, [50, 95, 99])
+    return {
+        "requests": len(samples),
+        "throughput": round(len(samples) / elapsed, 2) if elapsed > 0 else 0.0,
+        "errorRate": round(errors / len(samples), 4),
+        "p50": round(float(p50), 2),
+        "p95": round(float(p95), 2),
+        "p99": round(float(p99), 2),
+        # 0 = the request failed without a response (timeout, connection error)
+        "statuses": {str(status): count for status, count in sorted(Counter(status for _, status in samples).items())},
+    }
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+async def _wait_until_up(base_url: str, process: subprocess.Popen, timeout: float = 60) -> None:
+    deadline = time.perf_counter() + timeout
+    async with httpx.AsyncClient(base_url=base_url, timeout=2) as client:
+        while time.perf_counter() < deadline:
+            if process.poll() is not None:
+                raise RuntimeError(f"Server exited with status {process.returncode}")
+            try:
+                if (await client.get("/health")).status_code == 200:
+                    return
+            except httpx.HTTPError:
+                pass
+            await asyncio.sleep(0.5)
+    raise RuntimeError(f"Server at {base_url} did not come up within {timeout}s")
+
+
+def summary_table(steps: List[Dict[str, Any]]) -> str:
+    lines = [f"{'scenario':<10} {'users':>5} {'req/s':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'errors':>7}"]
+    for step in steps:
+        lines.append(
+            f"{step['scenario']:<10} {step['concurrency']:>5} {step['throughput']:>9.1f} "
+            f"{step['p50'] or 0:>9.1f} {step['p95'] or 0:>9.1f} {step['p99'] or 0:>9.1f} {step['errorRate']:>7.2%}"
+        )
+    return "\n".join(lines)
+
+
+async def run(args) -> Dict[str, Any]:
+    levels = [int(level) for level in args.concurrency.split(",") if level.strip()]
+    scenarios = SCENARIOS if args.scenario == "all" else args.scenario.split(",")
+    for scenario in scenarios:
+        if scenario not in SCENARIOS:
+            raise SystemExit(f"Unknown scenario {scenario!r} (choose from {', '.join(SCENARIOS)} or all)")
+
+    limits = httpx.Limits(max_connections=max(levels), max_keepalive_connections=max(levels))
+    async with httpx.AsyncClient(base_url=args.base_url, timeout=args.timeout, limits=limits) as client:
+        load_test = LoadTest(client, args.size, args.seed, args.think_ms / 1000)
+        steps: List[Dict[str, Any]] = []
+        try:
+            await load_test.setup(max(levels))
+            for scenario in scenarios:
+                for users in levels:
+                    print(f"{scenario}: {users} users for {args.duration}s...", flush=True)
+                    step = await load_test.step(scenario, users, args.duration, args.warmup)
+                    steps.append({"scenario": scenario, **step})
+        finally:
+            await load_test.cleanup()
+    return {"steps": steps}
+
+
+def main(argv: Optional[List[str]] = None) -> Tuple[str, Dict[str, Any]]:
+    parser = argparse.ArgumentParser(description="Load test the journey API at increasing concurrency")
+    parser.add_argument("--base-url", default="http://localhost:8001", help="server to test (ignored with --serve)")
+    parser.add_argument("--serve", action="store_true", help="start uvicorn main:app on a free port for the run")
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn worker processes with --serve")
+    parser.add_argument("--scenario", default="all", help=f"comma-separated: {', '.join(SCENARIOS)}, or all")
+    parser.add_argument("--concurrency", default="1,4,16,64", help="virtual users per step (default: 1,4,16,64)")
+    parser.add_argument("--duration", type=float, default=20, help="measured seconds per step")
+    parser.add_argument("--warmup", type=float, default=3, help="unmeasured seconds at the start of each step")
+    parser.add_argument("--think-ms", type=float, default=0, help="mean pause between a user's iterations")
+    parser.add_argument("--size", type=int, default=200, help="nodes per journey")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--timeout", type=float, default=30, help="request timeout in seconds")
+    parser.add_argument("--output", help="result file (default: benchmarks/results/load-<commit>-<time>.json)")
+    args = parser.parse_args(argv)
+
+    server = None
+    if args.serve:
+        port = _free_port()
+        args.base_url = f"http://127.0.0.1:{port}"
+        server = subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "main:app", "--port", str(port), "--workers", str(args.workers),
+             "--log-level", "warning", "--no-access-log"],
+            cwd=BACKEND_DIR,
+            # The app logs every request; keep the load test's own output readable
+            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+        )
+
+    commit = _git("rev-parse", "HEAD")
+    started = datetime.now(timezone.utc)
+    try:
+        if server:
+            asyncio.run(_wait_until_up(args.base_url, server))
+        result = asyncio.run(run(args))
+    finally:
+        if server:
+            server.terminate()
+            server.wait(timeout=30)
+
+    report = {
+        "benchmark": "load",
+        "commit": commit,
+        "dirty": bool(_git("status", "--porcelain", "--untracked-files=no")),
+        "createdAt": started.isoformat(),
+        "config": {
+            "baseUrl": args.base_url, "serve": args.serve, "workers": args.workers if args.serve else None,
+            "concurrency": args.concurrency, "duration": args.duration, "warmup": args.warmup,
+            "thinkMs": args.think_ms, "size": args.size, "seed": args.seed,
+        },
+        **result,
+    }
+
+    output = args.output or os.path.join(
+        RESULTS_DIR, f"load-{(commit or 'unknown')[:8]}-{started.strftime('%Y%m%dT%H%M%SZ')}.json"
+    )
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+
+    print(summary_table(report["steps"]))
+    print(f"Results written to {output}")
+    return output, report
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,266 @@
+"""
+Journey persistence benchmark.
+
+    python -m benchmarks.persistence                                  # sizes 10, 1000, 10000
+    python -m benchmarks.persistence --sizes 10,100 --repeat 50
+    python -m benchmarks.compare benchmarks/results/a.json benchmarks/results/b.json
+
+Runs against the database in CP_DATABASE_URL / DATABASE_URL, which must be migrated
+(``alembic upgrade head``). Every operation goes through the API in-process (FastAPI
+TestClient), so timings include validation, serialization and routing but no network:
+
+- create: POST /api/journeys/ (empty journey)
+- save: first full save of a synthetic journey into a fresh journey
+- incremental_save: re-save of the same journey with 1% of its nodes edited
+- load, canvas, stats: GET /api/journeys/{id}, /canvas, /stats
+- list: GET /api/journeys/?user_id=... (the journeys created by the run)
+- duplicate: POST /api/journeys/{id}/duplicate
+
+Each operation is warmed up, then repeated; p50/p95/p99 (milliseconds) and the round
+trips per operation - SQL statements and connection checkouts, read from the Prometheus
+counters - are written to a JSON file named after the commit, for ``benchmarks.compare``.
+Everything the run creates is hard-deleted at the end.
+"""
+import argparse
+import json
+import logging
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+from dotenv import load_dotenv
+
+BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+RESULTS_DIR = os.path.join(BACKEND_DIR, "benchmarks", "results")
+
+def _git(*args: str) -> Optional[str]:
+    try:
+        return subprocess.run(["git", *args], cwd=BACKEND_DIR, capture_output=True, text=True, check=True).stdout.strip()
+    except Exception:
+        return None
+
+
+def _counter_total(metric) -> int:
+    """Sum of a histogram's _count samples over all label sets"""
+    return int(sum(
+        sample.value for family in metric.collect() for sample in family.samples if sample.name.endswith("_count")
+    ))
+
+
+class PersistenceBenchmark:
+    """Times the journey persistence operations for synthetic journeys of several sizes"""
+
+    def __init__(self, repeat: int, warmup: int, seed: int):
+        # Imported here so DATABASE_URL from .env / the command line is in place first
+        sys.path.insert(0, BACKEND_DIR)
+        from fastapi.testclient import TestClient
+        import main
+        from app.shared_services.metrics import DB_QUERY_DURATION, DB_POOL_WAIT
+
+        self.client = TestClient(main.app)
+        self.statements = lambda: _counter_total(DB_QUERY_DURATION)
+        self.checkouts = lambda: _counter_total(DB_POOL_WAIT)
+        self.repeat = repeat
+        self.warmup = warmup
+        self.seed = seed
+        self.user_id = f"benchmark-{os.getpid()}-{int(time.time())}"
+        self.created: List[str] = []
+
+    # ------------------------------------------------------------------
+    # API calls
+    # ------------------------------------------------------------------
+
+    def _call(self, method: str, path: str, **kwargs) -> Dict[str, Any]:
+        response = self.client.request(method, path, **kwargs)
+        if response.status_code != 200:
+            raise RuntimeError(f"{method} {path} returned {response.status_code}: {response.text[:300]}")
+        return response.json()
+
+    def _create(self) -> str:
+        journey_id = self._call("POST", "/api/journeys/", json={
+            "name": "Benchmark journey", "description": "benchmarks/persistence.py", "user_id": self.user_id,
+        })["journey"]["id"]
+        self.created.append(journey_id)
+        return journey_id
+
+    def _save_body(self, journey_id: str, journey: Dict[str, Any]) -> bytes:
+        return json.dumps({"journey": {**journey, "id": journey_id}}).encode("utf-8")
+
+    def _save(self, journey_id: str, body: bytes) -> None:
+        self._call("POST", f"/api/journeys/{journey_id}/save", content=body,
+                   headers={"Content-Type": "application/json"})
+
+    # ------------------------------------------------------------------
+    # Measurement
+    # ------------------------------------------------------------------
+
+    def repeat_for(self, size: int) -> int:
+        """Fewer repetitions for large journeys (never fewer than 3)"""
+        return max(3, min(self.repeat, self.repeat * 1000 // max(size, 1)))
+
+    def _measure(self, repeat: int, setup: Callable[[int], Any], operation: Callable[[Any], None]) -> Dict[str, Any]:
+        """Run ``operation(setup(i))`` warmup + repeat times; only the operation is timed"""
+        timings: List[float] = []
+        statements: List[int] = []
+        checkouts: List[int] = []
+        for i in range(self.warmup + repeat):
+            argument = setup(i)
+            statements_before, checkouts_before = self.statements(), self.checkouts()
+            started = time.perf_counter()
+            operation(argument)
+            elapsed = time.perf_counter() - started
+            if i >= self.warmup:
+                timings.append(elapsed * 1000)
+                statements.append(self.statements() - statements_before)
+                checkouts.append(self.checkouts() - checkouts_before)
+
+        p50, p95, p99 = np.percentile(timings, [50, 95, 99])
+        return {
+            "samples": len(timings),
+            "p50": round(float(p50), 3),
+            "p95": round(float(p95), 3),
+            "p99": round(float(p99), 3),
+            "mean": round(statistics.fmean(timings), 3),
+            "min": round(min(timings), 3),
+            "max": round(max(timings), 3),
+            "statements": int(statistics.median(statements)),
+            "connections": int(statistics.median(checkouts)),
+        }
+
+    def run_size(self, size: int) -> Dict[str, Any]:
+        from benchmarks.synthetic import make_journey, touch
+
+        journey = make_journey(size, self.seed)
+        repeat = self.repeat_for(size)
+        base_id = self._create()
+        base_body = self._save_body(base_id, journey)
+        self._save(base_id, base_body)
+
+        operations: Dict[str, Dict[str, Any]] = {}
+        operations["create"] = self._measure(repeat, lambda i: None, lambda _: self._create())
+        operations["save"] = self._measure(
+            repeat,
+            lambda i: (lambda journey_id: (journey_id, self._save_body(journey_id, journey)))(self._create()),
+            lambda args: self._save(*args)
+        )
+        operations["incremental_save"] = self._measure(
+            repeat,
+            lambda i: self._save_body(base_id, touch(journey, 0.01, seed=i + 1)),
+            lambda body: self._save(base_id, body)
+        )
+        operations["load"] = self._measure(repeat, lambda i: None, lambda _: self._call("GET", f"/api/journeys/{base_id}"))
+        operations["canvas"] = self._measure(repeat, lambda i: None, lambda _: self._call("GET", f"/api/journeys/{base_id}/canvas"))
+        operations["list"] = self._measure(
+            repeat, lambda i: None,
+            lambda _: self._call("GET", "/api/journeys/", params={"user_id": self.user_id, "limit": 50})
+        )
+        operations["stats"] = self._measure(repeat, lambda i: None, lambda _: self._call("GET", f"/api/journeys/{base_id}/stats"))
+        operations["duplicate"] = self._measure(
+            repeat, lambda i: None,
+            lambda _: self.created.append(self._call("POST", f"/api/journeys/{base_id}/duplicate")["journey"]["id"])
+        )
+
+        return {
+            "journey": {
+                "nodes": len(journey["nodes"]),
+                "edges": len(journey["edges"]),
+                "goals": len(journey["goals"]),
+                "milestones": len(journey["milestones"]),
+                "payloadBytes": len(base_body),
+            },
+            "operations": operations,
+        }
+
+    def cleanup(self) -> None:
+        for journey_id in self.created:
+            self.client.delete(f"/api/journeys/{journey_id}", params={"hard_delete": True})
+        self.created.clear()
+
+    def environment(self) -> Dict[str, Any]:
+        from app.services.journey.utils import get_connection
+
+        with get_connection("journeys") as conn:
+            with conn.cursor() as cursor:
+                cursor.execute("SELECT version()")
+                postgres = cursor.fetchone()[0]
+            conn.rollback()
+        return {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "machine": platform.machine(),
+            "cpus": os.cpu_count(),
+            "postgres": postgres,
+        }
+
+
+def summary_table(results: Dict[str, Any]) -> str:
+    lines = [f"{'size':>7} {'operation':<17} {'p50 ms':>10} {'p95 ms':>10} {'p99 ms':>10} {'stmts':>7} {'conns':>6} {'n':>4}"]
+    for size, result in results.items():
+        for name, stats in result["operations"].items():
+            lines.append(
+                f"{size:>7} {name:<17} {stats['p50']:>10.2f} {stats['p95']:>10.2f} {stats['p99']:>10.2f} "
+                f"{stats['statements']:>7} {stats['connections']:>6} {stats['samples']:>4}"
+            )
+    return "\n".join(lines)
+
+
+def main(argv: Optional[List[str]] = None) -> Tuple[str, Dict[str, Any]]:
+    parser = argparse.ArgumentParser(description="Benchmark journey persistence against a local Postgres")
+    parser.add_argument("--sizes", default="10,1000,10000", help="comma-separated node counts (default: 10,1000,10000)")
+    parser.add_argument("--repeat", type=int, default=20, help="timed repetitions per operation (scaled down above 1000 nodes)")
+    parser.add_argument("--warmup", type=int, default=1, help="untimed repetitions before measuring")
+    parser.add_argument("--seed", type=int, default=42, help="seed of the synthetic journeys")
+    parser.add_argument("--database-url", help="database to run against (default: CP_DATABASE_URL / DATABASE_URL)")
+    parser.add_argument("--output", help="result file (default: benchmarks/results/persistence-<commit>-<time>.json)")
+    args = parser.parse_args(argv)
+
+    load_dotenv()
+    if args.database_url:
+        os.environ["CP_DATABASE_URL"] = args.database_url
+
+    sizes = [int(size) for size in args.sizes.split(",") if size.strip()]
+    benchmark = PersistenceBenchmark(args.repeat, args.warmup, args.seed)
+    # Request logging (set up by the app import) would dominate the small operations
+    logging.getLogger("QueryStateLogger").setLevel(logging.WARNING)
+
+    commit = _git("rev-parse", "HEAD")
+    started = datetime.now(timezone.utc)
+    results: Dict[str, Any] = {}
+    try:
+        for size in sizes:
+            print(f"Benchmarking {size} nodes ({benchmark.repeat_for(size)} repetitions)...", flush=True)
+            results[str(size)] = benchmark.run_size(size)
+    finally:
+        benchmark.cleanup()
+
+    report = {
+        "benchmark": "persistence",
+        "commit": commit,
+        "dirty": bool(_git("status", "--porcelain", "--untracked-files=no")),
+        "createdAt": started.isoformat(),
+        "durationSeconds": round((datetime.now(timezone.utc) - started).total_seconds(), 1),
+        "environment": benchmark.environment(),
+        "config": {"sizes": sizes, "repeat": args.repeat, "warmup": args.warmup, "seed": args.seed},
+        "results": results,
+    }
+
+    output = args.output or os.path.join(
+        RESULTS_DIR, f"persistence-{(commit or 'unknown')[:8]}-{started.strftime('%Y%m%dT%H%M%SZ')}.json"
+    )
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+
+    print(summary_table(results))
+    print(f"Results written to {output}")
+    return output, report
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""
+Deterministic synthetic journeys in the shape the frontend store saves.
+
+A journey of size N has N nodes laid out left to right: an entry node, then a mix of
+message/wait/decision/goal/milestone nodes, and exit nodes at the end. Edges chain the
+nodes and every decision adds a second branch to a later node, so there are about
+1.1 N edges. Goals and milestones scale with N (milestones form a DAG).
+"""
+import random
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List
+
+SUBTYPES = ["message", "message", "message", "wait", "decision", "goal", "milestone"]
+
+
+def _node(i: int, subtype: str, rng: random.Random) -> Dict[str, Any]:
+    data: Dict[str, Any] = {
+        "title": f"{subtype.capitalize()} {i}",
+        "description": f"Synthetic {subtype} node {i} " + "x" * rng.randint(20, 120),
+    }
+    if subtype == "message":
+        data.update({
+            "channel": rng.choice(["email", "sms", "push"]),
+            "template": f"template-{rng.randint(1, 50)}",
+            "subject": f"Offer {i}",
+            "body": "Hello {{first_name}}, " + "lorem ipsum " * rng.randint(3, 15),
+        })
+    elif subtype == "wait":
+        data.update({"duration": rng.randint(1, 72), "unit": "hours"})
+    elif subtype == "decision":
+        data.update({"condition": f"customer.score > {rng.randint(10, 90)}"})
+    return {
+        "id": f"n{i}",
+        "type": "custom",
+        "node-subtype": subtype,
+        "position": {"x": i * 220.0, "y": (i % 7) * 140.0 + rng.random()},
+        "data": data,
+        "selected": False,
+    }
+
+
+def make_journey(size: int, seed: int = 42) -> Dict[str, Any]:
+    """A CompleteJourneyState-shaped dict with ``size`` nodes (the id is filled in by the caller)"""
+    rng = random.Random(seed + size)
+    now = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+    nodes: List[Dict[str, Any]] = []
+    for i in range(size):
+        if i == 0:
+            subtype = "entry"
+        elif i >= size - max(1, size // 100):
+            subtype = "exit"
+        else:
+            subtype = rng.choice(SUBTYPES)
+        nodes.append(_node(i, subtype, rng))
+
+    edges: List[Dict[str, Any]] = []
+    for i in range(size - 1):
+        edges.append({
+            "id": f"e{i}", "source": f"n{i}", "target": f"n{i + 1}",
+            "data": {"label": "yes" if nodes[i]["node-subtype"] == "decision" else ""},
+            "type": "custom", "animated": False, "style": {},
+        })
+        if nodes[i]["node-subtype"] == "decision" and i + 2 < size:
+            target = rng.randint(i + 2, min(size - 1, i + 50))
+            edges.append({
+                "id": f"b{i}", "source": f"n{i}", "target": f"n{target}",
+                "data": {"label": "no"}, "type": "custom", "animated": False, "style": {},
+            })
+
+    goal_count = max(1, min(size // 100, 50))
+    goals = [{
+        "id": f"g{i}", "title": f"Goal {i}", "description": f"Synthetic goal {i}",
+        "targetValue": float(rng.randint(10, 1000)), "currentValue": 0, "unit": "customers",
+        "status": "not-started", "priority": rng.choice(["low", "medium", "high"]), "category": "growth",
+        "createdAt": now.isoformat(), "updatedAt": now.isoformat(),
+    } for i in range(goal_count)]
+
+    milestone_count = max(1, min(size // 50, 200))
+    milestones = [{
+        "id": f"m{i}", "title": f"Milestone {i}", "description": f"Synthetic milestone {i}",
+        "targetDate": (now + timedelta(days=7 * (i + 1))).isoformat(),
+        "status": "pending", "progress": 0,
+        # Only earlier milestones, so the dependencies stay acyclic
+        "dependencies": [f"m{j}" for j in sorted(rng.sample(range(i), min(i, 2)))],
+        "createdAt": now.isoformat(), "updatedAt": now.isoformat(),
+    } for i in range(milestone_count)]
+
+    return {
+        "id": "",
+        "name": f"Benchmark journey ({size} nodes)",
+        "description": "Synthetic journey generated by benchmarks/persistence.py",
+        "createdAt": now.isoformat(),
+        "updatedAt": now.isoformat(),
+        "nodes": nodes,
+        "edges": edges,
+        "goals": goals,
+        "milestones": milestones,
+        "reports": [],
+    }
+
+
+def touch(journey: Dict[str, Any], fraction: float = 0.01, seed: int = 0) -> Dict[str, Any]:
+    """A copy of the journey with ``fraction`` of its nodes moved and retitled (an incremental edit)"""
+    rng = random.Random(seed)
+    edited = dict(journey)
+    edited["nodes"] = list(journey["nodes"])
+    count = max(1, int(len(edited["nodes"]) * fraction))
+    for i in rng.sample(range(len(edited["nodes"])), count):
+        node = dict(edited["nodes"][i])
+        node["position"] = {"x": node["position"]["x"] + rng.uniform(-50, 50), "y": node["position"]["y"] + rng.uniform(-50, 50)}
+        node["data"] = {**node["data"], "title": f"{node['data']['title']} (edited {seed})"}
+        edited["nodes"][i] = node
+    edited["updatedAt"] = datetime.now(timezone.utc).isoformat()
+    return edited
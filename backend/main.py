@@ -30,6 +30,19 @@ app.add_middleware(
 from app.shared_services.logger_setup import setup_logger
 logger = setup_logger()
 
+# Request latency metrics, served at /metrics
+from app.shared_services.metrics import MetricsMiddleware, metrics_response
+app.add_middleware(MetricsMiddleware)
+
+# Tracing, exported when OTEL_EXPORTER_OTLP_ENDPOINT or TRACE_FILE is set
+from app.shared_services.tracing import TracingMiddleware, setup_tracing
+setup_tracing("cvm-api")
+app.add_middleware(TracingMiddleware)
+
+# Per-request profiling (X-Profile: 1 with X-Admin-Token), see the admin router
+from app.shared_services.profiler import ProfilingMiddleware
+app.add_middleware(ProfilingMiddleware)
+
 # Try to import and include routers
 try:
     from app.routers import journey_router
@@ -42,12 +55,58 @@ except ImportError as e:
     print(f"❌ Failed to import journey router: {e}")
     logger.error(f"Failed to import journey router: {e}")
 
+try:
+    from app.routers import execution_router
+
+    app.include_router(execution_router.router)
+    print("✅ Execution router loaded successfully")
+
+except ImportError as e:
+    print(f"❌ Failed to import execution router: {e}")
+    logger.error(f"Failed to import execution router: {e}")
+
+try:
+    from app.routers import report_router
+
+    app.include_router(report_router.router)
+    print("✅ Report router loaded successfully")
+
+except ImportError as e:
+    print(f"❌ Failed to import report router: {e}")
+    logger.error(f"Failed to import report router: {e}")
+
+try:
+    from app.routers import job_router
+
+    app.include_router(job_router.router)
+    print("✅ Job router loaded successfully")
+
+except ImportError as e:
+    print(f"❌ Failed to import job router: {e}")
+    logger.error(f"Failed to import job router: {e}")
+
+try:
+    from app.routers import admin_router
+
+    app.include_router(admin_router.router)
+    print("✅ Admin router loaded successfully")
+
+except ImportError as e:
+    print(f"❌ Failed to import admin router: {e}")
+    logger.error(f"Failed to import admin router: {e}")
+
 # Health check endpoint
 @app.get("/health")
 async def health_check():
     """Health check endpoint"""
     return {"status": "healthy", "message": "AI-CVM Tool API is running"}
 
+# Prometheus metrics endpoint
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Prometheus metrics"""
+    return metrics_response()
+
 # Root endpoint
 @app.get("/")
 async def root():
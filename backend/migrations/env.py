@@ -0,0 +1,49 @@
+"""
+Alembic environment. The schema is written as plain SQL in the revisions (the services
+use psycopg2 directly, there are no ORM models to autogenerate from), so there is no
+target metadata; ``alembic revision -m "..."`` creates an empty revision to fill in.
+"""
+import os
+from logging.config import fileConfig
+
+from alembic import context
+from dotenv import load_dotenv
+from sqlalchemy import create_engine, pool
+
+load_dotenv()
+
+config = context.config
+
+if config.config_file_name is not None:
+    fileConfig(config.config_file_name)
+
+
+def database_url() -> str:
+    """Same lookup as app.shared_services.db: CP_DATABASE_URL, then DATABASE_URL"""
+    url = os.getenv("CP_DATABASE_URL") or os.getenv("DATABASE_URL") or config.get_main_option("sqlalchemy.url")
+    if not url:
+        raise RuntimeError("Set CP_DATABASE_URL or DATABASE_URL to run migrations")
+    return url
+
+
+def run_migrations_offline() -> None:
+    """Print the SQL instead of running it (``alembic upgrade head --sql``)"""
+    context.configure(url=database_url(), literal_binds=True, transaction_per_migration=True)
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def run_migrations_online() -> None:
+    engine = create_engine(database_url(), poolclass=pool.NullPool)
+    with engine.connect() as connection:
+        # One transaction per revision, so a revision can step out of it for
+        # CREATE INDEX CONCURRENTLY (op.get_context().autocommit_block())
+        context.configure(connection=connection, transaction_per_migration=True)
+        with context.begin_transaction():
+            context.run_migrations()
+
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
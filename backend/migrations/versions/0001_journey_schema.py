@@ -0,0 +1,236 @@
+"""Journey persistence schema
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-19
+
+The complete journey state from the frontend journey store. Replaces
+database/journey_schema.sql and update_status_constraints.sql, with these fixes:
+
+- journey_milestones.data was declared after the UNIQUE constraint (a syntax error)
+- journey_reports had no updated_at column although every save writes it
+- the 'active' status constraints and milestone sort_order were applied by hand
+
+Every statement is idempotent, so a database created from the old SQL files is brought
+up to date by ``alembic upgrade head`` as well.
+"""
+from alembic import op
+
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+TABLES = """
+-- Journeys table (main journey metadata)
+CREATE TABLE IF NOT EXISTS journeys (
+    id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+    name VARCHAR(255) NOT NULL DEFAULT 'Untitled Journey',
+    description TEXT DEFAULT 'No description',
+    is_published BOOLEAN DEFAULT FALSE,
+    is_deleted BOOLEAN DEFAULT FALSE,
+    is_archived BOOLEAN DEFAULT FALSE,
+    is_locked BOOLEAN DEFAULT FALSE,
+    is_read_only BOOLEAN DEFAULT FALSE,
+    is_editable BOOLEAN DEFAULT TRUE,
+    is_view_only BOOLEAN DEFAULT FALSE,
+    created_at TIMESTAMP DEFAULT NOW(),
+    updated_at TIMESTAMP DEFAULT NOW(),
+    user_id VARCHAR(255) -- Optional: if you want to associate with users
+);
+
+-- Journey nodes (canvas nodes)
+CREATE TABLE IF NOT EXISTS journey_nodes (
+    id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+    journey_id UUID REFERENCES journeys(id) ON DELETE CASCADE,
+    node_id VARCHAR(255) NOT NULL, -- Frontend node ID
+    node_type VARCHAR(100) NOT NULL,
+    node_subtype VARCHAR(100) NOT NULL,
+    position_x DECIMAL(10,2) NOT NULL,
+    position_y DECIMAL(10,2) NOT NULL,
+    data JSONB DEFAULT '{}',
+    selected BOOLEAN DEFAULT FALSE,
+    created_at TIMESTAMP DEFAULT NOW(),
+    updated_at TIMESTAMP DEFAULT NOW(),
+    UNIQUE(journey_id, node_id)
+);
+
+-- Journey edges (canvas connections)
+CREATE TABLE IF NOT EXISTS journey_edges (
+    id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+    journey_id UUID REFERENCES journeys(id) ON DELETE CASCADE,
+    edge_id VARCHAR(255) NOT NULL, -- Frontend edge ID
+    source_node VARCHAR(255) NOT NULL,
+    target_node VARCHAR(255) NOT NULL,
+    data JSONB DEFAULT '{}',
+    selected BOOLEAN DEFAULT FALSE,
+    edge_type VARCHAR(100),
+    animated BOOLEAN DEFAULT FALSE,
+    style JSONB DEFAULT '{}',
+    created_at TIMESTAMP DEFAULT NOW(),
+    updated_at TIMESTAMP DEFAULT NOW(),
+    UNIQUE(journey_id, edge_id)
+);
+
+-- Journey goals
+CREATE TABLE IF NOT EXISTS journey_goals (
+    id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+    journey_id UUID REFERENCES journeys(id) ON DELETE CASCADE,
+    goal_id VARCHAR(255) NOT NULL, -- Frontend goal ID
+    title VARCHAR(255) NOT NULL,
+    description TEXT,
+    target_value DECIMAL(15,2) NOT NULL,
+    current_value DECIMAL(15,2) DEFAULT 0,
+    unit VARCHAR(50) NOT NULL,
+    deadline TIMESTAMP,
+    status VARCHAR(20) DEFAULT 'active', -- not-started, in-progress, completed, cancelled, deleted, archived, active
+    priority VARCHAR(10) DEFAULT 'medium', -- low, medium, high
+    category VARCHAR(100),
+    created_at TIMESTAMP DEFAULT NOW(),
+    updated_at TIMESTAMP DEFAULT NOW(),
+    UNIQUE(journey_id, goal_id)
+);
+
+-- Journey milestones
+CREATE TABLE IF NOT EXISTS journey_milestones (
+    id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+    journey_id UUID REFERENCES journeys(id) ON DELETE CASCADE,
+    milestone_id VARCHAR(255) NOT NULL, -- Frontend milestone ID
+    title VARCHAR(255) NOT NULL,
+    description TEXT,
+    target_date TIMESTAMP,
+    status VARCHAR(20) DEFAULT 'active', -- pending, in-progress, completed, overdue, cancelled, deleted, archived, active
+    progress INTEGER DEFAULT 0 CHECK (progress >= 0 AND progress <= 100),
+    dependencies JSONB DEFAULT '[]', -- Array of milestone IDs
+    data JSONB NOT NULL DEFAULT '{}',
+    sort_order INTEGER DEFAULT 0,
+    created_at TIMESTAMP DEFAULT NOW(),
+    updated_at TIMESTAMP DEFAULT NOW(),
+    UNIQUE(journey_id, milestone_id)
+);
+
+-- Journey reports
+CREATE TABLE IF NOT EXISTS journey_reports (
+    id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+    journey_id UUID REFERENCES journeys(id) ON DELETE CASCADE,
+    report_id VARCHAR(255) NOT NULL, -- Frontend report ID
+    name VARCHAR(255) NOT NULL,
+    report_type VARCHAR(20) NOT NULL, -- progress, performance, summary
+    generated_at TIMESTAMP DEFAULT NOW(),
+    data JSONB NOT NULL DEFAULT '{}',
+    created_at TIMESTAMP DEFAULT NOW(),
+    updated_at TIMESTAMP DEFAULT NOW(),
+    UNIQUE(journey_id, report_id)
+);
+
+-- Journey snapshots (full-state archive per save)
+CREATE TABLE IF NOT EXISTS journey_snapshots (
+    id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+    journey_id UUID REFERENCES journeys(id) ON DELETE CASCADE,
+    snapshot JSONB NOT NULL,
+    taken_at TIMESTAMP DEFAULT NOW()
+);
+
+-- Columns missing from databases created with the old SQL files
+ALTER TABLE journey_milestones ADD COLUMN IF NOT EXISTS data JSONB NOT NULL DEFAULT '{}';
+ALTER TABLE journey_milestones ADD COLUMN IF NOT EXISTS sort_order INTEGER DEFAULT 0;
+ALTER TABLE journey_reports ADD COLUMN IF NOT EXISTS updated_at TIMESTAMP DEFAULT NOW();
+"""
+
+STATUS_CONSTRAINTS = """
+ALTER TABLE journey_milestones DROP CONSTRAINT IF EXISTS journey_milestones_status_check;
+ALTER TABLE journey_milestones ADD CONSTRAINT journey_milestones_status_check
+    CHECK (status IN ('pending', 'in-progress', 'completed', 'overdue', 'cancelled', 'deleted', 'archived', 'active'));
+ALTER TABLE journey_milestones ALTER COLUMN status SET DEFAULT 'active';
+
+ALTER TABLE journey_goals DROP CONSTRAINT IF EXISTS journey_goals_status_check;
+ALTER TABLE journey_goals ADD CONSTRAINT journey_goals_status_check
+    CHECK (status IN ('not-started', 'in-progress', 'completed', 'cancelled', 'deleted', 'archived', 'active'));
+ALTER TABLE journey_goals ALTER COLUMN status SET DEFAULT 'active';
+"""
+
+# The indexes of the old schema file; 0005 replaces most of them
+INDEXES = """
+CREATE INDEX IF NOT EXISTS idx_journeys_user_id ON journeys(user_id);
+CREATE INDEX IF NOT EXISTS idx_journeys_created_at ON journeys(created_at);
+CREATE INDEX IF NOT EXISTS idx_journeys_updated_at ON journeys(updated_at);
+CREATE INDEX IF NOT EXISTS idx_journeys_is_published ON journeys(is_published);
+CREATE INDEX IF NOT EXISTS idx_journeys_is_deleted ON journeys(is_deleted);
+
+CREATE INDEX IF NOT EXISTS idx_journey_nodes_journey_id ON journey_nodes(journey_id);
+CREATE INDEX IF NOT EXISTS idx_journey_nodes_node_id ON journey_nodes(node_id);
+CREATE INDEX IF NOT EXISTS idx_journey_nodes_type ON journey_nodes(node_type);
+
+CREATE INDEX IF NOT EXISTS idx_journey_edges_journey_id ON journey_edges(journey_id);
+CREATE INDEX IF NOT EXISTS idx_journey_edges_source ON journey_edges(source_node);
+CREATE INDEX IF NOT EXISTS idx_journey_edges_target ON journey_edges(target_node);
+
+CREATE INDEX IF NOT EXISTS idx_journey_goals_journey_id ON journey_goals(journey_id);
+CREATE INDEX IF NOT EXISTS idx_journey_goals_status ON journey_goals(status);
+CREATE INDEX IF NOT EXISTS idx_journey_goals_priority ON journey_goals(priority);
+CREATE INDEX IF NOT EXISTS idx_journey_goals_deadline ON journey_goals(deadline);
+
+CREATE INDEX IF NOT EXISTS idx_journey_milestones_journey_id ON journey_milestones(journey_id);
+CREATE INDEX IF NOT EXISTS idx_journey_milestones_status ON journey_milestones(status);
+CREATE INDEX IF NOT EXISTS idx_journey_milestones_target_date ON journey_milestones(target_date);
+CREATE INDEX IF NOT EXISTS idx_journey_milestones_sort ON journey_milestones(journey_id, sort_order);
+
+CREATE INDEX IF NOT EXISTS idx_journey_reports_journey_id ON journey_reports(journey_id);
+CREATE INDEX IF NOT EXISTS idx_journey_reports_type ON journey_reports(report_type);
+CREATE INDEX IF NOT EXISTS idx_journey_reports_generated_at ON journey_reports(generated_at);
+
+CREATE INDEX IF NOT EXISTS idx_journey_snapshots_journey_id ON journey_snapshots(journey_id);
+"""
+
+TRIGGERS = """
+-- Automatic timestamp updates
+CREATE OR REPLACE FUNCTION update_updated_at_column()
+RETURNS TRIGGER AS $$
+BEGIN
+    NEW.updated_at = NOW();
+    RETURN NEW;
+END;
+$$ language 'plpgsql';
+"""
+
+UPDATED_AT_TABLES = ("journeys", "journey_nodes", "journey_edges", "journey_goals", "journey_milestones", "journey_reports")
+
+VIEWS = """
+-- Counted per table: joining all child tables at once multiplies their rows
+-- (nodes x edges x goals x milestones) before COUNT(DISTINCT) collapses them
+CREATE OR REPLACE VIEW journey_stats AS
+SELECT
+    j.id as journey_id,
+    j.name as journey_name,
+    (SELECT COUNT(*) FROM journey_nodes jn WHERE jn.journey_id = j.id) as total_nodes,
+    (SELECT COUNT(*) FROM journey_edges je WHERE je.journey_id = j.id) as total_edges,
+    (SELECT COUNT(*) FROM journey_goals jg WHERE jg.journey_id = j.id) as total_goals,
+    (SELECT COUNT(*) FROM journey_goals jg WHERE jg.journey_id = j.id AND jg.status = 'completed') as completed_goals,
+    (SELECT COUNT(*) FROM journey_milestones jm WHERE jm.journey_id = j.id) as total_milestones,
+    (SELECT COUNT(*) FROM journey_milestones jm WHERE jm.journey_id = j.id AND jm.status = 'completed') as completed_milestones,
+    (SELECT COUNT(*) FROM journey_reports jr WHERE jr.journey_id = j.id) as total_reports
+FROM journeys j
+WHERE j.is_deleted = FALSE;
+"""
+
+
+def upgrade() -> None:
+    op.execute(TABLES)
+    op.execute(STATUS_CONSTRAINTS)
+    op.execute(INDEXES)
+    op.execute(TRIGGERS)
+    for table in UPDATED_AT_TABLES:
+        op.execute(f"DROP TRIGGER IF EXISTS update_{table}_updated_at ON {table}")
+        op.execute(
+            f"CREATE TRIGGER update_{table}_updated_at BEFORE UPDATE ON {table} "
+            f"FOR EACH ROW EXECUTE FUNCTION update_updated_at_column()"
+        )
+    op.execute(VIEWS)
+
+
+def downgrade() -> None:
+    op.execute("DROP VIEW IF EXISTS journey_stats")
+    for table in ("journey_snapshots", "journey_reports", "journey_milestones", "journey_goals",
+                  "journey_edges", "journey_nodes", "journeys"):
+        op.execute(f"DROP TABLE IF EXISTS {table}")
+    op.execute("DROP FUNCTION IF EXISTS update_updated_at_column()")
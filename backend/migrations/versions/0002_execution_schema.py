@@ -0,0 +1,174 @@
+"""Journey execution schema
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-19
+
+Runtime state for customers moving through published journeys: compiled plans, customer
+positions, wait timers, execution workers, events, entry imports and progress counters.
+Replaces database/execution_schema.sql.
+"""
+from alembic import op
+
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+SCHEMA = """
+-- Compiled, immutable execution plans (one row per published version)
+CREATE TABLE IF NOT EXISTS journey_execution_plans (
+    journey_id UUID REFERENCES journeys(id) ON DELETE CASCADE,
+    version INTEGER NOT NULL,
+    checksum VARCHAR(64) NOT NULL,
+    plan JSONB NOT NULL,
+    created_at TIMESTAMPTZ DEFAULT NOW(),
+    PRIMARY KEY (journey_id, version)
+);
+
+-- Per-customer position. Kept narrow (integers instead of node ids) because every
+-- transition rewrites the row; fillfactor leaves room for HOT updates.
+-- status: 0 = ready, 1 = waiting, 2 = completed, 3 = exited, 4 = failed
+-- shard: hash of (journey, customer) into 256 shards distributed across execution
+-- workers; the expression must match the one on journey_wait_timers
+CREATE TABLE IF NOT EXISTS journey_customer_states (
+    journey_id UUID NOT NULL,
+    customer_id VARCHAR(255) NOT NULL,
+    shard SMALLINT GENERATED ALWAYS AS (hashtext(journey_id::text || ':' || customer_id) & 255) STORED,
+    plan_version INTEGER NOT NULL,
+    node_idx INTEGER NOT NULL,
+    status SMALLINT NOT NULL DEFAULT 0,
+    due_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    loop_counts SMALLINT[] NOT NULL DEFAULT '{}',
+    attributes JSONB DEFAULT '{}',
+    entered_at TIMESTAMPTZ DEFAULT NOW(),
+    updated_at TIMESTAMPTZ DEFAULT NOW(),
+    PRIMARY KEY (journey_id, customer_id),
+    FOREIGN KEY (journey_id, plan_version) REFERENCES journey_execution_plans(journey_id, version) ON DELETE CASCADE
+) WITH (fillfactor = 80);
+
+-- Claim query: ready customers, oldest first (waiting customers are woken through their timers)
+CREATE INDEX IF NOT EXISTS idx_customer_states_due ON journey_customer_states(journey_id, due_at) WHERE status = 0;
+-- Worker claim query: ready customers of the shards a worker owns, across journeys
+CREATE INDEX IF NOT EXISTS idx_customer_states_shard_due ON journey_customer_states(shard, due_at) WHERE status = 0;
+
+-- Durable delay queue for Wait nodes: one timer per waiting customer
+CREATE TABLE IF NOT EXISTS journey_wait_timers (
+    journey_id UUID NOT NULL,
+    customer_id VARCHAR(255) NOT NULL,
+    due_at TIMESTAMPTZ NOT NULL,
+    shard SMALLINT GENERATED ALWAYS AS (hashtext(journey_id::text || ':' || customer_id) & 255) STORED,
+    PRIMARY KEY (journey_id, customer_id)
+);
+
+CREATE INDEX IF NOT EXISTS idx_wait_timers_due ON journey_wait_timers(due_at);
+CREATE INDEX IF NOT EXISTS idx_wait_timers_shard_due ON journey_wait_timers(shard, due_at);
+
+-- Live execution workers. Shards are assigned by rendezvous hashing over the workers
+-- with a recent heartbeat and guarded by session advisory locks.
+CREATE TABLE IF NOT EXISTS execution_workers (
+    worker_id VARCHAR(100) PRIMARY KEY,
+    hostname VARCHAR(255),
+    pid INTEGER,
+    shards SMALLINT[] NOT NULL DEFAULT '{}',
+    started_at TIMESTAMPTZ DEFAULT NOW(),
+    heartbeat_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+);
+
+-- Append-only log of what happened to customers (messages, branches, goals, milestones, exits)
+CREATE TABLE IF NOT EXISTS journey_execution_events (
+    id BIGSERIAL PRIMARY KEY,
+    journey_id UUID NOT NULL,
+    customer_id VARCHAR(255) NOT NULL,
+    plan_version INTEGER NOT NULL,
+    node_id VARCHAR(255) NOT NULL,
+    event_type VARCHAR(20) NOT NULL,
+    detail VARCHAR(255),
+    occurred_at TIMESTAMPTZ DEFAULT NOW()
+);
+
+CREATE INDEX IF NOT EXISTS idx_execution_events_journey ON journey_execution_events(journey_id, id);
+
+-- Entry source file imports (CSV/TSV/JSON uploads feeding an Entry node)
+-- status: loading, staged, enrolling, enrolled, failed
+CREATE TABLE IF NOT EXISTS journey_entry_imports (
+    id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+    journey_id UUID NOT NULL REFERENCES journeys(id) ON DELETE CASCADE,
+    plan_version INTEGER NOT NULL,
+    entry_node_id VARCHAR(255) NOT NULL,
+    filename VARCHAR(255),
+    format VARCHAR(10) NOT NULL,
+    status VARCHAR(20) NOT NULL DEFAULT 'loading',
+    bytes_read BIGINT NOT NULL DEFAULT 0,
+    rows_read BIGINT NOT NULL DEFAULT 0,
+    rows_staged BIGINT NOT NULL DEFAULT 0,
+    rows_rejected BIGINT NOT NULL DEFAULT 0,
+    rows_enrolled BIGINT NOT NULL DEFAULT 0,
+    rejects JSONB NOT NULL DEFAULT '[]',
+    warnings JSONB NOT NULL DEFAULT '[]',
+    error TEXT,
+    started_at TIMESTAMPTZ DEFAULT NOW(),
+    staged_at TIMESTAMPTZ,
+    finished_at TIMESTAMPTZ
+);
+
+CREATE INDEX IF NOT EXISTS idx_entry_imports_journey ON journey_entry_imports(journey_id, started_at DESC);
+
+-- Validated rows waiting to be enrolled. Loaded with COPY and deleted once enrolled;
+-- unlogged because an interrupted import is simply uploaded again.
+CREATE UNLOGGED TABLE IF NOT EXISTS journey_entry_staging (
+    import_id UUID NOT NULL,
+    record_number BIGINT NOT NULL,
+    customer_id VARCHAR(255) NOT NULL,
+    attributes JSONB NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS idx_entry_staging_import ON journey_entry_staging(import_id, record_number);
+
+-- Goal and milestone progress aggregated from journey_execution_events.
+-- One watermark per journey: events up to last_event_id are already counted.
+CREATE TABLE IF NOT EXISTS journey_progress_watermarks (
+    journey_id UUID PRIMARY KEY REFERENCES journeys(id) ON DELETE CASCADE,
+    last_event_id BIGINT NOT NULL DEFAULT 0,
+    customers_entered BIGINT NOT NULL DEFAULT 0,
+    updated_at TIMESTAMPTZ DEFAULT NOW()
+);
+
+-- Distinct customers that reached each goal/milestone (kind: goal, milestone; target_id is
+-- the frontend goal_id/milestone_id)
+CREATE TABLE IF NOT EXISTS journey_progress_counters (
+    journey_id UUID NOT NULL REFERENCES journeys(id) ON DELETE CASCADE,
+    kind VARCHAR(10) NOT NULL,
+    target_id VARCHAR(255) NOT NULL,
+    customers BIGINT NOT NULL DEFAULT 0,
+    updated_at TIMESTAMPTZ DEFAULT NOW(),
+    PRIMARY KEY (journey_id, kind, target_id)
+);
+
+-- Who has been counted, so a customer looping through a goal node is counted once
+CREATE TABLE IF NOT EXISTS journey_progress_members (
+    journey_id UUID NOT NULL,
+    kind VARCHAR(10) NOT NULL,
+    target_id VARCHAR(255) NOT NULL,
+    customer_id VARCHAR(255) NOT NULL,
+    PRIMARY KEY (journey_id, kind, target_id, customer_id)
+);
+
+-- Windowed report queries over a journey's events
+CREATE INDEX IF NOT EXISTS idx_execution_events_journey_time ON journey_execution_events(journey_id, occurred_at);
+"""
+
+TABLES = (
+    "journey_progress_members", "journey_progress_counters", "journey_progress_watermarks",
+    "journey_entry_staging", "journey_entry_imports", "journey_execution_events", "execution_workers",
+    "journey_wait_timers", "journey_customer_states", "journey_execution_plans",
+)
+
+
+def upgrade() -> None:
+    op.execute(SCHEMA)
+
+
+def downgrade() -> None:
+    for table in TABLES:
+        op.execute(f"DROP TABLE IF EXISTS {table}")
@@ -0,0 +1,58 @@
+"""Background job queue schema
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-19
+
+Slow work (reports, snapshots, ...) queued by the API and run by the worker processes.
+Replaces database/jobs_schema.sql.
+"""
+from alembic import op
+
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+SCHEMA = """
+-- status: queued -> running -> done | failed (or cancelled while queued).
+-- A failed attempt goes back to queued with run_at pushed out (exponential backoff)
+-- until max_attempts is reached. A running job whose lease (locked_until) expired is
+-- assumed lost with its worker and is claimed again.
+CREATE TABLE IF NOT EXISTS jobs (
+    id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+    job_type VARCHAR(50) NOT NULL,
+    payload JSONB NOT NULL DEFAULT '{}',
+    priority SMALLINT NOT NULL DEFAULT 0, -- higher runs first
+    status VARCHAR(10) NOT NULL DEFAULT 'queued'
+        CHECK (status IN ('queued', 'running', 'done', 'failed', 'cancelled')),
+    idempotency_key VARCHAR(255),
+    attempts INTEGER NOT NULL DEFAULT 0,
+    max_attempts INTEGER NOT NULL DEFAULT 5,
+    run_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    locked_by VARCHAR(255),
+    locked_until TIMESTAMPTZ,
+    result JSONB,
+    error TEXT,
+    created_at TIMESTAMPTZ DEFAULT NOW(),
+    started_at TIMESTAMPTZ,
+    finished_at TIMESTAMPTZ
+);
+
+-- Enqueueing with a key that already exists returns the existing job
+CREATE UNIQUE INDEX IF NOT EXISTS idx_jobs_idempotency ON jobs(job_type, idempotency_key) WHERE idempotency_key IS NOT NULL;
+-- Claim order
+CREATE INDEX IF NOT EXISTS idx_jobs_queue ON jobs(priority DESC, run_at) WHERE status = 'queued';
+-- Running jobs per type (concurrency limits) and expired leases
+CREATE INDEX IF NOT EXISTS idx_jobs_running ON jobs(job_type, locked_until) WHERE status = 'running';
+-- Purging finished jobs
+CREATE INDEX IF NOT EXISTS idx_jobs_finished ON jobs(finished_at) WHERE status IN ('done', 'failed', 'cancelled');
+"""
+
+
+def upgrade() -> None:
+    op.execute(SCHEMA)
+
+
+def downgrade() -> None:
+    op.execute("DROP TABLE IF EXISTS jobs")
@@ -0,0 +1,134 @@
+"""GoalGetter chat schema
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-19
+
+Users, their summaries, goals, milestones, habits, progress logs and conversations used
+by the chat agents. Replaces app/shared_services/create_table.py.
+"""
+from alembic import op
+
+revision = "0004"
+down_revision = "0003"
+branch_labels = None
+depends_on = None
+
+TABLES = """
+CREATE OR REPLACE FUNCTION update_last_updated()
+RETURNS TRIGGER AS $$
+BEGIN
+    NEW.last_updated = NOW();
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TABLE IF NOT EXISTS users (
+    user_id BIGINT PRIMARY KEY,
+    first_name TEXT,
+    timezone TEXT DEFAULT 'UTC',
+    created_at TIMESTAMPTZ DEFAULT NOW()
+);
+
+CREATE TABLE IF NOT EXISTS user_summaries (
+    user_id BIGINT PRIMARY KEY REFERENCES users(user_id) ON DELETE CASCADE,
+    summary TEXT NOT NULL,
+    last_updated TIMESTAMPTZ DEFAULT NOW()
+);
+
+CREATE TABLE IF NOT EXISTS goals (
+    goal_id BIGSERIAL PRIMARY KEY,
+    user_id BIGINT NOT NULL REFERENCES users(user_id) ON DELETE CASCADE,
+    title TEXT NOT NULL,
+    description TEXT,
+    status VARCHAR DEFAULT 'active',
+    start_date DATE,
+    target_date DATE,
+    created_at TIMESTAMPTZ DEFAULT NOW(),
+    last_updated TIMESTAMPTZ DEFAULT NOW()
+);
+
+CREATE TABLE IF NOT EXISTS milestones (
+    milestone_id BIGSERIAL PRIMARY KEY,
+    goal_id BIGINT NOT NULL REFERENCES goals(goal_id) ON DELETE CASCADE,
+    description TEXT NOT NULL,
+    status VARCHAR DEFAULT 'pending',
+    target_date DATE,
+    completed_at TIMESTAMPTZ,
+    created_at TIMESTAMPTZ DEFAULT NOW(),
+    last_updated TIMESTAMPTZ DEFAULT NOW()
+);
+
+CREATE TABLE IF NOT EXISTS habits (
+    habit_id BIGSERIAL PRIMARY KEY,
+    user_id BIGINT NOT NULL REFERENCES users(user_id) ON DELETE CASCADE,
+    description TEXT NOT NULL,
+    frequency_type VARCHAR NOT NULL,
+    frequency_value INTEGER NOT NULL,
+    created_at TIMESTAMPTZ DEFAULT NOW(),
+    last_updated TIMESTAMPTZ DEFAULT NOW()
+);
+
+CREATE TABLE IF NOT EXISTS progress_logs (
+    log_id SERIAL PRIMARY KEY,
+    user_id BIGINT NOT NULL REFERENCES users(user_id) ON DELETE CASCADE,
+    related_goal_id BIGINT REFERENCES goals(goal_id) ON DELETE SET NULL,
+    related_habit_id BIGINT REFERENCES habits(habit_id) ON DELETE SET NULL,
+    log_type VARCHAR NOT NULL,
+    content TEXT NOT NULL,
+    created_at TIMESTAMPTZ DEFAULT NOW(),
+    last_updated TIMESTAMPTZ DEFAULT NOW()
+);
+
+-- All of a user's conversations
+CREATE TABLE IF NOT EXISTS conversations (
+    conversation_id BIGSERIAL PRIMARY KEY,
+    user_id BIGINT NOT NULL REFERENCES users(user_id) ON DELETE CASCADE,
+    conversation_type VARCHAR NOT NULL,
+    conversation_data JSONB,
+    state JSONB,
+    created_at TIMESTAMPTZ DEFAULT NOW()
+);
+
+CREATE INDEX IF NOT EXISTS idx_goals_user_id ON goals(user_id);
+CREATE INDEX IF NOT EXISTS idx_goals_status ON goals(status);
+CREATE INDEX IF NOT EXISTS idx_goals_target_date ON goals(target_date);
+
+CREATE INDEX IF NOT EXISTS idx_milestones_goal_id ON milestones(goal_id);
+CREATE INDEX IF NOT EXISTS idx_milestones_status ON milestones(status);
+
+CREATE INDEX IF NOT EXISTS idx_habits_user_id ON habits(user_id);
+
+CREATE INDEX IF NOT EXISTS idx_progress_logs_user_id ON progress_logs(user_id);
+CREATE INDEX IF NOT EXISTS idx_progress_logs_created_at ON progress_logs(created_at);
+CREATE INDEX IF NOT EXISTS idx_progress_logs_goal_id ON progress_logs(related_goal_id);
+CREATE INDEX IF NOT EXISTS idx_progress_logs_habit_id ON progress_logs(related_habit_id);
+
+CREATE INDEX IF NOT EXISTS idx_conversations_user_id ON conversations(user_id);
+CREATE INDEX IF NOT EXISTS idx_conversations_created_at ON conversations(created_at);
+"""
+
+# table -> trigger keeping last_updated current
+LAST_UPDATED_TRIGGERS = {
+    "user_summaries": "user_summaries_trigger",
+    "goals": "goals_trigger",
+    "milestones": "milestones_trigger",
+    "habits": "habits_trigger",
+    "progress_logs": "progress_logs_trigger",
+}
+
+
+def upgrade() -> None:
+    op.execute(TABLES)
+    for table, trigger in LAST_UPDATED_TRIGGERS.items():
+        op.execute(f"DROP TRIGGER IF EXISTS {trigger} ON {table}")
+        op.execute(
+            f"CREATE TRIGGER {trigger} BEFORE UPDATE ON {table} "
+            f"FOR EACH ROW EXECUTE FUNCTION update_last_updated()"
+        )
+
+
+def downgrade() -> None:
+    for table in ("conversations", "progress_logs", "habits", "milestones", "goals", "user_summaries", "users"):
+        op.execute(f"DROP TABLE IF EXISTS {table}")
+    op.execute("DROP FUNCTION IF EXISTS update_last_updated()")
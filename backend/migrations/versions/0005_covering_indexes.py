@@ -0,0 +1,92 @@
+"""Covering indexes for the hot journey lookups; drop redundant indexes
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-19
+
+Added:
+
+- (journey_id) INCLUDE (updated_at[, status]) on every child table. The stats view, the
+  analysis/report revision queries (count + max(updated_at) per journey) and the
+  completed goal/milestone counts become index-only scans. The load itself reads the
+  JSONB columns, which do not belong in an index (index tuples are limited to ~2.7kB),
+  so it stays an index scan on the same index.
+- the journey list (``is_deleted = FALSE ORDER BY updated_at DESC``, optionally for one
+  user_id) reads its page and its count from partial indexes in order.
+
+Dropped, because every save pays to maintain them and no query uses them: the single
+column (journey_id) indexes (the UNIQUE (journey_id, ..._id) constraints and the covering
+indexes lead with journey_id), boolean flags, and lookups by node type, edge
+endpoint, goal status/priority/deadline, milestone status/date/sort order and report
+type/date, which are only ever read within one journey.
+
+Indexes are built and dropped CONCURRENTLY, outside the migration transaction, so the
+tables stay writable while this runs.
+"""
+from alembic import op
+
+revision = "0005"
+down_revision = "0004"
+branch_labels = None
+depends_on = None
+
+# name -> definition
+COVERING_INDEXES = {
+    "idx_journeys_live_updated": "journeys (updated_at DESC) WHERE is_deleted = FALSE",
+    "idx_journeys_user_updated": "journeys (user_id, updated_at DESC) WHERE is_deleted = FALSE",
+    "idx_journey_nodes_journey_cover": "journey_nodes (journey_id) INCLUDE (updated_at)",
+    "idx_journey_edges_journey_cover": "journey_edges (journey_id) INCLUDE (updated_at)",
+    "idx_journey_goals_journey_cover": "journey_goals (journey_id) INCLUDE (status, updated_at)",
+    "idx_journey_milestones_journey_cover": "journey_milestones (journey_id) INCLUDE (status, updated_at)",
+    "idx_journey_reports_journey_cover": "journey_reports (journey_id) INCLUDE (updated_at)",
+}
+
+# name -> definition, recreated on downgrade
+REDUNDANT_INDEXES = {
+    "idx_journeys_user_id": "journeys (user_id)",
+    "idx_journeys_created_at": "journeys (created_at)",
+    "idx_journeys_updated_at": "journeys (updated_at)",
+    "idx_journeys_is_published": "journeys (is_published)",
+    "idx_journeys_is_deleted": "journeys (is_deleted)",
+    "idx_journey_nodes_journey_id": "journey_nodes (journey_id)",
+    "idx_journey_nodes_node_id": "journey_nodes (node_id)",
+    "idx_journey_nodes_type": "journey_nodes (node_type)",
+    "idx_journey_edges_journey_id": "journey_edges (journey_id)",
+    "idx_journey_edges_source": "journey_edges (source_node)",
+    "idx_journey_edges_target": "journey_edges (target_node)",
+    "idx_journey_goals_journey_id": "journey_goals (journey_id)",
+    "idx_journey_goals_status": "journey_goals (status)",
+    "idx_journey_goals_priority": "journey_goals (priority)",
+    "idx_journey_goals_deadline": "journey_goals (deadline)",
+    "idx_journey_milestones_journey_id": "journey_milestones (journey_id)",
+    "idx_journey_milestones_status": "journey_milestones (status)",
+    "idx_journey_milestones_target_date": "journey_milestones (target_date)",
+    "idx_journey_milestones_sort": "journey_milestones (journey_id, sort_order)",
+    "idx_journey_reports_journey_id": "journey_reports (journey_id)",
+    "idx_journey_reports_type": "journey_reports (report_type)",
+    "idx_journey_reports_generated_at": "journey_reports (generated_at)",
+}
+
+
+def _create(indexes) -> None:
+    for name, definition in indexes.items():
+        op.execute(f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} ON {definition}")
+
+
+def _drop(indexes) -> None:
+    for name in indexes:
+        op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {name}")
+
+
+def upgrade() -> None:
+    with op.get_context().autocommit_block():
+        _create(COVERING_INDEXES)
+        _drop(REDUNDANT_INDEXES)
+    for table in ("journeys", "journey_nodes", "journey_edges", "journey_goals", "journey_milestones", "journey_reports"):
+        op.execute(f"ANALYZE {table}")
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        _create(REDUNDANT_INDEXES)
+        _drop(COVERING_INDEXES)
@@ -0,0 +1,201 @@
+"""Partition journey nodes and edges by journey, snapshots by month
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-19
+
+- journey_nodes, journey_edges: HASH (journey_id) into 16 partitions. Every query reads or
+  writes one journey, so it touches one partition; autovacuum and index builds work on
+  partitions a sixteenth of the size. The surrogate ``id`` is kept as a column, but the
+  primary key is now (journey_id, node_id) / (journey_id, edge_id) - a partitioned
+  table's keys must contain the partition key, and these were the unique keys already.
+- journey_snapshots: RANGE (taken_at), one partition per month named
+  ``journey_snapshots_pYYYYMM``, created ahead of time by
+  ``journey_snapshots_partition(month)`` (called here and by the job workers, see
+  JourneySnapshotService.maintain_partitions). Retention detaches or drops whole months
+  instead of deleting rows. ``journey_snapshots_default`` catches rows outside every
+  month so an insert never fails; it stays empty while the workers run.
+
+The rows are copied into the new tables inside the migration transaction, which holds
+ACCESS EXCLUSIVE locks on the three tables until it commits: run it in a maintenance
+window on large databases.
+"""
+from alembic import op
+
+revision = "0006"
+down_revision = "0005"
+branch_labels = None
+depends_on = None
+
+HASH_PARTITIONS = 16
+# Months of snapshot partitions created after the current one
+SNAPSHOT_MONTHS_AHEAD = 2
+
+NODE_COLUMNS = "id, journey_id, node_id, node_type, node_subtype, position_x, position_y, data, selected, created_at, updated_at"
+EDGE_COLUMNS = ("id, journey_id, edge_id, source_node, target_node, data, selected, edge_type, animated, style, "
+                "created_at, updated_at")
+SNAPSHOT_COLUMNS = "id, journey_id, snapshot, taken_at"
+
+NODES = """
+CREATE TABLE journey_nodes (
+    id UUID NOT NULL DEFAULT gen_random_uuid(),
+    journey_id UUID NOT NULL,
+    node_id VARCHAR(255) NOT NULL, -- Frontend node ID
+    node_type VARCHAR(100) NOT NULL,
+    node_subtype VARCHAR(100) NOT NULL,
+    position_x DECIMAL(10,2) NOT NULL,
+    position_y DECIMAL(10,2) NOT NULL,
+    data JSONB DEFAULT '{}',
+    selected BOOLEAN DEFAULT FALSE,
+    created_at TIMESTAMP DEFAULT NOW(),
+    updated_at TIMESTAMP DEFAULT NOW()
+) PARTITION BY HASH (journey_id)
+"""
+
+EDGES = """
+CREATE TABLE journey_edges (
+    id UUID NOT NULL DEFAULT gen_random_uuid(),
+    journey_id UUID NOT NULL,
+    edge_id VARCHAR(255) NOT NULL, -- Frontend edge ID
+    source_node VARCHAR(255) NOT NULL,
+    target_node VARCHAR(255) NOT NULL,
+    data JSONB DEFAULT '{}',
+    selected BOOLEAN DEFAULT FALSE,
+    edge_type VARCHAR(100),
+    animated BOOLEAN DEFAULT FALSE,
+    style JSONB DEFAULT '{}',
+    created_at TIMESTAMP DEFAULT NOW(),
+    updated_at TIMESTAMP DEFAULT NOW()
+) PARTITION BY HASH (journey_id)
+"""
+
+SNAPSHOTS = """
+CREATE TABLE journey_snapshots (
+    id UUID NOT NULL DEFAULT gen_random_uuid(),
+    journey_id UUID NOT NULL,
+    snapshot JSONB NOT NULL,
+    taken_at TIMESTAMP NOT NULL DEFAULT NOW()
+) PARTITION BY RANGE (taken_at)
+"""
+
+SNAPSHOT_PARTITION_FUNCTION = """
+-- Create the journey_snapshots partition holding ``month`` (any day of it) unless it
+-- exists; returns its name
+CREATE OR REPLACE FUNCTION journey_snapshots_partition(month DATE) RETURNS TEXT AS $$
+DECLARE
+    lower_bound DATE := date_trunc('month', month)::date;
+    partition_name TEXT := 'journey_snapshots_p' || to_char(lower_bound, 'YYYYMM');
+BEGIN
+    IF to_regclass(partition_name) IS NULL THEN
+        EXECUTE format(
+            'CREATE TABLE %I PARTITION OF journey_snapshots FOR VALUES FROM (%L) TO (%L)',
+            partition_name, lower_bound, (lower_bound + INTERVAL '1 month')::date
+        );
+    END IF;
+    RETURN partition_name;
+END;
+$$ LANGUAGE plpgsql;
+"""
+
+PARTITIONED_BY_JOURNEY = (
+    ("journey_nodes", NODES, NODE_COLUMNS, "node_id"),
+    ("journey_edges", EDGES, EDGE_COLUMNS, "edge_id"),
+)
+
+# Recreated because views are bound to the tables they were created on
+STATS_VIEW = """
+CREATE VIEW journey_stats AS
+SELECT
+    j.id as journey_id,
+    j.name as journey_name,
+    (SELECT COUNT(*) FROM journey_nodes jn WHERE jn.journey_id = j.id) as total_nodes,
+    (SELECT COUNT(*) FROM journey_edges je WHERE je.journey_id = j.id) as total_edges,
+    (SELECT COUNT(*) FROM journey_goals jg WHERE jg.journey_id = j.id) as total_goals,
+    (SELECT COUNT(*) FROM journey_goals jg WHERE jg.journey_id = j.id AND jg.status = 'completed') as completed_goals,
+    (SELECT COUNT(*) FROM journey_milestones jm WHERE jm.journey_id = j.id) as total_milestones,
+    (SELECT COUNT(*) FROM journey_milestones jm WHERE jm.journey_id = j.id AND jm.status = 'completed') as completed_milestones,
+    (SELECT COUNT(*) FROM journey_reports jr WHERE jr.journey_id = j.id) as total_reports
+FROM journeys j
+WHERE j.is_deleted = FALSE
+"""
+
+
+def _updated_at_trigger(table: str) -> None:
+    op.execute(
+        f"CREATE TRIGGER update_{table}_updated_at BEFORE UPDATE ON {table} "
+        f"FOR EACH ROW EXECUTE FUNCTION update_updated_at_column()"
+    )
+
+
+def _replace(table: str, create_sql: str) -> None:
+    """Move ``table`` aside as ``<table>_old`` and create its replacement"""
+    op.execute(f"ALTER TABLE {table} RENAME TO {table}_old")
+    op.execute(create_sql)
+
+
+def _copy(table: str, columns: str, select: str = None) -> None:
+    """Copy the rows over from ``<table>_old`` and drop it"""
+    op.execute(f"INSERT INTO {table} ({columns}) SELECT {select or columns} FROM {table}_old")
+    op.execute(f"DROP TABLE {table}_old")
+
+
+def upgrade() -> None:
+    op.execute("DROP VIEW IF EXISTS journey_stats")
+
+    for table, create_sql, columns, key in PARTITIONED_BY_JOURNEY:
+        _replace(table, create_sql)
+        for remainder in range(HASH_PARTITIONS):
+            op.execute(
+                f"CREATE TABLE {table}_p{remainder:02d} PARTITION OF {table} "
+                f"FOR VALUES WITH (MODULUS {HASH_PARTITIONS}, REMAINDER {remainder})"
+            )
+        # Rows without a journey could never be read (every query filters on journey_id)
+        op.execute(f"DELETE FROM {table}_old WHERE journey_id IS NULL")
+        _copy(table, columns)
+        op.execute(f"ALTER TABLE {table} ADD PRIMARY KEY (journey_id, {key})")
+        op.execute(f"ALTER TABLE {table} ADD FOREIGN KEY (journey_id) REFERENCES journeys(id) ON DELETE CASCADE")
+        op.execute(f"CREATE INDEX idx_{table}_journey_cover ON {table} (journey_id) INCLUDE (updated_at)")
+        _updated_at_trigger(table)
+
+    _replace("journey_snapshots", SNAPSHOTS)
+    op.execute("CREATE TABLE journey_snapshots_default PARTITION OF journey_snapshots DEFAULT")
+    op.execute(SNAPSHOT_PARTITION_FUNCTION)
+    op.execute(f"""
+        SELECT journey_snapshots_partition(month::date)
+        FROM generate_series(
+            date_trunc('month', coalesce((SELECT min(taken_at) FROM journey_snapshots_old), NOW())),
+            date_trunc('month', NOW()) + INTERVAL '{SNAPSHOT_MONTHS_AHEAD} months',
+            INTERVAL '1 month'
+        ) AS month
+    """)
+    op.execute("DELETE FROM journey_snapshots_old WHERE journey_id IS NULL")
+    _copy("journey_snapshots", SNAPSHOT_COLUMNS, select="id, journey_id, snapshot, coalesce(taken_at, NOW())")
+    op.execute("ALTER TABLE journey_snapshots ADD PRIMARY KEY (id, taken_at)")
+    op.execute("ALTER TABLE journey_snapshots ADD FOREIGN KEY (journey_id) REFERENCES journeys(id) ON DELETE CASCADE")
+    op.execute("CREATE INDEX idx_journey_snapshots_journey ON journey_snapshots (journey_id, taken_at DESC)")
+
+    op.execute(STATS_VIEW)
+    for table in ("journey_nodes", "journey_edges", "journey_snapshots"):
+        op.execute(f"ANALYZE {table}")
+
+
+def downgrade() -> None:
+    op.execute("DROP VIEW IF EXISTS journey_stats")
+
+    for table, create_sql, columns, key in PARTITIONED_BY_JOURNEY:
+        _replace(table, create_sql.replace(") PARTITION BY HASH (journey_id)", ")"))
+        _copy(table, columns)  # drops the old partitions with their parent
+        op.execute(f"ALTER TABLE {table} ADD PRIMARY KEY (id)")
+        op.execute(f"ALTER TABLE {table} ADD UNIQUE (journey_id, {key})")
+        op.execute(f"ALTER TABLE {table} ADD FOREIGN KEY (journey_id) REFERENCES journeys(id) ON DELETE CASCADE")
+        op.execute(f"CREATE INDEX idx_{table}_journey_cover ON {table} (journey_id) INCLUDE (updated_at)")
+        _updated_at_trigger(table)
+
+    op.execute("DROP FUNCTION IF EXISTS journey_snapshots_partition(DATE)")
+    _replace("journey_snapshots", SNAPSHOTS.replace(") PARTITION BY RANGE (taken_at)", ")"))
+    _copy("journey_snapshots", SNAPSHOT_COLUMNS)
+    op.execute("ALTER TABLE journey_snapshots ADD PRIMARY KEY (id)")
+    op.execute("ALTER TABLE journey_snapshots ADD FOREIGN KEY (journey_id) REFERENCES journeys(id) ON DELETE CASCADE")
+    op.execute("CREATE INDEX idx_journey_snapshots_journey_id ON journey_snapshots (journey_id)")
+
+    op.execute(STATS_VIEW)
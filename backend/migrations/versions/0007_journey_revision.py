@@ -0,0 +1,29 @@
+"""Journey revision numbers for optimistic concurrency
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-19
+
+journeys.revision starts at 1 and is incremented by every save (full, canvas, goals,
+milestones) and milestone status change. A save that names the revision it was based on
+only applies while the journey is still at that revision, so two editors can no longer
+silently overwrite (or orphan-delete) each other's work. The API also uses the revision
+as the journey's ETag and as the key of the analysis cache.
+
+Adding a NOT NULL column with a constant default only updates the catalog (Postgres 11+);
+existing rows are not rewritten.
+"""
+from alembic import op
+
+revision = "0007"
+down_revision = "0006"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.execute("ALTER TABLE journeys ADD COLUMN IF NOT EXISTS revision BIGINT NOT NULL DEFAULT 1")
+
+
+def downgrade() -> None:
+    op.execute("ALTER TABLE journeys DROP COLUMN IF EXISTS revision")
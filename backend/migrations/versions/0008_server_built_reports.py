@@ -0,0 +1,29 @@
+"""Mark reports built by the report jobs
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-19
+
+Reports in journey_reports come from two places: the editor's saved state, and the
+``report`` jobs (app/services/reports). A full save deletes every report the editor
+did not send, so a report built after the editor loaded the journey was deleted by
+its next autosave. Server-built rows are now flagged; saves neither delete nor
+overwrite them.
+
+Existing server-built reports are recognized by the build metadata in their data.
+"""
+from alembic import op
+
+revision = "0008"
+down_revision = "0007"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.execute("ALTER TABLE journey_reports ADD COLUMN IF NOT EXISTS server_built BOOLEAN NOT NULL DEFAULT FALSE")
+    op.execute("UPDATE journey_reports SET server_built = TRUE WHERE data ? 'revision' AND data ? 'buildSeconds'")
+
+
+def downgrade() -> None:
+    op.execute("ALTER TABLE journey_reports DROP COLUMN IF EXISTS server_built")
@@ -0,0 +1,31 @@
+"""Mark goals and milestones whose progress the execution engine publishes
+
+Revision ID: 0009
+Revises: 0008
+Create Date: 2026-10-19
+
+Goals and milestones linked to nodes of a published plan get ``current_value`` /
+``progress`` and ``status`` from the progress aggregation (app/services/execution/
+progress_service.py). Editor saves wrote their loaded copies back over those columns
+and the next aggregation pass wrote them again, so the values flipped back and forth.
+``execution_linked`` is kept up to date by the aggregation; saves leave the published
+columns of linked rows alone.
+"""
+from alembic import op
+
+revision = "0009"
+down_revision = "0008"
+branch_labels = None
+depends_on = None
+
+TABLES = ("journey_goals", "journey_milestones")
+
+
+def upgrade() -> None:
+    for table in TABLES:
+        op.execute(f"ALTER TABLE {table} ADD COLUMN IF NOT EXISTS execution_linked BOOLEAN NOT NULL DEFAULT FALSE")
+
+
+def downgrade() -> None:
+    for table in TABLES:
+        op.execute(f"ALTER TABLE {table} DROP COLUMN IF EXISTS execution_linked")
@@ -0,0 +1,84 @@
+"""Let journey_snapshots_partition() adopt rows from the default partition
+
+Revision ID: 0010
+Revises: 0009
+Create Date: 2026-10-19
+
+When a month's partition is not created in time, its snapshots land in
+journey_snapshots_default, and creating the partition afterwards fails ("updated
+partition constraint for default partition would be violated"). The function now
+detaches the default partition, creates the month, moves the month's rows over and
+attaches the default partition again, all in the caller's transaction.
+"""
+from alembic import op
+
+revision = "0010"
+down_revision = "0009"
+branch_labels = None
+depends_on = None
+
+SNAPSHOT_PARTITION_FUNCTION = """
+-- Create the journey_snapshots partition holding ``month`` (any day of it) unless it
+-- exists, moving that month's rows out of the default partition; returns its name
+CREATE OR REPLACE FUNCTION journey_snapshots_partition(month DATE) RETURNS TEXT AS $$
+DECLARE
+    lower_bound DATE := date_trunc('month', month)::date;
+    upper_bound DATE := (date_trunc('month', month) + INTERVAL '1 month')::date;
+    partition_name TEXT := 'journey_snapshots_p' || to_char(lower_bound, 'YYYYMM');
+BEGIN
+    IF to_regclass(partition_name) IS NOT NULL THEN
+        RETURN partition_name;
+    END IF;
+
+    IF EXISTS (
+        SELECT 1 FROM journey_snapshots_default WHERE taken_at >= lower_bound AND taken_at < upper_bound
+    ) THEN
+        ALTER TABLE journey_snapshots DETACH PARTITION journey_snapshots_default;
+        EXECUTE format(
+            'CREATE TABLE %I PARTITION OF journey_snapshots FOR VALUES FROM (%L) TO (%L)',
+            partition_name, lower_bound, upper_bound
+        );
+        EXECUTE format(
+            'INSERT INTO %I (id, journey_id, snapshot, taken_at) '
+            'SELECT id, journey_id, snapshot, taken_at FROM journey_snapshots_default '
+            'WHERE taken_at >= %L AND taken_at < %L',
+            partition_name, lower_bound, upper_bound
+        );
+        DELETE FROM journey_snapshots_default WHERE taken_at >= lower_bound AND taken_at < upper_bound;
+        ALTER TABLE journey_snapshots ATTACH PARTITION journey_snapshots_default DEFAULT;
+    ELSE
+        EXECUTE format(
+            'CREATE TABLE %I PARTITION OF journey_snapshots FOR VALUES FROM (%L) TO (%L)',
+            partition_name, lower_bound, upper_bound
+        );
+    END IF;
+    RETURN partition_name;
+END;
+$$ LANGUAGE plpgsql;
+"""
+
+# As created by 0006
+PREVIOUS_SNAPSHOT_PARTITION_FUNCTION = """
+CREATE OR REPLACE FUNCTION journey_snapshots_partition(month DATE) RETURNS TEXT AS $$
+DECLARE
+    lower_bound DATE := date_trunc('month', month)::date;
+    partition_name TEXT := 'journey_snapshots_p' || to_char(lower_bound, 'YYYYMM');
+BEGIN
+    IF to_regclass(partition_name) IS NULL THEN
+        EXECUTE format(
+            'CREATE TABLE %I PARTITION OF journey_snapshots FOR VALUES FROM (%L) TO (%L)',
+            partition_name, lower_bound, (lower_bound + INTERVAL '1 month')::date
+        );
+    END IF;
+    RETURN partition_name;
+END;
+$$ LANGUAGE plpgsql;
+"""
+
+
+def upgrade() -> None:
+    op.execute(SNAPSHOT_PARTITION_FUNCTION)
+
+
+def downgrade() -> None:
+    op.execute(PREVIOUS_SNAPSHOT_PARTITION_FUNCTION)
@@ -0,0 +1,26 @@
+"""Run a job again when it is re-enqueued while running
+
+Revision ID: 0011
+Revises: 0010
+Create Date: 2026-10-19
+
+Jobs keyed per entity (the journey snapshot job is keyed by journey id) read the
+entity when they run. A save that re-enqueued such a job while it was running got the
+running job back, which may already have read the state before that save. Such an
+enqueue now sets ``jobs.rerun``, and completing the attempt queues the job once more
+instead of marking it done.
+"""
+from alembic import op
+
+revision = "0011"
+down_revision = "0010"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.execute("ALTER TABLE jobs ADD COLUMN IF NOT EXISTS rerun BOOLEAN NOT NULL DEFAULT FALSE")
+
+
+def downgrade() -> None:
+    op.execute("ALTER TABLE jobs DROP COLUMN IF EXISTS rerun")
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# Tests import the application as ``app.…``, the way main.py and worker.py do
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,57 @@
+import numpy as np
+
+from app.models.journey_models import EdgeData, NodeData
+from app.services.journey.compact_canvas import CompactCanvas
+
+NODES = [
+    {"id": "a", "type": "custom", "node-subtype": "entry", "position": {"x": 1.5, "y": -2.0},
+     "data": {"title": "Start", "nested": {"k": [1, 2]}}, "selected": True},
+    {"id": "b", "type": None, "node-subtype": "email", "position": None, "data": None, "selected": False},
+    {"id": "c", "type": "custom", "node-subtype": "end", "position": {"x": 0.0, "y": 0.0}, "data": {},
+     "selected": False},
+]
+EDGES = [
+    {"id": "a-b", "source": "a", "target": "b", "data": {"label": "yes"}, "selected": False,
+     "type": "smoothstep", "animated": True, "style": {"stroke": "red"}},
+    {"id": "b-c", "source": "b", "target": "c", "data": None, "selected": True, "type": None,
+     "animated": False, "style": None},
+    {"id": "c-x", "source": "c", "target": "missing", "data": {}, "selected": False, "type": None,
+     "animated": False, "style": {}},
+]
+
+
+def test_api_round_trip_is_lossless():
+    nodes, edges = CompactCanvas.from_api(NODES, EDGES).to_api()
+
+    assert nodes == NODES
+    assert edges == EDGES
+
+
+def test_models_round_trip():
+    models = [NodeData.model_validate(n) for n in NODES if n["data"] is not None]
+    edge_models = [EdgeData.model_validate(e) for e in EDGES if e["data"] is not None and e["style"] is not None]
+
+    nodes, edges = CompactCanvas.from_api(models, edge_models).to_api()
+
+    assert nodes == [n.model_dump(by_alias=True) for n in models]
+    assert edges == [e.model_dump() for e in edge_models]
+
+
+def test_absent_keys_take_model_defaults():
+    nodes, edges = CompactCanvas.from_api(
+        [{"id": "a", "type": "custom", "node-subtype": "entry"}], [{"id": "e", "source": "a", "target": "a"}]
+    ).to_api()
+
+    assert nodes[0]["data"] == {} and nodes[0]["position"] is None and nodes[0]["selected"] is False
+    assert edges[0]["data"] == {} and edges[0]["style"] == {} and edges[0]["animated"] is False
+
+
+def test_adjacency_skips_dangling_edges():
+    canvas = CompactCanvas.from_api(NODES, EDGES)
+
+    assert canvas.valid_edge_mask().tolist() == [True, True, False]
+    assert canvas.successors(0).tolist() == [1]
+    assert canvas.out_degree().tolist() == [1, 1, 0]
+    assert canvas.in_degree().tolist() == [0, 1, 1]
+    assert canvas.subtype_counts() == {"entry": 1, "email": 1, "end": 1}
+    assert np.array_equal(canvas.subtype_mask("email"), [False, True, False])
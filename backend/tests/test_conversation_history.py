@@ -0,0 +1,77 @@
+from contextlib import contextmanager
+
+from app.shared_services import get_conversation_history as history
+
+
+class FakeCursor:
+    def __init__(self, rows, error=None):
+        self.rows = rows
+        self.error = error
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute(self, query, params=None):
+        if self.error:
+            raise self.error
+
+    def fetchall(self):
+        return self.rows
+
+
+class FakeConnection:
+    def __init__(self, rows=(), error=None):
+        self.rows = list(rows)
+        self.error = error
+        self.calls = []
+
+    def cursor(self, cursor_factory=None):
+        return FakeCursor(self.rows, self.error)
+
+    def rollback(self):
+        self.calls.append("rollback")
+
+    def close(self):
+        self.calls.append("close")
+
+
+def use_connection(monkeypatch, conn):
+    entered = []
+
+    @contextmanager
+    def fake_connection(table_name=None):
+        entered.append(True)
+        yield conn
+
+    monkeypatch.setattr(history, "get_postgres_connection", fake_connection)
+    return entered
+
+
+def test_history_is_read_through_the_pooled_connection(monkeypatch):
+    conn = FakeConnection([
+        {"conversation_history": [{"role": "user", "content": "hi", "timestamp": "2026-10-19T10:00:00"}]},
+        {"conversation_history": [{"role": "assistant", "content": "hello", "timestamp": "2026-10-19T10:00:05"}]},
+        {"conversation_history": None},
+    ])
+    entered = use_connection(monkeypatch, conn)
+
+    result = history.get_conversation_history(1, session_id="s")
+
+    assert entered == [True]
+    assert result["status"] == "success"
+    assert [m["content"] for m in result["conversations"]] == ["hello", "hi"]
+    # The connection goes back to the pool: the read transaction is ended, never closed
+    assert conn.calls == ["rollback"]
+
+
+def test_errors_still_release_the_connection(monkeypatch):
+    conn = FakeConnection(error=RuntimeError("relation does not exist"))
+    use_connection(monkeypatch, conn)
+
+    result = history.get_goals(1, session_id="s")
+
+    assert result["status"] == "error"
+    assert conn.calls == ["rollback"]
@@ -0,0 +1,152 @@
+import gzip
+import io
+import json
+
+import pytest
+
+from app.services.execution import entry_sources
+from app.services.execution.entry_sources import (
+    EntrySchema, FieldDefinition, IngestionError, RecordRejected, detect_format, open_stream, read_records,
+)
+
+
+def records(data: bytes, fmt: str, gzipped: bool = False):
+    stream, counter = open_stream(io.BytesIO(data), gzipped)
+    columns, rows = read_records(stream, fmt)
+    return columns, list(rows), counter
+
+
+def test_detect_format():
+    assert detect_format("people.csv.gz") == ("csv", True)
+    assert detect_format("people.ndjson") == ("json", False)
+    assert detect_format("upload.bin", "jsonl") == ("json", False)
+    with pytest.raises(IngestionError):
+        detect_format("people.xlsx")
+    with pytest.raises(IngestionError):
+        detect_format("people.csv", "xml")
+
+
+def test_string_bounds_are_coerced():
+    field = FieldDefinition({"name": "age", "type": "integer", "min": "18", "max": 65})
+
+    assert field.validate("30") == 30
+    with pytest.raises(RecordRejected, match="below minimum 18"):
+        field.validate("17")
+    with pytest.raises(RecordRejected, match="above maximum 65"):
+        field.validate(70)
+
+
+@pytest.mark.parametrize("bound", ["eighteen", [18], True, "nan"])
+def test_invalid_bound_fails_the_import(bound):
+    with pytest.raises(IngestionError, match="invalid min"):
+        FieldDefinition({"name": "age", "type": "number", "min": bound})
+
+
+def test_bounds_ignored_for_non_numeric_types():
+    assert FieldDefinition({"name": "plan", "type": "string", "min": "x"}).minimum is None
+
+
+def test_csv_records_and_bad_rows():
+    columns, rows, counter = records(b"\xef\xbb\xbfemail,age\r\na@x.io,30\r\nb@x.io\r\n\r\nc@x.io,\r\n", "csv")
+
+    assert columns == ["email", "age"]
+    assert rows == [
+        (2, {"email": "a@x.io", "age": "30"}, None),
+        (3, None, "Expected 2 fields, found 1"),
+        (5, {"email": "c@x.io"}, None),
+    ]
+    assert counter.bytes_read > 0
+
+
+@pytest.mark.parametrize("data, message", [
+    (b"", "File is empty"),
+    (b"email,,age\n", "empty column name"),
+    (b"email,age,email\n", "Duplicate columns in header: email"),
+])
+def test_header_errors(data, message):
+    with pytest.raises(IngestionError, match=message):
+        records(data, "csv")
+
+
+def test_gzip_input():
+    data = gzip.compress(b"id\tplan\n1\tgold\n2\tsilver\n")
+
+    columns, rows, _ = records(data, "tsv", gzipped=True)
+
+    assert columns == ["id", "plan"]
+    assert [row[1] for row in rows] == [{"id": "1", "plan": "gold"}, {"id": "2", "plan": "silver"}]
+
+
+def test_json_array_split_across_reads(monkeypatch):
+    monkeypatch.setattr(entry_sources, "INGEST_READ_SIZE", 7)
+    elements = [{"id": i, "name": "x" * (i * 5), "score": 12345.678} for i in range(1, 6)] + [3, {"nested": [1, {"a": "]"}]}]
+    data = json.dumps(elements, indent=1).encode()
+
+    _, rows, _ = records(data, "json")
+
+    assert [row[1] for row in rows] == elements[:5] + [None, elements[6]]
+    assert rows[5] == (6, None, "Record is not a JSON object")
+    assert [row[0] for row in rows] == list(range(1, 8))
+
+
+def test_json_array_numbers_at_read_boundary(monkeypatch):
+    monkeypatch.setattr(entry_sources, "INGEST_READ_SIZE", 4)
+    # Split so a number's digits straddle reads
+    _, rows, _ = records(b'[{"a":123456789},{"a":1.5e10}]', "json")
+
+    assert [row[1] for row in rows] == [{"a": 123456789}, {"a": 1.5e10}]
+
+
+@pytest.mark.parametrize("data, message", [
+    (b"[", "Unexpected end of file"),
+    (b'[{"a": 1} {"a": 2}]', "Expected ',' or ']'"),
+    (b'[{"a": tru}]', "Invalid JSON in record 1"),
+])
+def test_json_array_errors_abort(data, message):
+    with pytest.raises(IngestionError, match=message):
+        records(data, "json")
+
+
+def test_json_array_oversized_record(monkeypatch):
+    monkeypatch.setattr(entry_sources, "INGEST_READ_SIZE", 8)
+    monkeypatch.setattr(entry_sources, "INGEST_MAX_RECORD_BYTES", 32)
+
+    with pytest.raises(IngestionError, match="Record 2 exceeds 32 bytes"):
+        records(json.dumps([{"a": 1}, {"a": "y" * 100}]).encode(), "json")
+
+
+def test_ndjson_rejects_per_line(monkeypatch):
+    monkeypatch.setattr(entry_sources, "INGEST_MAX_RECORD_BYTES", 40)
+    lines = [
+        json.dumps({"id": 1}),
+        json.dumps({"id": 2, "blob": "z" * 200}),
+        "not json",
+        "",
+        "[1, 2]",
+        json.dumps({"id": 3}),
+    ]
+
+    _, rows, _ = records(("\n".join(lines) + "\n").encode(), "json")
+
+    assert rows[0] == (1, {"id": 1}, None)
+    assert rows[1] == (2, None, "Record exceeds 40 bytes")
+    assert rows[2][0] == 3 and rows[2][2].startswith("Invalid JSON")
+    assert rows[3] == (5, None, "Record is not a JSON object")
+    assert rows[4] == (6, {"id": 3}, None)
+
+
+def test_schema_key_and_definitions():
+    schema = EntrySchema({
+        "audience": "email",
+        "dataDefinitions": [{"name": "age", "type": "integer", "required": True}, {"name": "vip", "type": "boolean"}],
+    })
+
+    assert schema.validate({"email": " A@X.io ", "age": "41", "vip": "yes"}) == (
+        "a@x.io", {"email": " A@X.io ", "age": 41, "vip": True}
+    )
+    with pytest.raises(RecordRejected, match="invalid email"):
+        schema.validate({"email": "nope", "age": 1})
+    with pytest.raises(RecordRejected, match="age: required"):
+        schema.validate({"email": "a@x.io"})
+    with pytest.raises(IngestionError, match="Key column 'email'"):
+        schema.check_columns(["phone", "age"])
@@ -0,0 +1,104 @@
+from app.services.execution import plan as plan_module
+from app.services.execution.plan import (
+    DECISION, ENTRY, EXIT, MERGE, MESSAGE, PASS, WAIT, compile_plan,
+)
+from app.services.journey.compact_canvas import CompactCanvas
+
+
+def node(node_id, subtype, **data):
+    return {"id": node_id, "type": "custom", "node-subtype": subtype, "position": {"x": 0, "y": 0}, "data": data}
+
+
+def edge(source, target, label=None):
+    return {"id": f"{source}-{target}", "source": source, "target": target, "data": {"label": label} if label else {}}
+
+
+# A canvas as the frontend saves it (subtypes from frontend/src/config/nodeTypes.ts)
+FRONTEND_CANVAS = (
+    [
+        node("entry", "entry", title="Jambo"),
+        node("welcome", "email", title="Welcome email"),
+        node("wait", "wait", waitType="fixed", waitDays=1),
+        node("check", "decision-point", condition="age >= 18"),
+        node("reminder", "sms", title="Reminder"),
+        node("notify", "webhook", title="Notify CRM"),
+        node("copy", "ai-copy"),
+        node("merge", "merge"),
+        node("end", "end"),
+    ],
+    [
+        edge("entry", "welcome"),
+        edge("welcome", "wait"),
+        edge("wait", "check"),
+        edge("check", "reminder", "yes"),
+        edge("check", "notify", "no"),
+        edge("reminder", "copy"),
+        edge("copy", "merge"),
+        edge("notify", "merge"),
+        edge("merge", "end"),
+    ],
+)
+
+
+def compile_frontend_canvas():
+    return compile_plan("journey", CompactCanvas.from_api(*FRONTEND_CANVAS))
+
+
+def kind_of(plan, node_id):
+    return plan.kinds[plan.node_ids.index(node_id)]
+
+
+def test_frontend_subtypes_compile_to_their_kinds():
+    plan = compile_frontend_canvas()
+
+    assert kind_of(plan, "entry") == ENTRY
+    assert kind_of(plan, "welcome") == MESSAGE
+    assert kind_of(plan, "reminder") == MESSAGE
+    assert kind_of(plan, "notify") == MESSAGE
+    assert kind_of(plan, "wait") == WAIT
+    assert kind_of(plan, "check") == DECISION
+    assert kind_of(plan, "copy") == PASS
+    assert kind_of(plan, "merge") == MERGE
+    assert kind_of(plan, "end") == EXIT
+
+
+def test_message_nodes_keep_their_title_and_channel():
+    plan = compile_frontend_canvas()
+
+    assert plan.node_data[plan.node_ids.index("welcome")] == {"title": "Welcome email", "channel": "email"}
+    assert plan.node_data[plan.node_ids.index("reminder")] == {"title": "Reminder", "channel": "sms"}
+
+
+def test_decision_routes_yes_branch_by_condition():
+    plan = compile_frontend_canvas()
+    check = plan.node_ids.index("check")
+
+    labels = [branch.label for branch in plan.branches[check]]
+    assert labels == ["yes", "no"]
+    assert plan.branches[check][0].rule == "age >= 18"
+    assert plan.branches[check][plan.fallback_branch[check]].label == "no"
+
+
+def test_unknown_subtype_passes_through_with_a_warning(monkeypatch):
+    warnings = []
+    monkeypatch.setattr(plan_module.logger, "warning", warnings.append)
+    nodes, edges = FRONTEND_CANVAS
+    nodes = [node("mystery", "teleport") if n["id"] == "copy" else n for n in nodes]
+    edges = [
+        edge(e["source"].replace("copy", "mystery"), e["target"].replace("copy", "mystery"), e["data"].get("label"))
+        for e in edges
+    ]
+
+    plan = compile_plan("journey", CompactCanvas.from_api(nodes, edges))
+
+    assert kind_of(plan, "mystery") == PASS
+    assert len(warnings) == 1 and "teleport" in warnings[0]
+
+
+def test_known_pass_through_subtypes_do_not_warn(monkeypatch):
+    warnings = []
+    monkeypatch.setattr(plan_module.logger, "warning", warnings.append)
+
+    compile_frontend_canvas()
+
+    assert warnings == []
@@ -0,0 +1,121 @@
+from app.services.journey.compact_canvas import CompactCanvas
+from app.services.journey.graph_analysis import analyze_canvas, strongly_connected_components
+
+
+def node(node_id, subtype):
+    return {"id": node_id, "type": "custom", "node-subtype": subtype, "position": {"x": 0, "y": 0}, "data": {}}
+
+
+def edge(source, target):
+    return {"id": f"{source}-{target}", "source": source, "target": target, "data": {}}
+
+
+def analyze(nodes, edges):
+    return analyze_canvas(CompactCanvas.from_api(
+        [node(node_id, subtype) for node_id, subtype in nodes], [edge(s, t) for s, t in edges]
+    ))
+
+
+def test_linear_journey_is_valid():
+    report = analyze(
+        [("end", "end"), ("email", "send-email"), ("start", "entry")],
+        [("start", "email"), ("email", "end")],
+    )
+
+    assert report["valid"] and report["isAcyclic"]
+    assert report["entryNodes"] == ["start"]
+    assert report["topologicalOrder"] == ["start", "email", "end"]
+    assert report["longestPath"] == {"length": 2, "nodes": ["start", "email", "end"]}
+
+
+def test_unreachable_nodes():
+    report = analyze(
+        [("start", "entry"), ("a", "wait"), ("island", "wait"), ("island-end", "end")],
+        [("start", "a"), ("island", "island-end")],
+    )
+
+    assert report["unreachableNodes"] == ["island", "island-end"]
+    assert not report["valid"]
+
+
+def test_no_entry_is_invalid():
+    report = analyze([("a", "wait")], [])
+
+    assert report["entryNodes"] == [] and report["unreachableNodes"] == ["a"]
+    assert not report["valid"]
+
+
+def test_dangling_edges():
+    report = analyze(
+        [("start", "entry"), ("end", "end")],
+        [("start", "end"), ("start", "ghost"), ("phantom", "end")],
+    )
+
+    assert report["danglingEdges"] == [
+        {"id": "start-ghost", "source": "start", "target": "ghost", "missingSource": False, "missingTarget": True},
+        {"id": "phantom-end", "source": "phantom", "target": "end", "missingSource": True, "missingTarget": False},
+    ]
+    assert report["unreachableNodes"] == []
+    assert not report["valid"]
+
+
+def test_cycle_through_loop_node_is_legal():
+    report = analyze(
+        [("start", "entry"), ("loop", "loop"), ("email", "send-email"), ("end", "end")],
+        [("start", "loop"), ("loop", "email"), ("email", "loop"), ("loop", "end")],
+    )
+
+    assert report["loopCycles"] == 1 and report["illegalCycles"] == []
+    assert not report["isAcyclic"]
+    assert report["valid"]
+    # The cycle counts as one step, represented by its Loop node
+    assert report["longestPath"] == {"length": 2, "nodes": ["start", "loop", "end"]}
+
+
+def test_cycle_without_loop_node_is_illegal():
+    report = analyze(
+        [("start", "entry"), ("a", "wait"), ("b", "send-email"), ("self", "wait")],
+        [("start", "a"), ("a", "b"), ("b", "a"), ("start", "self"), ("self", "self")],
+    )
+
+    assert report["loopCycles"] == 0
+    assert sorted(sorted(cycle) for cycle in report["illegalCycles"]) == [["a", "b"], ["self"]]
+    assert not report["valid"]
+
+
+def test_topological_order_respects_every_edge():
+    nodes = [("start", "entry"), ("a", "wait"), ("b", "wait"), ("c", "wait"), ("end", "end")]
+    edges = [("start", "b"), ("start", "a"), ("a", "c"), ("b", "c"), ("c", "end"), ("a", "end")]
+
+    order = analyze(nodes, edges)["topologicalOrder"]
+
+    assert sorted(order) == sorted(node_id for node_id, _ in nodes)
+    position = {node_id: i for i, node_id in enumerate(order)}
+    assert all(position[s] < position[t] for s, t in edges)
+
+
+def test_longest_path_takes_the_deeper_branch():
+    report = analyze(
+        [("start", "entry"), ("short", "wait"), ("x", "wait"), ("y", "wait"), ("end", "end")],
+        [("start", "short"), ("short", "end"), ("start", "x"), ("x", "y"), ("y", "end")],
+    )
+
+    assert report["longestPath"] == {"length": 3, "nodes": ["start", "x", "y", "end"]}
+
+
+def test_strongly_connected_components_sinks_first():
+    # 0 -> {1, 2}, 1 <-> 2, 2 -> 3
+    offsets = [0, 2, 3, 5, 5]
+    targets = [1, 2, 2, 1, 3]
+
+    component, components = strongly_connected_components(4, offsets, targets)
+
+    assert [sorted(members) for members in components] == [[3], [1, 2], [0]]
+    assert component == [2, 1, 1, 0]
+
+
+def test_empty_canvas():
+    report = analyze([], [])
+
+    assert report["topologicalOrder"] == [] and report["longestPath"] == {"length": 0, "nodes": []}
+    assert not report["valid"]
@@ -0,0 +1,81 @@
+import os
+import uuid
+
+import pytest
+
+from app.services.jobs.queue import JobQueueService, JobType, enqueue, retry_delay
+
+needs_database = pytest.mark.skipif(
+    not (os.getenv("CP_DATABASE_URL") or os.getenv("DATABASE_URL")),
+    reason="needs a migrated database (DATABASE_URL)"
+)
+
+
+def test_retry_delay_grows_and_is_capped():
+    assert 5 <= retry_delay(1) <= 10
+    assert 20 <= retry_delay(3) <= 40
+    assert retry_delay(50) <= 3600
+
+
+@pytest.fixture
+def job_type():
+    """A job type of its own, so other queued jobs are never claimed"""
+    name = f"test_{uuid.uuid4().hex[:12]}"
+    yield name
+    from app.services.journey.utils import get_connection
+    with get_connection("jobs") as conn:
+        with conn.cursor() as cursor:
+            cursor.execute("DELETE FROM jobs WHERE job_type = %s", (name,))
+        conn.commit()
+
+
+def enqueue_committed(job_type, key, **options):
+    from app.services.journey.utils import get_connection
+    with get_connection("jobs") as conn:
+        with conn.cursor() as cursor:
+            job_id, status = enqueue(cursor, job_type, {"key": key}, idempotency_key=key, **options)
+        conn.commit()
+    return job_id, status
+
+
+def claim(job_type):
+    from app.services.journey.utils import get_connection
+    with get_connection("jobs") as conn:
+        return JobQueueService().claim(conn, {job_type: JobType(handler=lambda payload: None)}, "test-worker")
+
+
+def complete(job):
+    from app.services.journey.utils import get_connection
+    with get_connection("jobs") as conn:
+        return JobQueueService().complete(conn, job, {"ok": True})
+
+
+@needs_database
+def test_enqueue_while_running_reruns_after_completion(job_type):
+    job_id, status = enqueue_committed(job_type, "j1", retry_finished=True, rerun_running=True)
+    assert status == "queued"
+    job = claim(job_type)
+    assert job["id"] == job_id
+
+    # A second enqueue while queued shares the job; while running it asks for a rerun
+    again_id, status = enqueue_committed(job_type, "j1", retry_finished=True, rerun_running=True)
+    assert (again_id, status) == (job_id, "running")
+
+    assert complete(job)
+    rerun = claim(job_type)
+    assert rerun["id"] == job_id
+    assert rerun["rerun"] is False and rerun["attempts"] == 1
+
+    assert complete(rerun)
+    assert claim(job_type) is None
+    assert enqueue_committed(job_type, "j1", retry_finished=True, rerun_running=True) == (job_id, "queued")
+
+
+@needs_database
+def test_enqueue_while_running_without_rerun_shares_the_attempt(job_type):
+    job_id, _ = enqueue_committed(job_type, "j1", retry_finished=True)
+    job = claim(job_type)
+
+    assert enqueue_committed(job_type, "j1", retry_finished=True) == (job_id, "running")
+    assert complete(job)
+    assert claim(job_type) is None
@@ -0,0 +1,143 @@
+import os
+
+import pytest
+from fastapi import HTTPException
+from starlette.requests import Request
+
+from app.routers.journey_router import if_match_revision, journey_etag
+
+needs_database = pytest.mark.skipif(
+    not (os.getenv("CP_DATABASE_URL") or os.getenv("DATABASE_URL")),
+    reason="needs a migrated database (DATABASE_URL)"
+)
+
+
+def request_with(headers):
+    return Request({"type": "http", "headers": [(k.lower().encode(), v.encode()) for k, v in headers.items()]})
+
+
+def test_if_match_parsing():
+    assert if_match_revision(request_with({})) is None
+    assert if_match_revision(request_with({"If-Match": "*"})) is None
+    assert if_match_revision(request_with({"If-Match": journey_etag(7)})) == 7
+    assert if_match_revision(request_with({"If-Match": '"journey-8"'})) == 8
+    with pytest.raises(HTTPException) as error:
+        if_match_revision(request_with({"If-Match": '"analysis-3"'}))
+    assert error.value.status_code == 400
+
+
+@pytest.fixture(scope="module")
+def client():
+    from fastapi.testclient import TestClient
+    import main
+    return TestClient(main.app)
+
+
+@pytest.fixture
+def journey(client):
+    response = client.post("/api/journeys/", json={"name": "Revisions", "description": "test"})
+    assert response.status_code == 200
+    journey_id = response.json()["journey"]["id"]
+    state = client.get(f"/api/journeys/{journey_id}").json()["journey"]
+    state["nodes"] = [
+        {"id": "entry", "type": "custom", "node-subtype": "entry", "position": {"x": 0, "y": 0}, "data": {}},
+        {"id": "end", "type": "custom", "node-subtype": "end", "position": {"x": 100, "y": 0}, "data": {}},
+    ]
+    state["edges"] = [{"id": "entry-end", "source": "entry", "target": "end", "data": {}}]
+    assert client.post(f"/api/journeys/{journey_id}/save", json={"journey": state}).status_code == 200
+    yield journey_id
+    client.delete(f"/api/journeys/{journey_id}", params={"hard_delete": True})
+
+
+def load(client, journey_id):
+    response = client.get(f"/api/journeys/{journey_id}")
+    assert response.status_code == 200
+    state = response.json()["journey"]
+    assert response.headers["etag"] == journey_etag(state["revision"])
+    return state
+
+
+@needs_database
+def test_save_bumps_revision_and_returns_etag(client, journey):
+    state = load(client, journey)
+
+    response = client.post(f"/api/journeys/{journey}/save", json={"journey": state})
+
+    assert response.status_code == 200
+    assert response.json()["journey"]["revision"] == state["revision"] + 1
+    assert response.headers["etag"] == journey_etag(state["revision"] + 1)
+
+
+@needs_database
+def test_stale_if_match_conflicts_with_current_etag(client, journey):
+    state = load(client, journey)
+    assert client.post(f"/api/journeys/{journey}/save", json={"journey": state}).status_code == 200
+
+    response = client.post(
+        f"/api/journeys/{journey}/save",
+        json={"journey": {**state, "revision": None}},
+        headers={"If-Match": journey_etag(state["revision"])}
+    )
+
+    assert response.status_code == 409
+    assert response.headers["etag"] == journey_etag(state["revision"] + 1)
+    assert response.json()["detail"]["revision"] == state["revision"] + 1
+    assert load(client, journey)["revision"] == state["revision"] + 1
+
+
+@needs_database
+def test_stale_body_revision_conflicts_and_keeps_rows(client, journey):
+    state = load(client, journey)
+    assert client.post(f"/api/journeys/{journey}/save", json={"journey": state}).status_code == 200
+
+    response = client.post(f"/api/journeys/{journey}/save", json={"journey": {**state, "nodes": [], "edges": []}})
+
+    assert response.status_code == 409
+    assert len(load(client, journey)["nodes"]) == 2
+
+
+@needs_database
+def test_partial_save_bumps_revision(client, journey):
+    state = load(client, journey)
+
+    response = client.post(
+        f"/api/journeys/{journey}/canvas",
+        json={"nodes": state["nodes"], "edges": state["edges"]},
+        headers={"If-Match": journey_etag(state["revision"])}
+    )
+
+    assert response.status_code == 200
+    assert response.json()["data"]["revision"] == state["revision"] + 1
+    assert response.headers["etag"] == journey_etag(state["revision"] + 1)
+    assert load(client, journey)["revision"] == state["revision"] + 1
+
+    stale = client.post(f"/api/journeys/{journey}/goals", json={"goals": [], "revision": state["revision"]})
+    assert stale.status_code == 409
+
+
+@needs_database
+def test_save_without_revision_is_unconditional(client, journey):
+    state = {**load(client, journey), "revision": None}
+
+    first = client.post(f"/api/journeys/{journey}/save", json={"journey": state})
+    second = client.post(f"/api/journeys/{journey}/save", json={"journey": state})
+
+    assert first.status_code == second.status_code == 200
+    assert second.json()["journey"]["revision"] == first.json()["journey"]["revision"] + 1
+
+
+@needs_database
+def test_metadata_update_without_if_match_is_unconditional(client, journey):
+    state = load(client, journey)
+    assert client.post(f"/api/journeys/{journey}/save", json={"journey": state}).status_code == 200
+
+    response = client.put(f"/api/journeys/{journey}", json={"name": "Renamed"})
+
+    assert response.status_code == 200
+    assert response.json()["journey"]["name"] == "Renamed"
+    assert response.headers["etag"] == journey_etag(state["revision"] + 2)
+
+    stale = client.put(
+        f"/api/journeys/{journey}", json={"name": "Stale"}, headers={"If-Match": journey_etag(state["revision"])}
+    )
+    assert stale.status_code == 409
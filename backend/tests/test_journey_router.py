@@ -0,0 +1,14 @@
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+
+client = TestClient(main.app)
+
+
+@pytest.mark.parametrize("path", ["/api/journeys/not-a-uuid", "/api/journeys/not-a-uuid/canvas"])
+@pytest.mark.parametrize("stream", [False, True])
+def test_malformed_journey_id_is_not_found(path, stream):
+    response = client.get(path, params={"stream": stream})
+
+    assert response.status_code == 404
@@ -0,0 +1,90 @@
+from datetime import datetime, timezone
+
+import pytest
+
+from app.services.journey.milestone_graph import MilestoneCycleError, MilestoneGraph
+
+
+def milestone(milestone_id, *dependencies, status="pending", target=None):
+    return {"id": milestone_id, "status": status, "targetDate": target, "dependencies": list(dependencies)}
+
+
+def day(n):
+    return datetime(2026, 11, n, tzinfo=timezone.utc)
+
+
+def test_cycle_is_rejected():
+    with pytest.raises(MilestoneCycleError) as error:
+        MilestoneGraph([milestone("a", "c"), milestone("b", "a"), milestone("c", "b"), milestone("d")])
+
+    cycle = error.value.cycle
+    assert cycle[0] == cycle[-1]
+    assert set(cycle) == {"a", "b", "c"}
+
+
+def test_cycle_dropped_when_allowed():
+    graph = MilestoneGraph([milestone("a", "b"), milestone("b", "a")], allow_cycles=True)
+
+    assert sorted(graph.topological_order()) == ["a", "b"]
+    assert len(graph.ready()) == 1
+
+
+def test_missing_dependencies_are_ignored():
+    graph = MilestoneGraph([milestone("a", "ghost")])
+
+    assert graph.missing == {"a": ["ghost"]}
+    assert graph.ready() == ["a"]
+
+
+def test_set_status_unblocks_and_blocks_dependents():
+    graph = MilestoneGraph([milestone("a"), milestone("b"), milestone("c", "a", "b"), milestone("d", "a")])
+    assert graph.ready() == ["a", "b"]
+
+    change = graph.set_status("a", "completed")
+    assert change.unblocked == ["d"]
+    assert change.blocked == []
+    assert graph.blocked_by("c") == ["b"]
+
+    change = graph.set_status("b", "completed")
+    assert change.unblocked == ["c"]
+    assert sorted(graph.ready()) == ["c", "d"]
+
+    # Reopening a dependency puts its ready dependents back to waiting
+    change = graph.set_status("a", "in-progress")
+    assert sorted(change.blocked) == ["c", "d"]
+    assert change.unblocked == []
+    assert graph.ready() == ["a"]
+
+    # A change that stays on the same side of satisfied touches nothing
+    assert graph.set_status("a", "overdue") == ([], [])
+
+
+def test_set_target_date_propagates_estimates():
+    graph = MilestoneGraph([
+        milestone("a", target=day(5)),
+        milestone("b", "a", target=day(3)),
+        milestone("c", "b", target=day(10)),
+    ])
+    assert graph.earliest_completion("b") == day(5)
+    assert graph.earliest_completion("c") == day(10)
+    assert graph.critical_path() == ["c"]
+
+    graph.set_target_date("a", day(20))
+    assert graph.earliest_completion("b") == day(20)
+    assert graph.earliest_completion("c") == day(20)
+    assert graph.critical_path() == ["a", "b", "c"]
+
+    graph.set_target_date("a", None)
+    assert graph.earliest_completion("b") == day(3)
+    assert graph.earliest_completion() == day(10)
+
+
+def test_completed_dependency_stops_holding_back_estimate():
+    graph = MilestoneGraph([milestone("a", target=day(20)), milestone("b", "a", target=day(3))])
+    assert graph.earliest_completion("b") == day(20)
+
+    graph.set_status("a", "completed")
+
+    assert graph.earliest_completion("b") == day(3)
+    assert graph.critical_path() == ["b"]
+    assert graph.earliest_completion("b", now=day(7)) == day(7)
@@ -0,0 +1,25 @@
+import main
+
+
+def refs(schema):
+    if isinstance(schema, dict):
+        if "$ref" in schema:
+            yield schema["$ref"]
+        for value in schema.values():
+            yield from refs(value)
+    elif isinstance(schema, list):
+        for value in schema:
+            yield from refs(value)
+
+
+def test_save_request_body_is_documented():
+    openapi = main.app.openapi()
+    body = openapi["paths"]["/api/journeys/{journey_id}/save"]["post"]["requestBody"]
+    schema = body["content"]["application/json"]["schema"]
+
+    assert body["required"]
+    assert schema["required"] == ["journey"]
+    assert schema["properties"]["journey"] == {"$ref": "#/components/schemas/CompleteJourneyState"}
+    components = openapi["components"]["schemas"]
+    for ref in refs(openapi):
+        assert ref.removeprefix("#/components/schemas/") in components, ref
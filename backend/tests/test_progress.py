@@ -0,0 +1,114 @@
+from datetime import datetime, timezone
+
+from app.services.execution.plan import compile_plan
+from app.services.execution.progress import (
+    GoalProgress, goal_progress, goal_rollups, link_targets, milestone_progress,
+)
+from app.services.journey.compact_canvas import CompactCanvas
+
+NOW = datetime(2026, 10, 19, 12, tzinfo=timezone.utc)
+
+
+def node(node_id, subtype, **data):
+    return {"id": node_id, "type": "custom", "node-subtype": subtype, "position": {"x": 0, "y": 0}, "data": data}
+
+
+def edge(source, target):
+    return {"id": f"{source}-{target}", "source": source, "target": target, "data": {}}
+
+
+def milestone(progress=0, status="pending", target_date=None, dependencies=()):
+    return {"progress": progress, "status": status, "target_date": target_date, "dependencies": list(dependencies)}
+
+
+def test_link_targets_by_id_then_title():
+    nodes = [
+        node("entry", "entry"),
+        node("by-id", "goal", goalId="g1", title="Ignored"),
+        node("by-title", "goal", title="  signed UP "),
+        node("stone", "milestone", title="Onboarded"),
+        node("nothing", "milestone", title="Unknown"),
+        node("end", "end"),
+    ]
+    ids = [n["id"] for n in nodes]
+    plan = compile_plan("journey", CompactCanvas.from_api(nodes, [edge(a, b) for a, b in zip(ids, ids[1:])]))
+
+    links = link_targets(plan, [("g1", "First"), ("g2", "Signed up")], [("m1", "onboarded")])
+
+    assert links == {"by-id": ("goal", "g1"), "by-title": ("goal", "g2"), "stone": ("milestone", "m1")}
+
+
+def test_goal_progress_counts_or_percent():
+    assert goal_progress(10, "customers", "not-started", 4, 20) == GoalProgress(4.0, "in-progress")
+    assert goal_progress(50, "%", "active", 1, 3) == GoalProgress(33.33, "in-progress")
+    assert goal_progress(10, "Percent", "in-progress", 2, 20) == GoalProgress(10.0, "completed")
+    assert goal_progress(10, "users", "in-progress", 0, 0) == GoalProgress(0.0, "not-started")
+    assert goal_progress(10, "users", "active", 0, 0) == GoalProgress(0.0, "active")
+    # Statuses set by people are kept
+    assert goal_progress(1, "users", "cancelled", 5, 5) == GoalProgress(5.0, "cancelled")
+
+
+def test_goal_rollups_only_cover_linked_goals():
+    goals = [
+        {"goal_id": "g1", "target_value": 2, "unit": "users", "status": "not-started"},
+        {"goal_id": "g2", "target_value": None, "unit": "users", "status": "not-started"},
+    ]
+
+    assert goal_rollups(goals, {"g1"}, {"g1": 3, "g2": 9}, 10) == {"g1": GoalProgress(3.0, "completed")}
+
+
+def test_milestone_capped_by_dependencies():
+    milestones = {
+        "m1": milestone(),
+        "m2": milestone(dependencies=["m1"]),
+        "m3": milestone(progress=40, dependencies=["m2"]),
+    }
+
+    result = milestone_progress(milestones, {"m1", "m2"}, {"m1": 5, "m2": 8}, 10, NOW)
+
+    assert set(result) == {"m1", "m2"}
+    assert result["m1"].own == result["m1"].progress == 50
+    assert result["m1"].status == "in-progress" and result["m1"].blocked_by == ()
+    assert result["m2"].own == 80 and result["m2"].progress == 50
+    assert result["m2"].blocked_by == ("m1",)
+
+
+def test_unlinked_dependency_counts_with_saved_progress():
+    milestones = {
+        "manual": milestone(progress=30),
+        "done": milestone(progress=0, status="completed"),
+        "m": milestone(dependencies=["manual", "done"]),
+    }
+
+    result = milestone_progress(milestones, {"m"}, {"m": 10}, 10, NOW)
+
+    assert result["m"].own == 100
+    assert result["m"].progress == 30
+    assert result["m"].status == "in-progress"
+    assert result["m"].blocked_by == ("manual",)
+
+
+def test_milestone_statuses():
+    past = datetime(2026, 1, 1)  # naive values are UTC
+    milestones = {
+        "complete": milestone(),
+        "overdue": milestone(target_date=past),
+        "pending": milestone(status="in-progress"),
+        "manual": milestone(status="cancelled", target_date=past),
+    }
+
+    result = milestone_progress(milestones, set(milestones), {"complete": 4}, 4, NOW)
+
+    assert {milestone_id: p.status for milestone_id, p in result.items()} == {
+        "complete": "completed", "overdue": "overdue", "pending": "pending", "manual": "cancelled",
+    }
+    assert result["complete"].progress == 100
+
+
+def test_dependency_cycle_is_ignored_and_unknown_links_skipped():
+    milestones = {"a": milestone(dependencies=["b"]), "b": milestone(dependencies=["a"])}
+
+    result = milestone_progress(milestones, {"a", "b", "ghost"}, {"a": 10, "b": 10}, 10, NOW)
+
+    assert set(result) == {"a", "b"}
+    assert result["a"].progress == result["b"].progress == 100
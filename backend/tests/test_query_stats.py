@@ -0,0 +1,62 @@
+import pytest
+
+from app.shared_services import query_stats as query_stats_module
+from app.shared_services.query_stats import QueryStats, explain_options, normalize
+
+ANALYZE = "ANALYZE, BUFFERS, FORMAT JSON"
+PLAIN = "FORMAT JSON"
+
+
+@pytest.fixture
+def analyze_enabled(monkeypatch):
+    monkeypatch.setattr(query_stats_module, "SLOW_QUERY_EXPLAIN_ANALYZE", True)
+
+
+def options(sql):
+    return explain_options(normalize(sql))
+
+
+def test_plain_explain_by_default():
+    assert options("SELECT name FROM journeys WHERE id = %s") == PLAIN
+
+
+def test_statements_that_cannot_be_explained():
+    assert options("BEGIN") is None
+    assert options("CREATE TABLE x (id int)") is None
+
+
+def test_analyze_pure_selects_when_enabled(analyze_enabled):
+    assert options("SELECT count(*), max(updated_at) FROM journey_nodes WHERE journey_id IN (%s, %s)") == ANALYZE
+    assert options("WITH t AS (SELECT id FROM journeys) SELECT coalesce(count(*), 0) FROM t") == ANALYZE
+
+
+@pytest.mark.parametrize("sql", [
+    "SELECT shard FROM generate_series(0, 15) AS shard WHERE pg_try_advisory_lock(%s, shard)",
+    "SELECT pg_advisory_unlock(%s, %s)",
+    "SELECT pg_advisory_xact_lock(hashtext(%s))",
+    "SELECT journey_snapshots_partition(%s)",
+    "SELECT nextval('jobs_id_seq')",
+])
+def test_function_calls_are_never_analyzed(analyze_enabled, sql):
+    assert options(sql) == PLAIN
+
+
+def test_data_changes_are_never_analyzed(analyze_enabled):
+    assert options("WITH d AS (DELETE FROM jobs RETURNING id) SELECT count(*) FROM d") == PLAIN
+    assert options("UPDATE journeys SET revision = revision + 1 WHERE id = %s") == PLAIN
+
+
+class _AutocommitConnection:
+    autocommit = True
+
+    def cursor(self, *args, **kwargs):
+        raise AssertionError("nothing may run on an autocommit connection")
+
+
+class _Cursor:
+    name = None
+    connection = _AutocommitConnection()
+
+
+def test_autocommit_connections_are_never_explained():
+    QueryStats()._explain(_Cursor(), "SELECT 1", None, "key", "SELECT ?", "test", 500.0)
@@ -0,0 +1,16 @@
+import asyncio
+
+from app.agents.respond_to_user import respond_to_user_node
+
+
+def test_router_message_becomes_the_response():
+    state = {"user_id": 1, "message": "hi", "interaction_count": 2,
+             "agent_outputs": {"router_output": {"message_to_user": "Let's set a goal"}}}
+
+    assert asyncio.run(respond_to_user_node(state)) == {"response": "Let's set a goal", "interaction_count": 3}
+
+
+def test_existing_response_is_kept_without_a_router_message():
+    state = {"user_id": 1, "message": "hi", "response": "Saved"}
+
+    assert asyncio.run(respond_to_user_node(state)) == {"response": "Saved", "interaction_count": 1}
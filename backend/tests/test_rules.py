@@ -0,0 +1,65 @@
+import numpy as np
+import pytest
+
+from app.services.execution.rules import RuleCompileError, attribute_columns, compile_rule
+
+CUSTOMERS = [
+    {"age": 30, "plan": "gold", "user": {"country": "KE"}, "score": "42", "active": True},
+    {"age": 17, "plan": "silver", "user": {"country": "UG"}, "score": 7, "active": False},
+    {"age": None, "plan": "gold", "score": "n/a"},
+    {"age": "18", "plan": None, "user": {"country": "KE"}, "score": 0.0, "active": True},
+    {},
+]
+
+CONDITIONS = [
+    "age >= 18",
+    "age >= 18 && plan === 'gold'",
+    "user.age > 18 || plan == \"silver\"",
+    "!(age < 18)",
+    "SELECT * FROM customers WHERE age IS NULL ORDER BY age",
+    "age is not null and plan in ('gold', 'platinum')",
+    "plan not in ('gold')",
+    "user.country = 'KE' and active",
+    "score > 10",
+    "score / age > 1",
+    "score % 0 == 0",
+    "age == null",
+    "active == true",
+    "-age < -20",
+    "SELECT id FROM customers",
+]
+
+
+@pytest.mark.parametrize("condition", CONDITIONS)
+def test_vectorized_matches_scalar(condition):
+    rule = compile_rule(condition)
+    columns = attribute_columns(CUSTOMERS, rule.attribute_names)
+
+    scalar = [rule.evaluate(customer) for customer in CUSTOMERS]
+    vectorized = rule.evaluate_batch(columns, size=len(CUSTOMERS))
+
+    assert vectorized.dtype == np.bool_
+    assert vectorized.tolist() == scalar
+
+
+def test_scalar_semantics():
+    assert compile_rule("age >= 18").evaluate({"age": "18"})
+    assert not compile_rule("age >= 18").evaluate({"age": None})
+    assert not compile_rule("age != 18").evaluate({})
+    assert not compile_rule("plan == 'gold'").evaluate({"plan": 1})
+    assert compile_rule("user.age > 18").evaluate({"age": 20})
+    assert compile_rule("SELECT * FROM customers").evaluate({})
+    assert compile_rule("") is None
+
+
+@pytest.mark.parametrize("condition", [
+    "__import__('os')",
+    "plan[0] == 'g'",
+    "len(plan) > 3",
+    "plan in other",
+    "age is 3",
+    "age > ",
+])
+def test_unsupported_conditions_are_rejected(condition):
+    with pytest.raises(RuleCompileError):
+        compile_rule(condition)
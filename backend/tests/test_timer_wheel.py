@@ -0,0 +1,58 @@
+from app.services.execution.timer_wheel import TimerWheel
+
+
+def test_timers_fire_in_their_tick():
+    wheel = TimerWheel(start=0, bits=2, levels=2)
+    wheel.schedule("a", 1)
+    wheel.schedule("b", 2.5)
+    wheel.schedule("c", 3)
+
+    assert wheel.advance(1) == ["a"]
+    assert wheel.advance(2) == []
+    assert sorted(wheel.advance(3)) == ["b", "c"]
+    assert len(wheel) == 0
+
+
+def test_timers_cascade_from_higher_levels_and_overflow():
+    # 2 levels of 4 slots: level 0 covers 4 ticks, level 1 covers 16, the rest overflows
+    wheel = TimerWheel(start=0, bits=2, levels=2)
+    dues = [2, 5, 9, 15, 16, 17, 40, 63, 64, 100]
+    for due in dues:
+        wheel.schedule(due, due)
+    assert wheel.overflow
+
+    fired = {}
+    for now in range(1, 101):
+        for key in wheel.advance(now):
+            fired[key] = now
+
+    assert fired == {due: due for due in dues}
+
+
+def test_large_jump_fires_everything_due():
+    wheel = TimerWheel(start=1000, bits=3, levels=2)
+    for due in (1001, 1010, 1100, 5000):
+        wheel.schedule(due, due)
+
+    assert sorted(wheel.advance(1200)) == [1001, 1010, 1100]
+    assert 5000 in wheel
+    assert wheel.advance(5000) == [5000]
+
+
+def test_reschedule_and_cancel():
+    wheel = TimerWheel(start=0, bits=2, levels=2)
+    wheel.schedule("moved", 3)
+    wheel.schedule("cancelled", 3)
+    wheel.schedule("moved", 10)
+    wheel.cancel("cancelled")
+
+    assert wheel.advance(5) == []
+    assert "cancelled" not in wheel
+    assert wheel.advance(10) == ["moved"]
+
+
+def test_past_due_timer_fires_on_next_advance():
+    wheel = TimerWheel(start=50)
+    wheel.schedule("late", 10)
+
+    assert wheel.advance(50) == ["late"]
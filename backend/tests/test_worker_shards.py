@@ -0,0 +1,44 @@
+from app.services.execution.worker import assign_shards
+
+WORKERS = ["worker-a", "worker-b", "worker-c", "worker-d"]
+SHARDS = 256
+
+
+def assignment(workers):
+    return {worker: set(assign_shards(worker, workers, SHARDS)) for worker in workers}
+
+
+def test_assignment_is_a_partition():
+    owned = assignment(WORKERS)
+
+    assert sum(len(shards) for shards in owned.values()) == SHARDS
+    assert set().union(*owned.values()) == set(range(SHARDS))
+    # Every worker gets a share
+    assert all(owned.values())
+
+
+def test_assignment_is_deterministic_and_order_independent():
+    assert assignment(WORKERS) == assignment(list(reversed(WORKERS)))
+
+
+def test_unknown_worker_owns_nothing():
+    assert assign_shards("worker-z", WORKERS, SHARDS) == []
+
+
+def test_removing_a_worker_only_moves_its_shards():
+    before = assignment(WORKERS)
+    after = assignment([w for w in WORKERS if w != "worker-b"])
+
+    for worker, shards in after.items():
+        assert before[worker] <= shards
+        assert shards - before[worker] <= before["worker-b"]
+
+
+def test_adding_a_worker_only_takes_shards():
+    before = assignment(WORKERS)
+    after = assignment(WORKERS + ["worker-e"])
+
+    for worker in WORKERS:
+        assert after[worker] <= before[worker]
+    moved = set().union(*(before[w] - after[w] for w in WORKERS))
+    assert moved == after["worker-e"]
@@ -0,0 +1,87 @@
+"""
+Journey execution worker entry point.
+
+    python worker.py                  # one worker process
+    python worker.py --processes 4    # one worker per core on this host
+
+Start it on as many hosts as needed: workers find each other through the
+execution_workers table and split the customer shards between them automatically.
+Each process also runs queued background jobs (reports, snapshots) in a few threads.
+"""
+import argparse
+import multiprocessing
+import os
+import signal
+import threading
+import time
+
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv()
+
+
+def run_worker(batch_size: int, jobs: bool = True) -> None:
+    from app.services.execution.worker import ExecutionWorker
+    from app.services.jobs.worker import JobWorker
+    from app.shared_services.tracing import setup_tracing
+
+    setup_tracing("cvm-worker")
+    stop_event = threading.Event()
+    signal.signal(signal.SIGTERM, lambda *_: stop_event.set())
+    signal.signal(signal.SIGINT, lambda *_: stop_event.set())
+    if jobs:
+        JobWorker().start(stop_event)
+    else:
+        # Snapshot partitions must be created ahead of time whether or not jobs run here
+        JobWorker().start_maintenance(stop_event)
+    ExecutionWorker(batch_size=batch_size).run_forever(stop_event)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Run journey execution workers")
+    parser.add_argument("--processes", type=int, default=int(os.getenv("WORKER_PROCESSES", "1")),
+                        help="worker processes to run on this host (default: 1)")
+    parser.add_argument("--batch-size", type=int, default=int(os.getenv("EXECUTION_BATCH_SIZE", "1000")),
+                        help="customers claimed per transaction")
+    parser.add_argument("--no-jobs", action="store_true",
+                        help="do not run queued background jobs in these processes")
+    args = parser.parse_args()
+
+    if args.processes <= 1:
+        run_worker(args.batch_size, not args.no_jobs)
+        return
+
+    # Spawn rather than fork so every worker opens its own database connections
+    context = multiprocessing.get_context("spawn")
+    stopping = threading.Event()
+
+    def start(index: int):
+        process = context.Process(target=run_worker, args=(args.batch_size, not args.no_jobs), name=f"execution-worker-{index}")
+        process.start()
+        return process
+
+    def stop(*_):
+        stopping.set()
+        for process in processes:
+            if process.is_alive():
+                process.terminate()
+
+    processes = [start(i) for i in range(args.processes)]
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+
+    # Replace workers that die; their shards are picked up by the others meanwhile
+    while not stopping.is_set():
+        for index, process in enumerate(processes):
+            if not process.is_alive() and not stopping.is_set():
+                print(f"Worker {process.name} exited with code {process.exitcode}, restarting")
+                processes[index] = start(index)
+        time.sleep(1)
+
+    for process in processes:
+        process.join()
+
+
+if __name__ == "__main__":
+    main()
@@ -76,6 +76,9 @@ interface JourneyState {
     description: string;
     createdAt: Date;
     updatedAt: Date;
+    // Server revision the local state is based on (null until loaded/created); every
+    // save sends it as If-Match and the server answers 409 if the journey was saved since
+    revision: number | null;
     
     // Journey state flags
     isPublished: boolean;
@@ -201,6 +204,14 @@ interface JourneyState {
     clearError: () => void;
 }
 
+// A save was refused because the journey changed on the server since it was loaded
+class RevisionConflictError extends Error {
+    constructor(message = 'This journey was changed in another tab or by another user') {
+        super(message);
+        this.name = 'RevisionConflictError';
+    }
+}
+
 const useJourneyStore = create<JourneyState>()(
     devtools(
         persist(
@@ -214,6 +225,53 @@ const useJourneyStore = create<JourneyState>()(
                 // API Configuration
                 const API_BASE_URL = process.env.NEXT_PUBLIC_API_URL || 'http://localhost:8001';
 
+                // Headers for a write that only applies while the journey is still at the
+                // revision this state was loaded at
+                const conditionalHeaders = (): Record<string, string> => {
+                    const { revision } = get();
+                    if (revision === null || revision === undefined) {
+                        throw new RevisionConflictError('This journey has not been loaded from the server');
+                    }
+                    return { 'Content-Type': 'application/json', 'If-Match': `"journey-${revision}"` };
+                };
+
+                // Check a conditional write's response and adopt the revision it produced
+                const acceptWrite = async (response: Response, what: string) => {
+                    if (response.status === 409) {
+                        throw new RevisionConflictError();
+                    }
+                    if (!response.ok) {
+                        throw new Error(`${what} failed: ${response.statusText}`);
+                    }
+                    const result = await response.json();
+                    if (!result.success) {
+                        throw new Error(result.message || `${what} failed`);
+                    }
+                    const revision = result.data?.revision ?? result.journey?.revision;
+                    if (revision !== undefined && revision !== null) {
+                        set({ revision });
+                    }
+                    return result;
+                };
+
+                // Another tab or user saved since this state was loaded: keep the local edits and
+                // offer to reload (which replaces them with the saved journey)
+                const reportConflict = (error: unknown): boolean => {
+                    if (!(error instanceof RevisionConflictError)) {
+                        return false;
+                    }
+                    console.warn('Save refused:', error.message);
+                    toast.error('Journey changed elsewhere', {
+                        description: `${error.message}. Reload it to continue; unsaved changes here will be lost.`,
+                        action: {
+                            label: 'Reload',
+                            onClick: () => get().loadFromAPI(get().id)
+                        }
+                    });
+                    set({ isSaving: false, lastError: error.message });
+                    return true;
+                };
+
                 return {
                     // Initial state
                 id: '1234567890',
@@ -221,6 +279,7 @@ const useJourneyStore = create<JourneyState>()(
                 description: 'No description',
                 createdAt: new Date(),
                 updatedAt: new Date(),
+                revision: null,
                 isPublished: false,
                 isDeleted: false,
                 isArchived: false,
@@ -587,6 +646,7 @@ const useJourneyStore = create<JourneyState>()(
                         id: '',
                         name: 'Untitled Journey',
                         description: 'No description',
+                        revision: null,
                         nodes: [],
                         edges: [],
                         goals: [],
@@ -627,6 +687,7 @@ const useJourneyStore = create<JourneyState>()(
                         id: newId,
                         name: newName,
                         description: "New journey created",
+                        revision: null,
                         nodes: [],
                         edges: [],
                         goals: [],
@@ -730,44 +791,28 @@ const useJourneyStore = create<JourneyState>()(
                             return;
                         }
 
-                        // Save all domains in parallel for efficiency
-                        await Promise.all([
-                            // Save canvas (nodes + edges)
-                            fetch(`${API_BASE_URL}/api/journeys/${state.id}/canvas`, {
-                                method: 'POST',
-                                headers: { 'Content-Type': 'application/json' },
-                                body: JSON.stringify({ 
-                                    nodes: state.nodes, 
-                                    edges: state.edges 
-                                })
-                            }).then(async (response) => {
-                                if (!response.ok) throw new Error(`Canvas save failed: ${response.statusText}`);
-                                const result = await response.json();
-                                if (!result.success) throw new Error(result.message || 'Canvas save failed');
-                            }),
-                            
-                            // Save goals
-                            fetch(`${API_BASE_URL}/api/journeys/${state.id}/goals`, {
-                                method: 'POST',
-                                headers: { 'Content-Type': 'application/json' },
-                                body: JSON.stringify({ goals: state.goals })
-                            }).then(async (response) => {
-                                if (!response.ok) throw new Error(`Goals save failed: ${response.statusText}`);
-                                const result = await response.json();
-                                if (!result.success) throw new Error(result.message || 'Goals save failed');
-                            }),
-                            
-                            // Save milestones
-                            fetch(`${API_BASE_URL}/api/journeys/${state.id}/milestones`, {
-                                method: 'POST',
-                                headers: { 'Content-Type': 'application/json' },
-                                body: JSON.stringify({ milestones: state.milestones })
-                            }).then(async (response) => {
-                                if (!response.ok) throw new Error(`Milestones save failed: ${response.statusText}`);
-                                const result = await response.json();
-                                if (!result.success) throw new Error(result.message || 'Milestones save failed');
+                        // Save the domains one after another: each save bumps the revision the
+                        // next one is conditional on
+                        await fetch(`${API_BASE_URL}/api/journeys/${state.id}/canvas`, {
+                            method: 'POST',
+                            headers: conditionalHeaders(),
+                            body: JSON.stringify({ 
+                                nodes: state.nodes, 
+                                edges: state.edges 
                             })
-                        ]);
+                        }).then((response) => acceptWrite(response, 'Canvas save'));
+                        
+                        await fetch(`${API_BASE_URL}/api/journeys/${state.id}/goals`, {
+                            method: 'POST',
+                            headers: conditionalHeaders(),
+                            body: JSON.stringify({ goals: state.goals })
+                        }).then((response) => acceptWrite(response, 'Goals save'));
+                        
+                        await fetch(`${API_BASE_URL}/api/journeys/${state.id}/milestones`, {
+                            method: 'POST',
+                            headers: conditionalHeaders(),
+                            body: JSON.stringify({ milestones: state.milestones })
+                        }).then((response) => acceptWrite(response, 'Milestones save'));
                         
                         // Create snapshot after successful saves
                         try {
@@ -806,9 +851,9 @@ const useJourneyStore = create<JourneyState>()(
                                 generatedAt: new Date(report.generatedAt).toISOString()
                             }));
 
-                            await fetch(`${API_BASE_URL}/api/journeys/${state.id}/save`, {
+                            const response = await fetch(`${API_BASE_URL}/api/journeys/${state.id}/save`, {
                                 method: 'POST',
-                                headers: { 'Content-Type': 'application/json' },
+                                headers: conditionalHeaders(),
                                 body: JSON.stringify({
                                     journey: {
                                         id: state.id,
@@ -832,8 +877,13 @@ const useJourneyStore = create<JourneyState>()(
                                     }
                                 })
                             });
+                            await acceptWrite(response, 'Snapshot');
                         } catch (snapshotError) {
-                            // Snapshot is best-effort, don't fail the whole save
+                            // Snapshot is best-effort, don't fail the whole save, unless someone
+                            // else saved in between
+                            if (snapshotError instanceof RevisionConflictError) {
+                                throw snapshotError;
+                            }
                             console.warn('Snapshot creation failed:', snapshotError);
                         }
                         
@@ -851,6 +901,9 @@ const useJourneyStore = create<JourneyState>()(
                             lastSavedAt: new Date() 
                         });
                     } catch (error) {
+                        if (reportConflict(error)) {
+                            return;
+                        }
                         const errorMessage = error instanceof Error ? error.message : 'Failed to save journey';
                         console.error('Failed to save journey:', errorMessage);
                         toast.error('Saving failed. Try again', {
@@ -899,21 +952,13 @@ const useJourneyStore = create<JourneyState>()(
                         // Save only canvas (nodes + edges)
                         const response = await fetch(`${API_BASE_URL}/api/journeys/${state.id}/canvas`, {
                             method: 'POST',
-                            headers: { 'Content-Type': 'application/json' },
+                            headers: conditionalHeaders(),
                             body: JSON.stringify({ 
                                 nodes: transformedNodes, 
                                 edges: state.edges 
                             })
                         });
-
-                        if (!response.ok) {
-                            throw new Error(`Canvas save failed: ${response.statusText}`);
-                        }
-
-                        const result = await response.json();
-                        if (!result.success) {
-                            throw new Error(result.message || 'Canvas save failed');
-                        }
+                        await acceptWrite(response, 'Canvas save');
 
                         console.log('Canvas saved successfully!');
                         toast.success('Canvas saved successfully!', {
@@ -929,6 +974,9 @@ const useJourneyStore = create<JourneyState>()(
                             changedEdges: new Set<string>()
                         });
                     } catch (error) {
+                        if (reportConflict(error)) {
+                            return;
+                        }
                         const errorMessage = error instanceof Error ? error.message : 'Failed to save canvas';
                         console.error('Failed to save canvas:', errorMessage);
                         toast.error('Canvas save failed', {
@@ -973,6 +1021,7 @@ const useJourneyStore = create<JourneyState>()(
                                 description: journey.description,
                                 createdAt: new Date(journey.createdAt),
                                 updatedAt: new Date(journey.updatedAt),
+                                revision: journey.revision ?? null,
                                 isPublished: journey.isPublished,
                                 isDeleted: journey.isDeleted,
                                 isArchived: journey.isArchived,
@@ -1106,22 +1155,17 @@ const useJourneyStore = create<JourneyState>()(
                     try {
                         const response = await fetch(`${API_BASE_URL}/api/journeys/${state.id}/goals`, {
                             method: 'POST',
-                            headers: { 'Content-Type': 'application/json' },
+                            headers: conditionalHeaders(),
                             body: JSON.stringify({ goals: state.goals })
                         });
+                        await acceptWrite(response, 'Goals save');
                         
-                        if (!response.ok) {
-                            throw new Error(`HTTP ${response.status}: ${response.statusText}`);
-                        }
-                        
-                        const result = await response.json();
-                        if (result.success) {
-                            toast.success('Goals saved successfully!');
-                            set({ isSaving: false, lastError: null, unsavedChanges: false, lastSavedAt: new Date() });
-                        } else {
-                            throw new Error(result.message || 'Failed to save goals');
-                        }
+                        toast.success('Goals saved successfully!');
+                        set({ isSaving: false, lastError: null, unsavedChanges: false, lastSavedAt: new Date() });
                     } catch (error) {
+                        if (reportConflict(error)) {
+                            return;
+                        }
                         const errorMessage = error instanceof Error ? error.message : 'Failed to save goals';
                         console.error('Failed to save goals:', errorMessage);
                         
@@ -1164,22 +1208,17 @@ const useJourneyStore = create<JourneyState>()(
 
                         const response = await fetch(`${API_BASE_URL}/api/journeys/${state.id}/milestones`, {
                             method: 'POST',
-                            headers: { 'Content-Type': 'application/json' },
+                            headers: conditionalHeaders(),
                             body: JSON.stringify({ milestones: transformedMilestones })
                         });
+                        await acceptWrite(response, 'Milestones save');
                         
-                        if (!response.ok) {
-                            throw new Error(`HTTP ${response.status}: ${response.statusText}`);
-                        }
-                        
-                        const result = await response.json();
-                        if (result.success) {
-                            toast.success('Milestones saved successfully!');
-                            set({ isSaving: false, lastError: null, unsavedChanges: false, lastSavedAt: new Date() });
-                        } else {
-                            throw new Error(result.message || 'Failed to save milestones');
-                        }
+                        toast.success('Milestones saved successfully!');
+                        set({ isSaving: false, lastError: null, unsavedChanges: false, lastSavedAt: new Date() });
                     } catch (error) {
+                        if (reportConflict(error)) {
+                            return;
+                        }
                         const errorMessage = error instanceof Error ? error.message : 'Failed to save milestones';
                         console.error('Failed to save milestones:', errorMessage);
                         
@@ -1226,6 +1265,7 @@ const useJourneyStore = create<JourneyState>()(
                                 description: journey.description,
                                 createdAt: new Date(journey.createdAt),
                                 updatedAt: new Date(journey.updatedAt),
+                                revision: journey.revision ?? null,
                                 isPublished: journey.isPublished,
                                 isDeleted: journey.isDeleted,
                                 isArchived: journey.isArchived,
@@ -1272,6 +1312,7 @@ const useJourneyStore = create<JourneyState>()(
                                 id: '',
                                 name: 'Untitled Journey',
                                 description: 'No description',
+                                revision: null,
                                 nodes: [],
                                 edges: [],
                                 goals: [],
@@ -1308,6 +1349,7 @@ const useJourneyStore = create<JourneyState>()(
                                 description: journey.description,
                                 createdAt: new Date(journey.createdAt),
                                 updatedAt: new Date(journey.updatedAt),
+                                revision: journey.revision ?? null,
                                 isPublished: journey.isPublished,
                                 isDeleted: journey.isDeleted,
                                 isArchived: journey.isArchived,
@@ -1361,24 +1403,23 @@ const useJourneyStore = create<JourneyState>()(
                     try {
                         const response = await fetch(`${API_BASE_URL}/api/journeys/${state.id}`, {
                             method: 'PUT',
-                            headers: { 'Content-Type': 'application/json' },
+                            headers: conditionalHeaders(),
                             body: JSON.stringify(updates)
                         });
-                        const result = await response.json();
+                        await acceptWrite(response, 'Journey update');
                         
-                        if (result.success) {
-                            // Update local state
-                            set((state) => ({
-                                ...state,
-                                ...updates,
-                                updatedAt: new Date()
-                            }));
-                            
-                            console.log('Journey updated successfully!');
-                        } else {
-                            throw new Error(result.message || 'Failed to update journey');
-                        }
+                        // Update local state
+                        set((state) => ({
+                            ...state,
+                            ...updates,
+                            updatedAt: new Date()
+                        }));
+                        
+                        console.log('Journey updated successfully!');
                     } catch (error) {
+                        if (reportConflict(error)) {
+                            return;
+                        }
                         const errorMessage = error instanceof Error ? error.message : 'Failed to update journey';
                         console.error('Failed to update journey:', errorMessage);
                         set({ lastError: errorMessage });